@@ -0,0 +1,287 @@
+# pyright: reportMissingImports=false, reportMissingModuleSource=false, reportUnknownVariableType=false, reportUnknownArgumentType=false, reportUnknownParameterType=false, reportUnknownMemberType=false, reportGeneralTypeIssues=false
+"""Schedule change toasts and 15-minute patient reminders (Scheduling pages, or every page
+with "Run alerts on all pages").
+"""
+
+import re
+import time as time_module
+from datetime import datetime
+
+import pandas as pd
+import streamlit as st
+
+import runtime
+from status import _schedule_change_key
+from storage import _get_cached_schedule_hash, _persist_reminder_to_storage
+from ui import LIVE_REMINDERS_REFRESH, _rerun_live_fragment, live_fragment
+from utils import IST
+
+
+# ================ LIVE ALERTS ================
+def _notification_tick_key(schedule_hash: str) -> tuple:
+    return (schedule_hash, int(time_module.time() // 60))
+
+
+@live_fragment(run_every=LIVE_REMINDERS_REFRESH)
+def render_live_alerts(df_raw: pd.DataFrame, df: pd.DataFrame, current_hash: str, enable_reminders: bool) -> None:
+    """Per-minute ongoing/upcoming toasts, 15-minute reminders and the Manage Reminders expander."""
+    current_min = runtime.current_minute()
+    now_epoch = runtime.now_epoch()
+    tick_key = _notification_tick_key(current_hash)
+    if st.session_state.get("notification_tick_key") != tick_key:
+        # Re-mark ongoing rows: on a fragment tick current_min has moved on
+        df["Is_Ongoing"] = (df["In_min"] <= current_min) & (current_min <= df["Out_min"])
+
+        # Currently Ongoing (filtered)
+        ongoing_df = df.loc[
+            df["Is_Ongoing"] &
+            ~df["STATUS"].astype(str).str.upper().str.contains("CANCELLED|DONE|COMPLETED|SHIFTED", na=True)
+        ]
+
+        current_ongoing = set(ongoing_df["Patient Name"].dropna())
+
+        # New ongoing (either from time passing or manual status update)
+        new_ongoing = current_ongoing - st.session_state.prev_ongoing
+        for patient in new_ongoing:
+            row = ongoing_df.loc[ongoing_df["Patient Name"] == patient].iloc[0]
+            st.toast(f"🚨 NOW ONGOING: {patient} – {row['Procedure']} with {row['DR.']} (Chair {row['OP']})", icon="🟢")
+
+        # Upcoming in next 15 minutes
+        upcoming_min = current_min + 15
+        upcoming_df = df.loc[
+            (df["In_min"] > current_min) &
+            (df["In_min"] <= upcoming_min) &
+            ~df["STATUS"].astype(str).str.upper().str.contains("CANCELLED|DONE|COMPLETED|SHIFTED", na=True)
+        ]
+
+        current_upcoming = set(upcoming_df["Patient Name"].dropna())
+
+        # New upcoming (just entered the 15-minute window)
+        new_upcoming = current_upcoming - st.session_state.prev_upcoming
+        for patient in new_upcoming:
+            row = upcoming_df.loc[upcoming_df["Patient Name"] == patient].iloc[0]
+            mins_left = row["In_min"] - current_min
+            st.toast(f"⏰ Upcoming in ~{mins_left} min: {patient} – {row['Procedure']} with {row['DR.']}", icon="⚠️")
+        # New arrivals (manual status change in Excel)
+        current_arrived = set(df_raw.loc[df_raw["STATUS"].astype(str).str.upper() == "ARRIVED", "Patient Name"].dropna())
+        if ("STATUS" in st.session_state.prev_raw.columns) and ("Patient Name" in st.session_state.prev_raw.columns):
+            prev_arrived = set(
+                st.session_state.prev_raw[
+                    st.session_state.prev_raw["STATUS"].astype(str).str.upper() == "ARRIVED"
+                ]["Patient Name"].dropna()
+            )
+        else:
+            prev_arrived = set()
+        new_arrived = current_arrived - prev_arrived
+        for patient in new_arrived:
+            row = df[df["Patient Name"] == patient].iloc[0]
+            st.toast(f"👤 Patient ARRIVED: {patient} – {row['Procedure']}", icon="🟡")
+        # Update session state for next run
+        st.session_state.prev_ongoing = current_ongoing
+        st.session_state.prev_upcoming = current_upcoming
+        st.session_state.prev_raw = df_raw.copy()
+        st.session_state.notification_tick_key = tick_key
+
+    # ================ 15-Minute Reminder System ================
+    if enable_reminders:
+        # Clean up expired snoozes
+        expired = [rid for rid, until in list(st.session_state.snoozed.items()) if until <= now_epoch]
+        for rid in expired:
+            del st.session_state.snoozed[rid]
+            # Don't persist clears on natural expiry; we'll overwrite when re-snoozing.
+
+        # Find patients needing reminders (0-15 min before In Time)
+        reminder_df = df[
+            (df["In_min"].notna()) &
+            (df["In_min"] - current_min > 0) &
+            (df["In_min"] - current_min <= 15) &
+            ~df["STATUS"].astype(str).str.upper().str.contains("CANCELLED|DONE|COMPLETED|SHIFTED|ARRIVED|ARRIVING|ON GOING|ONGOING", na=True)
+        ].copy()
+
+        # Show toast for new reminders (not snoozed, not dismissed)
+        for idx, row in reminder_df.iterrows():
+            row_id = row.get('REMINDER_ROW_ID')
+            if pd.isna(row_id):
+                continue
+            patient = row.get("Patient Name", "Unknown")
+            mins_left = int(row["In_min"] - current_min)
+
+            # Skip if snoozed (still active) or dismissed
+            snooze_until = st.session_state.snoozed.get(row_id)
+            if (snooze_until is not None and snooze_until > now_epoch) or (row_id in st.session_state.reminder_sent):
+                continue
+
+            assistants = ", ".join(
+                [
+                    a
+                    for a in [
+                        str(row.get("FIRST", "")).strip(),
+                        str(row.get("SECOND", "")).strip(),
+                        str(row.get("Third", "")).strip(),
+                    ]
+                    if a and a.lower() not in {"nan", "none"}
+                ]
+            )
+            assistants_text = f" | Assist: {assistants}" if assistants else ""
+
+            st.toast(
+                f"🔔 Reminder: {patient} in ~{mins_left} min at {row['In Time Str']} with {row.get('DR.','')} (OP {row.get('OP','')}){assistants_text}",
+                icon="🔔",
+            )
+
+            # Auto-snooze for 30 seconds, and re-alert until status changes.
+            next_until = now_epoch + 30
+            st.session_state.snoozed[row_id] = next_until
+            _persist_reminder_to_storage(df_raw, row_id, next_until, False)
+
+        # Reminder management UI
+        def _safe_key(s):
+            return re.sub(r"\W+", "_", str(s))
+
+        with st.expander("🔔 Manage Reminders", expanded=False):
+            if reminder_df.empty:
+                st.caption("No upcoming appointments in the next 15 minutes.")
+            else:
+                for idx, row in reminder_df.iterrows():
+                    row_id = row.get('REMINDER_ROW_ID')
+                    if pd.isna(row_id):
+                        continue
+                    patient = row.get('Patient Name', 'Unknown')
+                    mins_left = int(row["In_min"] - current_min)
+
+                    assistants = ", ".join(
+                        [
+                            a
+                            for a in [
+                                str(row.get("FIRST", "")).strip(),
+                                str(row.get("SECOND", "")).strip(),
+                                str(row.get("Third", "")).strip(),
+                            ]
+                            if a and a.lower() not in {"nan", "none"}
+                        ]
+                    )
+                    assistants_text = f" — Assist: {assistants}" if assistants else ""
+
+                    col1, col2, col3, col4, col5 = st.columns([4,1,1,1,1])
+                    col1.markdown(
+                        f"**{patient}** — {row.get('Procedure','')} (in ~{mins_left} min at {row.get('In Time Str','')}){assistants_text}"
+                    )  
+
+                    default_snooze_seconds = int(st.session_state.get("default_snooze_seconds", 30))
+                    if col2.button(f"💤 {default_snooze_seconds}s", key=f"snooze_{_safe_key(row_id)}_default"):
+                        until = now_epoch + default_snooze_seconds
+                        st.session_state.snoozed[row_id] = until
+                        st.session_state.reminder_sent.discard(row_id)
+                        _persist_reminder_to_storage(df_raw, row_id, until, False)
+                        st.toast(f"😴 Snoozed {patient} for {default_snooze_seconds} sec", icon="💤")
+                        _rerun_live_fragment()
+
+                    if col3.button("💤 30s", key=f"snooze_{_safe_key(row_id)}_30s"):
+                        until = now_epoch + 30
+                        st.session_state.snoozed[row_id] = until
+                        st.session_state.reminder_sent.discard(row_id)
+                        _persist_reminder_to_storage(df_raw, row_id, until, False)
+                        st.toast(f"😴 Snoozed {patient} for 30 sec", icon="💤")
+                        _rerun_live_fragment()
+
+                    if col4.button("💤 60s", key=f"snooze_{_safe_key(row_id)}_60s"):
+                        until = now_epoch + 60
+                        st.session_state.snoozed[row_id] = until
+                        st.session_state.reminder_sent.discard(row_id)
+                        _persist_reminder_to_storage(df_raw, row_id, until, False)
+                        st.toast(f"😴 Snoozed {patient} for 60 sec", icon="💤")
+                        _rerun_live_fragment()
+
+                    if col5.button("🗑️", key=f"dismiss_{_safe_key(row_id)}"):
+                        st.session_state.reminder_sent.add(row_id)
+                        _persist_reminder_to_storage(df_raw, row_id, None, True)
+                        st.toast(f"✅ Dismissed reminder for {patient}", icon="✅")
+                        _rerun_live_fragment()
+
+                # Show snoozed reminders
+                if st.session_state.snoozed:
+                    st.markdown("---")
+                    st.markdown("**Snoozed Reminders**")
+                    for row_id, until in list(st.session_state.snoozed.items()):
+                        remaining_sec = int(until - now_epoch)
+                        if remaining_sec > 0:
+                            match_row = df[df.get('REMINDER_ROW_ID') == row_id]
+                            if not match_row.empty:
+                                name = match_row.iloc[0].get('Patient Name', row_id)
+                                c1, c2 = st.columns([4,1])
+                                c1.write(f"🕐 {name} — {remaining_sec} sec remaining")
+                                if c2.button("Cancel", key=f"cancel_{_safe_key(row_id)}"):
+                                    del st.session_state.snoozed[row_id]
+                                    _persist_reminder_to_storage(df_raw, row_id, None, False)
+                                    st.toast(f"✅ Cancelled snooze for {name}", icon="✅")
+                                    _rerun_live_fragment()
+
+
+def run_alerts(df_raw: pd.DataFrame, df: pd.DataFrame) -> None:
+    """Change detection, persisted snoozes/dismissals and the live alerts fragment."""
+    if 'prev_hash' not in st.session_state:
+        st.session_state.prev_hash = None
+        st.session_state.prev_ongoing = set()
+        st.session_state.prev_upcoming = set()
+        st.session_state.prev_raw = pd.DataFrame()
+        st.session_state.reminder_sent = set()  # Track reminders by row ID
+        st.session_state.snoozed = {}  # Map row_id -> snooze_until_epoch_seconds
+
+    enable_reminders = st.session_state.get("enable_reminders", True)
+    schedule_key = _schedule_change_key()
+    current_hash = _get_cached_schedule_hash(df_raw)
+
+    if st.session_state.prev_hash != current_hash:
+        st.toast("📊 ALLOTMENT UPDATED", icon="🔄")
+        # Reset tracked sets on file change
+        st.session_state.prev_ongoing = set()
+        st.session_state.prev_upcoming = set()
+        st.session_state.reminder_sent = set()
+        st.session_state.snoozed = {}
+        st.session_state.reminder_state_key = None
+        st.session_state.notification_tick_key = None
+
+    st.session_state.prev_hash = current_hash
+
+    if enable_reminders and st.session_state.get("reminder_state_key") != schedule_key:
+        st.session_state.reminder_sent = set()
+        st.session_state.snoozed = {}
+        # Load persisted reminders from storage
+        for idx, row in df_raw.iterrows():
+            try:
+                row_id = row.get('REMINDER_ROW_ID')
+                if pd.notna(row_id):
+                    until_raw = row.get('REMINDER_SNOOZE_UNTIL')
+                    until_epoch = None
+                    if pd.notna(until_raw) and until_raw != "":
+                        try:
+                            # Normalize numeric strings
+                            if isinstance(until_raw, str) and until_raw.strip().isdigit():
+                                until_raw = int(until_raw.strip())
+
+                            if isinstance(until_raw, (int, float)):
+                                val = int(until_raw)
+                                # Legacy values were stored as minutes since midnight (small numbers)
+                                if val < 100000:
+                                    now = runtime.now()
+                                    midnight_ist = datetime(now.year, now.month, now.day, tzinfo=IST)
+                                    until_epoch = int(midnight_ist.timestamp()) + (val * 60)
+                                else:
+                                    until_epoch = val
+                            elif isinstance(until_raw, str):
+                                s = until_raw.strip().replace("Z", "+00:00")
+                                dt = datetime.fromisoformat(s)
+                                until_epoch = int(dt.timestamp())
+                        except Exception:
+                            until_epoch = None
+
+                    if until_epoch is not None and until_epoch > runtime.now_epoch():
+                        st.session_state.snoozed[row_id] = until_epoch
+                    dismissed = row.get('REMINDER_DISMISSED')
+                    if str(dismissed).strip().upper() in ['TRUE','1','T','YES']:
+                        st.session_state.reminder_sent.add(row_id)
+            except Exception:
+                continue
+        st.session_state.reminder_state_key = schedule_key
+
+    render_live_alerts(df_raw, df, current_hash, enable_reminders)
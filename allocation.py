@@ -0,0 +1,2235 @@
+# pyright: reportMissingImports=false, reportMissingModuleSource=false, reportUnknownVariableType=false, reportUnknownArgumentType=false, reportUnknownParameterType=false, reportUnknownMemberType=false, reportGeneralTypeIssues=false
+"""Assistant allocation engine: day bitsets, conflicts, rules, load ledger, workload,
+per-row and whole-day allocation, and the rebalancer.
+
+Imported by the app pages and by allocation_simulator.py; it reads the
+session, clock and storage only through runtime, so it runs the same inside
+and outside Streamlit.
+"""
+
+import bisect
+import functools
+import time as time_module
+from types import MappingProxyType
+from typing import AbstractSet, Any, Mapping, Optional
+
+import numpy as np
+import pandas as pd
+from pandas import DataFrame
+
+import runtime
+from staff import (
+    ALLOCATION_RULES_PATH,
+    WEEKLY_OFF,
+    _get_all_assistants,
+    _get_global_allocation_config,
+    _get_profiles_cache,
+    _load_allocation_config_cached,
+    get_assistants_for_department,
+    get_department_for_doctor,
+)
+from status import (
+    _assistant_punch_state,
+    _availability_cache_key,
+    _availability_version,
+    _get_dashboard_free_set,
+    _get_tick_punch_map,
+    _schedule_version_key,
+    _tick_cached,
+    get_availability_snapshot,
+    invalidate_availability,
+)
+from utils import (
+    _coerce_to_time_obj,
+    _format_punch_time,
+    _frame_fingerprint,
+    _get_third_column_name,
+    _is_blank_cell,
+    _norm_staff_key,
+    _normalize_name_list,
+    _time_to_hhmm,
+    _to_float,
+    _unique_preserve_order,
+    mins_to_hhmm,
+    time_to_minutes,
+)
+
+
+# ================ DAY AVAILABILITY BITSETS ================
+# One boolean row per assistant and one column per minute of the day. Windows
+# that cross midnight keep their +1440 shape, so the mask spans two days.
+DAY_MINUTES = 1440
+_DAY_MASK_WIDTH = DAY_MINUTES * 2
+_INACTIVE_APPT_PATTERN = "CANCELLED|DONE|COMPLETED|SHIFTED"
+
+
+def _minutes_from_time_value(value: Any) -> Optional[int]:
+    t = _coerce_to_time_obj(value)
+    if t is None:
+        return None
+    return t.hour * 60 + t.minute
+
+
+def _window_minutes(check_in_time: Any, check_out_time: Any) -> Optional[tuple[int, int]]:
+    check_in_min = _minutes_from_time_value(check_in_time)
+    check_out_min = _minutes_from_time_value(check_out_time)
+    if check_in_min is None or check_out_min is None:
+        return None
+    if check_out_min < check_in_min:
+        check_out_min += DAY_MINUTES  # Overnight
+    return check_in_min, check_out_min
+
+
+def _assistant_off_reason(
+    assist_upper: str,
+    punch_map: Optional[dict[str, dict[str, str]]],
+    weekly_off_set: set[str],
+) -> str:
+    """Reason an assistant is off duty right now ('' when punched in)."""
+    punch_state, _, punch_out = _assistant_punch_state(assist_upper, punch_map)
+    if punch_state == "IN":
+        return ""
+    if assist_upper in weekly_off_set:
+        return f"Weekly off on {runtime.now().strftime('%A')}"
+    if punch_state == "OUT":
+        out_label = _format_punch_time(punch_out)
+        return f"Punched out at {out_label}" if out_label else "Punched out"
+    return "Not punched in"
+
+
+def _schedule_minutes(df_schedule: DataFrame, cols: tuple[str, ...]) -> pd.Series:
+    """Minutes of day from the first of cols that parses per row (NaN when none do)."""
+    minutes = pd.Series(np.nan, index=df_schedule.index, dtype="float64")
+    for col in cols:
+        missing = minutes.isna()
+        if col not in df_schedule.columns or not bool(missing.any()):
+            continue
+        src = df_schedule.loc[missing, col]
+        parsed = src if col.endswith("_min") else src.map(_minutes_from_time_value)
+        minutes = minutes.fillna(pd.Series(pd.to_numeric(parsed, errors="coerce"), index=src.index, dtype="float64"))
+    return minutes
+
+
+def _schedule_interval_base(df_schedule: DataFrame) -> tuple[pd.DataFrame, pd.Series]:
+    """Active appointments with a known start as (pos, start, end, row_id, patient, labels), plus the row mask.
+
+    Minutes come from "In Time"/"Out Time", then In_min/Out_min, then the "... Str"
+    columns; a row with no Out Time ends at its In Time. The time columns go first
+    because edit paths update them on working copies without recomputing In_min.
+    """
+    if "STATUS" in df_schedule.columns:
+        status = df_schedule["STATUS"].astype(str).str.strip().str.upper()
+        active = ~status.str.contains(_INACTIVE_APPT_PATTERN, na=False)
+    else:
+        active = pd.Series(True, index=df_schedule.index)
+
+    start_min = _schedule_minutes(df_schedule, ("In Time", "In_min", "In Time Str"))
+    end_min = _schedule_minutes(df_schedule, ("Out Time", "Out_min", "Out Time Str"))
+    valid = active & start_min.notna()
+    if not bool(valid.any()):
+        return pd.DataFrame(columns=["pos", "start", "end", "row_id", "patient", "in_label", "out_label"]), valid
+
+    starts = start_min.loc[valid].astype(int)
+    ends = end_min.fillna(start_min).loc[valid].astype(int)
+    ends = ends.where(ends >= starts, ends + DAY_MINUTES)
+    positions = pd.Series(np.arange(len(df_schedule)), index=df_schedule.index)[valid]
+    base = pd.DataFrame(
+        {
+            "pos": positions,
+            "start": starts,
+            "end": ends,
+            "row_id": df_schedule["REMINDER_ROW_ID"][valid] if "REMINDER_ROW_ID" in df_schedule.columns else "",
+            "patient": df_schedule["Patient Name"][valid] if "Patient Name" in df_schedule.columns else "Unknown",
+            "in_label": starts.map(lambda m: mins_to_hhmm(m % DAY_MINUTES)),
+            "out_label": ends.map(lambda m: mins_to_hhmm(m % DAY_MINUTES)),
+        }
+    )
+    return base, valid
+
+
+def _schedule_assignment_frame(df_schedule: Optional[DataFrame]) -> pd.DataFrame:
+    """Long view of active assignments: one row per (appointment, role) in schedule order."""
+    cols = ["assistant", "pos", "role", "start", "end", "row_id", "patient", "in_label", "out_label"]
+    if df_schedule is None or df_schedule.empty:
+        return pd.DataFrame(columns=cols)
+    base, valid = _schedule_interval_base(df_schedule)
+    if base.empty:
+        return pd.DataFrame(columns=cols)
+
+    third_col = _get_third_column_name(df_schedule.columns)
+    parts = []
+    for role_order, col in enumerate(["FIRST", "SECOND", third_col]):
+        if not col or col not in df_schedule.columns:
+            continue
+        names = df_schedule.loc[valid, col].fillna("").astype(str).str.strip().str.upper()
+        keep = ~names.isin(["", "NAN", "NONE", "NAT"])
+        if not bool(keep.any()):
+            continue
+        part = base[keep].copy()
+        part["assistant"] = names[keep]
+        part["role"] = col
+        part["role_order"] = role_order
+        parts.append(part)
+    if not parts:
+        return pd.DataFrame(columns=cols)
+    out = pd.concat(parts, ignore_index=True)
+    out = out.sort_values(["pos", "role_order"], kind="stable").reset_index(drop=True)
+    return out.loc[:, cols]
+
+
+def _interval_counts(n_rows: int, rows: np.ndarray, starts: np.ndarray, ends: np.ndarray) -> np.ndarray:
+    """Per-minute overlap counts of [start, end) intervals as an (n_rows, width) array, via a difference array."""
+    mask_diff = np.zeros((n_rows, _DAY_MASK_WIDTH + 1), dtype=np.int32)
+    if len(rows):
+        starts = np.clip(starts, 0, _DAY_MASK_WIDTH)
+        ends = np.clip(np.maximum(ends, starts + 1), 0, _DAY_MASK_WIDTH)
+        np.add.at(mask_diff, (rows, starts), 1)
+        np.add.at(mask_diff, (rows, ends), -1)
+    return np.cumsum(mask_diff, axis=1)[:, :_DAY_MASK_WIDTH]
+
+
+def _fill_interval_mask(n_rows: int, rows: np.ndarray, starts: np.ndarray, ends: np.ndarray) -> np.ndarray:
+    return _interval_counts(n_rows, rows, starts, ends) > 0
+
+
+def _build_day_availability(
+    df_schedule: Optional[DataFrame],
+    assistants: list[str],
+    punch_map: Optional[dict[str, dict[str, str]]],
+    weekly_off_set: set[str],
+    today_blocks: list[dict],
+) -> dict[str, Any]:
+    assignments = _schedule_assignment_frame(df_schedule)
+    names = _unique_preserve_order(
+        list(assistants)
+        + assignments["assistant"].tolist()
+        + [str(b.get("assistant", "")) for b in today_blocks]
+    )
+    index = {name: i for i, name in enumerate(names)}
+    n = len(names)
+
+    appt_rows = assignments["assistant"].map(index.get).to_numpy(dtype=np.int64)
+    appt_mask = _fill_interval_mask(
+        n,
+        appt_rows,
+        assignments["start"].to_numpy(dtype=np.int64),
+        assignments["end"].to_numpy(dtype=np.int64),
+    )
+
+    blocks_by_name: dict[str, list[tuple[int, int, str]]] = {}
+    b_rows: list[int] = []
+    b_starts: list[int] = []
+    b_ends: list[int] = []
+    for block in today_blocks:
+        name = str(block.get("assistant", "")).strip().upper()
+        start_t = _coerce_to_time_obj(block.get("start_time"))
+        end_t = _coerce_to_time_obj(block.get("end_time"))
+        if not name or start_t is None or end_t is None:
+            continue
+        start_min = start_t.hour * 60 + start_t.minute
+        end_min = end_t.hour * 60 + end_t.minute
+        if end_min < start_min:
+            end_min += DAY_MINUTES
+        blocks_by_name.setdefault(name, []).append((start_min, end_min, str(block.get("reason", "Blocked"))))
+        b_rows.append(index[name])
+        b_starts.append(start_min)
+        b_ends.append(end_min)
+    block_mask = _fill_interval_mask(n, np.array(b_rows, dtype=np.int64), np.array(b_starts, dtype=np.int64), np.array(b_ends, dtype=np.int64))
+
+    # Off-duty layer: whole day when not punched in, otherwise the minutes before punch-in.
+    off_mask = np.zeros((n, _DAY_MASK_WIDTH), dtype=bool)
+    off_reason: dict[str, str] = {}
+    for name, i in index.items():
+        reason = _assistant_off_reason(name, punch_map, weekly_off_set)
+        off_reason[name] = reason
+        if reason:
+            off_mask[i, :] = True
+            continue
+        _, punch_in, _ = _assistant_punch_state(name, punch_map)
+        punch_in_min = time_to_minutes(_format_punch_time(punch_in))
+        if punch_in_min is not None:
+            off_mask[i, :punch_in_min] = True
+
+    appts_by_name: dict[str, list[dict[str, Any]]] = {}
+    for rec in assignments.to_dict("records"):
+        appts_by_name.setdefault(rec["assistant"], []).append(rec)
+
+    return {
+        "names": names,
+        "index": index,
+        "appt": appt_mask,
+        "blocked": block_mask,
+        "off": off_mask,
+        "busy": appt_mask | block_mask | off_mask,
+        "off_reason": off_reason,
+        "blocks": blocks_by_name,
+        "appts": appts_by_name,
+    }
+
+
+def _get_day_availability(
+    df_schedule: Optional[DataFrame],
+    assistants: Optional[list[str]] = None,
+    use_cache: bool = True,
+) -> dict[str, Any]:
+    """Return the per-minute availability matrix, rebuilt once per schedule/punch/block change and minute.
+
+    use_cache=False builds it for a scratch frame without reading or storing the session copy.
+    """
+    now = runtime.now()
+    if assistants is None:
+        try:
+            assistants = _get_all_assistants()
+        except Exception:
+            assistants = []
+    punch_map = _get_tick_punch_map()
+    try:
+        weekly_off_map = _get_profiles_cache().get("weekly_off_map", WEEKLY_OFF)
+    except Exception:
+        weekly_off_map = WEEKLY_OFF
+    weekly_off_set = {
+        str(a).strip().upper()
+        for a in weekly_off_map.get(now.weekday(), [])
+        if str(a).strip()
+    }
+    today_str = now.strftime("%Y-%m-%d")
+    today_blocks = [
+        b for b in runtime.session_state().get("time_blocks", [])
+        if str(b.get("date", "")).strip() == today_str
+    ]
+    if not use_cache:
+        return _build_day_availability(df_schedule, assistants, punch_map, weekly_off_set, today_blocks)
+
+    cache_key = (
+        *_availability_cache_key(df_schedule),
+        tuple(_unique_preserve_order(list(assistants))),
+        tuple(sorted(weekly_off_set)),
+        runtime.now_epoch() // 60,
+    )
+    cached = runtime.session_state().get("day_availability_cache")
+    if isinstance(cached, tuple) and len(cached) == 2 and cached[0] == cache_key:
+        return cached[1]
+    avail = _build_day_availability(df_schedule, assistants, punch_map, weekly_off_set, today_blocks)
+    runtime.session_state().day_availability_cache = (cache_key, avail)
+    return avail
+
+
+def _mask_window(check_in_min: int, check_out_min: int) -> slice:
+    start = max(0, min(int(check_in_min), _DAY_MASK_WIDTH - 1))
+    end = max(start + 1, min(int(check_out_min), _DAY_MASK_WIDTH))
+    return slice(start, end)
+
+
+def _day_availability_cache_key(avail: dict[str, Any]) -> Optional[tuple]:
+    """Version key of the cached day availability (None if avail is not the cached one)."""
+    cached = runtime.session_state().get("day_availability_cache")
+    if isinstance(cached, tuple) and len(cached) == 2 and cached[1] is avail:
+        return cached[0]
+    return None
+
+
+# Heatmap cell codes, in precedence order (highest wins within a slot).
+GRID_FREE, GRID_BUSY, GRID_BLOCKED, GRID_NOT_IN, GRID_OFF = 0, 1, 2, 3, 4
+GRID_LABELS = {GRID_FREE: "", GRID_BUSY: "Busy", GRID_BLOCKED: "Blocked", GRID_NOT_IN: "Not in", GRID_OFF: "Off"}
+
+
+def _build_availability_grid(avail: dict[str, Any], slot_minutes: int, day_start: int, day_end: int) -> dict[str, Any]:
+    names = list(avail["names"])
+    n_cells = max(1, -(-(day_end - day_start) // slot_minutes))
+    span_end = min(day_start + n_cells * slot_minutes, _DAY_MASK_WIDTH)
+
+    def _per_slot(mask: np.ndarray) -> np.ndarray:
+        window = np.zeros((len(names), n_cells * slot_minutes), dtype=bool)
+        window[:, : span_end - day_start] = mask[:, day_start:span_end]
+        return np.asarray(window.reshape(len(names), n_cells, slot_minutes).any(axis=2))
+
+    codes = np.zeros((len(names), n_cells), dtype=np.int8)
+    codes[_per_slot(avail["appt"])] = GRID_BUSY
+    codes[_per_slot(avail["blocked"])] = GRID_BLOCKED
+    codes[_per_slot(avail["off"])] = GRID_NOT_IN
+    whole_day_off = np.array(
+        [bool(avail["off_reason"].get(name)) and avail["off_reason"][name] != "Not punched in" for name in names],
+        dtype=bool,
+    )
+    codes[whole_day_off, :] = GRID_OFF
+    starts = [day_start + i * slot_minutes for i in range(n_cells)]
+    return {
+        "names": names,
+        "starts": starts,
+        "labels": [mins_to_hhmm(s % DAY_MINUTES) for s in starts],
+        "codes": codes,
+        "off_reason": dict(avail["off_reason"]),
+        "slot_minutes": slot_minutes,
+    }
+
+
+def get_availability_grid(df_schedule: Optional[DataFrame], slot_minutes: int = 15) -> dict[str, Any]:
+    """Assistants x slot_minutes grid of free/busy/blocked/not-in/off codes, cached per availability version.
+
+    Built from the per-minute masks of _get_day_availability with one reshape per
+    layer; the day spans 08:00-21:00 widened to cover every booked appointment.
+    """
+    avail = _get_day_availability(df_schedule)
+    day_start, day_end = 8 * 60, 21 * 60
+    for recs in avail["appts"].values():
+        for rec in recs:
+            day_start = min(day_start, int(rec["start"]))
+            day_end = max(day_end, int(rec["end"]))
+    day_start = (day_start // slot_minutes) * slot_minutes
+    day_end = min(day_end, _DAY_MASK_WIDTH)
+
+    def _build() -> dict[str, Any]:
+        return _build_availability_grid(avail, slot_minutes, day_start, day_end)
+
+    avail_key = _day_availability_cache_key(avail)
+    if avail_key is None:
+        return _build()
+    return _tick_cached("availability_grid", (avail_key, slot_minutes, day_start, day_end), _build)
+
+
+def _grid_slot_availability(grid: dict[str, Any], slot_start: int, slot_end: int) -> MappingProxyType:
+    """Snapshot-shaped {status_map, free_set} for a future window, from the grid cells it covers."""
+    starts = grid["starts"]
+    first = bisect.bisect_right(starts, slot_start) - 1
+    last = bisect.bisect_left(starts, slot_end)
+    codes = grid["codes"][:, max(first, 0):max(last, first + 1)]
+    worst = codes.max(axis=1) if codes.shape[1] else np.zeros(len(grid["names"]), dtype=np.int8)
+    status_map = {}
+    for name, code in zip(grid["names"], worst.tolist()):
+        label = "FREE" if code == GRID_FREE else GRID_LABELS[code].upper()
+        reason = grid["off_reason"].get(name) if code in (GRID_OFF, GRID_NOT_IN) else ""
+        status_map[name] = MappingProxyType({"status": label, "reason": reason or f"{GRID_LABELS.get(code) or 'Free'} in this slot"})
+    return MappingProxyType({
+        "status_map": MappingProxyType(status_map),
+        "free_set": frozenset(name for name, code in zip(grid["names"], worst.tolist()) if code == GRID_FREE),
+    })
+
+
+def get_free_assistants_between(
+    df_schedule: pd.DataFrame,
+    check_in_time: Any,
+    check_out_time: Any,
+    assistants: Optional[list[str]] = None,
+) -> list[str]:
+    """Assistants with no busy minute (off duty, blocked or chairside) in the window."""
+    window = _window_minutes(check_in_time, check_out_time)
+    avail = _get_day_availability(df_schedule)
+    names = avail["names"] if assistants is None else _unique_preserve_order(assistants)
+    if window is None:
+        return [n for n in names if not avail["off_reason"].get(n)]
+    rows = [avail["index"][n] for n in names if n in avail["index"]]
+    if not rows:
+        return []
+    free_rows = ~avail["busy"][rows, _mask_window(*window)].any(axis=1)
+    row_names = [n for n in names if n in avail["index"]]
+    return [name for name, free in zip(row_names, free_rows) if free]
+
+
+def get_next_busy_minute(
+    assistant: str,
+    df_schedule: pd.DataFrame,
+    from_min: Optional[int] = None,
+    layer: str = "busy",
+) -> Optional[int]:
+    """First minute at/after from_min where the assistant is busy (None if free for the rest of the day)."""
+    avail = _get_day_availability(df_schedule)
+    i = avail["index"].get(str(assistant or "").strip().upper())
+    if i is None:
+        return None
+    start = runtime.current_minute() if from_min is None else int(from_min)
+    row = avail[layer][i, start:_DAY_MASK_WIDTH]
+    if not row.any():
+        return None
+    return start + int(np.argmax(row))
+
+
+def get_largest_free_gap(
+    assistant: str,
+    df_schedule: pd.DataFrame,
+    from_min: Optional[int] = None,
+    until_min: int = DAY_MINUTES,
+) -> tuple[Optional[int], int]:
+    """Return (start_minute, length) of the longest free run between from_min and until_min."""
+    avail = _get_day_availability(df_schedule)
+    i = avail["index"].get(str(assistant or "").strip().upper())
+    start = runtime.current_minute() if from_min is None else int(from_min)
+    if i is None or start >= until_min:
+        return None, 0
+    free = ~avail["busy"][i, start:until_min]
+    if not free.any():
+        return None, 0
+    padded = np.concatenate(([0], free.astype(np.int8), [0]))
+    edges = np.flatnonzero(np.diff(padded))
+    run_starts, run_ends = edges[0::2], edges[1::2]
+    lengths = run_ends - run_starts
+    best = int(np.argmax(lengths))
+    return start + int(run_starts[best]), int(lengths[best])
+
+
+# ================ CONFLICT DETECTION ================
+# Sweep-line over (assistant, interval) and (OP, interval): sort each group by
+# start; a row conflicts when it starts before the running max end of earlier
+# rows in its group, or the next row starts before it ends. O(n log n) per
+# schedule version, cached on the schedule fingerprint.
+def _sweep_overlap_flags(groups: np.ndarray, starts: np.ndarray, ends: np.ndarray) -> np.ndarray:
+    n = len(starts)
+    if n == 0:
+        return np.zeros(0, dtype=bool)
+    ends = np.maximum(ends, starts + 1)
+    order = np.lexsort((starts, groups))
+    g = pd.Series(groups[order])
+    s_sorted = pd.Series(starts[order])
+    e_sorted = pd.Series(ends[order])
+    prev_max_end = e_sorted.groupby(g).cummax().groupby(g).shift(1)
+    next_start = s_sorted.groupby(g).shift(-1)
+    flags_sorted = ((s_sorted < prev_max_end) | (next_start < e_sorted)).to_numpy()
+    flags = np.zeros(n, dtype=bool)
+    flags[order] = flags_sorted
+    return flags
+
+
+def _conflict_messages(frame: pd.DataFrame, key_col: str, label: str, flags: np.ndarray) -> dict[int, list[str]]:
+    """Describe each flagged interval against the overlapping rows in its group (flagged rows only)."""
+    out: dict[int, list[str]] = {}
+    flagged = frame.loc[flags]
+    for key, grp in flagged.groupby(key_col, sort=False):
+        starts = grp["start"].to_numpy()
+        ends = np.maximum(grp["end"].to_numpy(), starts + 1)
+        pos = grp["pos"].to_numpy()
+        who = f"{label} {key}".strip()
+        for i in range(len(grp)):
+            hits = np.nonzero((starts < ends[i]) & (ends > starts[i]) & (np.arange(len(grp)) != i))[0]
+            for j in hits:
+                if pos[j] == pos[i]:
+                    msg = f"{who} listed twice on this appointment"
+                else:
+                    msg = (
+                        f"{who} double-booked with {grp['patient'].iat[j]} "
+                        f"({grp['in_label'].iat[j]}-{grp['out_label'].iat[j]})"
+                    )
+                bucket = out.setdefault(int(pos[i]), [])
+                if msg not in bucket:
+                    bucket.append(msg)
+    return out
+
+
+def _build_schedule_conflicts(df_schedule: DataFrame) -> dict[str, Any]:
+    messages: dict[int, list[str]] = {}
+
+    assignments = _schedule_assignment_frame(df_schedule)
+    if not assignments.empty:
+        codes = pd.factorize(assignments["assistant"])[0]
+        flags = _sweep_overlap_flags(
+            codes, assignments["start"].to_numpy(dtype=np.int64), assignments["end"].to_numpy(dtype=np.int64)
+        )
+        for pos, msgs in _conflict_messages(assignments.reset_index(drop=True), "assistant", "Assistant", flags).items():
+            messages.setdefault(pos, []).extend(msgs)
+
+    if "OP" in df_schedule.columns:
+        base, valid = _schedule_interval_base(df_schedule)
+        if not base.empty:
+            ops = df_schedule.loc[valid, "OP"].astype(str).str.strip().str.upper()
+            keep = ~ops.isin(["", "NAN", "NONE", "NAT"])
+            op_frame = base[keep].assign(op=ops[keep]).reset_index(drop=True)
+            if not op_frame.empty:
+                codes = pd.factorize(op_frame["op"])[0]
+                flags = _sweep_overlap_flags(
+                    codes, op_frame["start"].to_numpy(dtype=np.int64), op_frame["end"].to_numpy(dtype=np.int64)
+                )
+                for pos, msgs in _conflict_messages(op_frame, "op", "", flags).items():
+                    messages.setdefault(pos, []).extend(msgs)
+
+    index_labels = list(df_schedule.index)
+    row_ids = (
+        df_schedule["REMINDER_ROW_ID"].astype(str).str.strip().tolist()
+        if "REMINDER_ROW_ID" in df_schedule.columns
+        else [""] * len(df_schedule)
+    )
+    by_index = {index_labels[pos]: tuple(msgs) for pos, msgs in sorted(messages.items())}
+    return {
+        "by_index": by_index,
+        "row_ids": frozenset(row_ids[pos] for pos in messages if row_ids[pos]),
+        "count": len(by_index),
+    }
+
+
+def find_schedule_conflicts(df_schedule: Optional[DataFrame]) -> dict[str, Any]:
+    """Double-booked assistants and OPs as {by_index: {index label: messages}, row_ids, count}."""
+    if df_schedule is None or df_schedule.empty:
+        return {"by_index": {}, "row_ids": frozenset(), "count": 0}
+    key = _frame_fingerprint(
+        df_schedule,
+        ["In Time", "Out Time", "FIRST", "SECOND", "Third", "THIRD", "OP", "STATUS", "REMINDER_ROW_ID", "Patient Name"],
+    )
+    if not key:
+        return _build_schedule_conflicts(df_schedule)
+    return _tick_cached("schedule_conflicts", (key,), lambda: _build_schedule_conflicts(df_schedule))
+
+
+# ================ ASSISTANT AVAILABILITY TRACKING ================
+def get_assistant_schedule(assistant_name: str, df_schedule: pd.DataFrame) -> list[dict[str, Any]]:
+    """Get all appointments where this assistant is assigned"""
+    if not assistant_name or df_schedule.empty:
+        return []
+    
+    assist_upper = str(assistant_name).strip().upper()
+    appointments = []
+    third_col = _get_third_column_name(df_schedule.columns)
+    
+    for idx, row in df_schedule.iterrows():
+        # Check FIRST, SECOND, Third columns
+        for col in ["FIRST", "SECOND", third_col]:
+            if col in row.index:
+                val = str(row.get(col, "")).strip().upper()
+                if val == assist_upper:
+                    # Skip cancelled/done/completed/shifted appointments
+                    status = str(row.get("STATUS", "")).strip().upper()
+                    if any(s in status for s in ["CANCELLED", "DONE", "COMPLETED", "SHIFTED"]):
+                        continue
+                    
+                    appointments.append({
+                        "row_id": row.get("REMINDER_ROW_ID", ""),
+                        "patient": row.get("Patient Name", "Unknown"),
+                        "in_time": row.get("In Time"),
+                        "out_time": row.get("Out Time"),
+                        "doctor": row.get("DR.", ""),
+                        "op": row.get("OP", ""),
+                        "role": col,
+                        "status": status
+                    })
+    
+    return appointments
+
+
+def is_assistant_available(
+    assistant_name: str,
+    check_in_time,
+    check_out_time,
+    df_schedule: pd.DataFrame,
+    exclude_row_id: Optional[str] = None,
+    avail: Optional[dict[str, Any]] = None,
+) -> tuple[bool, str]:
+    """
+    Check if an assistant is available during a time window.
+    Returns (is_available, conflict_reason)
+    avail is a day availability already built for df_schedule (saves re-keying it per assistant).
+    """
+    if not assistant_name:
+        return False, "No assistant specified"
+    
+    assist_upper = str(assistant_name).strip().upper()
+    if avail is None:
+        avail = _get_day_availability(df_schedule)
+
+    if assist_upper in avail["off_reason"]:
+        off_reason = avail["off_reason"][assist_upper]
+    else:
+        try:
+            weekly_off_map = _get_profiles_cache().get("weekly_off_map", WEEKLY_OFF)
+            weekly_off_set = {str(a).strip().upper() for a in weekly_off_map.get(runtime.now().weekday(), [])}
+        except Exception:
+            weekly_off_set = set()
+        off_reason = _assistant_off_reason(assist_upper, runtime.punch_map(), weekly_off_set)
+    if off_reason:
+        return False, off_reason
+
+    window = _window_minutes(check_in_time, check_out_time)
+    if window is None:
+        return True, ""  # Can't determine, assume available
+    check_in_min, check_out_min = window
+
+    i = avail["index"].get(assist_upper)
+    if i is None:
+        return True, ""
+    span = _mask_window(check_in_min, check_out_min)
+
+    # Time blocks first (overlap against the whole appointment window)
+    if avail["blocked"][i, span].any():
+        for start_min, end_min, reason in avail["blocks"].get(assist_upper, []):
+            if not (check_out_min <= start_min or check_in_min >= end_min):
+                return False, f"Blocked: {reason}"
+
+    # Existing appointments; the mask is a superset so only walk the rows on a hit
+    if avail["appt"][i, span].any():
+        for appt in avail["appts"].get(assist_upper, []):
+            if exclude_row_id and str(appt.get("row_id", "")).strip() == str(exclude_row_id).strip():
+                continue
+            if not (check_out_min <= appt["start"] or check_in_min >= appt["end"]):
+                return False, f"With {appt.get('patient', 'patient')} ({appt['in_label']}-{appt['out_label']})"
+
+    return True, ""
+
+
+def _remove_assistant_assignments(df_schedule: Optional[DataFrame], assistant_name: str) -> Optional[DataFrame]:
+    """Clear all allotments for an assistant (FIRST/SECOND/Third). Returns updated DF or None if no change."""
+    if df_schedule is None or df_schedule.empty:
+        return None
+    assist_upper = str(assistant_name or "").strip().upper()
+    if not assist_upper:
+        return None
+
+    df_updated = df_schedule.copy()
+    third_col = _get_third_column_name(df_updated.columns)
+    cols = ["FIRST", "SECOND", third_col]
+    changed = False
+    for col in cols:
+        if not col or col not in df_updated.columns:
+            continue
+        mask = df_updated[col].astype(str).str.strip().str.upper() == assist_upper
+        if mask.any():
+            df_updated.loc[mask, col] = ""
+            changed = True
+    return df_updated if changed else None
+
+
+def _pref_allows_role(value: Any) -> bool:
+    try:
+        s = str(value or "").strip().lower()
+    except Exception:
+        return True
+    if not s:
+        return True
+    if s in {"no", "n", "false", "0", "off"}:
+        return False
+    if s in {"yes", "y", "true", "1", "on"}:
+        return True
+    return True
+
+
+def _collect_time_overrides(time_overrides: Any) -> list[tuple[float, list[str]]]:
+    overrides: list[tuple[float, list[str]]] = []
+    if time_overrides is None:
+        return overrides
+    if isinstance(time_overrides, dict):
+        if "after_hour" in time_overrides:
+            after = _to_float(time_overrides.get("after_hour"))
+            assistants = _normalize_name_list(
+                time_overrides.get("assistant") or time_overrides.get("assistants")
+            )
+            if after is not None and assistants:
+                overrides.append((after, assistants))
+        else:
+            for key, val in time_overrides.items():
+                after = _to_float(key)
+                assistants = _normalize_name_list(val)
+                if after is not None and assistants:
+                    overrides.append((after, assistants))
+    elif isinstance(time_overrides, list):
+        for item in time_overrides:
+            if isinstance(item, dict):
+                after = _to_float(item.get("after_hour"))
+                assistants = _normalize_name_list(item.get("assistant") or item.get("assistants"))
+                if after is not None and assistants:
+                    overrides.append((after, assistants))
+            elif isinstance(item, (list, tuple)) and len(item) >= 2:
+                after = _to_float(item[0])
+                assistants = _normalize_name_list(item[1])
+                if after is not None and assistants:
+                    overrides.append((after, assistants))
+    return overrides
+
+
+def _time_override_candidates(time_overrides: Any, appt_hour: float) -> list[str]:
+    overrides = _collect_time_overrides(time_overrides)
+    matched = [(after, names) for after, names in overrides if appt_hour >= after]
+    matched.sort(key=lambda item: item[0], reverse=True)
+    out: list[str] = []
+    for _, names in matched:
+        out.extend(names)
+    return _unique_preserve_order(out)
+
+
+def _compile_rule(role: str, rule: Any) -> dict[str, Any]:
+    """Flatten one role rule into lookup tables: when_first_is / doctor maps keyed by
+    _norm_staff_key, time_override lists pre-merged per hour bucket, and a memo of
+    finished candidate lists keyed by (doctor, hour bucket, first assistant)."""
+    compiled: dict[str, Any] = {
+        "_compiled": True,
+        "role": role,
+        "when_first": {},
+        "doctor": {},
+        "time_breaks": [],
+        "time_lists": [[]],
+        "default": [],
+        "memo": {},
+    }
+    if not isinstance(rule, dict):
+        return compiled
+
+    when_map = rule.get("when_first_is", {})
+    if role == "SECOND" and isinstance(when_map, dict):
+        for key, val in when_map.items():
+            compiled["when_first"].setdefault(_norm_staff_key(key), _normalize_name_list(val))
+
+    doctor_overrides = rule.get("doctor_overrides", {})
+    if isinstance(doctor_overrides, dict):
+        for key, val in doctor_overrides.items():
+            compiled["doctor"].setdefault(_norm_staff_key(key), val)
+    for key, val in rule.items():
+        if key in {"default", "time_override", "when_first_is", "doctor_overrides"}:
+            continue
+        compiled["doctor"].setdefault(_norm_staff_key(key), val)
+    compiled["doctor"] = {key: _normalize_name_list(val) for key, val in compiled["doctor"].items()}
+
+    if "time_override" in rule:
+        breaks = sorted({after for after, _ in _collect_time_overrides(rule.get("time_override"))})
+        compiled["time_breaks"] = breaks
+        compiled["time_lists"] = [_time_override_candidates(rule.get("time_override"), -1.0)] + [
+            _time_override_candidates(rule.get("time_override"), after) for after in breaks
+        ]
+
+    compiled["default"] = _normalize_name_list(rule.get("default", []))
+    return compiled
+
+
+def _rule_candidates_for_role(
+    role: str,
+    rule: dict[str, Any],
+    doctor: str,
+    appt_hour: float,
+    first_assistant: str,
+) -> list[str]:
+    if not isinstance(rule, dict):
+        return []
+    compiled = rule if rule.get("_compiled") else _compile_rule(role, rule)
+    first_assistant = first_assistant if role == "SECOND" and first_assistant else ""
+    bucket = bisect.bisect_right(compiled["time_breaks"], appt_hour) if compiled["time_breaks"] else 0
+    memo_key = (doctor, bucket, first_assistant)
+    memo = compiled["memo"]
+    if memo_key not in memo:
+        candidates: list[str] = []
+        if first_assistant:
+            candidates.extend(compiled["when_first"].get(_norm_staff_key(first_assistant), []))
+        candidates.extend(compiled["doctor"].get(_norm_staff_key(doctor), []))
+        candidates.extend(compiled["time_lists"][bucket])
+        candidates.extend(compiled["default"])
+        memo[memo_key] = _unique_preserve_order(candidates)
+    return list(memo[memo_key])
+
+
+def _validate_allocation_config(config: dict[str, Any]) -> list[str]:
+    """List rule entries that name doctors/assistants not declared in any department."""
+    depts = config.get("departments", {}) if isinstance(config, dict) else {}
+    if not isinstance(depts, dict):
+        return []
+    known_doctors: set[str] = set()
+    known_assistants: set[str] = set()
+    for data in depts.values():
+        if isinstance(data, dict):
+            known_doctors.update(_norm_staff_key(d) for d in _normalize_name_list(data.get("doctors", [])))
+            known_assistants.update(_norm_staff_key(a) for a in _normalize_name_list(data.get("assistants", [])))
+
+    issues: list[str] = []
+
+    def _check(dept: str, role: str, where: str, names: Any, known: set[str], kind: str) -> None:
+        for name in _normalize_name_list(names):
+            if _norm_staff_key(name) not in known:
+                issues.append(f"{dept} / {role} / {where}: unknown {kind} '{name}'")
+
+    for dept, data in depts.items():
+        rules = data.get("allocation_rules", {}) if isinstance(data, dict) else {}
+        if not isinstance(rules, dict):
+            continue
+        for role, rule in rules.items():
+            if not isinstance(rule, dict):
+                continue
+            for key, val in rule.items():
+                if key == "default":
+                    _check(dept, role, "default", val, known_assistants, "assistant")
+                elif key == "time_override":
+                    for after, names in _collect_time_overrides(val):
+                        _check(dept, role, f"time_override {after:g}", names, known_assistants, "assistant")
+                elif key in {"when_first_is", "doctor_overrides"}:
+                    if not isinstance(val, dict):
+                        continue
+                    key_known, key_kind = (
+                        (known_assistants, "assistant") if key == "when_first_is" else (known_doctors, "doctor")
+                    )
+                    for sub_key, names in val.items():
+                        _check(dept, role, key, [sub_key], key_known, key_kind)
+                        _check(dept, role, f"{key} {sub_key}", names, known_assistants, "assistant")
+                else:
+                    _check(dept, role, "doctor", [key], known_doctors, "doctor")
+                    _check(dept, role, key, val, known_assistants, "assistant")
+    return issues
+
+
+def _compile_allocation_config(config: dict[str, Any]) -> dict[str, Any]:
+    departments: dict[str, dict[str, Any]] = {}
+    depts = config.get("departments", {}) if isinstance(config, dict) else {}
+    if isinstance(depts, dict):
+        for dept, data in depts.items():
+            rules = data.get("allocation_rules", {}) if isinstance(data, dict) else {}
+            if isinstance(rules, dict):
+                departments[str(dept).strip().upper()] = {
+                    role: _compile_rule(role, rule) for role, rule in rules.items()
+                }
+    return {"departments": departments, "issues": _validate_allocation_config(config)}
+
+
+@functools.lru_cache(maxsize=4)
+def _compile_allocation_rules_cached(path_str: str, mtime: float) -> dict[str, Any]:
+    return _compile_allocation_config(_load_allocation_config_cached(path_str, mtime))
+
+
+def _get_compiled_allocation_rules() -> dict[str, Any]:
+    try:
+        rules_path = runtime.rules_path(ALLOCATION_RULES_PATH)
+        if rules_path.exists():
+            mtime = rules_path.stat().st_mtime
+            return _compile_allocation_rules_cached(str(rules_path), mtime)
+    except Exception:
+        pass
+    return {"departments": {}, "issues": []}
+
+
+def _get_compiled_department_rules(department: str) -> dict[str, Any]:
+    return _get_compiled_allocation_rules()["departments"].get(str(department).strip().upper(), {})
+
+
+# ================ ASSISTANT LOAD LEDGER ================
+# Per-row contributions (assistant, role, minutes, active) kept in session
+# state. While the schedule version (_schedule_version_key) is unchanged the
+# ledger is returned as is; otherwise the relevant columns are hashed per row
+# and only rows that were added, edited (assigned, retimed, cancelled) or
+# deleted are re-applied.
+_LOAD_ROLES = ("FIRST", "SECOND", "Third")
+
+
+def _empty_load_ledger() -> dict[str, Any]:
+    return {
+        "version": None,
+        "rows": {},
+        "by_row_id": {},
+        "count": {},
+        "minutes": {},
+        "active_count": {},
+        "active_minutes": {},
+        "active_roles": {},
+    }
+
+
+def _load_row_contribution(row: pd.Series, role_cols: dict[str, str]) -> list[tuple[str, str, int, bool]]:
+    window = _window_minutes(row.get("In Time"), row.get("Out Time"))
+    minutes = window[1] - window[0] if window else 0
+    status = str(row.get("STATUS", "")).strip().upper()
+    active = not any(s in status for s in _INACTIVE_APPT_PATTERN.split("|"))
+    contrib = []
+    for role, col in role_cols.items():
+        if col not in row.index:
+            continue
+        name = str(row.get(col, "")).strip().upper()
+        if name:
+            contrib.append((name, role, minutes, active))
+    return contrib
+
+
+def _apply_load_contribution(ledger: dict[str, Any], contrib: list[tuple[str, str, int, bool]], sign: int) -> None:
+    for name, role, minutes, active in contrib:
+        ledger["count"][name] = ledger["count"].get(name, 0) + sign
+        ledger["minutes"][name] = ledger["minutes"].get(name, 0) + sign * minutes
+        if active:
+            ledger["active_count"][name] = ledger["active_count"].get(name, 0) + sign
+            ledger["active_minutes"][name] = ledger["active_minutes"].get(name, 0) + sign * minutes
+            roles = ledger["active_roles"].setdefault(name, {})
+            roles[role] = roles.get(role, 0) + sign
+
+
+def _get_assistant_load_ledger(df_schedule: Optional[DataFrame], use_cache: bool = True) -> dict[str, Any]:
+    """Bring the session load ledger in line with df_schedule, touching only changed rows.
+
+    use_cache=False builds a fresh ledger for a scratch frame and leaves the session one alone.
+    """
+    ledger = runtime.session_state().get("assistant_load_ledger") if use_cache else None
+    if not isinstance(ledger, dict):
+        ledger = _empty_load_ledger()
+    if df_schedule is None or df_schedule.empty:
+        ledger = _empty_load_ledger()
+        if use_cache:
+            runtime.session_state().assistant_load_ledger = ledger
+        return ledger
+    version = _schedule_version_key(df_schedule)
+    if ledger.get("version") == version:
+        return ledger
+
+    third_col = _get_third_column_name(df_schedule.columns)
+    role_cols = {"FIRST": "FIRST", "SECOND": "SECOND", "Third": third_col}
+    cols = [
+        c
+        for c in ["REMINDER_ROW_ID", "FIRST", "SECOND", third_col, "In Time", "Out Time", "STATUS"]
+        if c in df_schedule.columns
+    ]
+    row_hashes = pd.util.hash_pandas_object(df_schedule[cols].astype(str), index=False).to_numpy()
+    row_ids = (
+        df_schedule["REMINDER_ROW_ID"].astype(str).str.strip()
+        if "REMINDER_ROW_ID" in df_schedule.columns
+        else pd.Series("", index=df_schedule.index)
+    )
+
+    rows = ledger["rows"]
+    seen: set[str] = set()
+    for pos, idx in enumerate(df_schedule.index):
+        row_id = row_ids.iat[pos]
+        key = f"{row_id}|{idx}"
+        while key in seen:
+            key += "+"
+        seen.add(key)
+        row_hash = int(row_hashes[pos])
+        old = rows.get(key)
+        if old is not None and old[0] == row_hash:
+            continue
+        if old is not None:
+            _apply_load_contribution(ledger, old[2], -1)
+        contrib = _load_row_contribution(df_schedule.iloc[pos], role_cols)
+        _apply_load_contribution(ledger, contrib, 1)
+        rows[key] = (row_hash, row_id, contrib)
+        if row_id:
+            ledger["by_row_id"].setdefault(row_id, set()).add(key)
+
+    for key in [k for k in rows if k not in seen]:
+        _, row_id, contrib = rows.pop(key)
+        _apply_load_contribution(ledger, contrib, -1)
+        if row_id in ledger["by_row_id"]:
+            ledger["by_row_id"][row_id].discard(key)
+            if not ledger["by_row_id"][row_id]:
+                del ledger["by_row_id"][row_id]
+
+    ledger["version"] = version
+    if use_cache:
+        runtime.session_state().assistant_load_ledger = ledger
+    return ledger
+
+
+def _assistant_loads(
+    df_schedule: pd.DataFrame,
+    exclude_row_id: Optional[str] = None,
+    weight: str = "count",
+    use_cache: bool = True,
+) -> dict[str, int]:
+    """Assignments per assistant across every row (weight "minutes" sums scheduled minutes instead)."""
+    if df_schedule is None or df_schedule.empty:
+        return {}
+    ledger = _get_assistant_load_ledger(df_schedule, use_cache=use_cache)
+    field = "minutes" if weight == "minutes" else "count"
+    loads = dict(ledger[field])
+    exclude_key = str(exclude_row_id).strip() if exclude_row_id else ""
+    for key in ledger["by_row_id"].get(exclude_key, set()) if exclude_key else set():
+        for name, _role, minutes, _active in ledger["rows"][key][2]:
+            loads[name] = loads.get(name, 0) - (minutes if field == "minutes" else 1)
+    return loads
+
+
+# ================ WORKLOAD ENGINE ================
+# One grouped pass over the long (assistant, role, interval) view of active
+# appointments: chairside minutes, per-role counts and idle gaps come from a
+# single sort, busy minutes and the hourly histogram from one interval-count
+# matrix. The schedule part is cached per schedule version; punch-based
+# utilization is re-derived per minute from the tick punch map.
+WORKLOAD_SUMMARY_COLUMNS = [
+    "Assistant",
+    "Appointments",
+    *_LOAD_ROLES,
+    "Chairside Minutes",
+    "Busy Minutes",
+    "Idle Minutes",
+    "Idle Gaps",
+    "Longest Gap",
+    "First In",
+    "Last Out",
+    "Punched Minutes",
+    "Busy While Punched",
+    "Utilization %",
+]
+
+
+def _build_workload_base(df_schedule: Optional[DataFrame], assistants: list[str]) -> dict[str, Any]:
+    assignments = _schedule_assignment_frame(df_schedule)
+    names = _unique_preserve_order(
+        [str(a).strip().upper() for a in assistants if str(a).strip()] + assignments["assistant"].tolist()
+    )
+    index = {name: i for i, name in enumerate(names)}
+    n = len(names)
+    stats = pd.DataFrame(index=pd.Index(names, name="Assistant"))
+
+    if assignments.empty:
+        for col in ["Appointments", *_LOAD_ROLES, "Chairside Minutes", "Idle Minutes", "Idle Gaps", "Longest Gap"]:
+            stats[col] = 0
+        stats["First In"] = np.nan
+        stats["Last Out"] = np.nan
+        return {"names": names, "stats": stats, "busy": np.zeros((n, _DAY_MASK_WIDTH), dtype=bool)}
+
+    long = assignments.assign(
+        role=assignments["role"].where(assignments["role"] != "THIRD", "Third"),
+        minutes=(assignments["end"] - assignments["start"]).clip(lower=0),
+    ).sort_values(["assistant", "start", "end"], kind="stable")
+    grouped = long.groupby("assistant", sort=False)
+    # Idle gap = time between an appointment's start and the latest end seen so far
+    # for the same assistant; overlapping (double-booked) rows yield no gap.
+    prev_end = grouped["end"].cummax().groupby(long["assistant"]).shift()
+    gaps = (long["start"] - prev_end).clip(lower=0).fillna(0)
+    long = long.assign(gap=gaps)
+    grouped = long.groupby("assistant", sort=False)
+
+    roles = long.groupby(["assistant", "role"]).size().unstack(fill_value=0)
+    stats["Appointments"] = grouped.size()
+    for role in _LOAD_ROLES:
+        stats[role] = roles[role] if role in roles.columns else 0
+    stats["Chairside Minutes"] = grouped["minutes"].sum()
+    stats["Idle Minutes"] = grouped["gap"].sum()
+    stats["Idle Gaps"] = grouped["gap"].agg(lambda g: int((g > 0).sum()))
+    stats["Longest Gap"] = grouped["gap"].max()
+    stats["First In"] = grouped["start"].min()
+    stats["Last Out"] = grouped["end"].max()
+    count_cols = ["Appointments", *_LOAD_ROLES, "Chairside Minutes", "Idle Minutes", "Idle Gaps", "Longest Gap"]
+    stats[count_cols] = stats[count_cols].fillna(0).astype(int)
+
+    busy = _fill_interval_mask(
+        n,
+        long["assistant"].map(index.get).to_numpy(dtype=np.int64),
+        long["start"].to_numpy(dtype=np.int64),
+        long["end"].to_numpy(dtype=np.int64),
+    )
+    return {"names": names, "stats": stats, "busy": busy}
+
+
+def _build_workload_report(
+    base: dict[str, Any],
+    punch_map: dict[str, dict[str, str]],
+    now_min: int,
+) -> dict[str, DataFrame]:
+    names, busy = base["names"], base["busy"]
+    summary = base["stats"].copy()
+    summary["Busy Minutes"] = busy.sum(axis=1).astype(int) if len(names) else 0
+
+    punched: list[Optional[int]] = []
+    busy_punched: list[Optional[int]] = []
+    for i, name in enumerate(names):
+        rec = punch_map.get(name) or {}
+        in_min = time_to_minutes(rec.get("punch_in") or "")
+        if in_min is None:
+            punched.append(None)
+            busy_punched.append(None)
+            continue
+        out_min = time_to_minutes(rec.get("punch_out") or "")
+        end_min = int(now_min) if out_min is None else out_min
+        if end_min < in_min:
+            end_min += DAY_MINUTES
+        end_min = min(end_min, _DAY_MASK_WIDTH)
+        punched.append(max(0, end_min - in_min))
+        busy_punched.append(int(busy[i, in_min:end_min].sum()))
+    summary["Punched Minutes"] = pd.array(punched, dtype="Int64")
+    summary["Busy While Punched"] = pd.array(busy_punched, dtype="Int64")
+    share = summary["Busy While Punched"].astype("Float64") / summary["Punched Minutes"].astype("Float64")
+    summary["Utilization %"] = (share.where(summary["Punched Minutes"] > 0) * 100).round(1)
+    for col in ["First In", "Last Out"]:
+        summary[col] = summary[col].map(lambda m: "" if pd.isna(m) else mins_to_hhmm(int(m) % DAY_MINUTES))
+    summary = summary.reset_index()[WORKLOAD_SUMMARY_COLUMNS]
+
+    # Busy minutes per clock hour, spanning every booked hour (at least 08:00-21:00)
+    booked = np.flatnonzero(busy.any(axis=0)) if len(names) else np.array([], dtype=int)
+    first_hour = min(8, int(booked[0]) // 60) if booked.size else 8
+    last_hour = max(21, int(booked[-1]) // 60 + 1) if booked.size else 21
+    hourly_minutes = busy[:, first_hour * 60:last_hour * 60].reshape(len(names), last_hour - first_hour, 60).sum(axis=2)
+    hourly = pd.DataFrame(
+        hourly_minutes.astype(int),
+        index=pd.Index(names, name="Assistant"),
+        columns=[mins_to_hhmm((h * 60) % DAY_MINUTES) for h in range(first_hour, last_hour)],
+    )
+    return {"summary": summary, "hourly": hourly}
+
+
+def get_workload_report(
+    df_schedule: Optional[DataFrame],
+    assistants: Optional[list[str]] = None,
+    now_min: Optional[int] = None,
+) -> dict[str, DataFrame]:
+    """Minutes-weighted workload per assistant as DataFrames ready for display or export.
+
+    {"summary": one row per assistant (WORKLOAD_SUMMARY_COLUMNS), "hourly": busy minutes per
+    assistant x clock hour}. Assistants listed in `assistants` are included even when idle.
+    Chairside minutes sum every assignment; busy minutes count double-booked time once.
+    Utilization % is busy time inside the punch window over punched-in time (open punches
+    run to now_min).
+    """
+    names = tuple(str(a).strip().upper() for a in (assistants or []) if str(a).strip())
+    if now_min is None:
+        report_now = runtime.now()
+        now_min = report_now.hour * 60 + report_now.minute
+    schedule_key = (_schedule_version_key(df_schedule), names)
+    base = _tick_cached("workload_base", schedule_key, lambda: _build_workload_base(df_schedule, list(names)))
+    return _tick_cached(
+        "workload_report",
+        (schedule_key, _availability_version("punch"), int(now_min)),
+        lambda: _build_workload_report(base, _get_tick_punch_map(), int(now_min)),
+    )
+
+
+# ================ LOOKAHEAD RESERVATION ================
+# Open demand (booked rows with empty roles) is indexed once per availability
+# version: start-sorted rows with the qualified assistants still free for
+# them. A single-slot fill then only walks rows that overlap it and start
+# before the horizon ends, and penalises candidates who are the last free
+# qualified option there. max_len bounds how far back an overlapping row can start.
+# Off by default; set lookahead_minutes in the rules file to opt in.
+def _build_lookahead_demand(df_schedule: pd.DataFrame, avail: dict[str, Any]) -> dict[str, Any]:
+    demand: dict[str, Any] = {"starts": [], "rows": [], "max_len": 0}
+    if df_schedule is None or df_schedule.empty or "DR." not in df_schedule.columns:
+        return demand
+    base, _valid = _schedule_interval_base(df_schedule)
+    if base.empty:
+        return demand
+    third_col = _get_third_column_name(df_schedule.columns)
+    role_values = {
+        role: (df_schedule[col].tolist() if col in df_schedule.columns else [""] * len(df_schedule))
+        for role, col in {"FIRST": "FIRST", "SECOND": "SECOND", "Third": third_col}.items()
+    }
+    doctors = df_schedule["DR."].tolist()
+    index, busy = avail["index"], avail["busy"]
+    dept_cache: dict[str, tuple[dict[str, Any], set[str]]] = {}
+    rows = []
+    for pos, start, end, row_id in zip(base["pos"], base["start"], base["end"], base["row_id"]):
+        doctor = str(doctors[pos]).strip()
+        if _is_blank_cell(doctor):
+            continue
+        if doctor not in dept_cache:
+            department = get_department_for_doctor(doctor)
+            dept_cache[doctor] = (
+                _get_compiled_department_rules(department),
+                {str(a).strip().upper() for a in get_assistants_for_department(department)},
+            )
+        rules, dept_assistants = dept_cache[doctor]
+        current = {
+            role: ("" if _is_blank_cell(values[pos]) else str(values[pos]).strip())
+            for role, values in role_values.items()
+        }
+        open_roles = [role for role in (rules or {"FIRST": {}}) if role in current and not current[role]]
+        if not open_roles:
+            continue
+        appt_hour = start / 60.0
+        qualified = set(dept_assistants)
+        for role in open_roles:
+            qualified.update(
+                str(a).strip().upper()
+                for a in _rule_candidates_for_role(role, rules.get(role, {}), doctor, appt_hour, current.get("FIRST", ""))
+            )
+        span = _mask_window(int(start), int(end))
+        free = frozenset(
+            name for name in qualified
+            if name in index and not busy[index[name], span].any()
+        )
+        rows.append((int(start), int(end), str(row_id).strip(), len(open_roles), free))
+    rows.sort(key=lambda r: r[0])
+    max_len = max((r[1] - r[0] for r in rows), default=0)
+    return {"starts": [r[0] for r in rows], "rows": rows, "max_len": max_len}
+
+
+def _get_lookahead_demand(df_schedule: pd.DataFrame) -> dict[str, Any]:
+    avail = _get_day_availability(df_schedule)
+    avail_key = _day_availability_cache_key(avail)
+    if avail_key is None:
+        return _build_lookahead_demand(df_schedule, avail)
+    return _tick_cached("lookahead_demand", avail_key, lambda: _build_lookahead_demand(df_schedule, avail))
+
+
+def _lookahead_penalties(
+    df_schedule: pd.DataFrame,
+    start_min: int,
+    end_min: int,
+    exclude_row_id: Optional[str],
+    horizon_minutes: int,
+) -> dict[str, int]:
+    """Per assistant, how many rows overlapping this slot and starting before start_min + horizon_minutes would be left short if they took it."""
+    if horizon_minutes <= 0:
+        return {}
+    demand = _get_lookahead_demand(df_schedule)
+    starts = demand["starts"]
+    # Rows that started earlier can still run into this slot; none is longer than max_len
+    lo = bisect.bisect_right(starts, start_min - demand["max_len"])
+    hi = bisect.bisect_right(starts, start_min + horizon_minutes)
+    exclude_key = str(exclude_row_id or "").strip()
+    penalties: dict[str, int] = {}
+    for r_start, r_end, row_id, open_count, free in demand["rows"][lo:hi]:
+        if r_start >= end_min or r_end <= start_min or (exclude_key and row_id == exclude_key):
+            continue
+        if len(free) > open_count:
+            continue
+        for name in free:
+            penalties[name] = penalties.get(name, 0) + 1
+    return penalties
+
+
+def _order_by_load(
+    names: list[str],
+    load_map: dict[str, int],
+    penalties: Optional[dict[str, int]] = None,
+) -> list[str]:
+    if not names:
+        return names
+    order = {name: idx for idx, name in enumerate(names)}
+    penalties = penalties or {}
+    return sorted(names, key=lambda n: (penalties.get(n, 0), load_map.get(n, 0), order.get(n, 0)))
+
+
+def _select_assistant_from_candidates(
+    role: str,
+    candidates: list[str],
+    available_map: dict[str, str],
+    available_order: list[str],
+    already: set[str],
+    pref_map: dict[str, dict[str, Any]],
+    use_role_flags: bool,
+    load_map: dict[str, int],
+    load_balance: bool,
+    penalties: Optional[dict[str, int]] = None,
+) -> str:
+    filtered: list[str] = []
+    for name in candidates:
+        key = str(name).strip().upper()
+        if not key or key in already:
+            continue
+        if key not in available_map:
+            continue
+        if use_role_flags:
+            pref_val = pref_map.get(_norm_staff_key(key), {}).get(role, "")
+            if not _pref_allows_role(pref_val):
+                continue
+        filtered.append(key)
+    if filtered and (load_balance or penalties):
+        filtered = _order_by_load(filtered, load_map if load_balance else {}, penalties)
+    if filtered:
+        return available_map[filtered[0]]
+
+    fallback: list[str] = []
+    for name in available_order:
+        key = str(name).strip().upper()
+        if not key or key in already:
+            continue
+        if use_role_flags:
+            pref_val = pref_map.get(_norm_staff_key(key), {}).get(role, "")
+            if not _pref_allows_role(pref_val):
+                continue
+        if key in available_map:
+            fallback.append(key)
+    if fallback and (load_balance or penalties):
+        fallback = _order_by_load(fallback, load_map if load_balance else {}, penalties)
+    if fallback:
+        return available_map[fallback[0]]
+    return ""
+
+
+def _allocate_assistants_for_slot(
+    doctor: str,
+    department: str,
+    in_time: Any,
+    out_time: Any,
+    df_schedule: pd.DataFrame,
+    exclude_row_id: Optional[str] = None,
+    current_assignments: Optional[dict[str, Any]] = None,
+    only_fill_empty: bool = False,
+    availability: Optional[MappingProxyType] = None,
+) -> dict[str, str]:
+    result = {"FIRST": "", "SECOND": "", "Third": ""}
+    if current_assignments:
+        for role in result:
+            val = current_assignments.get(role, "")
+            result[role] = "" if _is_blank_cell(val) else str(val).strip()
+
+    if not doctor:
+        return result
+
+    in_obj = _coerce_to_time_obj(in_time)
+    out_obj = _coerce_to_time_obj(out_time)
+    if in_obj is None or out_obj is None:
+        return result
+
+    appt_hour = in_obj.hour + in_obj.minute / 60.0
+    global_cfg = _get_global_allocation_config()
+    rules = _get_compiled_department_rules(department)
+
+    dept_assistants = get_assistants_for_department(department)
+    all_assistants = _get_all_assistants()
+    if availability is None:
+        availability = get_availability_snapshot(df_schedule, all_assistants)
+    free_now_set, free_status_map = availability["free_set"], availability["status_map"]
+
+    avail_dept = get_available_assistants(
+        department,
+        in_time,
+        out_time,
+        df_schedule,
+        exclude_row_id,
+        assistants_override=dept_assistants,
+        free_now_set=free_now_set,
+        free_status_map=free_status_map,
+    )
+    available_dept_order = [a["name"] for a in avail_dept if a.get("available")]
+    available_dept_map = {name.upper(): name for name in available_dept_order}
+
+    if global_cfg.get("cross_department_fallback", False):
+        avail_all = get_available_assistants(
+            department,
+            in_time,
+            out_time,
+            df_schedule,
+            exclude_row_id,
+            assistants_override=all_assistants,
+            free_now_set=free_now_set,
+            free_status_map=free_status_map,
+        )
+        available_all_order = [a["name"] for a in avail_all if a.get("available")]
+        available_all_map = {name.upper(): name for name in available_all_order}
+    else:
+        available_all_order = available_dept_order
+        available_all_map = available_dept_map
+
+    cache = _get_profiles_cache()
+    pref_map = cache.get("assistant_prefs", {})
+    load_map = (
+        _assistant_loads(df_schedule, exclude_row_id, weight=global_cfg.get("load_balance_weight", "count"))
+        if global_cfg.get("load_balance", False)
+        else {}
+    )
+    penalties = None
+    if global_cfg.get("lookahead_minutes", 0) > 0:
+        start_min = in_obj.hour * 60 + in_obj.minute
+        end_min = out_obj.hour * 60 + out_obj.minute
+        if end_min < start_min:
+            end_min += DAY_MINUTES
+        penalties = _lookahead_penalties(df_schedule, start_min, end_min, exclude_row_id, global_cfg["lookahead_minutes"])
+
+    return _assign_roles_for_slot(
+        result,
+        doctor,
+        appt_hour,
+        rules,
+        global_cfg,
+        (available_dept_map, available_dept_order),
+        (available_all_map, available_all_order),
+        pref_map,
+        load_map,
+        only_fill_empty,
+        penalties,
+    )
+
+
+def _assign_roles_for_slot(
+    result: dict[str, str],
+    doctor: str,
+    appt_hour: float,
+    rules: dict[str, Any],
+    global_cfg: dict[str, Any],
+    dept_pool: tuple[dict[str, str], list[str]],
+    all_pool: tuple[dict[str, str], list[str]],
+    pref_map: dict[str, dict[str, Any]],
+    load_map: dict[str, int],
+    only_fill_empty: bool,
+    penalties: Optional[dict[str, int]] = None,
+) -> dict[str, str]:
+    """Walk FIRST -> SECOND -> Third over prepared availability pools (shared by single-slot and batch fills).
+
+    penalties (lookahead mode) are a cost ranked ahead of load and rule order, for
+    rule candidates and the non-rule fallback alike.
+    """
+    available_dept_map, available_dept_order = dept_pool
+    available_all_map, available_all_order = all_pool
+    already = {
+        str(x).strip().upper()
+        for x in [result["FIRST"], result["SECOND"], result["Third"]]
+        if x
+    }
+
+    for role in ["FIRST", "SECOND", "Third"]:
+        if only_fill_empty and role in result and result[role]:
+            continue
+        rule = rules.get(role, {}) if isinstance(rules, dict) else {}
+        candidates = _rule_candidates_for_role(role, rule, doctor, appt_hour, result.get("FIRST", ""))
+        chosen = _select_assistant_from_candidates(
+            role,
+            candidates,
+            available_dept_map,
+            available_dept_order,
+            already,
+            pref_map,
+            global_cfg.get("use_profile_role_flags", False),
+            load_map,
+            global_cfg.get("load_balance", False),
+            penalties,
+        )
+        if not chosen and global_cfg.get("cross_department_fallback", False):
+            chosen = _select_assistant_from_candidates(
+                role,
+                candidates,
+                available_all_map,
+                available_all_order,
+                already,
+                pref_map,
+                global_cfg.get("use_profile_role_flags", False),
+                load_map,
+                global_cfg.get("load_balance", False),
+                penalties,
+            )
+        if chosen:
+            result[role] = chosen
+            already.add(chosen.strip().upper())
+    return result
+
+
+def get_available_assistants(
+    department: str,
+    check_in_time: Any,
+    check_out_time: Any,
+    df_schedule: pd.DataFrame,
+    exclude_row_id: Optional[str] = None,
+    assistants_override: Optional[list[str]] = None,
+    free_now_set: Optional[AbstractSet[str]] = None,
+    free_status_map: Optional[Mapping[str, Mapping[str, str]]] = None,
+) -> list[dict[str, Any]]:
+    """
+    Get list of available assistants for a department at a specific time.
+    Returns list of dicts with assistant name and availability status.
+    """
+    if assistants_override is not None:
+        assistants = _unique_preserve_order(assistants_override)
+    else:
+        assistants = get_assistants_for_department(department)
+    available = []
+    avail = _get_day_availability(df_schedule)
+    
+    for assistant in assistants:
+        assist_upper = str(assistant).strip().upper()
+        if free_now_set is not None and assist_upper not in free_now_set:
+            reason = "Not available on dashboard"
+            if isinstance(free_status_map, Mapping):
+                info = free_status_map.get(assist_upper, {}) or {}
+                status_label = str(info.get("status", "")).strip().upper()
+                if info.get("reason"):
+                    reason = str(info.get("reason"))
+                elif status_label:
+                    reason = f"Dashboard: {status_label}"
+            available.append({
+                "name": assistant,
+                "available": False,
+                "reason": reason,
+            })
+            continue
+        is_avail, reason = is_assistant_available(
+            assistant, check_in_time, check_out_time, df_schedule, exclude_row_id, avail=avail
+        )
+        available.append({
+            "name": assistant,
+            "available": is_avail,
+            "reason": reason if not is_avail else "Available"
+        })
+    
+    return available
+
+
+def auto_allocate_assistants(
+    doctor: str,
+    in_time: Any,
+    out_time: Any,
+    df_schedule: pd.DataFrame,
+    exclude_row_id: Optional[str] = None,
+    availability: Optional[MappingProxyType] = None,
+) -> dict[str, str]:
+    """
+    Automatically allocate assistants based on department and availability.
+    Returns dict with FIRST, SECOND, Third assignments.
+    availability replaces the who-is-free-now snapshot, e.g. with a future slot's free set.
+    """
+    department = get_department_for_doctor(doctor)
+    return _allocate_assistants_for_slot(
+        doctor,
+        department,
+        in_time,
+        out_time,
+        df_schedule,
+        exclude_row_id=exclude_row_id,
+        current_assignments=None,
+        only_fill_empty=False,
+        availability=availability,
+    )
+
+
+def _auto_fill_assistants_for_row(
+    df_schedule: pd.DataFrame,
+    row_index: int,
+    only_fill_empty: bool = True,
+    availability: Optional[MappingProxyType] = None,
+) -> bool:
+    """Auto-fill FIRST/SECOND/Third for a single row based on doctor-specific and time-based allocation rules. Returns True if anything changed.
+
+    Pass one get_availability_snapshot() as availability when filling several rows so status is computed once.
+    """
+    try:
+        if row_index < 0 or row_index >= len(df_schedule):
+            return False
+
+        row = df_schedule.iloc[row_index]
+        doctor = str(row.get("DR.", "")).strip()
+        if _is_blank_cell(doctor):
+            doctor = str(row.get("Doctor", "")).strip()
+        in_time_val = row.get("In Time", None)
+        out_time_val = row.get("Out Time", None)
+        row_id = str(row.get("REMINDER_ROW_ID", "")).strip()
+
+        if not doctor:
+            return False
+        if _coerce_to_time_obj(in_time_val) is None or _coerce_to_time_obj(out_time_val) is None:
+            return False
+
+        department = get_department_for_doctor(doctor)
+
+        current_first = row.get("FIRST", "")
+        current_second = row.get("SECOND", "")
+        third_col = _get_third_column_name(df_schedule.columns)
+        current_third = row.get(third_col, "")
+
+        if only_fill_empty and (not _is_blank_cell(current_first)) and (not _is_blank_cell(current_second)) and (not _is_blank_cell(current_third)):
+            return False
+
+        allocations = _allocate_assistants_for_slot(
+            doctor,
+            department,
+            in_time_val,
+            out_time_val,
+            df_schedule,
+            exclude_row_id=row_id,
+            current_assignments={
+                "FIRST": current_first,
+                "SECOND": current_second,
+                "Third": current_third,
+            },
+            only_fill_empty=only_fill_empty,
+            availability=availability,
+        )
+
+        changed = False
+        for role, current_val in [("FIRST", current_first), ("SECOND", current_second), ("Third", current_third)]:
+            new_val = allocations.get(role, "")
+            if _is_blank_cell(new_val):
+                continue
+            if str(new_val).strip() != str(current_val).strip():
+                if role == "Third":
+                    if third_col in df_schedule.columns:
+                        df_schedule.iloc[row_index, df_schedule.columns.get_loc(third_col)] = new_val
+                else:
+                    if role in df_schedule.columns:
+                        df_schedule.iloc[row_index, df_schedule.columns.get_loc(role)] = new_val
+                changed = True
+
+        if changed:
+            invalidate_availability("schedule")
+        return changed
+    except Exception:
+        return False
+
+
+# ================ WHOLE-DAY BATCH ALLOCATION ================
+_INACTIVE_STATUS_WORDS = ["CANCELLED", "DONE", "COMPLETED", "SHIFTED"]
+
+
+def _slot_is_current(status_text: str, start_min: int, end_min: int, current_minute: int) -> bool:
+    """Mirror of get_current_assistant_status's 'with a patient right now' test."""
+    if "ON GOING" in status_text or "ONGOING" in status_text:
+        return True
+    return start_min <= current_minute <= end_min
+
+
+def _prepare_day_allocation(df_updated: pd.DataFrame, use_cache: bool = True) -> dict[str, Any]:
+    """Collect everything a whole-day fill needs into one mutable state dict.
+
+    Occupancy is kept as per-minute counters (fast negative check) plus exact
+    interval lists, loads use the same basis as _assistant_loads, and the
+    dashboard free set is computed once and then patched as rows are placed.
+    Pass use_cache=False for a scratch frame that is not the session schedule
+    (previews), so its availability never lands in the session caches.
+    """
+    now = runtime.now()
+    third_col = _get_third_column_name(df_updated.columns)
+    global_cfg = _get_global_allocation_config()
+    all_assistants = _unique_preserve_order(_get_all_assistants())
+
+    avail = _get_day_availability(df_updated, use_cache=use_cache)
+    free_now_set, status_map = _get_dashboard_free_set(df_updated, all_assistants, use_cache=use_cache)
+
+    names = list(avail["names"])
+    index = dict(avail["index"])
+    intervals: dict[str, list[dict[str, Any]]] = {
+        name: [dict(rec) for rec in recs] for name, recs in avail["appts"].items()
+    }
+    flat = [rec for recs in intervals.values() for rec in recs]
+    occupancy = _interval_counts(
+        len(names),
+        np.array([index[rec["assistant"]] for rec in flat], dtype=np.int64),
+        np.array([rec["start"] for rec in flat], dtype=np.int64),
+        np.array([rec["end"] for rec in flat], dtype=np.int64),
+    ).astype(np.int16)
+
+    role_cols = {"FIRST": "FIRST", "SECOND": "SECOND", "Third": third_col}
+    loads = _assistant_loads(df_updated, weight=global_cfg.get("load_balance_weight", "count"), use_cache=use_cache)
+
+    status_series = (
+        df_updated["STATUS"].astype(str).str.strip().str.upper()
+        if "STATUS" in df_updated.columns
+        else pd.Series("", index=df_updated.index)
+    )
+
+    slots: list[dict[str, Any]] = []
+    if "In Time" in df_updated.columns and "Out Time" in df_updated.columns:
+        in_objs = df_updated["In Time"].map(_coerce_to_time_obj)
+        out_objs = df_updated["Out Time"].map(_coerce_to_time_obj)
+        doctor_series = df_updated["DR."] if "DR." in df_updated.columns else pd.Series("", index=df_updated.index)
+        dept_cache: dict[str, tuple[str, list[str], dict[str, Any]]] = {}
+        for pos in range(len(df_updated)):
+            in_obj, out_obj = in_objs.iat[pos], out_objs.iat[pos]
+            if in_obj is None or out_obj is None or pd.isna(in_obj) or pd.isna(out_obj):
+                continue
+            if any(s in status_series.iat[pos] for s in _INACTIVE_STATUS_WORDS):
+                continue
+            doctor = str(doctor_series.iat[pos]).strip()
+            if _is_blank_cell(doctor) and "Doctor" in df_updated.columns:
+                doctor = str(df_updated["Doctor"].iat[pos]).strip()
+            if _is_blank_cell(doctor):
+                continue
+            if doctor not in dept_cache:
+                department = get_department_for_doctor(doctor)
+                rules = _get_compiled_department_rules(department)
+                dept_cache[doctor] = (department, _unique_preserve_order(get_assistants_for_department(department)), rules)
+            department, dept_assistants, rules = dept_cache[doctor]
+            start_min = in_obj.hour * 60 + in_obj.minute
+            end_min = out_obj.hour * 60 + out_obj.minute
+            if end_min < start_min:
+                end_min += DAY_MINUTES
+            current = {}
+            for role, col in role_cols.items():
+                val = df_updated[col].iat[pos] if col in df_updated.columns else ""
+                current[role] = "" if _is_blank_cell(val) else str(val).strip()
+            row_id = str(df_updated["REMINDER_ROW_ID"].iat[pos]).strip() if "REMINDER_ROW_ID" in df_updated.columns else ""
+            slots.append({
+                "pos": pos,
+                "start": start_min,
+                "end": end_min,
+                "appt_hour": in_obj.hour + in_obj.minute / 60.0,
+                "doctor": doctor,
+                "department": department,
+                "dept_assistants": dept_assistants,
+                "rules": rules,
+                "row_id": row_id,
+                "current": current,
+                "patient": df_updated["Patient Name"].iat[pos] if "Patient Name" in df_updated.columns else "",
+            })
+    slots.sort(key=lambda slot: (slot["start"], slot["pos"]))
+
+    return {
+        "df": df_updated,
+        "role_cols": role_cols,
+        "global_cfg": global_cfg,
+        "pref_map": _get_profiles_cache().get("assistant_prefs", {}),
+        "all_assistants": all_assistants,
+        "blocks": avail["blocks"],
+        "names": names,
+        "index": index,
+        "occupancy": occupancy,
+        "intervals": intervals,
+        "off_reason": dict(avail["off_reason"]),
+        "free_now": set(free_now_set),
+        "status_map": status_map,
+        "current_minute": now.hour * 60 + now.minute,
+        "loads": loads,
+        "status_series": status_series,
+        "slots": slots,
+        "changes": [],
+    }
+
+
+def _day_off_reason(state: dict[str, Any], name: str) -> str:
+    off_reason = state["off_reason"]
+    if name not in off_reason:
+        weekly_off_map = _get_profiles_cache().get("weekly_off_map", WEEKLY_OFF)
+        weekly_off_set = {str(a).strip().upper() for a in weekly_off_map.get(runtime.now().weekday(), [])}
+        off_reason[name] = _assistant_off_reason(name, runtime.punch_map(), weekly_off_set)
+    return off_reason[name]
+
+
+def _day_is_free(state: dict[str, Any], name: str, start_min: int, end_min: int, row_id: str) -> bool:
+    """Same answer as is_assistant_available + the dashboard free-now filter, against live batch state."""
+    if name not in state["free_now"] or _day_off_reason(state, name):
+        return False
+    for b_start, b_end, _reason in state["blocks"].get(name, []):
+        if not (end_min <= b_start or start_min >= b_end):
+            return False
+    i = state["index"].get(name)
+    if i is None or not state["occupancy"][i, _mask_window(start_min, end_min)].any():
+        return True
+    for appt in state["intervals"].get(name, []):
+        if row_id and str(appt.get("row_id", "")).strip() == row_id:
+            continue
+        if not (end_min <= appt["start"] or start_min >= appt["end"]):
+            return False
+    return True
+
+
+def _day_pool(state: dict[str, Any], candidates: list[str], slot: dict[str, Any]) -> tuple[dict[str, str], list[str]]:
+    order = [
+        a for a in candidates
+        if _day_is_free(state, str(a).strip().upper(), slot["start"], slot["end"], slot["row_id"])
+    ]
+    return {a.upper(): a for a in order}, order
+
+
+def _day_load_unit(state: dict[str, Any], slot: dict[str, Any]) -> int:
+    if state["global_cfg"].get("load_balance_weight", "count") == "minutes":
+        return slot["end"] - slot["start"]
+    return 1
+
+
+def _day_load_map(state: dict[str, Any], slot: dict[str, Any]) -> dict[str, int]:
+    """Loads excluding this row, matching _assistant_loads(df, exclude_row_id)."""
+    load_map = dict(state["loads"])
+    if slot["row_id"]:
+        unit = _day_load_unit(state, slot)
+        for name in slot["current"].values():
+            if name:
+                key = name.upper()
+                load_map[key] = load_map.get(key, 0) - unit
+    return load_map
+
+
+def _day_place(state: dict[str, Any], slot: dict[str, Any], role: str, new_val: str) -> None:
+    """Write one assignment into the frame and patch occupancy, loads and the free-now set."""
+    df_updated = state["df"]
+    col = state["role_cols"][role]
+    old_val = slot["current"].get(role, "")
+    if _is_blank_cell(new_val) or str(new_val).strip() == old_val or col not in df_updated.columns:
+        return
+    pos = slot["pos"]
+    df_updated.iloc[pos, df_updated.columns.get_loc(col)] = new_val
+    state["changes"].append({
+        "row": pos,
+        "row_id": slot["row_id"],
+        "patient": slot["patient"],
+        "role": role,
+        "old": old_val,
+        "new": new_val,
+    })
+
+    span = _mask_window(slot["start"], slot["end"])
+    status_series = state["status_series"]
+    current_minute = state["current_minute"]
+    if old_val:
+        _day_release(state, slot, role)
+    new_key = str(new_val).strip().upper()
+    if new_key not in state["index"]:
+        state["index"][new_key] = len(state["names"])
+        state["names"].append(new_key)
+        state["occupancy"] = np.vstack([state["occupancy"], np.zeros((1, _DAY_MASK_WIDTH), dtype=np.int16)])
+    state["occupancy"][state["index"][new_key], span] += 1
+    state["intervals"].setdefault(new_key, []).append({
+        "assistant": new_key,
+        "pos": pos,
+        "role": col,
+        "start": slot["start"],
+        "end": slot["end"],
+        "row_id": slot["row_id"],
+        "patient": slot["patient"],
+    })
+    state["loads"][new_key] = state["loads"].get(new_key, 0) + _day_load_unit(state, slot)
+    if _slot_is_current(status_series.iat[pos], slot["start"], slot["end"], current_minute):
+        state["free_now"].discard(new_key)
+    slot["current"][role] = str(new_val).strip()
+
+
+def _day_release(state: dict[str, Any], slot: dict[str, Any], role: str) -> None:
+    """Take the current holder of a role off this row's occupancy (the cell itself is left to the caller)."""
+    old_val = slot["current"].get(role, "")
+    if not old_val:
+        return
+    col = state["role_cols"][role]
+    pos = slot["pos"]
+    old_key = old_val.upper()
+    state["intervals"][old_key] = [
+        a for a in state["intervals"].get(old_key, [])
+        if not (a.get("pos") == pos and a.get("role") == col)
+    ]
+    if old_key in state["index"]:
+        state["occupancy"][state["index"][old_key], _mask_window(slot["start"], slot["end"])] -= 1
+    state["loads"][old_key] = state["loads"].get(old_key, 0) - _day_load_unit(state, slot)
+    old_info = state["status_map"].get(old_key, {}) or {}
+    status_series = state["status_series"]
+    if (
+        old_info.get("status") == "BUSY"
+        and not old_info.get("duty_run_id")
+        and not any(
+            _slot_is_current(status_series.iat[a["pos"]], a["start"], a["end"], state["current_minute"])
+            for a in state["intervals"].get(old_key, [])
+        )
+    ):
+        state["free_now"].add(old_key)
+    slot["current"][role] = ""
+
+
+def _greedy_fill_day(state: dict[str, Any], only_fill_empty: bool) -> None:
+    global_cfg = state["global_cfg"]
+    load_balance = bool(global_cfg.get("load_balance", False))
+    cross_dept = bool(global_cfg.get("cross_department_fallback", False))
+    for slot in state["slots"]:
+        current = slot["current"]
+        if only_fill_empty and all(current.values()):
+            continue
+        dept_pool = _day_pool(state, slot["dept_assistants"], slot)
+        all_pool = _day_pool(state, state["all_assistants"], slot) if cross_dept else dept_pool
+        load_map = _day_load_map(state, slot) if load_balance else {}
+        result = _assign_roles_for_slot(
+            dict(current),
+            slot["doctor"],
+            slot["appt_hour"],
+            slot["rules"],
+            global_cfg,
+            dept_pool,
+            all_pool,
+            state["pref_map"],
+            load_map,
+            only_fill_empty,
+        )
+        for role in ["FIRST", "SECOND", "Third"]:
+            _day_place(state, slot, role, result.get(role, ""))
+
+
+# ================ WHOLE-DAY SOLVER (OPTIONAL) ================
+# Cost tiers, largest first: leaving a role empty > slot end time (when a
+# group has more open roles than assistants, keep the later-ending ones open
+# so assistants are freed sooner) > cross-department pick > non-candidate
+# fallback > assistant load > position in the rule list. Each tier's weight
+# exceeds the largest sum of every tier below it, checked at import.
+_SOLVER_RANK_LIMIT = 1e3
+_SOLVER_LOAD_WEIGHT = 1e3
+_SOLVER_LOAD_LIMIT = 1e2
+_SOLVER_FALLBACK = 1e6
+_SOLVER_CROSS_DEPT = 1e7
+_SOLVER_END_WEIGHT = 1e8
+_SOLVER_UNFILLED = 1e12
+_SOLVER_INFEASIBLE = 1e14
+
+# Starting per-unit cost (ms per n*n*m) for the pre-solve budget estimate; the
+# rate actually measured on earlier cliques takes over once it is higher.
+_SOLVER_MS_PER_UNIT = 2e-4
+
+if not (
+    _SOLVER_RANK_LIMIT <= _SOLVER_LOAD_WEIGHT
+    and _SOLVER_RANK_LIMIT + _SOLVER_LOAD_WEIGHT * _SOLVER_LOAD_LIMIT <= _SOLVER_FALLBACK
+    and _SOLVER_FALLBACK * 2 <= _SOLVER_CROSS_DEPT
+    and _SOLVER_CROSS_DEPT + _SOLVER_FALLBACK * 2 <= _SOLVER_END_WEIGHT
+    and _SOLVER_END_WEIGHT * (_DAY_MASK_WIDTH + 1) <= _SOLVER_UNFILLED
+    and _SOLVER_UNFILLED * 10 <= _SOLVER_INFEASIBLE
+):
+    raise RuntimeError("Whole-day solver cost tiers overlap")
+
+
+def _min_cost_assignment(cost: np.ndarray) -> list[int]:
+    """Hungarian algorithm for an n x m cost matrix (n <= m). Returns the column chosen for each row."""
+    n, m = cost.shape
+    u = np.zeros(n + 1)
+    v = np.zeros(m + 1)
+    p = np.zeros(m + 1, dtype=np.int64)
+    way = np.zeros(m + 1, dtype=np.int64)
+    for i in range(1, n + 1):
+        p[0] = i
+        j0 = 0
+        minv = np.full(m + 1, np.inf)
+        used = np.zeros(m + 1, dtype=bool)
+        while True:
+            used[j0] = True
+            i0 = p[j0]
+            cur = cost[i0 - 1] - u[i0] - v[1:]
+            free = ~used[1:]
+            better = free & (cur < minv[1:])
+            minv[1:][better] = cur[better]
+            way[1:][better] = j0
+            masked = np.where(free, minv[1:], np.inf)
+            j1 = int(np.argmin(masked)) + 1
+            delta = masked[j1 - 1]
+            u[p[used]] += delta
+            v[used] -= delta
+            minv[~used] -= delta
+            j0 = j1
+            if p[j0] == 0:
+                break
+        while True:
+            j1 = way[j0]
+            p[j0] = p[j1]
+            j0 = j1
+            if j0 == 0:
+                break
+    assignment = [-1] * n
+    for j in range(1, m + 1):
+        if p[j]:
+            assignment[p[j] - 1] = j - 1
+    return assignment
+
+
+def _solver_position_costs(
+    state: dict[str, Any],
+    slot: dict[str, Any],
+    role: str,
+    columns: list[str],
+) -> np.ndarray:
+    """One cost row over the upper-cased assistant columns for a single open position."""
+    global_cfg = state["global_cfg"]
+    use_role_flags = bool(global_cfg.get("use_profile_role_flags", False))
+    load_balance = bool(global_cfg.get("load_balance", False))
+    cross_dept = bool(global_cfg.get("cross_department_fallback", False))
+
+    dept_map, dept_order = _day_pool(state, slot["dept_assistants"], slot)
+    all_map, all_order = _day_pool(state, state["all_assistants"], slot) if cross_dept else (dept_map, dept_order)
+    rule = slot["rules"].get(role, {}) if isinstance(slot["rules"], dict) else {}
+    candidates = _rule_candidates_for_role(role, rule, slot["doctor"], slot["appt_hour"], slot["current"].get("FIRST", ""))
+    cand_rank = {str(name).strip().upper(): i for i, name in enumerate(candidates)}
+    dept_rank = {name.upper(): i for i, name in enumerate(dept_order)}
+    all_rank = {name.upper(): i for i, name in enumerate(all_order)}
+    already = {str(v).strip().upper() for v in slot["current"].values() if v}
+    load_map = _day_load_map(state, slot) if load_balance else {}
+    load_unit = 60.0 if global_cfg.get("load_balance_weight", "count") == "minutes" else 1.0
+
+    row = np.full(len(columns), _SOLVER_INFEASIBLE)
+    for j, name in enumerate(columns):
+        if name in already or name not in all_map:
+            continue
+        if use_role_flags:
+            pref_val = state["pref_map"].get(_norm_staff_key(name), {}).get(role, "")
+            if not _pref_allows_role(pref_val):
+                continue
+        in_dept = name in dept_map
+        if name in cand_rank:
+            cost = float(min(cand_rank[name], _SOLVER_RANK_LIMIT - 1))
+        else:
+            rank = dept_rank.get(name, 0) if in_dept else all_rank.get(name, 0)
+            cost = _SOLVER_FALLBACK + min(rank, _SOLVER_RANK_LIMIT - 1)
+        if not in_dept:
+            cost += _SOLVER_CROSS_DEPT
+        if load_balance:
+            load = min(max(load_map.get(name, 0) / load_unit, 0.0), _SOLVER_LOAD_LIMIT - 1)
+            cost += _SOLVER_LOAD_WEIGHT * load
+        row[j] = cost + _SOLVER_END_WEIGHT * slot["end"]
+    return row
+
+
+def _solve_fill_day(state: dict[str, Any], time_budget_ms: float) -> bool:
+    """Fill open roles clique by clique with a min-cost assignment. False when the time budget runs out.
+
+    Slots that all overlap each other form a clique, so inside it every assistant
+    can take at most one position; FIRST is solved before SECOND/Third because
+    when_first_is rules depend on it. Existing assignments are kept as fixed.
+    Before each solve the Hungarian cost is estimated from its size (n*n*m) and
+    the rate measured so far; a solve that would overrun the budget is not started.
+    """
+    started = time_module.perf_counter()
+    display_names: dict[str, str] = {}
+    for name in list(state["all_assistants"]) + [a for slot in state["slots"] for a in slot["dept_assistants"]]:
+        display_names.setdefault(str(name).strip().upper(), name)
+    columns = list(display_names)
+
+    # Earliest-end clique cover: every slot in a group is still running at the
+    # group's first end minute, and long slots are decided only once their own
+    # end comes up, as in classic interval scheduling.
+    cliques: list[list[dict[str, Any]]] = []
+    clique_end = None
+    for slot in sorted(state["slots"], key=lambda item: (item["end"], item["start"], item["pos"])):
+        if cliques and clique_end is not None and slot["start"] < clique_end:
+            cliques[-1].append(slot)
+        else:
+            cliques.append([slot])
+            clique_end = slot["end"]
+
+    ms_per_unit = _SOLVER_MS_PER_UNIT
+    for clique in cliques:
+        for phase_roles in (["FIRST"], ["SECOND", "Third"]):
+            positions = [
+                (slot, role)
+                for slot in clique
+                for role in phase_roles
+                if not slot["current"].get(role)
+            ]
+            if not positions:
+                continue
+            units = len(positions) ** 2 * (len(columns) + len(positions))
+            solve_started = time_module.perf_counter()
+            if (solve_started - started) * 1000 + ms_per_unit * units > time_budget_ms:
+                return False
+            cost = np.full((len(positions), len(columns) + len(positions)), _SOLVER_INFEASIBLE)
+            for r, (slot, role) in enumerate(positions):
+                cost[r, : len(columns)] = _solver_position_costs(state, slot, role, columns)
+                cost[r, len(columns) + r] = _SOLVER_UNFILLED
+            for r, col_idx in enumerate(_min_cost_assignment(cost)):
+                if 0 <= col_idx < len(columns) and cost[r, col_idx] < _SOLVER_UNFILLED:
+                    slot, role = positions[r]
+                    _day_place(state, slot, role, display_names[columns[col_idx]])
+            ms_per_unit = max(ms_per_unit, (time_module.perf_counter() - solve_started) * 1000 / units)
+    return True
+
+
+def allocate_whole_day(
+    df_schedule: pd.DataFrame,
+    only_fill_empty: bool = True,
+    mode: Optional[str] = None,
+) -> tuple[pd.DataFrame, list[dict[str, Any]]]:
+    """Fill FIRST/SECOND/Third for every open row of the day in one pass.
+
+    mode "greedy" visits rows in In Time order and runs the same rule walk as
+    _allocate_assistants_for_slot, with occupancy, loads and the dashboard free
+    set updated incrementally. mode "solver" fills open roles with a min-cost
+    assignment per group of overlapping slots and falls back to greedy only when
+    the next solve would run past solver_time_budget_ms. The solver only fills
+    empty roles, so only_fill_empty=False (re-pick every role) always runs greedy.
+    Defaults to allocation_mode from the rules file. Returns (updated copy, changes).
+    """
+    if df_schedule is None or df_schedule.empty:
+        return df_schedule, []
+    global_cfg = _get_global_allocation_config()
+    mode = str(mode or global_cfg.get("allocation_mode", "greedy")).strip().lower()
+    if mode == "solver" and only_fill_empty:
+        solved = _prepare_day_allocation(df_schedule.copy())
+        if _solve_fill_day(solved, float(global_cfg.get("solver_time_budget_ms", 750))):
+            return solved["df"], solved["changes"]
+    state = _prepare_day_allocation(df_schedule.copy())
+    _greedy_fill_day(state, only_fill_empty)
+    return state["df"], state["changes"]
+
+
+# ================ AVAILABILITY REBALANCER ================
+# When an assistant punches out or is blocked, only the active rows they hold
+# that are still ahead of them are refilled, in one batch pass over the same
+# state as allocate_whole_day. The result is staged as a diff for preview and
+# applied as a single patch.
+def _rebalance_affected_rows(
+    df_schedule: pd.DataFrame,
+    assistant: str,
+    start_min: int,
+    end_min: Optional[int] = None,
+) -> list[int]:
+    """Positions of active rows where assistant holds a role and the slot overlaps [start_min, end_min)."""
+    assist_upper = str(assistant or "").strip().upper()
+    if df_schedule is None or df_schedule.empty or not assist_upper:
+        return []
+    third_col = _get_third_column_name(df_schedule.columns)
+    role_cols = [c for c in ["FIRST", "SECOND", third_col] if c in df_schedule.columns]
+    if not role_cols or "In Time" not in df_schedule.columns or "Out Time" not in df_schedule.columns:
+        return []
+    held = np.zeros(len(df_schedule), dtype=bool)
+    for col in role_cols:
+        held |= (df_schedule[col].astype(str).str.strip().str.upper() == assist_upper).to_numpy()
+    status_series = (
+        df_schedule["STATUS"].astype(str).str.strip().str.upper()
+        if "STATUS" in df_schedule.columns
+        else pd.Series("", index=df_schedule.index)
+    )
+    out: list[int] = []
+    for pos in np.flatnonzero(held):
+        if any(s in status_series.iat[pos] for s in _INACTIVE_STATUS_WORDS):
+            continue
+        window = _window_minutes(df_schedule["In Time"].iat[pos], df_schedule["Out Time"].iat[pos])
+        if not window or window[1] <= start_min:
+            continue
+        if end_min is not None and window[0] >= end_min:
+            continue
+        out.append(int(pos))
+    return out
+
+
+def plan_rebalance(
+    df_schedule: pd.DataFrame,
+    assistant: str,
+    start_min: int,
+    end_min: Optional[int] = None,
+    reason: str = "",
+) -> Optional[dict[str, Any]]:
+    """Clear assistant from affected rows and refill only those rows. Returns {reason, assistant, diff} or None.
+
+    Call after the availability change is recorded (punch saved / block added) so the
+    batch state already treats the assistant as unavailable. diff entries use the
+    allocate_whole_day change format; a blank "new" means nobody else was free.
+    """
+    positions = _rebalance_affected_rows(df_schedule, assistant, start_min, end_min)
+    if not positions:
+        return None
+    assist_upper = str(assistant).strip().upper()
+    df_work = df_schedule.copy()
+    third_col = _get_third_column_name(df_work.columns)
+    role_cols = {"FIRST": "FIRST", "SECOND": "SECOND", "Third": third_col}
+    for col in role_cols.values():
+        if col not in df_work.columns:
+            continue
+        col_idx = df_work.columns.get_loc(col)
+        for pos in positions:
+            if str(df_work.iat[pos, col_idx]).strip().upper() == assist_upper:
+                df_work.iat[pos, col_idx] = ""
+
+    state = _prepare_day_allocation(df_work, use_cache=False)
+    affected = set(positions)
+    state["slots"] = [slot for slot in state["slots"] if slot["pos"] in affected]
+    _greedy_fill_day(state, only_fill_empty=True)
+
+    df_filled = state["df"]
+    diff: list[dict[str, Any]] = []
+    for pos in positions:
+        for role, col in role_cols.items():
+            if col not in df_schedule.columns:
+                continue
+            old_val = str(df_schedule[col].iat[pos]).strip()
+            new_val = "" if _is_blank_cell(df_filled[col].iat[pos]) else str(df_filled[col].iat[pos]).strip()
+            if old_val.upper() != assist_upper or new_val == old_val:
+                continue
+            diff.append({
+                "row": pos,
+                "row_id": str(df_schedule["REMINDER_ROW_ID"].iat[pos]).strip() if "REMINDER_ROW_ID" in df_schedule.columns else "",
+                "patient": df_schedule["Patient Name"].iat[pos] if "Patient Name" in df_schedule.columns else "",
+                "in_time": _time_to_hhmm(_coerce_to_time_obj(df_schedule["In Time"].iat[pos])),
+                "role": role,
+                "old": old_val,
+                "new": new_val,
+            })
+    return {"reason": reason, "assistant": assist_upper, "diff": diff}
+
+
+def _apply_rebalance_patch(df_schedule: pd.DataFrame, diff: list[dict[str, Any]]) -> tuple[pd.DataFrame, int, int]:
+    """Apply a rebalance diff by row id. Cells edited since the plan (neither old value nor blank) are skipped."""
+    df_updated = df_schedule.copy()
+    third_col = _get_third_column_name(df_updated.columns)
+    role_cols = {"FIRST": "FIRST", "SECOND": "SECOND", "Third": third_col}
+    id_to_pos: dict[str, int] = {}
+    if "REMINDER_ROW_ID" in df_updated.columns:
+        for pos, rid in enumerate(df_updated["REMINDER_ROW_ID"].astype(str).str.strip()):
+            id_to_pos.setdefault(rid, pos)
+    applied = skipped = 0
+    for change in diff:
+        pos = id_to_pos.get(change.get("row_id", "")) if change.get("row_id") else change.get("row")
+        col = role_cols.get(change.get("role", ""))
+        if pos is None or pos >= len(df_updated) or col not in df_updated.columns:
+            skipped += 1
+            continue
+        col_idx = df_updated.columns.get_loc(col)
+        current = "" if _is_blank_cell(df_updated.iat[pos, col_idx]) else str(df_updated.iat[pos, col_idx]).strip()
+        if current.upper() not in {str(change.get("old", "")).strip().upper(), ""}:
+            skipped += 1
+            continue
+        df_updated.iat[pos, col_idx] = change.get("new", "")
+        applied += 1
+    return df_updated, applied, skipped
+
+
+def stage_rebalance(
+    df_schedule: pd.DataFrame,
+    assistant: str,
+    start_min: int,
+    end_min: Optional[int] = None,
+    reason: str = "",
+) -> None:
+    """Plan a rebalance and keep it in session for render_rebalance_preview."""
+    try:
+        plan = plan_rebalance(df_schedule, assistant, start_min, end_min, reason)
+    except Exception:
+        plan = None
+    if plan and plan["diff"]:
+        runtime.session_state().pending_rebalance = plan
+    else:
+        runtime.session_state().pop("pending_rebalance", None)
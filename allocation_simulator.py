@@ -0,0 +1,358 @@
+#!/usr/bin/env python3
+"""Replay a saved day through the real allocation functions (what-if simulator).
+
+Takes a schedule backup (CSV/XLSX as downloaded from Storage/Backup), an
+optional roster (Assistants/Doctors profiles) and a rules file, replays the
+bookings and status edits in time order through allocation.py's
+_auto_fill_assistants_for_row, and reports fill rate, fairness and per-call
+latency percentiles.
+
+The engine modules read session state, the clock, profiles, punches and duty
+runs through runtime, so the replay runs inside runtime.use_sources(): session
+state is a plain SessionDict, the clock is the replayed minute, storage is
+never touched and no Streamlit session is required.
+
+Usage:
+    python allocation_simulator.py --day tdb_allotment_backup_20260218_0900.xlsx
+    python allocation_simulator.py --day day.csv --roster "Putt Allotment.xlsx" --rules allocation_rules.json --out replayed.csv
+"""
+
+import argparse
+import io
+import json
+import re
+import sys
+import time
+import uuid
+from datetime import date, datetime, time as time_type
+from pathlib import Path
+from typing import Any, Optional, cast
+
+import numpy as np
+import pandas as pd
+
+import runtime
+from allocation import _auto_fill_assistants_for_row, _get_compiled_department_rules, _window_minutes, find_schedule_conflicts
+from staff import (
+    ALLOCATION_RULES_PATH,
+    PROFILE_ASSISTANT_SHEET,
+    PROFILE_DOCTOR_SHEET,
+    WEEKLY_OFF,
+    _get_all_assistants,
+    _get_profiles_cache,
+    get_department_for_doctor,
+)
+from status import _deserialize_time_blocks, invalidate_availability
+from utils import IST, _is_blank_cell, _unique_preserve_order
+
+RULES_PATH = ALLOCATION_RULES_PATH
+
+ROLE_COLUMNS = ("FIRST", "SECOND", "Third")
+CANCEL_WORDS = ("CANCELLED", "SHIFTED")
+DONE_WORDS = ("DONE", "COMPLETED")
+DEFAULT_LEAD_MINUTES = 60
+
+
+def simulation_sources(
+    rules_path: Optional[Path] = None,
+    assistants_df: Optional[pd.DataFrame] = None,
+    doctors_df: Optional[pd.DataFrame] = None,
+) -> runtime.Sources:
+    """Storage-free sources for one replay.
+
+    Profiles come from assistants_df/doctors_df (empty frames fall back to the
+    rules file lists), every rostered assistant is punched in and there are no
+    duty runs.
+    """
+    profile_frames = {
+        PROFILE_ASSISTANT_SHEET: assistants_df if assistants_df is not None else pd.DataFrame(),
+        PROFILE_DOCTOR_SHEET: doctors_df if doctors_df is not None else pd.DataFrame(),
+    }
+    punch_map: dict[str, dict[str, str]] = {}
+
+    def _punch_map() -> dict[str, dict[str, str]]:
+        if not punch_map:
+            for name in _get_all_assistants():
+                punch_map[str(name).strip().upper()] = {"punch_in": "00:00:00", "punch_out": ""}
+        return punch_map
+
+    return runtime.Sources(
+        session_state=runtime.SessionDict(profiles_cache_bust=0, time_blocks=[]),
+        now=datetime.now(IST),
+        punch_map=_punch_map,
+        load_profiles=lambda sheet_name, cache_bust: profile_frames.get(sheet_name, pd.DataFrame()).copy(),
+        load_duty_runs=pd.DataFrame,
+        rules_path=Path(rules_path) if rules_path else RULES_PATH,
+    )
+
+
+def _read_table(source: Any, name: str) -> dict[str, pd.DataFrame]:
+    """All sheets of an XLSX (or {"Sheet1": frame} for CSV) from a path or bytes."""
+    data = source
+    if isinstance(source, (bytes, bytearray)):
+        data = io.BytesIO(source)
+    if str(name).lower().endswith(".csv"):
+        return {"Sheet1": pd.read_csv(data, dtype=str, keep_default_na=False)}
+    return pd.read_excel(data, sheet_name=None, dtype=str, keep_default_na=False)
+
+
+def load_day(source: Any, name: str) -> tuple[pd.DataFrame, list[dict[str, Any]]]:
+    """Schedule rows and raw time blocks from a CSV/XLSX schedule backup."""
+    sheets = _read_table(source, name)
+    if isinstance(sheets, pd.DataFrame):
+        sheets = {"Sheet1": sheets}
+    day_df = sheets.get("Sheet1")
+    if day_df is None:
+        day_df = next(iter(sheets.values()), pd.DataFrame())
+    blocks: list[dict[str, Any]] = []
+    meta = sheets.get("Meta")
+    if meta is not None and {"key", "value"}.issubset(meta.columns):
+        for _, row in meta.iterrows():
+            if str(row["key"]).strip() == "time_blocks":
+                try:
+                    raw = json.loads(str(row["value"]) or "[]")
+                except Exception:
+                    raw = []
+                blocks = raw if isinstance(raw, list) else []
+    return day_df.reset_index(drop=True), blocks
+
+
+def load_roster(source: Any, name: str) -> tuple[pd.DataFrame, pd.DataFrame]:
+    """(assistants, doctors) profile frames; a single sheet/CSV is split on its "kind" column."""
+    sheets = _read_table(source, name)
+    if isinstance(sheets, pd.DataFrame):
+        sheets = {"Sheet1": sheets}
+    if "Assistants" in sheets or "Doctors" in sheets:
+        return sheets.get("Assistants", pd.DataFrame()), sheets.get("Doctors", pd.DataFrame())
+    frame = next(iter(sheets.values()), pd.DataFrame())
+    if "kind" in frame.columns:
+        kind = frame["kind"].astype(str).str.strip().str.lower()
+        return frame.loc[~kind.str.startswith("doc")], frame.loc[kind.str.startswith("doc")]
+    return frame, pd.DataFrame()
+
+
+def infer_day(name: str, blocks: list[dict[str, Any]]) -> Optional[date]:
+    match = re.search(r"(\d{4})(\d{2})(\d{2})", str(name))
+    if match:
+        try:
+            return date(int(match.group(1)), int(match.group(2)), int(match.group(3)))
+        except ValueError:
+            pass
+    for block in blocks:
+        try:
+            return date.fromisoformat(str(block.get("date", "")).strip())
+        except ValueError:
+            continue
+    return None
+
+
+def _minute_of(value: Any, sim_day: date) -> Optional[int]:
+    try:
+        ts = datetime.fromisoformat(str(value).strip())
+    except ValueError:
+        return None
+    if ts.date() != sim_day:
+        return None
+    return ts.hour * 60 + ts.minute
+
+
+def build_replay_events(day_df: pd.DataFrame, sim_day: date, lead_minutes: int) -> list[tuple[int, int, int, str]]:
+    """(minute, order, row position, new status) in replay order; "" books the row.
+
+    Every row is booked lead_minutes before its In Time as WAITING. Rows that
+    ended cancelled/shifted flip at STATUS_CHANGED_AT (or In Time); others go
+    ON GOING at In Time and DONE at Out Time when their saved status says so.
+    """
+    events: list[tuple[int, int, int, str]] = []
+    for label, row in day_df.iterrows():
+        window = _window_minutes(row.get("In Time"), row.get("Out Time"))
+        if not window:
+            continue
+        pos = cast(int, label)
+        start, end = window
+        final = str(row.get("STATUS", "")).strip().upper()
+        booked = max(0, start - lead_minutes)
+        events.append((booked, 0, pos, ""))
+        if any(word in final for word in CANCEL_WORDS):
+            at = _minute_of(row.get("STATUS_CHANGED_AT", ""), sim_day)
+            events.append((max(booked, at if at is not None else start), 1, pos, final))
+            continue
+        if "ON GOING" in final or "ONGOING" in final or any(word in final for word in DONE_WORDS):
+            events.append((start, 1, pos, "ON GOING"))
+        elif final and final != "WAITING":
+            events.append((start, 1, pos, final))
+        if any(word in final for word in DONE_WORDS):
+            events.append((end, 1, pos, final))
+    events.sort()
+    return events
+
+
+def _percentiles(values: list[float]) -> dict[str, float]:
+    if not values:
+        return {"p50": 0.0, "p90": 0.0, "p99": 0.0, "max": 0.0, "mean": 0.0}
+    arr = np.asarray(values, dtype=float)
+    return {
+        "p50": round(float(np.percentile(arr, 50)), 3),
+        "p90": round(float(np.percentile(arr, 90)), 3),
+        "p99": round(float(np.percentile(arr, 99)), 3),
+        "max": round(float(arr.max()), 3),
+        "mean": round(float(arr.mean()), 3),
+    }
+
+
+def _fairness(minutes: dict[str, int], pool: list[str]) -> dict[str, float]:
+    arr = np.asarray([minutes.get(name, 0) for name in pool], dtype=float)
+    if arr.size == 0 or arr.sum() <= 0:
+        return {"jain_index": 1.0, "cv": 0.0, "min_minutes": 0.0, "max_minutes": 0.0}
+    return {
+        "jain_index": round(float(arr.sum() ** 2 / (arr.size * (arr ** 2).sum())), 4),
+        "cv": round(float(arr.std() / arr.mean()), 4),
+        "min_minutes": float(arr.min()),
+        "max_minutes": float(arr.max()),
+    }
+
+
+def run_simulation(
+    day_df: pd.DataFrame,
+    time_blocks: Optional[list[dict[str, Any]]] = None,
+    assistants_df: Optional[pd.DataFrame] = None,
+    doctors_df: Optional[pd.DataFrame] = None,
+    rules_path: Optional[Path] = None,
+    sim_day: Optional[date] = None,
+    lead_minutes: int = DEFAULT_LEAD_MINUTES,
+    keep_assignments: bool = False,
+) -> dict[str, Any]:
+    """Replay day_df and return {"summary", "workload", "schedule"}.
+
+    Role columns are cleared first (unless keep_assignments) so the rules
+    decide every seat; the replayed schedule is returned for inspection.
+    """
+    sources = simulation_sources(rules_path, assistants_df, doctors_df)
+    with runtime.use_sources(sources):
+        return _replay(day_df, time_blocks or [], sources, sim_day or runtime.now().date(), lead_minutes, keep_assignments)
+
+
+def _replay(
+    day_df: pd.DataFrame,
+    time_blocks: list[dict[str, Any]],
+    sources: runtime.Sources,
+    sim_day: date,
+    lead_minutes: int,
+    keep_assignments: bool,
+) -> dict[str, Any]:
+    state = runtime.session_state()
+    state.time_blocks = _deserialize_time_blocks(time_blocks)
+
+    source = day_df.copy().reset_index(drop=True).astype(object).fillna("")
+    for col in (*ROLE_COLUMNS, "STATUS", "REMINDER_ROW_ID", "DR.", "In Time", "Out Time"):
+        if col not in source.columns:
+            source[col] = ""
+    if not keep_assignments:
+        for col in ROLE_COLUMNS:
+            source[col] = ""
+    blank_ids = source["REMINDER_ROW_ID"].astype(str).str.strip() == ""
+    source.loc[blank_ids, "REMINDER_ROW_ID"] = [str(uuid.uuid4()) for _ in range(int(blank_ids.sum()))]
+
+    events = build_replay_events(source, sim_day, lead_minutes)
+    schedule = source.iloc[0:0].copy()
+    position: dict[int, int] = {}
+    latencies: list[float] = []
+
+    for minute, _order, pos, new_status in events:
+        sources.now = datetime.combine(sim_day, time_type(min(minute, 1439) // 60, min(minute, 1439) % 60), IST)
+        if not new_status:
+            row = source.iloc[[pos]].copy()
+            row["STATUS"] = "WAITING"
+            schedule = pd.concat([schedule, row], ignore_index=True)
+            position[pos] = len(schedule) - 1
+        else:
+            schedule.iloc[position[pos], schedule.columns.get_loc("STATUS")] = new_status
+        # The schedule was edited in place and the clock moved: drop derived
+        # availability (keyed by wall-clock minute) and the load ledger version.
+        invalidate_availability("schedule")
+        started = time.perf_counter()
+        _auto_fill_assistants_for_row(schedule, position[pos], only_fill_empty=True)
+        latencies.append((time.perf_counter() - started) * 1000.0)
+
+    demanded = filled = full_rows = 0
+    minutes: dict[str, int] = {}
+    for _, row in schedule.iterrows():
+        status = str(row.get("STATUS", "")).strip().upper()
+        if any(word in status for word in CANCEL_WORDS):
+            continue
+        department = get_department_for_doctor(str(row.get("DR.", "")).strip())
+        roles = [r for r in ROLE_COLUMNS if r in _get_compiled_department_rules(department)] or ["FIRST"]
+        got = [r for r in roles if not _is_blank_cell(row.get(r, ""))]
+        demanded += len(roles)
+        filled += len(got)
+        full_rows += int(len(got) == len(roles))
+        window = _window_minutes(row.get("In Time"), row.get("Out Time"))
+        for role in ROLE_COLUMNS:
+            name = str(row.get(role, "")).strip().upper()
+            if name and not _is_blank_cell(name) and window:
+                minutes[name] = minutes.get(name, 0) + window[1] - window[0]
+
+    weekly_off = _get_profiles_cache().get("weekly_off_map", WEEKLY_OFF)
+    off_today = {str(n).strip().upper() for n in weekly_off.get(sim_day.weekday(), [])}
+    pool = [n for n in (str(a).strip().upper() for a in _get_all_assistants()) if n and n not in off_today]
+    pool = _unique_preserve_order(pool + sorted(set(minutes) - set(pool)))
+
+    workload = pd.DataFrame(
+        [{"Assistant": name, "Minutes": minutes.get(name, 0)} for name in pool],
+        columns=["Assistant", "Minutes"],
+    ).sort_values(["Minutes", "Assistant"], ascending=[False, True], ignore_index=True)
+    summary = {
+        "date": sim_day.isoformat(),
+        "rows": int(len(schedule)),
+        "events": len(events),
+        "roles_demanded": demanded,
+        "roles_filled": filled,
+        "fill_rate": round(filled / demanded, 4) if demanded else 1.0,
+        "rows_fully_staffed": full_rows,
+        "conflicts": int(find_schedule_conflicts(schedule).get("count", 0)),
+        **_fairness(minutes, pool),
+        **{f"latency_{k}_ms": v for k, v in _percentiles(latencies).items()},
+    }
+    return {"summary": summary, "workload": workload, "schedule": schedule}
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Replay a saved day through the allocation rules.")
+    parser.add_argument("--day", required=True, help="Schedule backup (CSV or XLSX with Sheet1/Meta)")
+    parser.add_argument("--roster", help="Profiles (XLSX with Assistants/Doctors sheets, or CSV)")
+    parser.add_argument("--rules", default=str(RULES_PATH), help="Allocation rules JSON")
+    parser.add_argument("--date", help="Day being replayed (YYYY-MM-DD); inferred from the backup name if omitted")
+    parser.add_argument("--lead-minutes", type=int, default=DEFAULT_LEAD_MINUTES, help="How long before In Time each booking arrives")
+    parser.add_argument("--keep-assignments", action="store_true", help="Keep saved FIRST/SECOND/Third instead of re-allocating")
+    parser.add_argument("--out", help="Write the replayed schedule to this CSV")
+    args = parser.parse_args(argv)
+
+    day_df, blocks = load_day(args.day, args.day)
+    assistants_df = doctors_df = None
+    if args.roster:
+        assistants_df, doctors_df = load_roster(args.roster, args.roster)
+    sim_day = date.fromisoformat(args.date) if args.date else infer_day(Path(args.day).name, blocks)
+
+    result = run_simulation(
+        day_df,
+        time_blocks=blocks,
+        assistants_df=assistants_df,
+        doctors_df=doctors_df,
+        rules_path=Path(args.rules),
+        sim_day=sim_day,
+        lead_minutes=args.lead_minutes,
+        keep_assignments=args.keep_assignments,
+    )
+    width = max(len(k) for k in result["summary"])
+    for key, value in result["summary"].items():
+        print(f"{key:<{width}}  {value}")
+    print()
+    print(result["workload"].to_string(index=False))
+    if args.out:
+        result["schedule"].to_csv(args.out, index=False)
+        print(f"\n✅ Replayed schedule written to {args.out}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,37 @@
+# pyright: reportMissingImports=false, reportMissingModuleSource=false, reportUnknownVariableType=false, reportUnknownArgumentType=false, reportUnknownParameterType=false, reportUnknownMemberType=false, reportGeneralTypeIssues=false
+"""Per-page setup shared by the files in pages/.
+
+Pages that read the schedule call schedule_page(); it loads the sheet, runs
+alerts where enabled and draws the schedule tools in the sidebar. Pages that
+never touch the schedule call plain_page() and skip the load entirely.
+"""
+
+import pandas as pd
+import streamlit as st
+
+import storage
+from alerts import run_alerts
+from sidebar import render_reset_schedule, render_save_mode, render_sidebar_header, render_time_blocking
+from ui import render_rebalance_preview
+
+
+def schedule_page(category: str) -> tuple[pd.DataFrame, pd.DataFrame]:
+    """Load (df_raw, df) and render the shared schedule sidebar for a page in `category`."""
+    df_raw, df = storage.load_schedule()
+    render_save_mode(df_raw)
+    render_time_blocking(df_raw)
+    render_reset_schedule(df_raw)
+    # Alerts run on the Scheduling pages unless "Run alerts on all pages" is on.
+    if category == "Scheduling" or st.session_state.get("alerts_background", False):
+        run_alerts(df_raw, df)
+    render_sidebar_header(df)
+    render_rebalance_preview(df_raw)
+    return df_raw, df
+
+
+def plain_page() -> None:
+    """Sidebar header for pages that do not read the schedule (loads it only for background alerts)."""
+    if st.session_state.get("alerts_background", False):
+        schedule_page("")
+        return
+    render_sidebar_header(None)
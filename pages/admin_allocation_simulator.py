@@ -0,0 +1,94 @@
+"""Admin › Allocation Simulator: replay a saved day through the allocation rules."""
+
+import tempfile
+import uuid
+from pathlib import Path
+
+import pandas as pd
+import streamlit as st
+
+import allocation_simulator
+import runtime
+from layout import schedule_page
+from staff import ALLOCATION_RULES_PATH, PROFILE_ASSISTANT_SHEET, PROFILE_DOCTOR_SHEET
+from status import _serialize_time_blocks
+from storage import _load_profiles_cached
+
+
+def render_allocation_simulator_admin(schedule_df: pd.DataFrame):
+    st.subheader("🧪 Allocation Simulator")
+    st.caption(
+        "Replays a saved day through the allocation rules with its own session, clock and roster "
+        "(nothing is saved) and reports fill rate, fairness and per-call latency. "
+        "Same as `python allocation_simulator.py --day <backup>`."
+    )
+    day_file = st.file_uploader("Day backup (CSV/XLSX)", type=["csv", "xlsx"], key="sim_day_file")
+    roster_file = st.file_uploader("Roster (optional, XLSX with Assistants/Doctors or CSV)", type=["csv", "xlsx"], key="sim_roster_file")
+    rules_file = st.file_uploader("Rules (optional, JSON)", type=["json"], key="sim_rules_file")
+    col1, col2 = st.columns(2)
+    with col1:
+        lead_minutes = st.number_input(
+            "Booking lead (minutes before In Time)",
+            min_value=0, max_value=720, value=allocation_simulator.DEFAULT_LEAD_MINUTES, step=15,
+            key="sim_lead_minutes",
+        )
+    with col2:
+        keep_assignments = st.checkbox("Keep saved assignments", value=False, key="sim_keep_assignments")
+    if not day_file:
+        st.caption("No backup uploaded: today's schedule and profiles are replayed.")
+    if not st.button("▶️ Run simulation", key="sim_run"):
+        return
+
+    try:
+        if day_file:
+            day_df, blocks = allocation_simulator.load_day(day_file.getvalue(), day_file.name)
+            sim_day = allocation_simulator.infer_day(day_file.name, blocks)
+        else:
+            day_df = schedule_df if isinstance(schedule_df, pd.DataFrame) else pd.DataFrame()
+            blocks = _serialize_time_blocks(st.session_state.get("time_blocks", []))
+            sim_day = runtime.now().date()
+        if roster_file:
+            assistants_df, doctors_df = allocation_simulator.load_roster(roster_file.getvalue(), roster_file.name)
+        else:
+            bust = int(st.session_state.get("profiles_cache_bust", 0))
+            assistants_df = _load_profiles_cached(PROFILE_ASSISTANT_SHEET, bust)
+            doctors_df = _load_profiles_cached(PROFILE_DOCTOR_SHEET, bust)
+        rules_path = ALLOCATION_RULES_PATH
+        if rules_file:
+            rules_path = Path(tempfile.gettempdir()) / f"tdb_sim_rules_{uuid.uuid4().hex}.json"
+            rules_path.write_bytes(rules_file.getvalue())
+        with st.spinner("Replaying day..."):
+            result = allocation_simulator.run_simulation(
+                day_df,
+                time_blocks=blocks,
+                assistants_df=assistants_df,
+                doctors_df=doctors_df,
+                rules_path=rules_path,
+                sim_day=sim_day,
+                lead_minutes=int(lead_minutes),
+                keep_assignments=keep_assignments,
+            )
+    except Exception as e:
+        st.error(f"Simulation failed: {e}")
+        return
+
+    summary = result["summary"]
+    m1, m2, m3, m4 = st.columns(4)
+    m1.metric("Fill rate", f"{summary['fill_rate']:.0%}", help=f"{summary['roles_filled']} of {summary['roles_demanded']} roles")
+    m2.metric("Fairness (Jain)", f"{summary['jain_index']:.2f}", help="1.0 = minutes spread evenly")
+    m3.metric("p50 / p99 latency", f"{summary['latency_p50_ms']:.0f} / {summary['latency_p99_ms']:.0f} ms")
+    m4.metric("Conflicts", summary["conflicts"])
+    st.dataframe(pd.DataFrame([summary]).T.rename(columns={0: "Value"}).astype(str), use_container_width=True)
+    st.dataframe(result["workload"], use_container_width=True, hide_index=True)
+    st.download_button(
+        "⬇️ Replayed schedule (CSV)",
+        data=result["schedule"].to_csv(index=False).encode("utf-8"),
+        file_name=f"simulated_{summary['date']}.csv",
+        mime="text/csv",
+        key="sim_download",
+    )
+
+
+df_raw, _df = schedule_page("Admin/Settings")
+st.markdown("### 🔧 Admin / Settings")
+render_allocation_simulator_admin(df_raw)
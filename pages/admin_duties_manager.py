@@ -0,0 +1,204 @@
+"""Admin › Duties Manager: duty catalogue and per-assistant assignments (Excel-backed)."""
+
+import uuid
+
+import pandas as pd
+import streamlit as st
+
+from layout import schedule_page
+from storage import (
+    extract_assistants,
+    load_duties_master_sheet,
+    load_duty_assignments_sheet,
+    load_profiles,
+    save_duties_master_sheet,
+    save_duty_assignments_sheet,
+)
+from utils import now_ist
+
+
+def render_duties_master_admin(supabase):
+    st.subheader("🗂 Duties Master (Weekly / Monthly)")
+
+    # Load assistants for selection
+    try:
+        assistants_df = load_profiles("Assistants")
+        available_assistants = assistants_df["name"].dropna().unique().tolist() if not assistants_df.empty else []
+        available_assistants = sorted([str(a).strip() for a in available_assistants if str(a).strip()])
+    except Exception:
+        available_assistants = []
+
+    with st.form("add_duty_form"):
+        col1, col2 = st.columns(2)
+        with col1:
+            title = st.text_input("Duty Name *", key="duty_title_input")
+            frequency = st.selectbox("Frequency *", ["WEEKLY", "MONTHLY"], key="duty_freq_select")
+            op = st.selectbox("OP", ["ANY", "OP1", "OP2", "OP3"], key="duty_op_select")
+        with col2:
+            default_minutes = st.number_input("Estimated Time (minutes) *", min_value=5, step=5, value=15, key="duty_minutes_input")
+            active = st.checkbox("Active", value=True, key="duty_active_check")
+
+        # Add assistants multi-select
+        selected_assistants = st.multiselect(
+            "Assign to Assistants (optional)",
+            options=available_assistants,
+            key="duty_assistants_multiselect",
+            help="Select assistants to auto-assign this duty to them"
+        )
+
+        submitted = st.form_submit_button("➕ Add Duty")
+        if submitted:
+            if not title:
+                st.error("Duty name required")
+            else:
+                try:
+                    # Create duty in Duties_Master
+                    duties_df = load_duties_master_sheet()
+                    duty_id = str(uuid.uuid4())
+                    new_duty = pd.DataFrame([{
+                        "id": duty_id,
+                        "title": title,
+                        "frequency": frequency,
+                        "default_minutes": int(default_minutes),
+                        "op": op,
+                        "active": active,
+                        "created_at": now_ist().isoformat(),
+                    }])
+                    combined = pd.concat([duties_df, new_duty], ignore_index=True)
+                    save_duties_master_sheet(combined)
+
+                    # Auto-assign to selected assistants
+                    if selected_assistants:
+                        assignments_df = load_duty_assignments_sheet()
+                        new_assignments = []
+                        for assistant in selected_assistants:
+                            new_assignments.append({
+                                "id": str(uuid.uuid4()),
+                                "duty_id": duty_id,
+                                "assistant": assistant,
+                                "op": op,
+                                "est_minutes": int(default_minutes),
+                                "active": "true",
+                            })
+                        new_assignments_df = pd.DataFrame(new_assignments)
+                        combined_assignments = pd.concat([assignments_df, new_assignments_df], ignore_index=True)
+                        save_duty_assignments_sheet(combined_assignments)
+                        st.success(f"Duty added and assigned to {len(selected_assistants)} assistant(s) ✅")
+                    else:
+                        st.success("Duty added successfully ✅")
+                    st.rerun()
+                except Exception as e:
+                    st.error(f"Failed to add duty: {e}")
+
+    try:
+        duties = load_duties_master_sheet().to_dict("records")
+    except Exception as e:
+        st.error(f"Failed to load duties: {e}")
+        duties = []
+
+    if duties:
+        st.data_editor(
+            duties,
+            use_container_width=True,
+            disabled=["id", "created_at"],
+            num_rows="dynamic",
+            key="duties_master_editor",
+        )
+
+
+def render_duty_assignment_admin(supabase, assistants: list[str]):
+    st.subheader("👥 Assign Duties to Assistants")
+
+    # Load duties
+    try:
+        duties_df = load_duties_master_sheet()
+        active_duties = duties_df.loc[duties_df["active"].astype(str).str.lower() == "true"]
+        duties = active_duties.to_dict("records") if not active_duties.empty else []
+    except Exception as e:
+        st.error(f"Failed to load duties: {e}")
+        duties = []
+
+    if not duties:
+        st.warning("No active duties found.")
+        return
+
+    # Load assistants from Assistants sheet (not from schedule)
+    try:
+        assistants_df = load_profiles("Assistants")
+        sheet_assistants = assistants_df["name"].dropna().unique().tolist() if not assistants_df.empty else []
+        sheet_assistants = sorted([str(a).strip() for a in sheet_assistants if str(a).strip()])
+    except Exception:
+        sheet_assistants = []
+
+    if not sheet_assistants:
+        st.warning("No assistants found in Assistants sheet. Add assistants first.")
+        return
+
+    duty_map = {d["title"]: d["id"] for d in duties if d.get("title")}
+
+    with st.form("assign_duty_form"):
+        col1, col2 = st.columns(2)
+        with col1:
+            duty_title = st.selectbox("Duty *", list(duty_map.keys()), key="assign_duty_select")
+            assistant = st.selectbox("Assistant *", sheet_assistants, key="assign_assistant_select")
+        with col2:
+            est_minutes = st.number_input("Time for this Assistant (minutes)", min_value=5, step=5, value=15, key="assign_minutes_input")
+            op = st.selectbox("OP (optional)", ["", "OP1", "OP2", "OP3"], key="assign_op_select")
+            active = st.checkbox("Active", value=True, key="assign_active_check")
+
+        submitted = st.form_submit_button("📌 Assign Duty")
+        if submitted:
+            try:
+                assigns_df = load_duty_assignments_sheet()
+                # Check if assignment exists and update or append
+                existing = assigns_df[
+                    (assigns_df["duty_id"] == duty_map.get(duty_title)) &
+                    (assigns_df["assistant"].astype(str).str.strip() == assistant)
+                ]
+
+                new_assign = {
+                    "id": str(uuid.uuid4()),
+                    "duty_id": duty_map.get(duty_title),
+                    "assistant": assistant,
+                    "est_minutes": int(est_minutes),
+                    "op": op or "",
+                    "active": active,
+                }
+
+                if not existing.empty:
+                    # Update existing
+                    assigns_df.loc[existing.index[0]] = new_assign
+                else:
+                    # Add new
+                    new_row = pd.DataFrame([new_assign])
+                    assigns_df = pd.concat([assigns_df, new_row], ignore_index=True)
+
+                save_duty_assignments_sheet(assigns_df)
+                st.success("Duty assigned successfully ✅")
+                st.rerun()
+            except Exception as e:
+                st.error(f"Failed to assign duty: {e}")
+
+    try:
+        assigns = load_duty_assignments_sheet().to_dict("records")
+    except Exception as e:
+        st.error(f"Failed to load assignments: {e}")
+        assigns = []
+
+    if assigns:
+        st.data_editor(
+            assigns,
+            use_container_width=True,
+            disabled=["id"],
+            num_rows="dynamic",
+            key="duty_assign_editor",
+        )
+
+
+_df_raw, df = schedule_page("Admin/Settings")
+st.markdown("### 🔧 Admin / Settings")
+# Duties are now stored in Excel (not Supabase)
+assistants_for_admin = extract_assistants(df)
+render_duties_master_admin(None)  # Excel-based, supabase param not used
+st.divider()
+render_duty_assignment_admin(None, assistants_for_admin)  # Excel-based, supabase param not used
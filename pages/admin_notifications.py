@@ -0,0 +1,13 @@
+"""Admin › Notifications: storage backend and last-run timings (notification toggles are in the sidebar)."""
+
+import streamlit as st
+
+import storage
+from layout import plain_page
+from ui import render_rerun_costs
+
+plain_page()
+st.markdown("### 🔧 Admin / Settings")
+st.write(f"Using Supabase: {storage.supabase_enabled()}")
+st.write(f"Excel path: {storage.file_path}")
+render_rerun_costs()
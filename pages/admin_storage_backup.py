@@ -0,0 +1,13 @@
+"""Admin › Storage/Backup: storage backend and last-run timings (backups are in the sidebar)."""
+
+import streamlit as st
+
+import storage
+from layout import schedule_page
+from ui import render_rerun_costs
+
+_df_raw, _df = schedule_page("Admin/Settings")
+st.markdown("### 🔧 Admin / Settings")
+st.write(f"Using Supabase: {storage.supabase_enabled()}")
+st.write(f"Excel path: {storage.file_path}")
+render_rerun_costs()
@@ -0,0 +1,202 @@
+"""Assistants › Attendance: monthly report (Supabase) or the sheet-based editor (Excel)."""
+
+from datetime import datetime, timedelta
+
+import pandas as pd
+import streamlit as st
+
+import runtime
+import storage
+from layout import schedule_page
+from storage import (
+    ATTENDANCE_COLUMNS,
+    _load_attendance_range_supabase,
+    file_path,
+    get_assistants_list,
+    load_attendance_sheet,
+    save_attendance_sheet,
+)
+from utils import IST, _calc_worked_minutes, calc_worked_minutes, mins_to_hhmm, safe_str_to_time_obj
+
+
+def _attendance_status(punch_in: str, punch_out: str) -> str:
+    if punch_in and punch_out:
+        return "COMPLETE"
+    if punch_in and not punch_out:
+        return "IN PROGRESS"
+    return "MISSING"
+
+
+def render_assistant_attendance_tab(schedule_df, excel_path):
+    st.header("Assistants Attendance")
+    today_str = datetime.now(IST).date().isoformat()
+    assistants = get_assistants_list(schedule_df)
+    att_df = load_attendance_sheet(excel_path)
+
+    today_att = att_df.loc[att_df["DATE"] == today_str].copy() if not att_df.empty else pd.DataFrame(columns=ATTENDANCE_COLUMNS)
+    for name in assistants:
+        if today_att.empty or name not in today_att["ASSISTANT"].values:
+            new_row = {"DATE": today_str, "ASSISTANT": name, "PUNCH IN": "", "PUNCH OUT": ""}
+            today_att = pd.concat([today_att, pd.DataFrame([new_row])], ignore_index=True)
+
+    now_time = datetime.now(IST).time()
+
+    def _decorate(row):
+        in_str = str(row.get("PUNCH IN", "")).strip()
+        out_str = str(row.get("PUNCH OUT", "")).strip()
+        in_t = safe_str_to_time_obj(in_str) if in_str else None
+        out_t = safe_str_to_time_obj(out_str) if out_str else None
+        worked_mins, status = calc_worked_minutes(in_t, out_t, now_time)
+        row["WORKED MINS"] = mins_to_hhmm(worked_mins)
+        row["STATUS"] = status
+        return row
+
+    display_df = pd.DataFrame([_decorate(row.copy()) for _, row in today_att.iterrows()]) if not today_att.empty else pd.DataFrame(columns=ATTENDANCE_COLUMNS + ["WORKED MINS", "STATUS"])
+
+    edited = st.data_editor(
+        display_df,
+        use_container_width=True,
+        num_rows="fixed",
+        column_config={
+            "ASSISTANT": st.column_config.TextColumn(disabled=True),
+            "PUNCH IN": st.column_config.TextColumn(help="HH:MM"),
+            "PUNCH OUT": st.column_config.TextColumn(help="HH:MM"),
+            "WORKED MINS": st.column_config.TextColumn(disabled=True),
+            "STATUS": st.column_config.TextColumn(disabled=True),
+        },
+        key="assistants_attendance_editor"
+    )
+
+    out_rows = []
+    for _, row in edited.iterrows():
+        in_str = str(row.get("PUNCH IN", "")).strip()
+        out_str = str(row.get("PUNCH OUT", "")).strip()
+        in_t = safe_str_to_time_obj(in_str) if in_str else None
+        out_t = safe_str_to_time_obj(out_str) if out_str else None
+        worked_mins, status = calc_worked_minutes(in_t, out_t, now_time)
+        row["WORKED MINS"] = mins_to_hhmm(worked_mins)
+        row["STATUS"] = status
+        out_rows.append(row)
+    edited_final = pd.DataFrame(out_rows)
+
+    if st.button("💾 Save Attendance"):
+        att_df = att_df.loc[att_df["DATE"] != today_str]
+        att_df = pd.concat([att_df, edited_final.loc[:, ATTENDANCE_COLUMNS]], ignore_index=True)
+        save_attendance_sheet(excel_path, att_df)
+        st.success("Attendance saved!")
+        st.rerun()
+
+
+_df_raw, df = schedule_page("Assistants")
+
+if storage.supabase_enabled():
+    st.info("Attendance editor (sheet-based) is disabled in Supabase mode. Use the sidebar Punch widget instead.")
+    if storage.supabase_client is None:
+        st.warning("Supabase is not configured. Configure Supabase to view attendance reports.")
+    else:
+        with st.expander("Monthly Attendance Report", expanded=True):
+            month_base = runtime.now().date().replace(day=1)
+            month_options = []
+            for i in range(0, 12):
+                idx = (month_base.year * 12 + (month_base.month - 1)) - i
+                year = idx // 12
+                month = idx % 12 + 1
+                month_options.append(datetime(year, month, 1).date())
+
+            selected_month = st.selectbox(
+                "Report month",
+                options=month_options,
+                index=0,
+                format_func=lambda d: d.strftime("%Y-%m"),
+                key="attendance_report_month",
+            ) or month_base
+            next_idx = (selected_month.year * 12 + (selected_month.month - 1)) + 1
+            next_year = next_idx // 12
+            next_month = next_idx % 12 + 1
+            start_date = selected_month.isoformat()
+            end_date = (datetime(next_year, next_month, 1).date() - timedelta(days=1)).isoformat()
+            st.caption(f"Range: {start_date} to {end_date}")
+
+            records = _load_attendance_range_supabase(storage.supabase_client, start_date, end_date)
+            if not records:
+                st.info("No attendance records for selected month.")
+            else:
+                df_att = pd.DataFrame(records)
+                for col in ["date", "assistant", "punch_in", "punch_out"]:
+                    if col not in df_att.columns:
+                        df_att[col] = ""
+                df_att["date"] = df_att["date"].astype(str)
+                df_att["assistant"] = df_att["assistant"].astype(str).str.strip().str.upper()
+                df_att["punch_in"] = df_att["punch_in"].astype(str).str.strip()
+                df_att["punch_out"] = df_att["punch_out"].astype(str).str.strip()
+                df_att["STATUS"] = df_att.apply(
+                    lambda row: _attendance_status(row["punch_in"], row["punch_out"]),
+                    axis=1,
+                )
+                df_att["WORKED MINS"] = df_att.apply(
+                    lambda row: _calc_worked_minutes(row["punch_in"], row["punch_out"]),
+                    axis=1,
+                )
+                df_att["WORKED HH:MM"] = df_att["WORKED MINS"].apply(mins_to_hhmm)
+
+                assistant_options = ["All"] + sorted(
+                    [a for a in df_att["assistant"].unique().tolist() if a]
+                )
+                selected_assistant = st.selectbox(
+                    "Assistant filter",
+                    options=assistant_options,
+                    index=0,
+                    key="attendance_report_assistant",
+                )
+                if selected_assistant != "All":
+                    df_att = df_att.loc[df_att["assistant"] == selected_assistant]
+
+                if df_att.empty:
+                    st.info("No attendance records for this assistant in the selected month.")
+                else:
+                    df_summary = df_att.copy()
+                    df_summary["WORKED MINS FILLED"] = df_summary["WORKED MINS"].fillna(0).astype(int)
+                    summary = (
+                        df_summary.groupby("assistant", dropna=False)
+                        .agg(
+                            Days=("date", "nunique"),
+                            Completed=("STATUS", lambda s: (s == "COMPLETE").sum()),
+                            In_Progress=("STATUS", lambda s: (s == "IN PROGRESS").sum()),
+                            Worked_Minutes=("WORKED MINS FILLED", "sum"),
+                        )
+                        .reset_index()
+                    )
+                    summary["Worked HH:MM"] = summary["Worked_Minutes"].apply(mins_to_hhmm)
+                    summary_display = summary.rename(columns={"assistant": "ASSISTANT"})
+                    summary_display = summary_display.sort_values("ASSISTANT")
+
+                    st.markdown("**Summary**")
+                    st.dataframe(summary_display, use_container_width=True, hide_index=True)
+
+                    details = df_att.loc[
+                        :, ["date", "assistant", "punch_in", "punch_out", "STATUS", "WORKED MINS", "WORKED HH:MM"]
+                    ].copy()
+                    details = details.rename(
+                        columns={
+                            "date": "DATE",
+                            "assistant": "ASSISTANT",
+                            "punch_in": "PUNCH IN",
+                            "punch_out": "PUNCH OUT",
+                        }
+                    )
+                    details = details.sort_values(["DATE", "ASSISTANT"])
+                    st.markdown("**Details**")
+                    st.dataframe(details, use_container_width=True, hide_index=True)
+                    csv = details.to_csv(index=False)
+                    st.download_button(
+                        "Download CSV",
+                        data=csv,
+                        file_name=f"attendance_{selected_month.strftime('%Y_%m')}.csv",
+                        mime="text/csv",
+                    )
+else:
+    with st.expander("🕒 Assistants Attendance", expanded=False):
+        try:
+            render_assistant_attendance_tab(df, file_path)
+        except Exception as e:
+            st.error(f"Unable to load attendance editor: {e}")
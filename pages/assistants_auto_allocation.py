@@ -0,0 +1,150 @@
+"""Assistants › Auto Allocation: single-appointment recommendations, the heatmap and whole-day fill."""
+
+import time as time_module
+from datetime import time as time_type
+
+import pandas as pd
+import streamlit as st
+
+from allocation import (
+    DAY_MINUTES,
+    _get_compiled_allocation_rules,
+    allocate_whole_day,
+    auto_allocate_assistants,
+    get_available_assistants,
+    get_free_assistants_between,
+    get_largest_free_gap,
+    get_next_busy_minute,
+)
+from layout import schedule_page
+from staff import _get_all_assistants, _get_all_doctors, _get_global_allocation_config, get_department_for_doctor
+from status import _get_dashboard_free_set
+from storage import _maybe_save
+from ui import render_availability_heatmap
+from utils import mins_to_hhmm
+
+df_raw, df = schedule_page("Assistants")
+
+rule_issues = _get_compiled_allocation_rules().get("issues", [])
+if rule_issues:
+    with st.expander(f"⚠️ allocation_rules.json: {len(rule_issues)} unknown staff reference(s)", expanded=False):
+        for issue in rule_issues:
+            st.caption(issue)
+with st.expander("🔄 Automatic Assistant Allocation", expanded=False):
+    st.caption("Automatically assign assistants based on department, doctor, and availability")
+
+    col_doc, col_in, col_out = st.columns(3)
+
+    with col_doc:
+        alloc_doctor = st.selectbox(
+            "Select Doctor",
+            options=[""] + _get_all_doctors(),
+            key="alloc_doctor_select"
+        )
+
+    with col_in:
+        alloc_in_time = st.time_input("Appointment Start", value=time_type(9, 0), key="alloc_in_time")
+
+    with col_out:
+        alloc_out_time = st.time_input("Appointment End", value=time_type(10, 0), key="alloc_out_time")
+
+    if alloc_doctor:
+        dept = get_department_for_doctor(alloc_doctor)
+        st.info(f"Department: **{dept}**")
+
+        # Get available assistants
+        free_now_set, free_status_map = _get_dashboard_free_set(df, _get_all_assistants())
+        available = get_available_assistants(
+            dept,
+            alloc_in_time,
+            alloc_out_time,
+            df,
+            free_now_set=free_now_set,
+            free_status_map=free_status_map,
+        )
+
+        st.markdown("**Assistant Availability:**")
+        for a in available:
+            if a["available"]:
+                st.success(f"✅ {a['name']} - Available")
+            else:
+                st.error(f"❌ {a['name']} - {a['reason']}")
+
+        # Auto-allocate button
+        if st.button("🎯 Get Recommended Allocation", key="auto_alloc_btn"):
+            allocation = auto_allocate_assistants(alloc_doctor, alloc_in_time, alloc_out_time, df)
+
+            if any(allocation.values()):
+                st.success("**Recommended Allocation:**")
+                if allocation["FIRST"]:
+                    st.write(f"• **FIRST**: {allocation['FIRST']}")
+                if allocation["SECOND"]:
+                    st.write(f"• **SECOND**: {allocation['SECOND']}")
+                if allocation["Third"]:
+                    st.write(f"• **Third**: {allocation['Third']}")
+            else:
+                st.warning("No available assistants found for this time slot in the department.")
+    else:
+        st.caption("Select a doctor to see department-specific assistant availability")
+
+    st.markdown("**Team free window:**")
+    free_in_window = set(get_free_assistants_between(df, alloc_in_time, alloc_out_time))
+    window_rows = []
+    for assistant in _get_all_assistants():
+        name = str(assistant).strip().upper()
+        next_busy = get_next_busy_minute(name, df)
+        gap_start, gap_len = get_largest_free_gap(name, df)
+        window_rows.append({
+            "Assistant": assistant,
+            "Free in window": "✅" if name in free_in_window else "❌",
+            "Next busy": mins_to_hhmm(next_busy % DAY_MINUTES) if next_busy is not None else "—",
+            "Longest free gap": (
+                f"{mins_to_hhmm(gap_start % DAY_MINUTES)} ({gap_len} min)" if gap_start is not None else "—"
+            ),
+        })
+    if window_rows:
+        st.dataframe(pd.DataFrame(window_rows), use_container_width=True, hide_index=True)
+    else:
+        st.caption("No assistants configured.")
+
+with st.expander("🟩 Team Availability Heatmap", expanded=False):
+    render_availability_heatmap(df)
+
+with st.expander("🗓️ Fill Whole Day", expanded=False):
+    st.caption("Fill every open FIRST/SECOND/Third slot for today in one pass, in appointment time order.")
+    fill_only_empty = bool(st.session_state.get("auto_assign_only_empty", True))
+    st.caption(f"Mode: {'only empty slots' if fill_only_empty else 'refill all slots'} (sidebar Auto-Allotment setting)")
+    fill_modes = {"Rule order (greedy)": "greedy", "Best fit (solver)": "solver"}
+    default_mode = _get_global_allocation_config().get("allocation_mode", "greedy")
+    fill_mode_label = st.radio(
+        "Method",
+        list(fill_modes),
+        index=list(fill_modes.values()).index(default_mode),
+        horizontal=True,
+        key="fill_whole_day_mode",
+        help="Best fit solves each group of overlapping appointments together and only fills empty slots; it uses rule order when refilling all slots, or if the next group would run past the configured budget.",
+    )
+    if st.button("🗓️ Fill whole day", key="fill_whole_day_btn", use_container_width=True):
+        started = time_module.perf_counter()
+        df_filled, fill_changes = allocate_whole_day(
+            df_raw,
+            only_fill_empty=fill_only_empty,
+            mode=fill_modes[fill_mode_label],
+        )
+        elapsed_ms = (time_module.perf_counter() - started) * 1000
+        st.session_state.fill_whole_day_summary = {"changes": fill_changes, "elapsed_ms": elapsed_ms}
+        if fill_changes:
+            _maybe_save(df_filled, message=f"Filled {len(fill_changes)} assistant slots")
+            st.rerun()
+    fill_summary = st.session_state.get("fill_whole_day_summary")
+    if fill_summary:
+        fill_changes = fill_summary.get("changes", [])
+        if fill_changes:
+            st.success(f"Filled {len(fill_changes)} slots in {fill_summary.get('elapsed_ms', 0):.0f} ms")
+            st.dataframe(
+                pd.DataFrame(fill_changes)[["patient", "role", "old", "new"]],
+                use_container_width=True,
+                hide_index=True,
+            )
+        else:
+            st.info(f"Nothing to fill ({fill_summary.get('elapsed_ms', 0):.0f} ms).")
@@ -0,0 +1,191 @@
+"""Assistants › Availability: live assistant cards and status counts."""
+
+from typing import Any
+
+import pandas as pd
+import streamlit as st
+
+from layout import schedule_page
+from staff import _get_all_assistants, get_assistants_for_department, get_department_for_assistant
+from status import get_availability_snapshot
+from storage import get_assistants_list
+from ui import LIVE_CARDS_REFRESH, _render_assistant_cards, live_fragment
+
+
+@live_fragment(run_every=LIVE_CARDS_REFRESH)
+def render_assistant_availability_dashboard(availability_df: pd.DataFrame) -> None:
+    """Assistant cards and status counts; ticks on its own so only the cards rerun."""
+    assistants_for_view = get_assistants_list(availability_df)
+    if not assistants_for_view:
+        assistants_for_view = _get_all_assistants()
+    # Get current status of all assistants (shared, versioned snapshot)
+    assistant_status = get_availability_snapshot(availability_df, assistants_for_view)["status_map"]
+    
+    def _norm_status_value(value: Any) -> str:
+        try:
+            s = str(value or "").strip().upper()
+        except Exception:
+            s = ""
+        return s if s else "UNKNOWN"
+    
+    assistant_entries: list[dict] = []
+    for assistant in assistants_for_view:
+        raw_name = assistant.strip().upper()
+        info = dict(assistant_status.get(raw_name, {}))
+        if not info:
+            info = {"status": "UNKNOWN", "reason": "No schedule"}
+        if not info.get("department"):
+            info["department"] = get_department_for_assistant(raw_name)
+        if not info.get("status"):
+            info["status"] = "UNKNOWN"
+        assistant_entries.append({
+            "name": assistant.title(),
+            "raw_name": raw_name,
+            "info": info,
+        })
+    
+    assistant_lookup = {entry["raw_name"]: entry for entry in assistant_entries}
+    
+    # Create tabs for each department
+    dept_tabs = st.tabs(["📊 All Assistants", "🦷 PROSTHO Department", "🔬 ENDO Department"])
+    
+    with dept_tabs[0]:
+    
+        # Calculate numbers before rendering HTML
+        total_count = len(assistant_entries)
+        # Normalize status and include alternate status values for busy and blocked
+        def is_free(status):
+            return status in ["FREE"]
+        def is_busy(status):
+            return status in ["BUSY", "ON GOING", "ARRIVED"]
+        def is_blocked(status):
+            return status in ["BLOCKED", "CANCELLED", "SHIFTED"]
+    
+        free_count = sum(1 for entry in assistant_entries if is_free(_norm_status_value(entry["info"].get("status"))))
+        busy_count = sum(1 for entry in assistant_entries if is_busy(_norm_status_value(entry["info"].get("status"))))
+        blocked_count = sum(1 for entry in assistant_entries if is_blocked(_norm_status_value(entry["info"].get("status"))))
+    
+        st.markdown(f"""
+        <div style='display: flex; align-items: center; gap: 1.5rem; margin-bottom: 1.2rem;'>
+            <div style='background: var(--glass-bg, #f8fafc); border: 1.5px solid var(--glass-border, #3b82f6); border-radius: 1.2rem; padding: 1.2rem 2.2rem; box-shadow: 0 2px 8px rgba(20, 17, 15, 0.04); min-width: 220px;'>
+                <div style='font-size: 2.2rem; font-weight: 700; color: var(--text-primary, #1e293b); margin-bottom: 0.2rem;'>Overview</div>
+                <div style='font-size: 1.1rem; color: var(--text-secondary, #64748b);'>Current Assistant Status</div>
+            </div>
+            <div style='display: flex; gap: 1.2rem;'>
+                <div style='background: rgba(52, 49, 45, 0.15); border-radius: 0.8rem; padding: 0.8rem 1.4rem; text-align: center;'>
+                    <div style='font-size: 1.6rem; font-weight: 600; color: #2563eb;'>{free_count}</div>
+                    <div style='font-size: 1rem; color: #2563eb;'>🟢 Free</div>
+                </div>
+                <div style='background: rgba(126, 127, 131, 0.18); border-radius: 0.8rem; padding: 0.8rem 1.4rem; text-align: center;'>
+                    <div style='font-size: 1.6rem; font-weight: 600; color: #64748b;'>{busy_count}</div>
+                    <div style='font-size: 1rem; color: #64748b;'>🔴 Busy</div>
+                </div>
+                <div style='background: rgba(20, 17, 15, 0.12); border-radius: 0.8rem; padding: 0.8rem 1.4rem; text-align: center;'>
+                    <div style='font-size: 1.6rem; font-weight: 600; color: #1e293b;'>{blocked_count}</div>
+                    <div style='font-size: 1rem; color: #1e293b;'>🚫 Blocked</div>
+                </div>
+                <div style='background: rgba(217, 197, 178, 0.35); border-radius: 0.8rem; padding: 0.8rem 1.4rem; text-align: center;'>
+                    <div style='font-size: 1.6rem; font-weight: 600; color: #2563eb;'>{total_count}</div>
+                    <div style='font-size: 1rem; color: #2563eb;'>Total</div>
+                </div>
+            </div>
+        </div>
+        """, unsafe_allow_html=True)
+    
+        st.markdown("#### Filter Assistants")
+        status_label_map = {
+            "FREE": "🟢 Free",
+            "BUSY": "🔴 Busy",
+            "BLOCKED": "🚫 Blocked",
+            "UNKNOWN": "❔ Unknown",
+        }
+        filter_options = list(status_label_map.keys())
+        default_filter = [opt for opt in filter_options if opt != "UNKNOWN"]
+        
+        # Initialize session state for filter if not set
+        if "assistant_status_filter" not in st.session_state:
+            st.session_state.assistant_status_filter = default_filter
+        
+        selected_statuses = st.multiselect(
+            "Show statuses",
+            options=filter_options,
+            format_func=lambda x: status_label_map.get(x) or str(x).title(),
+            key="assistant_status_filter",
+        )
+        st.caption("💡 Use the filter to focus on assistants who are free, busy, or currently blocked.")
+    
+        if selected_statuses:
+            filtered_entries = [entry for entry in assistant_entries if _norm_status_value(entry["info"].get("status")) in selected_statuses]
+        else:
+            filtered_entries = assistant_entries
+    
+        if filtered_entries:
+            st.markdown(f"#### Showing {len(filtered_entries)} Assistant{'s' if len(filtered_entries) != 1 else ''}")
+            _render_assistant_cards(filtered_entries, key_prefix="all")
+        else:
+            st.info("No assistants match the selected filters.")
+    
+    with dept_tabs[1]:
+        st.markdown("#### PROSTHO Department Assistants")
+        prostho_entries: list[dict] = []
+        for assistant in get_assistants_for_department("PROSTHO"):
+            entry = assistant_lookup.get(assistant.upper())
+            if entry is None:
+                fallback_info = {
+                    "status": "UNKNOWN",
+                    "reason": "No schedule",
+                    "department": "PROSTHO",
+                }
+                entry = {"name": assistant.title(), "raw_name": assistant.upper(), "info": fallback_info}
+            prostho_entries.append(entry)
+    
+        prostho_counts: dict[str, int] = {}
+        for entry in prostho_entries:
+            status_key = _norm_status_value(entry["info"].get("status"))
+            prostho_counts[status_key] = prostho_counts.get(status_key, 0) + 1
+        
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            st.metric("🟢 Free", prostho_counts.get('FREE', 0))
+        with col2:
+            st.metric("🔴 Busy", prostho_counts.get('BUSY', 0))
+        with col3:
+            st.metric("🚫 Blocked", prostho_counts.get('BLOCKED', 0))
+        
+        _render_assistant_cards(prostho_entries, key_prefix="prostho")
+    
+    with dept_tabs[2]:
+        st.markdown("#### ENDO Department Assistants")
+        endo_entries: list[dict] = []
+        for assistant in get_assistants_for_department("ENDO"):
+            entry = assistant_lookup.get(assistant.upper())
+            if entry is None:
+                fallback_info = {
+                    "status": "UNKNOWN",
+                    "reason": "No schedule",
+                    "department": "ENDO",
+                }
+                entry = {"name": assistant.title(), "raw_name": assistant.upper(), "info": fallback_info}
+            endo_entries.append(entry)
+    
+        endo_counts: dict[str, int] = {}
+        for entry in endo_entries:
+            status_key = _norm_status_value(entry["info"].get("status"))
+            endo_counts[status_key] = endo_counts.get(status_key, 0) + 1
+        
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            st.metric("🟢 Free", endo_counts.get('FREE', 0))
+        with col2:
+            st.metric("🔴 Busy", endo_counts.get('BUSY', 0))
+        with col3:
+            st.metric("🚫 Blocked", endo_counts.get('BLOCKED', 0))
+        
+        _render_assistant_cards(endo_entries, key_prefix="endo")
+
+
+_df_raw, df = schedule_page("Assistants")
+st.markdown("### 👥 Assistant Availability Dashboard")
+st.markdown("---")
+
+render_assistant_availability_dashboard(df)
@@ -0,0 +1,8 @@
+"""Assistants › Manage Profiles."""
+
+from layout import plain_page
+from staff import PROFILE_ASSISTANT_SHEET
+from ui import render_profile_manager
+
+plain_page()
+render_profile_manager(PROFILE_ASSISTANT_SHEET, "Assistant", "Department")
@@ -0,0 +1,63 @@
+"""Assistants › Workload: minutes-weighted workload and hourly busy minutes."""
+
+import streamlit as st
+
+import runtime
+from allocation import get_workload_report
+from layout import schedule_page
+from staff import _get_all_assistants, get_department_for_assistant
+
+_df_raw, df = schedule_page("Assistants")
+
+st.markdown("### 📊 Assistant Workload Summary")
+
+# Minutes-weighted workload (cached per schedule version, utilization per minute)
+workload = get_workload_report(df, _get_all_assistants(), runtime.current_minute())
+summary = workload["summary"].copy()
+if summary.empty:
+    st.info("No assistants or appointments to report.")
+else:
+    summary.insert(1, "Department", summary["Assistant"].map(get_department_for_assistant))
+    summary = summary.sort_values(
+        ["Chairside Minutes", "Appointments"], ascending=False, kind="stable"
+    ).reset_index(drop=True)
+    st.dataframe(
+        summary,
+        use_container_width=True,
+        hide_index=True,
+        column_config={
+            "Utilization %": st.column_config.ProgressColumn(
+                "Utilization %",
+                help="Busy time inside the punch window / punched-in time",
+                format="%.1f%%",
+                min_value=0,
+                max_value=100,
+            ),
+        },
+    )
+
+    hourly = workload["hourly"]
+    st.markdown("#### ⏱️ Busy Minutes by Hour")
+    st.bar_chart(hourly.sum(axis=0).rename("Busy minutes (team)"))
+    with st.expander("Per-assistant hourly breakdown", expanded=False):
+        st.dataframe(hourly.loc[summary["Assistant"]], use_container_width=True)
+
+    export_cols = st.columns(2)
+    with export_cols[0]:
+        st.download_button(
+            "⬇️ Export summary (CSV)",
+            data=summary.to_csv(index=False).encode("utf-8"),
+            file_name=f"workload_summary_{runtime.now().date().isoformat()}.csv",
+            mime="text/csv",
+            key="workload_export_summary",
+            use_container_width=True,
+        )
+    with export_cols[1]:
+        st.download_button(
+            "⬇️ Export hourly (CSV)",
+            data=hourly.to_csv().encode("utf-8"),
+            file_name=f"workload_hourly_{runtime.now().date().isoformat()}.csv",
+            mime="text/csv",
+            key="workload_export_hourly",
+            use_container_width=True,
+        )
@@ -0,0 +1,8 @@
+"""Doctors › Manage Profiles."""
+
+from layout import plain_page
+from staff import PROFILE_DOCTOR_SHEET
+from ui import render_profile_manager
+
+plain_page()
+render_profile_manager(PROFILE_DOCTOR_SHEET, "Doctor", "Department")
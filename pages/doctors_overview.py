@@ -0,0 +1,74 @@
+"""Doctors › Overview: weekly offs today and tomorrow, one card per doctor."""
+
+import streamlit as st
+
+import runtime
+from layout import plain_page
+from staff import PROFILE_DOCTOR_SHEET
+from storage import load_profiles
+from ui import _render_assistant_cards
+from utils import _parse_weekly_off_days
+
+
+def render_doctor_overview() -> None:
+    st.markdown("### 🩺 Doctors Overview")
+    today_idx = runtime.now().weekday()
+    tomorrow_idx = (today_idx + 1) % 7
+    weekday_names = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"]
+    doctors_df = load_profiles(PROFILE_DOCTOR_SHEET)
+    doctors_df["status"] = doctors_df["status"].astype(str).str.upper() if "status" in doctors_df.columns else "ACTIVE"
+    total = len(doctors_df)
+    active = (doctors_df["status"] == "ACTIVE").sum() if not doctors_df.empty else 0
+
+    def _off_list(idx):
+        if "weekly_off" not in doctors_df.columns:
+            return []
+        offs = []
+        for _, row in doctors_df.iterrows():
+            days = _parse_weekly_off_days(row.get("weekly_off", ""))
+            if idx in days:
+                offs.append(str(row.get("name", "")).strip().upper())
+        return offs
+
+    today_off = _off_list(today_idx)
+    tomorrow_off = _off_list(tomorrow_idx)
+
+    c1, c2, c3, c4 = st.columns(4)
+    c1.metric("Total Doctors", total)
+    c2.metric("Active", active)
+    c3.metric(f"Off Today ({weekday_names[today_idx]})", len(today_off))
+    c4.metric(f"Off Tomorrow ({weekday_names[tomorrow_idx]})", len(tomorrow_off))
+
+    st.markdown("#### Today's Off Doctors")
+    if today_off:
+        st.warning(", ".join(sorted(today_off)))
+    else:
+        st.success("All doctors available today.")
+
+    st.markdown("#### Tomorrow's Off Doctors")
+    if tomorrow_off:
+        st.info(", ".join(sorted(tomorrow_off)))
+    else:
+        st.success("All doctors available tomorrow.")
+
+    # Card view
+    st.markdown("#### Cards")
+    entries = []
+    for _, r in doctors_df.iterrows():
+        name = str(r.get("name", "")).title()
+        dept = str(r.get("department", "")).title()
+        wo_days = _parse_weekly_off_days(r.get("weekly_off", ""))
+        status = "BLOCKED" if today_idx in wo_days else "FREE"
+        entries.append({
+            "name": name,
+            "info": {
+                "status": status,
+                "reason": f"Weekly off {weekday_names[today_idx]}" if today_idx in wo_days else "Available",
+                "department": dept or "N/A",
+            }
+        })
+    _render_assistant_cards(entries)
+
+
+plain_page()
+render_doctor_overview()
@@ -0,0 +1,7 @@
+"""Doctors › Per-Doctor Schedule: procedures per doctor."""
+
+from layout import schedule_page
+from ui import render_doctor_summary
+
+_df_raw, df = schedule_page("Doctors")
+render_doctor_summary(df)
@@ -0,0 +1,11 @@
+"""Scheduling › Full Schedule."""
+
+from layout import schedule_page
+from scheduling import render_full_schedule, with_blank_row
+from ui import render_doctor_summary
+
+df_raw, df = schedule_page("Scheduling")
+# The editors end with a blank entry row; saves from both editors include it.
+df_raw = with_blank_row(df_raw)
+render_full_schedule(df_raw, df)
+render_doctor_summary(df)
@@ -0,0 +1,142 @@
+"""Per-run context shared by the allocation engine modules.
+
+staff.py, status.py and allocation.py never import Streamlit-bound storage or
+read the wall clock directly; they go through this module instead:
+
+- session_state() is st.session_state inside the app and a plain SessionDict
+  while a Sources override is active (the simulator, scripts).
+- now() is the clock captured at the start of the run (refresh_clock), so
+  every function in one rerun sees the same minute.
+- punch_map(), load_profiles() and load_duty_runs() are provided by storage.py
+  through register_storage(); without a registration (and no override) they
+  raise instead of silently returning empty data.
+"""
+
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Iterator, MutableMapping, Optional
+
+import pandas as pd
+
+from utils import now_ist
+
+
+class SessionDict(dict):
+    """dict with attribute access, enough to stand in for st.session_state."""
+
+    def __getattr__(self, name: str) -> Any:
+        try:
+            return self[name]
+        except KeyError as exc:
+            raise AttributeError(name) from exc
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        self[name] = value
+
+    def __delattr__(self, name: str) -> None:
+        self.pop(name, None)
+
+
+@dataclass
+class Sources:
+    """Stand-ins for the session, clock and storage while replaying outside the app."""
+
+    session_state: MutableMapping[str, Any] = field(default_factory=SessionDict)
+    now: Optional[datetime] = None
+    punch_map: Optional[Callable[[], dict]] = None
+    load_profiles: Optional[Callable[[str, int], pd.DataFrame]] = None
+    load_duty_runs: Optional[Callable[[], pd.DataFrame]] = None
+    rules_path: Optional[Path] = None
+
+
+_SOURCES: ContextVar[Optional[Sources]] = ContextVar("tdb_sources", default=None)
+_CLOCK: ContextVar[Optional[datetime]] = ContextVar("tdb_clock", default=None)
+_STORAGE: dict[str, Callable[..., Any]] = {}
+
+
+class MissingSourceError(RuntimeError):
+    """A storage-backed source was read with nothing registered to provide it."""
+
+
+@contextmanager
+def use_sources(sources: Sources) -> Iterator[Sources]:
+    token = _SOURCES.set(sources)
+    try:
+        yield sources
+    finally:
+        _SOURCES.reset(token)
+
+
+def session_state() -> Any:
+    sources = _SOURCES.get()
+    if sources is not None:
+        return sources.session_state
+    import streamlit as st
+
+    return st.session_state
+
+
+def refresh_clock() -> datetime:
+    """Capture the wall clock for this run (script start and each fragment rerun)."""
+    current = now_ist()
+    _CLOCK.set(current)
+    return current
+
+
+def now() -> datetime:
+    sources = _SOURCES.get()
+    if sources is not None and sources.now is not None:
+        return sources.now
+    current = _CLOCK.get()
+    return current if current is not None else now_ist()
+
+
+def now_epoch() -> int:
+    return int(now().timestamp())
+
+
+def current_minute() -> int:
+    current = now()
+    return current.hour * 60 + current.minute
+
+
+def register_storage(
+    punch_map: Callable[[], dict],
+    load_profiles: Callable[[str, int], pd.DataFrame],
+    load_duty_runs: Callable[[], pd.DataFrame],
+) -> None:
+    _STORAGE.update(punch_map=punch_map, load_profiles=load_profiles, load_duty_runs=load_duty_runs)
+
+
+def _provider(name: str) -> Callable[..., Any]:
+    sources = _SOURCES.get()
+    if sources is not None:
+        override = getattr(sources, name)
+        if override is not None:
+            return override
+    provider = _STORAGE.get(name)
+    if provider is None:
+        raise MissingSourceError(f"No {name} source: import storage or run inside runtime.use_sources().")
+    return provider
+
+
+def punch_map() -> dict:
+    return _provider("punch_map")()
+
+
+def load_profiles(sheet_name: str, cache_bust: int) -> pd.DataFrame:
+    return _provider("load_profiles")(sheet_name, cache_bust)
+
+
+def load_duty_runs() -> pd.DataFrame:
+    return _provider("load_duty_runs")()
+
+
+def rules_path(default: Path) -> Path:
+    sources = _SOURCES.get()
+    if sources is not None and sources.rules_path is not None:
+        return Path(sources.rules_path)
+    return default
@@ -0,0 +1,2238 @@
+# pyright: reportMissingImports=false, reportMissingModuleSource=false, reportUnknownVariableType=false, reportUnknownArgumentType=false, reportUnknownParameterType=false, reportUnknownMemberType=false, reportGeneralTypeIssues=false
+"""Scheduling views: the Full Schedule card grid / table editor and the per-OP editors."""
+
+import html
+import time as time_module
+import uuid
+from datetime import datetime, time as time_type
+from typing import Any, Optional, cast
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+from pandas import DataFrame
+
+import runtime
+from allocation import DAY_MINUTES, _auto_fill_assistants_for_row, find_schedule_conflicts
+from staff import _get_all_assistants, _get_all_doctors
+from status import (
+    STATUS_BASE_OPTIONS,
+    _append_status_log,
+    _schedule_cache_key,
+    _tick_cached,
+    get_availability_snapshot,
+    invalidate_availability,
+)
+from storage import _maybe_save
+from ui import _record_rerun_cost
+from utils import (
+    IST,
+    TIME_PICKER_AMPM,
+    TIME_PICKER_HOURS,
+    TIME_PICKER_MINUTES,
+    _coerce_to_time_obj,
+    _frame_fingerprint,
+    _norm_cell,
+    _now_iso,
+    _now_ist_str,
+    _time_from_picker_parts,
+    _time_to_picker_parts,
+    _unique_preserve_order,
+    mins_to_hhmm,
+    time_to_minutes,
+)
+
+
+# ================ SCHEDULE CARD GRID ================
+# Cards are one HTML block per page; a single shared action bar replaces the
+# per-card checkbox/buttons/expander, so widget count no longer grows with
+# the number of patients. Card bodies are memoized in the session by field
+# fingerprint (status bucket first), keeping only the last page of each grid,
+# so unchanged cards cost a dict lookup. Render time and payload size of the last grid are
+# kept in st.session_state.rerun_costs ("card_grid" ms, "card_grid_kb").
+CARD_GRID_PAGE_SIZE = 12
+CARD_GRID_WINDOWS: dict[str, Optional[tuple[int, int]]] = {
+    "All day": None,
+    "Around now (-1h / +2h)": (-60, 120),
+    "Morning (before 1 PM)": (0, 13 * 60),
+    "Afternoon (1-5 PM)": (13 * 60, 17 * 60),
+    "Evening (after 5 PM)": (17 * 60, 24 * 60),
+}
+
+# Icons are defined once per grid as <symbol>s and referenced with <use>.
+_CARD_ICON_SPRITE = (
+    '<svg width="0" height="0" style="position:absolute" aria-hidden="true">'
+    '<symbol id="tdb-icon-doctor" viewBox="0 0 24 24"><path d="M19 8h-1.26c-.19-.73-.48-1.42-.85-2.06l.94-.94a.996.996 0 0 0 0-1.41l-1.41-1.41a.996.996 0 0 0-1.41 0l-.94.94c-.64-.37-1.33-.66-2.06-.85V1c0-.55-.45-1-1-1H9c-.55 0-1 .45-1 1v1.26c-.73.19-1.42.48-2.06.85l-.94-.94a.996.996 0 0 0-1.41 0L2.18 3.58a.996.996 0 0 0 0 1.41l.94.94c-.37.64-.66 1.33-.85 2.06H1c-.55 0-1 .45-1 1v2c0 .55.45 1 1 1h1.26c.19.73.48 1.42.85 2.06l-.94.94a.996.996 0 0 0 0 1.41l1.41 1.41c.39.39 1.02.39 1.41 0l.94-.94c.64.37 1.33.66 2.06.85V23c0 .55.45 1 1 1h2c.55 0 1-.45 1-1v-1.26c.73-.19 1.42-.48 2.06-.85l.94.94c.39.39 1.02.39 1.41 0l1.41-1.41a.996.996 0 0 0 0-1.41l-.94-.94c.37-.64.66-1.33.85-2.06H19c.55 0 1-.45 1-1V9c0-.55-.45-1-1-1zm-8 8c-1.66 0-3-1.34-3-3s1.34-3 3-3 3 1.34 3 3-1.34 3-3 3z" fill="currentColor"/></symbol>'
+    '<symbol id="tdb-icon-staff" viewBox="0 0 24 24"><path d="M16 11c1.66 0 2.99-1.34 2.99-3S17.66 5 16 5c-1.66 0-3 1.34-3 3s1.34 3 3 3zm-8 0c1.66 0 2.99-1.34 2.99-3S9.66 5 8 5C6.34 5 5 6.34 5 8s1.34 3 3 3zm0 2c-2.33 0-7 1.17-7 3.5V19h14v-2.5c0-2.33-4.67-3.5-7-3.5zm8 0c-.29 0-.62.02-.97.05 1.16.84 1.97 1.97 1.97 3.45V19h6v-2.5c0-2.33-4.67-3.5-7-3.5z" fill="currentColor"/></symbol>'
+    '</svg>'
+)
+_CARD_DOCTOR_ICON_SVG = '<svg class="info-icon-svg" width="20" height="20"><use href="#tdb-icon-doctor"/></svg>'
+_CARD_STAFF_ICON_SVG = '<svg class="info-icon-svg" width="20" height="20"><use href="#tdb-icon-staff"/></svg>'
+
+_CARD_GRID_CSS = """
+<style>
+.card-grid {display:grid; grid-template-columns:repeat(auto-fill, minmax(280px, 1fr)); gap:16px; margin:8px 0 14px;}
+.card-grid-item {background:linear-gradient(180deg, #ffffff 0%, #f2f4f7 100%); border:1px solid #e3e6ec; border-radius:24px; box-shadow:0 22px 44px rgba(24, 28, 36, 0.18); overflow:hidden; padding:0 20px 16px 20px; display:flex; flex-direction:column;}
+.card-grid-item.selected {border-color:#2f63e8; box-shadow:0 0 0 2px rgba(47,99,232,0.35), 0 22px 44px rgba(24, 28, 36, 0.18);}
+.card-grid-item .card-status-banner {margin:0 -20px 14px -20px;}
+.card-grid-item .card-status-banner .card-qtraq {margin-left:auto; font-size:11px; letter-spacing:0.4px; padding:2px 8px; border-radius:999px; background:rgba(255,255,255,0.7);}
+.card-grid-item details {border:1px solid #d9dde3; border-radius:12px; background:#f7f8fa; margin-top:6px; font-size:13px;}
+.card-grid-item summary {padding:8px 12px; font-weight:600; color:#60656c; cursor:pointer;}
+.card-grid-item details > div {padding:0 12px 10px; color:#2f333a; line-height:1.6;}
+</style>
+"""
+
+
+def _filter_cards_by_window(cards: list[dict[str, Any]], window: str, now_min: int) -> list[dict[str, Any]]:
+    bounds = CARD_GRID_WINDOWS.get(window)
+    if bounds is None:
+        return cards
+    lo, hi = bounds
+    if window.startswith("Around now"):
+        lo, hi = now_min + lo, now_min + hi
+    return [c for c in cards if c.get("in_min") is not None and lo <= int(c["in_min"]) < hi]
+
+
+def _schedule_card_fingerprint(card: dict[str, Any]) -> tuple:
+    return (
+        card.get("status_class", "waiting"),
+        card.get("status_text", ""),
+        card.get("status", ""),
+        card.get("patient", ""),
+        card.get("initials", ""),
+        card.get("time_text", ""),
+        card.get("doctor", ""),
+        card.get("procedure", ""),
+        tuple(card.get("staff", ())),
+        card.get("op", ""),
+        bool(card.get("case_paper")),
+        tuple(card.get("conflicts", ())),
+    )
+
+
+def _build_schedule_card_html(card: dict[str, Any]) -> str:
+    patient = card.get("patient", "")
+    status_text = card.get("status_text", "WAITING")
+    staff = card.get("staff", [])
+    staff_html = " &bull; ".join(html.escape(name) for name in staff) if staff else "Unassigned"
+    doctor = card.get("doctor", "")
+    doctor_line = (
+        f"<div class='info-row'><span class='info-icon doctor-icon'>{_CARD_DOCTOR_ICON_SVG}</span><span class='info-text'>{html.escape(doctor)}</span></div>"
+        if doctor
+        else ""
+    )
+    staff_line = f"<div class='info-row'><span class='info-icon staff-icon'>{_CARD_STAFF_ICON_SVG}</span><span class='info-text'>{staff_html}</span></div>"
+    conflicts = card.get("conflicts", ())
+    conflict_line = (
+        "<div class='card-conflict'>⚠️ " + "<br>⚠️ ".join(html.escape(m) for m in conflicts) + "</div>"
+        if conflicts
+        else ""
+    )
+    qtraq_badge = "<span class='card-qtraq'>QTRAQ</span>" if card.get("case_paper") else ""
+    details = [
+        f"<b>Doctor:</b> {html.escape(doctor) or '--'}",
+        f"<b>Procedure:</b> {html.escape(card.get('procedure', '')) or '--'}",
+        f"<b>Staff:</b> {html.escape(', '.join(staff)) if staff else 'Unassigned'}",
+        f"<b>Status:</b> {html.escape(card.get('status', '') or status_text)}",
+    ]
+    if card.get("op"):
+        details.append(f"<b>OP:</b> {html.escape(card['op'])}")
+    return (
+        f"<div class='card-status-banner {card.get('status_class', 'waiting')}'><span class='status-dot'></span>"
+        f"<span class='status-text'>{html.escape(status_text)}</span>{qtraq_badge}</div>"
+        f"<div class='card-head'><div class='card-avatar'>{html.escape(card.get('initials', '--'))}</div>"
+        f"<div class='card-title'><div class='card-name'>{html.escape(patient) if patient else 'Unknown'}</div>"
+        f"<div class='card-time'>{html.escape(card.get('time_text', '')) or '--'}</div></div></div>"
+        f"<div class='card-subdivider'></div><div class='card-info'>{doctor_line}{staff_line}</div>{conflict_line}"
+        f"<details><summary>View Details</summary><div>{'<br>'.join(details)}</div></details>"
+    )
+
+
+def _card_grid_html(cards: list[dict[str, Any]], selected_key: str = "", memo_key: str = "") -> str:
+    """One HTML block for a page of schedule cards (no widgets); unchanged cards are a cache hit.
+
+    memo_key names the session slot holding this grid's fingerprint -> HTML memo (no memo when empty).
+    """
+    previous = st.session_state.get(memo_key, {}) if memo_key else {}
+    memo: dict[tuple, str] = {}
+    parts = [_CARD_GRID_CSS, _CARD_ICON_SPRITE, '<div class="card-grid">']
+    for card in cards:
+        fingerprint = _schedule_card_fingerprint(card)
+        fragment = memo.get(fingerprint) or previous.get(fingerprint)
+        if fragment is None:
+            fragment = _build_schedule_card_html(card)
+        memo[fingerprint] = fragment
+        selected_cls = " selected" if selected_key and card.get("key") == selected_key else ""
+        parts.append(f"<div class='card-grid-item{selected_cls}'>{fragment}</div>")
+    parts.append("</div>")
+    if memo_key:
+        st.session_state[memo_key] = memo
+    return "".join(parts)
+
+
+def render_schedule_card_grid(
+    cards: list[dict[str, Any]],
+    key: str,
+    show_case: bool = True,
+) -> Optional[tuple[str, dict[str, Any]]]:
+    """Paginated, time-windowed card grid with one shared action bar.
+
+    cards carry display fields plus "key", "in_min", "row_id" and "context";
+    returns (action, card) when Done/Edit/Cancel/QTRAQ is clicked, else None.
+    """
+    ctrl_cols = st.columns([0.4, 0.2, 0.4], gap="small")
+    with ctrl_cols[0]:
+        window = st.selectbox("Time window", list(CARD_GRID_WINDOWS), key=f"{key}_window")
+    visible = _filter_cards_by_window(cards, window, runtime.current_minute())
+    pages = max(1, (len(visible) + CARD_GRID_PAGE_SIZE - 1) // CARD_GRID_PAGE_SIZE)
+    page_key = f"{key}_page"
+    if int(st.session_state.get(page_key, 1) or 1) > pages:
+        st.session_state[page_key] = 1
+    with ctrl_cols[1]:
+        page = int(st.number_input("Page", min_value=1, max_value=pages, step=1, key=page_key))
+    page_cards = visible[(page - 1) * CARD_GRID_PAGE_SIZE: page * CARD_GRID_PAGE_SIZE]
+    with ctrl_cols[2]:
+        if page_cards:
+            first = (page - 1) * CARD_GRID_PAGE_SIZE + 1
+            st.caption(f"Showing {first}-{first + len(page_cards) - 1} of {len(visible)} ({len(cards)} today)")
+
+    if not page_cards:
+        st.info("No patients in this time window.")
+        return None
+
+    card_by_key = {card["key"]: card for card in page_cards}
+    action_cols = st.columns([0.4, 0.15, 0.15, 0.15, 0.15], gap="small")
+    with action_cols[0]:
+        selected_key = st.selectbox(
+            "Patient",
+            options=list(card_by_key),
+            format_func=lambda k: f"{card_by_key[k].get('time_text') or '--'} · {card_by_key[k].get('patient') or 'Unknown'}",
+            key=f"{key}_selected",
+            label_visibility="collapsed",
+        )
+
+    started_at = time_module.perf_counter()
+    grid_html = _card_grid_html(page_cards, selected_key or "", memo_key=f"{key}_card_html")
+    st.markdown(grid_html, unsafe_allow_html=True)
+    _record_rerun_cost("card_grid", started_at)
+    try:
+        costs = dict(st.session_state.get("rerun_costs", {}))
+        costs["card_grid_kb"] = round(len(grid_html.encode("utf-8")) / 1024.0, 1)
+        st.session_state.rerun_costs = costs
+    except Exception:
+        pass
+
+    card = card_by_key.get(selected_key)
+    if card is None:
+        return None
+    action = None
+    with action_cols[1]:
+        if st.button("✓ Done", key=f"{key}_done", use_container_width=True, type="primary"):
+            action = "done"
+    with action_cols[2]:
+        if st.button("✎ Edit", key=f"{key}_edit", use_container_width=True):
+            action = "edit"
+    with action_cols[3]:
+        if st.button("✕ Cancel", key=f"{key}_cancel", use_container_width=True):
+            action = "cancel"
+    with action_cols[4]:
+        qtraq_label = "☑ QTRAQ" if card.get("case_paper") else "☐ QTRAQ"
+        if show_case and st.button(qtraq_label, key=f"{key}_qtraq", use_container_width=True):
+            action = "qtraq"
+    return (action, card) if action else None
+
+
+def render_schedule_summary_chips(df: pd.DataFrame):
+    """Render top summary chips for schedule STATUS counts."""
+    if df is None or df.empty or "STATUS" not in df.columns:
+        return
+    status_series = df["STATUS"].astype(str).str.upper().str.strip()
+    total = len(status_series)
+    ongoing = status_series.str.contains("ON GOING|ONGOING").sum()
+    waiting = status_series.str.contains("WAITING").sum()
+    arrived = status_series.str.contains("ARRIVED").sum()
+    completed = status_series.str.contains("DONE|COMPLETED").sum()
+    cancelled = status_series.str.contains("CANCEL").sum()
+    chips = [
+        ("Total Cases", total, "info"),
+        ("Ongoing", ongoing, "success"),
+        ("Waiting", waiting, "warning"),
+        ("Arrived", arrived, "secondary"),
+        ("Completed", completed, "info"),
+        ("Cancelled", cancelled, "danger"),
+    ]
+    chips_html = "".join(
+        f'<div class="summary-chip {cls}"><div class="label">{label}</div><div class="value">{val}</div></div>'
+        for label, val, cls in chips
+    )
+    st.markdown(f'<div class="summary-row">{chips_html}</div>', unsafe_allow_html=True)
+
+
+# ================ OP ROW INDEX / EDITOR FRAMES ================
+def _build_op_row_index(df_schedule: DataFrame) -> dict[str, Any]:
+    if df_schedule is None or df_schedule.empty or "OP" not in df_schedule.columns:
+        return {"ops": [], "rows": {}}
+    ops = df_schedule["OP"]
+    status = df_schedule["STATUS"] if "STATUS" in df_schedule.columns else pd.Series("", index=df_schedule.index)
+    active = ~status.astype(str).str.upper().str.contains("CANCELLED|DONE|COMPLETED", na=True)
+    active_ops = ops.loc[active]
+    rows = {op: active_ops.index[active_ops == op] for op in active_ops.dropna().unique()}
+    return {"ops": sorted(ops.dropna().unique()), "rows": rows}
+
+
+def get_op_row_index(df_schedule: Optional[DataFrame]) -> dict[str, Any]:
+    """Chairs in the schedule and, per chair, the index labels of its open appointments.
+
+    {ops: sorted chair values, rows: {op: Index}}; rebuilt only when OP/STATUS change,
+    so switching chairs in "Schedule by OP" is a df.loc lookup.
+    """
+    if df_schedule is None or df_schedule.empty:
+        return {"ops": [], "rows": {}}
+    key = _frame_fingerprint(df_schedule, ["OP", "STATUS"])
+    if key is None:
+        return _build_op_row_index(df_schedule)
+    return _tick_cached("op_row_index", (key,), lambda: _build_op_row_index(df_schedule))
+
+
+def _build_editor_frame(
+    df_rows: DataFrame,
+    columns: list[str],
+    text_cols: list[str],
+    text_dtype: str,
+    bool_cols: list[str],
+) -> dict[str, Any]:
+    frame = df_rows.loc[:, columns].copy()
+    frame = frame.rename(columns={"In Time Obj": "In Time", "Out Time Obj": "Out Time"})
+    # Preserve original index for mapping edits back to df_raw
+    frame["_orig_idx"] = frame.index
+    frame = frame.reset_index(drop=True)
+    # Streamlit TimeColumn edits best with None for missing
+    for col in ["In Time", "Out Time"]:
+        if col in frame.columns:
+            frame[col] = frame[col].apply(lambda v: v if isinstance(v, time_type) else None)
+    for col in text_cols:
+        if col in frame.columns:
+            frame[col] = frame[col].astype(text_dtype).replace("nan", "")
+    for col in bool_cols:
+        if col in frame.columns:
+            frame[col] = frame[col].astype("boolean")
+
+    status = df_rows["STATUS"] if "STATUS" in df_rows.columns else pd.Series("", index=df_rows.index)
+    status = status.astype(str).str.strip().str.upper()
+    out_min = df_rows["Out_min"] if "Out_min" in df_rows.columns else pd.Series(np.nan, index=df_rows.index)
+    return {
+        "frame": frame,
+        "ongoing": (status.str.contains("ON GOING", regex=False) | status.str.contains("ONGOING", regex=False)).to_numpy(),
+        "out_min": pd.Series(pd.to_numeric(out_min, errors="coerce"), index=df_rows.index, dtype="float64").to_numpy(),
+    }
+
+
+def get_editor_frame(
+    cache_name: str,
+    df_rows: DataFrame,
+    columns: list[str],
+    current_minute: int,
+    text_cols: list[str],
+    text_dtype: str = "str",
+    bool_cols: Optional[list[str]] = None,
+) -> DataFrame:
+    """Editor-ready copy of df_rows for st.data_editor, with "Overtime (min)" for current_minute.
+
+    The frame (column pick, rename, _orig_idx, text/time/bool coercion) is rebuilt only when
+    the schedule version or the picked rows change; the overtime column is re-patched once a
+    minute. Returns a copy.
+    """
+    bool_cols = list(bool_cols or [])
+
+    def _build() -> dict[str, Any]:
+        return _build_editor_frame(df_rows, columns, text_cols, text_dtype, bool_cols)
+
+    cache_key = (
+        _schedule_cache_key(),
+        tuple(df_rows.index),
+        tuple(columns),
+        tuple(text_cols),
+        text_dtype,
+        tuple(bool_cols),
+    )
+    base = _tick_cached(cache_name, cache_key, _build)
+
+    def _patch() -> DataFrame:
+        overtime = int(current_minute) - base["out_min"]
+        frame = base["frame"].copy()
+        frame["Overtime (min)"] = np.where(base["ongoing"] & (overtime > 0), overtime, np.nan)
+        return frame
+
+    return _tick_cached(f"{cache_name}_minute", (cache_key, int(current_minute)), _patch).copy()
+
+
+# ================ SCHEDULE SEARCH ================
+def _normalize_search_text(value: Any) -> str:
+    if value is None:
+        return ""
+    try:
+        if pd.isna(value):
+            return ""
+    except (TypeError, ValueError):
+        pass
+    text = str(value).strip().lower()
+    return "" if text in ("nan", "none", "<na>") else text
+
+
+def _build_schedule_search_index(df_rows: DataFrame, columns: list[str]) -> dict[str, Any]:
+    cols = [c for c in columns if c in df_rows.columns]
+    fields = [
+        tuple(_normalize_search_text(v) for v in values)
+        for values in (df_rows[cols].itertuples(index=False, name=None) if cols else [() for _ in range(len(df_rows))])
+    ]
+    # Fields are joined with a separator no query contains, so matches never span two columns.
+    texts = ["\x1f".join(parts) for parts in fields]
+    grams: dict[str, list[int]] = {}
+    for pos, text in enumerate(texts):
+        for gram in {text[i:i + 3] for i in range(len(text) - 2)}:
+            if "\x1f" not in gram:
+                grams.setdefault(gram, []).append(pos)
+    return {"labels": list(df_rows.index), "fields": fields, "texts": texts, "grams": grams}
+
+
+def search_schedule_rows(
+    df_rows: Optional[DataFrame],
+    query: str,
+    columns: list[str],
+    cache_name: str = "schedule_search_index",
+) -> list[Any]:
+    """Index labels of rows whose columns contain query (case-insensitive), best matches first.
+
+    Rows where a field starts with the query rank before word-prefix matches, which rank
+    before plain substring matches; ties keep schedule order. The trigram index is rebuilt
+    once per schedule version, so a keystroke costs O(matches).
+    """
+    if df_rows is None or df_rows.empty:
+        return []
+    needle = _normalize_search_text(query)
+    if not needle:
+        return list(df_rows.index)
+    cols = [c for c in columns if c in df_rows.columns]
+    # Keyed by schedule version rather than a content hash: hashing the columns would cost
+    # more than answering the query.
+    key = (_schedule_cache_key(), tuple(cols), tuple(df_rows.index))
+    index = _tick_cached(cache_name, key, lambda: _build_schedule_search_index(df_rows, cols))
+
+    texts = index["texts"]
+    if len(needle) >= 3:
+        postings = sorted(
+            (index["grams"].get(needle[i:i + 3], []) for i in range(len(needle) - 2)),
+            key=len,
+        )
+        candidates = set(postings[0])
+        for posting in postings[1:]:
+            candidates.intersection_update(posting)
+            if not candidates:
+                break
+        positions = sorted(candidates)
+    else:
+        positions = range(len(texts))
+
+    ranked: list[tuple[int, int]] = []
+    for pos in positions:
+        if needle not in texts[pos]:
+            continue
+        rank = 2
+        for field in index["fields"][pos]:
+            if field.startswith(needle):
+                rank = 0
+                break
+            if f" {needle}" in field:
+                rank = 1
+        ranked.append((rank, pos))
+    ranked.sort()
+    labels = index["labels"]
+    return [labels[pos] for _, pos in ranked]
+
+
+# ================ DELETE ROW OPTIONS ================
+def _build_delete_row_options(df_rows: DataFrame) -> dict[str, Any]:
+    if df_rows is None or df_rows.empty or "REMINDER_ROW_ID" not in df_rows.columns:
+        return {"labels": [], "row_ids": {}, "by_row": {}}
+
+    def _text(col: str) -> list[str]:
+        if col not in df_rows.columns:
+            return [""] * len(df_rows)
+        # Blank for NaN/None, original casing otherwise
+        return [str(v).strip() if _normalize_search_text(v) else "" for v in df_rows[col].tolist()]
+
+    row_ids: dict[str, str] = {}
+    by_row: dict[Any, str] = {}
+    for row_ix, rid, pname, in_t, op in zip(
+        df_rows.index, _text("REMINDER_ROW_ID"), _text("Patient Name"), _text("In Time"), _text("OP")
+    ):
+        if not rid:
+            continue
+        row_no = f"#{int(row_ix) + 1}" if str(row_ix).isdigit() else str(row_ix)
+        label = " · ".join([p for p in [row_no, pname or "(blank row)", in_t, op] if p])
+        # Make option text unique even if labels repeat.
+        opt = f"{label} — {rid[:8]}"
+        row_ids[opt] = rid
+        by_row[row_ix] = opt
+    return {"labels": sorted(row_ids), "row_ids": row_ids, "by_row": by_row}
+
+
+def get_delete_row_options(df_rows: Optional[DataFrame]) -> dict[str, Any]:
+    """Delete-picker options as {labels: sorted option texts, row_ids: {option: REMINDER_ROW_ID},
+    by_row: {index label: option}}, rebuilt once per schedule version."""
+    if df_rows is None or df_rows.empty:
+        return {"labels": [], "row_ids": {}, "by_row": {}}
+    return _tick_cached(
+        "delete_row_options",
+        (_schedule_cache_key(), tuple(df_rows.index)),
+        lambda: _build_delete_row_options(df_rows),
+    )
+
+
+# ================ OP UTILIZATION TIMELINE ================
+# Per-chair occupancy from a sweep over (start, +1) / (end, -1) events.
+# Done appointments still occupied the chair, so only cancelled/shifted rows
+# are dropped. Overrun runs from the scheduled Out to ACTUAL_END_AT (or to now
+# while the visit is still open). The timeline and its Gantt HTML are cached
+# per (schedule version, minute).
+_OP_TIMELINE_EXCLUDED = "CANCELLED|SHIFTED"
+_OP_GANTT_CSS = """
+<style>
+.op-gantt {margin:4px 0 10px; font-size:12px; color:#334155;}
+.op-gantt-row {display:flex; align-items:center; gap:8px; margin:3px 0;}
+.op-gantt-label {flex:0 0 72px; font-weight:600; white-space:nowrap; overflow:hidden; text-overflow:ellipsis;}
+.op-gantt-track {position:relative; flex:1; height:18px; background:#eef2f7; border-radius:4px; overflow:hidden;}
+.op-gantt-axis .op-gantt-track {background:none; height:14px; overflow:visible;}
+.op-gantt-tick {position:absolute; top:0; transform:translateX(-50%); color:#94a3b8; font-size:10px;}
+.op-gantt-seg {position:absolute; top:2px; bottom:2px; background:#3b82f6; border-radius:3px;}
+.op-gantt-seg.past {background:#93c5fd;}
+.op-gantt-overlap {position:absolute; top:0; bottom:0; background:repeating-linear-gradient(45deg, #f59e0b 0 4px, transparent 4px 8px);}
+.op-gantt-overrun {position:absolute; top:5px; bottom:5px; background:#ef4444; border-radius:2px;}
+.op-gantt-now {position:absolute; top:0; bottom:0; width:2px; background:#0f172a;}
+.op-gantt-stat {flex:0 0 48px; text-align:right; font-variant-numeric:tabular-nums;}
+</style>
+"""
+
+
+def _actual_at_minutes(value: Any) -> Optional[int]:
+    """Minute of day (IST) of an ACTUAL_*_AT ISO timestamp, or None."""
+    text = str(value or "").strip()
+    if not text or text.lower() in ("nan", "none", "nat"):
+        return None
+    try:
+        ts = datetime.fromisoformat(text)
+    except ValueError:
+        return None
+    if ts.tzinfo is not None:
+        ts = ts.astimezone(IST)
+    return ts.hour * 60 + ts.minute
+
+
+def _sweep_occupancy(intervals: list[tuple[int, int]]) -> tuple[list[tuple[int, int]], list[tuple[int, int]]]:
+    """Occupied segments and double-booked (count >= 2) segments of [start, end) intervals."""
+    events = sorted([(s, 1) for s, e in intervals if e > s] + [(e, -1) for s, e in intervals if e > s])
+    occupied: list[tuple[int, int]] = []
+    overlap: list[tuple[int, int]] = []
+    count = 0
+    occ_start = over_start = 0
+    for t, delta in events:
+        before = count
+        count += delta
+        if before == 0 and count > 0:
+            occ_start = t
+        elif before > 0 and count == 0 and t > occ_start:
+            occupied.append((occ_start, t))
+        if before < 2 <= count:
+            over_start = t
+        elif before >= 2 > count and t > over_start:
+            overlap.append((over_start, t))
+    return occupied, overlap
+
+
+def _build_op_timeline(df_schedule: Optional[DataFrame], now_min: int) -> dict[str, Any]:
+    empty = {"window": (8 * 60, 21 * 60), "ops": [], "summary": pd.DataFrame(), "html": ""}
+    if df_schedule is None or df_schedule.empty or "OP" not in df_schedule.columns:
+        return empty
+    status = (
+        df_schedule["STATUS"].astype(str).str.strip().str.upper()
+        if "STATUS" in df_schedule.columns
+        else pd.Series("", index=df_schedule.index)
+    )
+    keep = ~status.str.contains(_OP_TIMELINE_EXCLUDED, na=False)
+    ops = df_schedule["OP"].where(df_schedule["OP"].notna(), "").astype(str).str.strip()
+    keep &= ~ops.str.upper().isin(["", "NAN", "NONE"])
+
+    def _minutes(col: str, fallback: str) -> list[Optional[int]]:
+        if col in df_schedule.columns:
+            return [None if pd.isna(v) else int(v) for v in df_schedule[col].tolist()]
+        src = df_schedule[fallback].tolist() if fallback in df_schedule.columns else [None] * len(df_schedule)
+        return [time_to_minutes(v) for v in src]
+
+    in_mins = _minutes("In_min", "In Time")
+    out_mins = _minutes("Out_min", "Out Time")
+    actual_end = df_schedule["ACTUAL_END_AT"].tolist() if "ACTUAL_END_AT" in df_schedule.columns else [None] * len(df_schedule)
+    actual_start = df_schedule["ACTUAL_START_AT"].tolist() if "ACTUAL_START_AT" in df_schedule.columns else [None] * len(df_schedule)
+    patients = df_schedule["Patient Name"].tolist() if "Patient Name" in df_schedule.columns else [""] * len(df_schedule)
+
+    by_op: dict[str, dict[str, list]] = {}
+    for pos, (ok, op) in enumerate(zip(keep.tolist(), ops.tolist())):
+        start, end = in_mins[pos], out_mins[pos]
+        if not ok or start is None or end is None:
+            continue
+        if end < start:
+            end += DAY_MINUTES
+        entry = by_op.setdefault(op, {"intervals": [], "overruns": [], "labels": []})
+        entry["intervals"].append((start, end))
+        patient = str(patients[pos]).strip() if _normalize_search_text(patients[pos]) else ""
+        entry["labels"].append(f"{mins_to_hhmm(start % DAY_MINUTES)}-{mins_to_hhmm(end % DAY_MINUTES)} {patient}".strip())
+        # Overrun: past the scheduled end until the visit actually ended (or now, while still open)
+        done_at = _actual_at_minutes(actual_end[pos])
+        state = status.iat[pos]
+        if done_at is None and ("ON GOING" in state or "ONGOING" in state or _actual_at_minutes(actual_start[pos]) is not None) and not any(
+            s in state for s in ("DONE", "COMPLETED")
+        ):
+            done_at = int(now_min)
+        if done_at is not None:
+            # Only a visit that ran past midnight ends "before" it started
+            if done_at < start - DAY_MINUTES // 2:
+                done_at += DAY_MINUTES
+            if done_at > end:
+                entry["overruns"].append((end, done_at))
+    if not by_op:
+        return empty
+
+    all_spans = [iv for entry in by_op.values() for iv in entry["intervals"] + entry["overruns"]]
+    day_start = min(8 * 60, min(s for s, _ in all_spans)) // 60 * 60
+    day_end = -(-max(21 * 60, max(e for _, e in all_spans)) // 60) * 60
+    window = day_end - day_start
+
+    timeline_ops = []
+    for op in sorted(by_op):
+        entry = by_op[op]
+        # Overrun time occupies the chair as well
+        occupied, overlap = _sweep_occupancy(entry["intervals"] + entry["overruns"])
+        busy = sum(e - s for s, e in occupied)
+        bounds = [day_start] + [t for seg in occupied for t in seg] + [day_end]
+        gaps = [(bounds[i], bounds[i + 1]) for i in range(0, len(bounds), 2) if bounds[i + 1] > bounds[i]]
+        timeline_ops.append({
+            "op": op,
+            "occupied": occupied,
+            "overlap": overlap,
+            "overruns": entry["overruns"],
+            "intervals": entry["intervals"],
+            "labels": entry["labels"],
+            "appointments": len(entry["intervals"]),
+            "busy": busy,
+            "idle": window - busy,
+            "gaps": gaps,
+            "utilization": round(100.0 * busy / window, 1) if window else 0.0,
+            "overrun": sum(e - s for s, e in entry["overruns"]),
+            "double_booked": sum(e - s for s, e in overlap),
+        })
+
+    summary = pd.DataFrame(
+        [
+            {
+                "OP": item["op"],
+                "Appointments": item["appointments"],
+                "Occupied Minutes": item["busy"],
+                "Idle Minutes": item["idle"],
+                "Idle Gaps": len(item["gaps"]),
+                "Longest Gap": max((e - s for s, e in item["gaps"]), default=0),
+                "Utilization %": item["utilization"],
+                "Overrun Minutes": item["overrun"],
+                "Double-booked Minutes": item["double_booked"],
+            }
+            for item in timeline_ops
+        ]
+    )
+    timeline = {"window": (day_start, day_end), "ops": timeline_ops, "summary": summary}
+    timeline["html"] = _op_gantt_html(timeline, int(now_min))
+    return timeline
+
+
+def _op_gantt_html(timeline: dict[str, Any], now_min: int) -> str:
+    """Whole-day chair Gantt as one HTML block: one track per OP, bars positioned in % of the day."""
+    day_start, day_end = timeline["window"]
+    span = max(1, day_end - day_start)
+
+    def _pct(t: int) -> float:
+        return round(100.0 * (min(max(t, day_start), day_end) - day_start) / span, 3)
+
+    def _bar(cls: str, s: int, e: int, title: str = "") -> str:
+        title_attr = f" title='{html.escape(title, quote=True)}'" if title else ""
+        return f"<div class='{cls}' style='left:{_pct(s)}%;width:{max(_pct(e) - _pct(s), 0.2)}%'{title_attr}></div>"
+
+    ticks = "".join(
+        f"<span class='op-gantt-tick' style='left:{_pct(h * 60)}%'>{mins_to_hhmm((h * 60) % DAY_MINUTES)}</span>"
+        for h in range(day_start // 60, day_end // 60 + 1, 2)
+    )
+    parts = [
+        _OP_GANTT_CSS,
+        "<div class='op-gantt'>",
+        f"<div class='op-gantt-row op-gantt-axis'><span class='op-gantt-label'></span><div class='op-gantt-track'>{ticks}</div><span class='op-gantt-stat'></span></div>",
+    ]
+    now_line = (
+        f"<div class='op-gantt-now' style='left:{_pct(now_min)}%'></div>" if day_start <= now_min <= day_end else ""
+    )
+    for item in timeline["ops"]:
+        bars = []
+        for s, e in item["occupied"]:
+            # Tooltip lists the appointments that make up this occupied stretch
+            names = [label for (a, b), label in zip(item["intervals"], item["labels"]) if a < e and b > s]
+            bars.append(_bar("op-gantt-seg past" if e <= now_min else "op-gantt-seg", s, e, " · ".join(names)))
+        bars.extend(_bar("op-gantt-overlap", s, e, "Double-booked") for s, e in item["overlap"])
+        bars.extend(_bar("op-gantt-overrun", s, e, f"Overrun {e - s} min") for s, e in item["overruns"])
+        parts.append(
+            f"<div class='op-gantt-row'><span class='op-gantt-label' title='{html.escape(item['op'], quote=True)}'>{html.escape(item['op'])}</span>"
+            f"<div class='op-gantt-track'>{''.join(bars)}{now_line}</div>"
+            f"<span class='op-gantt-stat'>{item['utilization']:.0f}%</span></div>"
+        )
+    parts.append("</div>")
+    return "".join(parts)
+
+
+def get_op_timeline(df_schedule: Optional[DataFrame], now_min: int) -> dict[str, Any]:
+    """Per-OP occupancy for the day: {window, ops: [...], summary: DataFrame, html: Gantt block}.
+
+    Each op entry has occupied / overlap / overrun segments (minutes since midnight), idle gaps
+    inside the day window (08:00-21:00 widened to the bookings), utilization %, overrun and
+    double-booked minutes. Cached per schedule version and minute.
+    """
+    return _tick_cached(
+        "op_timeline",
+        (_schedule_cache_key(), tuple(df_schedule.index) if df_schedule is not None else (), int(now_min)),
+        lambda: _build_op_timeline(df_schedule, int(now_min)),
+    )
+
+
+# ================ EDITOR DIFFS ================
+def _data_editor_has_pending_edits(editor_key: str) -> bool:
+    """Detect pending edits without touching widget state.
+
+    Streamlit stores data_editor widget edits in st.session_state[editor_key]
+    as a dict with keys like edited_rows/added_rows/deleted_rows.
+    """
+    try:
+        state = st.session_state.get(editor_key)
+        if not isinstance(state, dict):
+            return False
+        return bool(state.get("edited_rows") or state.get("added_rows") or state.get("deleted_rows"))
+    except Exception:
+        return False
+
+
+def _get_editor_changed_rows(editor_key: str) -> tuple[list[int], bool]:
+    try:
+        state = st.session_state.get(editor_key)
+        if not isinstance(state, dict):
+            return [], False
+        if state.get("added_rows"):
+            return [], True
+        edited = state.get("edited_rows") or {}
+        return sorted(int(k) for k in edited.keys()), False
+    except Exception:
+        return [], False
+
+
+def _row_has_changes(edited_row, base_row, compare_cols: list[str]) -> bool:
+    for col in compare_cols:
+        if col not in edited_row.index or col not in base_row.index:
+            continue
+        if _norm_cell(edited_row.get(col)) != _norm_cell(base_row.get(col)):
+            return True
+    return False
+
+
+def _collect_unique_upper(df_any: pd.DataFrame, col_name: str) -> list[str]:
+    try:
+        if col_name not in df_any.columns:
+            return []
+        s = df_any[col_name].astype(str).replace("nan", "").fillna("")
+        vals = [str(v).strip().upper() for v in s.tolist() if str(v).strip()]
+        return _unique_preserve_order(vals)
+    except Exception:
+        return []
+
+
+# ================ SCHEDULING PAGE ================
+def _is_row_empty(row) -> bool:
+    # Consider a row empty if Patient Name, In Time, Out Time, Procedure, DR. are all blank/None
+    return all(
+        not str(row.get(col, '')).strip()
+        for col in ["Patient Name", "In Time", "Out Time", "Procedure", "DR."]
+    )
+
+
+def _blank_schedule_row() -> dict[str, Any]:
+    return {
+        "Patient ID": "",
+        "Patient Name": "",
+        "In Time": None,
+        "Out Time": None,
+        "Procedure": "",
+        "DR.": "",
+        "FIRST": "",
+        "SECOND": "",
+        "Third": "",
+        "CASE PAPER": "",
+        "OP": "",
+        "SUCTION": False,
+        "CLEANING": False,
+        "STATUS": "WAITING",
+        "REMINDER_ROW_ID": str(uuid.uuid4()),
+        "REMINDER_SNOOZE_UNTIL": pd.NA,
+        "REMINDER_DISMISSED": False
+    }
+
+
+def with_blank_row(df_raw: pd.DataFrame) -> pd.DataFrame:
+    """df_raw plus an empty patient row when the last row is filled in (the editors' entry row)."""
+    if not df_raw.empty and not _is_row_empty(df_raw.iloc[-1]):
+        return pd.concat([df_raw, pd.DataFrame([_blank_schedule_row()])], ignore_index=True)
+    return df_raw
+
+
+def schedule_dropdown_options(df_raw: pd.DataFrame) -> dict[str, list[str]]:
+    """Dropdown options: configured lists plus any existing values from the sheet."""
+    extra_assistants: list[str] = []
+    for col in ["FIRST", "SECOND", "Third", "CASE PAPER"]:
+        extra_assistants.extend(_collect_unique_upper(df_raw, col))
+    return {
+        "doctors": _unique_preserve_order(_get_all_doctors() + _collect_unique_upper(df_raw, "DR.")),
+        "assistants": _unique_preserve_order(_get_all_assistants() + extra_assistants),
+        "statuses": _unique_preserve_order(STATUS_BASE_OPTIONS + _collect_unique_upper(df_raw, "STATUS")),
+    }
+
+
+def _render_delete_rows_body(df_raw: pd.DataFrame) -> None:
+    # Options are only built when the picker is open; the map itself is cached per schedule version.
+    delete_options = get_delete_row_options(df_raw)
+    row_ids = delete_options["row_ids"]
+    labels = delete_options["labels"]
+    # Rows matching the schedule search box come first, best matches first
+    delete_search = str(st.session_state.get("full_schedule_card_search", "") or "").strip()
+    if delete_search:
+        ranked = [
+            delete_options["by_row"][ix]
+            for ix in search_schedule_rows(
+                df_raw,
+                delete_search,
+                ["Patient Name", "Procedure", "DR.", "FIRST", "SECOND", "Third", "STATUS"],
+                cache_name="delete_picker_search_index",
+            )
+            if ix in delete_options["by_row"]
+        ]
+        ranked_set = set(ranked)
+        labels = ranked + [opt for opt in labels if opt not in ranked_set]
+    if not labels:
+        st.info("No rows to delete.")
+        return
+
+    # Drop selections that no longer exist (the widget raises on unknown values)
+    selected = st.session_state.get("delete_rows_select")
+    if isinstance(selected, list) and any(opt not in row_ids for opt in selected):
+        st.session_state["delete_rows_select"] = [opt for opt in selected if opt in row_ids]
+
+    chosen = st.multiselect("Rows to delete", options=labels, key="delete_rows_select")
+    btn_cols = st.columns(2)
+    with btn_cols[0]:
+        confirm = st.button(
+            f"Delete {len(chosen)} row(s)" if chosen else "Delete",
+            key="delete_rows_confirm",
+            type="primary",
+            disabled=not chosen,
+            use_container_width=True,
+        )
+    with btn_cols[1]:
+        cancel = st.button("Cancel", key="delete_rows_cancel", use_container_width=True)
+
+    if cancel:
+        st.session_state.delete_rows_open = False
+        st.session_state.pop("delete_rows_select", None)
+        st.rerun()
+    if confirm and chosen:
+        rids = {row_ids[opt] for opt in chosen if opt in row_ids}
+        try:
+            if "REMINDER_ROW_ID" not in df_raw.columns:
+                raise ValueError("Missing REMINDER_ROW_ID column")
+            # One patch for the whole selection: a single save, a single version bump.
+            df_updated = df_raw[~df_raw["REMINDER_ROW_ID"].astype(str).isin(list(rids))].copy()
+
+            # Clear local reminder state for these row ids.
+            try:
+                for rid in rids:
+                    if "snoozed" in st.session_state and rid in st.session_state.snoozed:
+                        del st.session_state.snoozed[rid]
+                    if "reminder_sent" in st.session_state:
+                        st.session_state.reminder_sent.discard(rid)
+            except Exception:
+                pass
+
+            _maybe_save(df_updated, message=f"{len(rids)} row(s) deleted")
+            st.session_state.delete_rows_open = False
+            st.session_state.pop("delete_rows_select", None)
+            st.rerun()
+        except Exception as e:
+            st.error(f"Error deleting rows: {e}")
+
+
+_dialog_decorator = getattr(st, "dialog", None) or getattr(st, "experimental_dialog", None)
+if _dialog_decorator:
+    @_dialog_decorator("Delete rows")
+    def _render_delete_rows_dialog(df_raw: pd.DataFrame) -> None:
+        _render_delete_rows_body(df_raw)
+else:
+    def _render_delete_rows_dialog(df_raw: pd.DataFrame) -> None:
+        st.markdown("**Delete rows**")
+        _render_delete_rows_body(df_raw)
+
+
+_FULL_SCHEDULE_CSS = """
+<style>
+.full-schedule-cards {margin-top: 8px;}
+.schedule-card {background:#f8fafc; border:1px solid #3b82f6; border-radius:18px; padding:14px; box-shadow:0 10px 20px rgba(20,17,15,0.08); display:flex; flex-direction:column; gap:10px; min-height:220px;}
+.card-shell-marker {display:none;}
+div[data-testid="stVerticalBlockBorderWrapper"]:has(.card-shell-marker) {background:linear-gradient(180deg, #ffffff 0%, #f2f4f7 100%); border:1px solid #e3e6ec; border-radius:24px; box-shadow:0 22px 44px rgba(24, 28, 36, 0.18); overflow:hidden;}
+div[data-testid="stVerticalBlockBorderWrapper"]:has(.card-shell-marker) > div {padding:0 20px 18px 20px; display:flex; flex-direction:column; gap:12px; min-height:260px;}
+div[data-testid="stVerticalBlockBorderWrapper"]:has(.card-shell-marker) [data-testid="stHorizontalBlock"] {gap: 0.6rem; align-items:center; justify-content:flex-start;}
+div[data-testid="stVerticalBlockBorderWrapper"]:has(.card-shell-marker) .stButton>button,
+div[data-testid="stVerticalBlockBorderWrapper"]:has(.card-shell-marker) [data-testid="stButton"] > button,
+div[data-testid="stVerticalBlockBorderWrapper"]:has(.card-shell-marker) button[kind] {height: 18px !important; border-radius: 10px !important; font-weight: 700; text-transform: none; letter-spacing: 0; white-space: nowrap; word-break: keep-all; overflow-wrap: normal; min-width: 60px; padding: 0 6px !important; font-size: 10px; line-height: 1; flex-shrink: 0; display: inline-flex; align-items: center; justify-content: center; gap: 4px; width: 100%; box-shadow: 0 6px 14px rgba(22, 24, 31, 0.14); color:#3f434a;}
+div[data-testid="stVerticalBlockBorderWrapper"]:has(.card-shell-marker) .stButton>button *,
+div[data-testid="stVerticalBlockBorderWrapper"]:has(.card-shell-marker) button[kind] * {white-space: nowrap;}
+div[data-testid="stVerticalBlockBorderWrapper"]:has(.card-shell-marker) div[data-testid="stHorizontalBlock"]:has(.card-action-marker) {flex-wrap: wrap; row-gap: 0.5rem; align-items:center; justify-content:flex-end;}
+div[data-testid="stVerticalBlockBorderWrapper"]:has(.card-shell-marker) div[data-testid="stHorizontalBlock"]:has(.card-action-marker) > div {min-width: 96px; flex: 1 1 96px;}
+@media (min-width: 1100px) {
+    div[data-testid="stVerticalBlockBorderWrapper"]:has(.card-shell-marker) div[data-testid="stHorizontalBlock"]:has(.card-action-marker) {flex-wrap: nowrap;}
+    div[data-testid="stVerticalBlockBorderWrapper"]:has(.card-shell-marker) div[data-testid="stHorizontalBlock"]:has(.card-action-marker) > div {min-width: 100px; flex: 0 0 auto;}
+}
+.card-actions-row {
+    margin-top: 8px;
+    display: flex;
+    flex-wrap: wrap;
+    gap: 0.5rem;
+    align-items: center;
+    justify-content: flex-start;
+}
+.card-actions-row .stCheckbox {
+    margin: 0;
+}
+.card-actions-row .stCheckbox label {
+    font-size: 13px;
+    font-weight: 600;
+    letter-spacing: 0.1px;
+}
+.card-actions-row .stButton>button,
+.card-actions-row button[kind] {
+    min-width: 70px;
+    border-radius: 10px !important;
+    height: 30px !important;
+    font-size: 12px !important;
+}
+.card-actions-row div[data-testid="stHorizontalBlock"] {align-items:center;}
+.card-actions-row div[data-testid="stHorizontalBlock"]:has(.stCheckbox) {justify-content:flex-start !important;}
+.card-actions-row div[data-testid="stHorizontalBlock"]:has(.stCheckbox) div[data-testid="column"]:has(.card-action-done) {margin-left:auto;}
+.card-actions-row div[data-testid="column"]:has(.card-action-done),
+.card-actions-row div[data-testid="column"]:has(.card-action-edit),
+.card-actions-row div[data-testid="column"]:has(.card-action-cancel) {min-width: 72px;}
+.card-details-row {
+    margin-top: 10px;
+    border: 1px solid #d9dde3;
+    border-radius: 14px;
+    padding: 6px 10px;
+    background: #fff;
+    box-shadow: 0 10px 20px rgba(24, 28, 36, 0.12);
+}
+div[data-testid="stVerticalBlockBorderWrapper"]:has(.card-shell-marker) .stCheckbox {margin-top: 10px;}
+div[data-testid="stVerticalBlockBorderWrapper"]:has(.card-shell-marker) .stCheckbox label {font-size: 14px; font-weight: 600; color:#2f333a; white-space: normal; line-height: 1.2;}
+div[data-testid="stVerticalBlockBorderWrapper"]:has(.card-shell-marker) .stCheckbox div[data-baseweb="checkbox"] > div,
+div[data-testid="stVerticalBlockBorderWrapper"]:has(.card-shell-marker) .stCheckbox div[data-baseweb="checkbox"] > label > div {width: 22px; height: 22px; border-radius: 6px; border: 1.5px solid #c3c8d0; background: #ffffff;}
+div[data-testid="stVerticalBlockBorderWrapper"]:has(.card-shell-marker) .stCheckbox div[data-baseweb="checkbox"] input:checked + div {background:#2f63e8; border-color:#2f63e8;}
+div[data-testid="stVerticalBlockBorderWrapper"]:has(.card-shell-marker) button[kind="primary"] {background:#2f63e8 !important; border:1px solid #2f63e8 !important; color:#ffffff !important; box-shadow:0 8px 18px rgba(47,99,232,0.28) !important;}
+div[data-testid="stVerticalBlockBorderWrapper"]:has(.card-shell-marker) button[kind="secondary"] {background:#ffffff !important; border:1px solid #d5d8de !important; color:#4b4f56 !important; box-shadow:0 6px 14px rgba(24, 28, 36, 0.08) !important;}
+div[data-testid="stVerticalBlockBorderWrapper"]:has(.card-shell-marker) div[data-testid="column"]:has(.card-action-cancel) button {border-color:#e1b0b0 !important; color:#b15454 !important; background:#ffffff !important;}
+div[data-testid="stVerticalBlockBorderWrapper"]:has(.card-shell-marker) div[data-testid="stHorizontalBlock"]:has(.stCheckbox) div[data-testid="column"]:has(.card-action-done) {margin-left:auto;}
+.card-action-marker {display:none;}
+.card-conflict {padding:8px 12px; border-radius:12px; background:#fdecec; border:1px solid #f3b4b4; color:#9a3b3b; font-size:12px; font-weight:600; line-height:1.4;}
+.card-status-banner {display:flex; align-items:center; gap:10px; padding:12px 20px; border-radius:20px 20px 12px 12px; font-weight:800; font-size:13px; letter-spacing:0.8px; text-transform:uppercase; margin:0 -20px 14px -20px;}
+.card-status-banner.waiting {background:linear-gradient(90deg, #f7e6b7, #fff2d6); color:#8a775b;}
+.card-status-banner.ongoing {background:linear-gradient(90deg, #dfe9ff, #f1f5ff); color:#2f4f86;}
+.card-status-banner.arrived {background:linear-gradient(90deg, #e9e9ea, #f5f5f6); color:#50545a;}
+.card-status-banner.completed {background:linear-gradient(90deg, #def3e6, #eef8f1); color:#3d6b4a;}
+.card-status-banner.cancelled {background:linear-gradient(90deg, #f6d1d1, #fde8e8); color:#9a4b4b;}
+.status-dot {width:14px; height:14px; border-radius:50%;}
+.card-status-banner.waiting .status-dot {background:#f1b400; box-shadow:0 0 0 4px rgba(241,180,0,0.22);}
+.card-status-banner.ongoing .status-dot {background:#3b6fd8; box-shadow:0 0 0 4px rgba(59,111,216,0.22);}
+.card-status-banner.arrived .status-dot {background:#7a7a7a; box-shadow:0 0 0 4px rgba(122,122,122,0.22);}
+.card-status-banner.completed .status-dot {background:#4caf6b; box-shadow:0 0 0 4px rgba(76,175,107,0.22);}
+.card-status-banner.cancelled .status-dot {background:#d45c5c; box-shadow:0 0 0 4px rgba(212,92,92,0.22);}
+.card-head {display:flex; align-items:center; gap:16px;}
+.card-title {display:flex; flex-direction:column; gap:3px;}
+.card-avatar {width:56px; height:56px; border-radius:50%; background:radial-gradient(circle at 30% 30%, #f6e4c9, #e4cca4); border:1px solid #ead8be; color:#5d4a35; font-weight:800; display:flex; align-items:center; justify-content:center; font-size:16px; box-shadow: inset 0 1px 0 rgba(255,255,255,0.7);}
+.card-name {font-size:18px; font-weight:800; color:#2a2d33; letter-spacing:0.4px; text-transform:uppercase;}
+.card-time {font-size:13px; color:#6f757d;}
+.card-info {
+    display: flex;
+    flex-direction: column;
+    gap: 12px;
+    margin: 16px 0;
+}
+.info-row {
+    display: flex;
+    align-items: center;
+    gap: 12px;
+    padding: 10px 12px;
+    border-radius: 12px;
+    background: linear-gradient(135deg, rgba(255, 255, 255, 0.6), rgba(255, 255, 255, 0.3));
+    backdrop-filter: blur(8px);
+    -webkit-backdrop-filter: blur(8px);
+    border: 1px solid rgba(255, 255, 255, 0.3);
+    transition: all 0.3s ease;
+}
+.info-row:hover {
+    background: linear-gradient(135deg, rgba(255, 255, 255, 0.8), rgba(255, 255, 255, 0.5));
+    border-color: rgba(59, 130, 246, 0.2);
+    transform: translateX(4px);
+}
+.info-icon {
+    width: 36px;
+    height: 36px;
+    border-radius: 12px;
+    background: linear-gradient(135deg, rgba(59, 130, 246, 0.1), rgba(37, 99, 235, 0.05));
+    border: 1px solid rgba(59, 130, 246, 0.15);
+    display: flex;
+    align-items: center;
+    justify-content: center;
+    color: #2563eb;
+    backdrop-filter: blur(8px);
+    -webkit-backdrop-filter: blur(8px);
+    transition: all 0.3s ease;
+    flex-shrink: 0;
+}
+div[data-testid="stVerticalBlockBorderWrapper"]:has(.card-shell-marker):hover .info-icon {
+    background: linear-gradient(135deg, rgba(59, 130, 246, 0.15), rgba(37, 99, 235, 0.08));
+    border-color: rgba(59, 130, 246, 0.25);
+    transform: scale(1.05);
+}
+.info-icon.doctor-icon {font-size:16px;}
+.info-icon.staff-icon {font-size:16px;}
+.info-icon-svg {
+    display: block;
+    width: 20px;
+    height: 20px;
+}
+.info-text {
+    font-size: 14px;
+    font-weight: 500;
+    color: #1e293b;
+    flex: 1;
+}
+.info-label {
+    font-size: 11px;
+    font-weight: 600;
+    color: #64748b;
+    text-transform: uppercase;
+    letter-spacing: 0.5px;
+    margin-bottom: 2px;
+}
+.card-subdivider {height:1px; background:#e4e6eb; margin: 10px 0 6px;}
+.card-divider {height:1px; background:#e4e6eb; margin: 12px 0;}
+div[data-testid="stVerticalBlockBorderWrapper"]:has(.card-shell-marker) [data-testid="stExpander"] {border:1px solid #d9dde3; border-radius:12px; background:#f7f8fa; margin-top:6px;}
+div[data-testid="stVerticalBlockBorderWrapper"]:has(.card-shell-marker) summary {padding:10px 12px; font-weight:600; color:#60656c; display:flex; align-items:center; gap:10px; font-size:13px;}
+div[data-testid="stVerticalBlockBorderWrapper"]:has(.card-shell-marker) summary::before {content:"›"; color:#7a8087; font-size:18px;}
+div[data-testid="stVerticalBlockBorderWrapper"]:has(.card-shell-marker) summary::after {content:"⋯"; margin-left:auto; color:#9aa0a7; font-size:18px;}
+</style>
+"""
+
+
+def _clean_text(val) -> str:
+    if val is None or (isinstance(val, float) and pd.isna(val)):
+        return ""
+    text = str(val).strip()
+    if text.lower() in {"nan", "none"}:
+        return ""
+    return text
+
+def _truthy(val) -> bool:
+    if isinstance(val, bool):
+        return val
+    text = _clean_text(val).lower()
+    return text in {"yes", "y", "true", "1", "done", "checked"}
+
+def _initials(name: str) -> str:
+    parts = [p for p in name.strip().split() if p]
+    if not parts:
+        return "--"
+    if len(parts) == 1:
+        return parts[0][:2].upper()
+    return (parts[0][0] + parts[-1][0]).upper()
+
+def _status_class(status: str) -> str:
+    status_up = status.upper()
+    if "WAIT" in status_up:
+        return "waiting"
+    if "ONGOING" in status_up or "ON GOING" in status_up:
+        return "ongoing"
+    if "ARRIVED" in status_up:
+        return "arrived"
+    if "DONE" in status_up or "COMPLETED" in status_up:
+        return "completed"
+    if "CANCEL" in status_up or "SHIFT" in status_up:
+        return "cancelled"
+    return "waiting"
+
+
+def _fmt_time(val) -> str:
+    if isinstance(val, time_type):
+        return val.strftime("%I:%M %p").lstrip("0")
+    return _clean_text(val)
+
+
+def _open_full_edit_dialog(context: dict[str, Any]) -> None:
+    st.session_state["full_edit_context"] = context
+    st.session_state["full_edit_open"] = True
+    row_key = str(context.get("row_key", "")).strip()
+    if not row_key:
+        return
+    in_time_value = str(context.get("in_time", "") or "").strip()
+    out_time_value = str(context.get("out_time", "") or "").strip()
+    if in_time_value.upper() in {"N/A", "NONE", "NAT"}:
+        in_time_value = ""
+    if out_time_value.upper() in {"N/A", "NONE", "NAT"}:
+        out_time_value = ""
+    st.session_state[f"full_popup_patient_{row_key}"] = str(context.get("patient", "") or "")
+    in_hour, in_minute, in_ampm = _time_to_picker_parts(in_time_value)
+    out_hour, out_minute, out_ampm = _time_to_picker_parts(out_time_value)
+    st.session_state[f"full_popup_in_hour_{row_key}"] = in_hour
+    st.session_state[f"full_popup_in_min_{row_key}"] = in_minute
+    st.session_state[f"full_popup_in_ampm_{row_key}"] = in_ampm
+    st.session_state[f"full_popup_out_hour_{row_key}"] = out_hour
+    st.session_state[f"full_popup_out_min_{row_key}"] = out_minute
+    st.session_state[f"full_popup_out_ampm_{row_key}"] = out_ampm
+    st.session_state[f"full_popup_status_{row_key}"] = str(context.get("status", "") or "")
+    st.session_state[f"full_popup_doctor_{row_key}"] = str(context.get("doctor", "") or "")
+    st.session_state[f"full_popup_procedure_{row_key}"] = str(context.get("procedure", "") or "")
+    st.session_state[f"full_popup_op_{row_key}"] = str(context.get("op", "") or "")
+    st.session_state[f"full_popup_first_{row_key}"] = str(context.get("staff_first", "") or "")
+    st.session_state[f"full_popup_second_{row_key}"] = str(context.get("staff_second", "") or "")
+    st.session_state[f"full_popup_third_{row_key}"] = str(context.get("staff_third", "") or "")
+    st.session_state[f"full_popup_case_{row_key}"] = bool(context.get("case_paper", False))
+    st.session_state[f"full_popup_suction_{row_key}"] = bool(context.get("suction", False))
+    st.session_state[f"full_popup_cleaning_{row_key}"] = bool(context.get("cleaning", False))
+
+def _close_full_edit_dialog() -> None:
+    st.session_state["full_edit_open"] = False
+    st.session_state["full_edit_context"] = {}
+
+
+def _full_build_select_options(options: list[str], current_value: str) -> tuple[list[str], int]:
+    current = str(current_value or "").strip()
+    opts = [opt for opt in options if str(opt).strip()]
+    if current and current not in opts:
+        opts = [current] + opts
+    opts = [""] + opts
+    index = opts.index(current) if current in opts else 0
+    return opts, index
+
+
+def _locate_schedule_row(df_updated: pd.DataFrame, row_id, patient_name, in_time_val) -> Optional[int]:
+    """Index of the card's row: by REMINDER_ROW_ID, else by patient name (and In Time)."""
+    idx: Optional[int] = None
+    if row_id and "REMINDER_ROW_ID" in df_updated.columns:
+        matches = df_updated["REMINDER_ROW_ID"].astype(str) == str(row_id)
+        if matches.any():
+            idx = cast(int, matches.idxmax())
+    if idx is None and "Patient Name" in df_updated.columns and patient_name:
+        name_mask = df_updated["Patient Name"].astype(str).str.upper() == str(patient_name).upper()
+        if in_time_val and "In Time" in df_updated.columns:
+            time_mask = df_updated["In Time"].astype(str) == str(in_time_val)
+            match = df_updated.loc[name_mask & time_mask]
+        else:
+            match = df_updated.loc[name_mask]
+        if not match.empty:
+            idx = cast(int, match.index[0])
+    return idx
+
+
+def _apply_full_card_edit(df_raw: pd.DataFrame, row_id, patient_name, in_time_val, updates: dict[str, Any]) -> bool:
+    if df_raw is None or df_raw.empty:
+        st.warning("No schedule data to update.")
+        return False
+    df_updated = df_raw.copy()
+    idx = _locate_schedule_row(df_updated, row_id, patient_name, in_time_val)
+    if idx is None:
+        st.warning("Unable to locate row for update.")
+        return False
+
+    status_col = "STATUS" if "STATUS" in df_updated.columns else "Status" if "Status" in df_updated.columns else ""
+    old_status_norm = str(df_updated.at[idx, status_col]).strip().upper() if status_col else ""
+
+    for col, val in updates.items():
+        if col in df_updated.columns:
+            df_updated.at[idx, col] = val
+
+    if status_col:
+        new_status_norm = str(df_updated.at[idx, status_col]).strip().upper()
+        if new_status_norm and new_status_norm != old_status_norm:
+            ts = _now_iso()
+            if "STATUS_CHANGED_AT" in df_updated.columns:
+                df_updated.at[idx, "STATUS_CHANGED_AT"] = ts
+            if ("ONGOING" in new_status_norm or "ON GOING" in new_status_norm) and "ACTUAL_START_AT" in df_updated.columns:
+                if not str(df_updated.at[idx, "ACTUAL_START_AT"]).strip():
+                    df_updated.at[idx, "ACTUAL_START_AT"] = ts
+            if ("DONE" in new_status_norm or "COMPLETED" in new_status_norm) and "ACTUAL_END_AT" in df_updated.columns:
+                if not str(df_updated.at[idx, "ACTUAL_END_AT"]).strip():
+                    df_updated.at[idx, "ACTUAL_END_AT"] = ts
+            if "STATUS_LOG" in df_updated.columns:
+                existing_log = str(df_updated.at[idx, "STATUS_LOG"])
+                try:
+                    df_updated.at[idx, "STATUS_LOG"] = _append_status_log(
+                        existing_log,
+                        {"at": ts, "from": old_status_norm, "to": new_status_norm},
+                    )
+                except Exception:
+                    df_updated.at[idx, "STATUS_LOG"] = existing_log
+
+    if bool(st.session_state.get("auto_assign_assistants", True)):
+        only_empty = bool(st.session_state.get("auto_assign_only_empty", True))
+        invalidate_availability("schedule")
+        _auto_fill_assistants_for_row(df_updated, int(idx), only_fill_empty=only_empty)
+
+    _maybe_save(df_updated, show_toast=False, message=f"Updated {patient_name or 'patient'}")
+    if st.session_state.get("auto_save_enabled", False):
+        st.toast("Changes saved.", icon="✅")
+    else:
+        st.toast("Changes queued. Click 'Save Changes'.", icon="📝")
+    return True
+
+
+def _update_row_status(df_raw: pd.DataFrame, row_id, patient_name, in_time_val, new_status):
+    if df_raw is None or df_raw.empty:
+        st.warning("No schedule data to update.")
+        return
+    df_updated = df_raw.copy()
+    idx = _locate_schedule_row(df_updated, row_id, patient_name, in_time_val)
+    if idx is None:
+        st.warning("Unable to locate row for update.")
+        return
+
+    old_status_norm = ""
+    if "STATUS" in df_updated.columns:
+        old_status_norm = str(df_updated.at[idx, "STATUS"]).strip().upper()
+        df_updated.at[idx, "STATUS"] = new_status
+    if "Status" in df_updated.columns:
+        if not old_status_norm:
+            old_status_norm = str(df_updated.at[idx, "Status"]).strip().upper()
+        df_updated.at[idx, "Status"] = new_status
+
+    ts = _now_iso()
+    if "STATUS_CHANGED_AT" in df_updated.columns:
+        df_updated.at[idx, "STATUS_CHANGED_AT"] = ts
+    if ("ONGOING" in new_status or "ON GOING" in new_status) and "ACTUAL_START_AT" in df_updated.columns:
+        if not str(df_updated.at[idx, "ACTUAL_START_AT"]).strip():
+            df_updated.at[idx, "ACTUAL_START_AT"] = ts
+    if ("DONE" in new_status or "COMPLETED" in new_status) and "ACTUAL_END_AT" in df_updated.columns:
+        if not str(df_updated.at[idx, "ACTUAL_END_AT"]).strip():
+            df_updated.at[idx, "ACTUAL_END_AT"] = ts
+    if "STATUS_LOG" in df_updated.columns:
+        existing_log = str(df_updated.at[idx, "STATUS_LOG"])
+        try:
+            df_updated.at[idx, "STATUS_LOG"] = _append_status_log(
+                existing_log,
+                {"at": ts, "from": old_status_norm, "to": new_status},
+            )
+        except Exception:
+            df_updated.at[idx, "STATUS_LOG"] = existing_log
+
+    _maybe_save(df_updated, message=f"Status set to {new_status} for {patient_name}")
+    st.toast(f"{patient_name} marked {new_status}", icon="✅")
+    st.rerun()
+
+
+def _update_row_case_paper(df_raw: pd.DataFrame, row_id, patient_name, in_time_val, case_checked: bool):
+    if df_raw is None or df_raw.empty:
+        st.warning("No schedule data to update.")
+        return
+    df_updated = df_raw.copy()
+    idx = _locate_schedule_row(df_updated, row_id, patient_name, in_time_val)
+    if idx is None:
+        st.warning("Unable to locate row for update.")
+        return
+    if "CASE PAPER" not in df_updated.columns:
+        st.warning("No QTRAQ column to update.")
+        return
+    df_updated.at[idx, "CASE PAPER"] = "Yes" if case_checked else ""
+
+    _maybe_save(df_updated, message=f"Case paper updated for {patient_name}")
+    st.toast(f"{patient_name} case paper updated")
+    st.rerun()
+
+
+def _render_full_edit_dialog_body(df_raw: pd.DataFrame, options: dict[str, list[str]]) -> None:
+    context = st.session_state.get("full_edit_context") or {}
+    if not context:
+        _close_full_edit_dialog()
+        return
+    row_key = str(context.get("row_key", "")).strip()
+    if not row_key:
+        _close_full_edit_dialog()
+        return
+
+    lookup_patient = str(context.get("lookup_patient", "") or "")
+    lookup_in_time = str(context.get("lookup_in_time", "") or "")
+    row_id = str(context.get("row_id", "") or "")
+
+    with st.form(key=f"full_popup_form_{row_key}"):
+        patient_input = st.text_input(
+            "Patient Name",
+            key=f"full_popup_patient_{row_key}",
+        )
+        time_cols = st.columns(2, gap="small")
+        with time_cols[0]:
+            with st.container():
+                st.markdown("<div class='time-select-marker'></div>", unsafe_allow_html=True)
+                st.markdown("In Time")
+                in_time_cols = st.columns(3, gap="small")
+                with in_time_cols[0]:
+                    in_hour = st.selectbox(
+                        "Hour",
+                        options=TIME_PICKER_HOURS,
+                        key=f"full_popup_in_hour_{row_key}",
+                    )
+                with in_time_cols[1]:
+                    in_minute = st.selectbox(
+                        "Minute",
+                        options=TIME_PICKER_MINUTES,
+                        key=f"full_popup_in_min_{row_key}",
+                    )
+                with in_time_cols[2]:
+                    in_ampm = st.selectbox(
+                        "AM/PM",
+                        options=TIME_PICKER_AMPM,
+                        key=f"full_popup_in_ampm_{row_key}",
+                    )
+        with time_cols[1]:
+            with st.container():
+                st.markdown("<div class='time-select-marker'></div>", unsafe_allow_html=True)
+                st.markdown("Out Time")
+                out_time_cols = st.columns(3, gap="small")
+                with out_time_cols[0]:
+                    out_hour = st.selectbox(
+                        "Hour",
+                        options=TIME_PICKER_HOURS,
+                        key=f"full_popup_out_hour_{row_key}",
+                    )
+                with out_time_cols[1]:
+                    out_minute = st.selectbox(
+                        "Minute",
+                        options=TIME_PICKER_MINUTES,
+                        key=f"full_popup_out_min_{row_key}",
+                    )
+                with out_time_cols[2]:
+                    out_ampm = st.selectbox(
+                        "AM/PM",
+                        options=TIME_PICKER_AMPM,
+                        key=f"full_popup_out_ampm_{row_key}",
+                    )
+
+        top_cols = st.columns(2, gap="small")
+        with top_cols[0]:
+            doctor_current = st.session_state.get(f"full_popup_doctor_{row_key}", "")
+            doctor_options, doctor_index = _full_build_select_options(options["doctors"], doctor_current)
+            doctor_input = st.selectbox(
+                "Doctor",
+                options=doctor_options,
+                index=doctor_index,
+                key=f"full_popup_doctor_{row_key}",
+            )
+        with top_cols[1]:
+            procedure_input = st.text_input(
+                "Procedure",
+                key=f"full_popup_procedure_{row_key}",
+            )
+
+        mid_cols = st.columns(2, gap="small")
+        with mid_cols[0]:
+            op_input = st.text_input(
+                "OP",
+                key=f"full_popup_op_{row_key}",
+            )
+        with mid_cols[1]:
+            status_current = st.session_state.get(f"full_popup_status_{row_key}", "")
+            status_options, status_index = _full_build_select_options(options["statuses"], status_current)
+            status_input = st.selectbox(
+                "Status",
+                options=status_options,
+                index=status_index,
+                key=f"full_popup_status_{row_key}",
+            )
+
+        staff_cols = st.columns(3, gap="small")
+        with staff_cols[0]:
+            first_current = st.session_state.get(f"full_popup_first_{row_key}", "")
+            first_options, first_index = _full_build_select_options(options["assistants"], first_current)
+            first_input = st.selectbox(
+                "First",
+                options=first_options,
+                index=first_index,
+                key=f"full_popup_first_{row_key}",
+            )
+        with staff_cols[1]:
+            second_current = st.session_state.get(f"full_popup_second_{row_key}", "")
+            second_options, second_index = _full_build_select_options(options["assistants"], second_current)
+            second_input = st.selectbox(
+                "Second",
+                options=second_options,
+                index=second_index,
+                key=f"full_popup_second_{row_key}",
+            )
+        with staff_cols[2]:
+            third_current = st.session_state.get(f"full_popup_third_{row_key}", "")
+            third_options, third_index = _full_build_select_options(options["assistants"], third_current)
+            third_input = st.selectbox(
+                "Third",
+                options=third_options,
+                index=third_index,
+                key=f"full_popup_third_{row_key}",
+            )
+
+        flag_cols = st.columns(3, gap="small")
+        with flag_cols[0]:
+            case_paper_input = st.checkbox(
+                "QTRAQ",
+                key=f"full_popup_case_{row_key}",
+            )
+        with flag_cols[1]:
+            suction_input = st.checkbox(
+                "Suction",
+                key=f"full_popup_suction_{row_key}",
+            )
+        with flag_cols[2]:
+            cleaning_input = st.checkbox(
+                "Cleaning",
+                key=f"full_popup_cleaning_{row_key}",
+            )
+
+        form_actions = st.columns(2, gap="small")
+        with form_actions[0]:
+            save_clicked = st.form_submit_button("Save", use_container_width=True)
+        with form_actions[1]:
+            cancel_clicked = st.form_submit_button("Cancel", use_container_width=True)
+
+    if cancel_clicked:
+        _close_full_edit_dialog()
+        st.rerun()
+    if save_clicked:
+        in_norm, in_err = _time_from_picker_parts(in_hour, in_minute, in_ampm)
+        out_norm, out_err = _time_from_picker_parts(out_hour, out_minute, out_ampm)
+        if in_err or out_err:
+            if in_err:
+                st.error(in_err)
+            if out_err:
+                st.error(out_err)
+        else:
+            updates = {
+                "Patient Name": str(patient_input or "").strip(),
+                "In Time": in_norm,
+                "Out Time": out_norm,
+                "Procedure": str(procedure_input or "").strip(),
+                "DR.": str(doctor_input or "").strip(),
+                "Doctor": str(doctor_input or "").strip(),
+                "OP": str(op_input or "").strip(),
+                "FIRST": str(first_input or "").strip(),
+                "SECOND": str(second_input or "").strip(),
+                "Third": str(third_input or "").strip(),
+                "THIRD": str(third_input or "").strip(),
+                "CASE PAPER": "Yes" if case_paper_input else "",
+                "SUCTION": bool(suction_input),
+                "CLEANING": bool(cleaning_input),
+                "STATUS": str(status_input or "").strip(),
+                "Status": str(status_input or "").strip(),
+            }
+            if _apply_full_card_edit(df_raw, row_id, lookup_patient, lookup_in_time, updates):
+                _close_full_edit_dialog()
+                st.rerun()
+
+
+if _dialog_decorator:
+    @_dialog_decorator("Edit appointment")
+    def _render_full_edit_dialog(df_raw: pd.DataFrame, options: dict[str, list[str]]) -> None:
+        _render_full_edit_dialog_body(df_raw, options)
+else:
+    def _render_full_edit_dialog(df_raw: pd.DataFrame, options: dict[str, list[str]]) -> None:
+        st.warning("Popup editing requires a newer Streamlit version.")
+        _render_full_edit_dialog_body(df_raw, options)
+
+
+def _render_schedule_cards(
+    df_raw: pd.DataFrame,
+    display_all: pd.DataFrame,
+    conflict_by_index: dict,
+    card_search: str,
+    options: dict[str, list[str]],
+) -> None:
+    df_cards = display_all.copy()
+    if card_search.strip():
+        df_cards = df_cards.loc[search_schedule_rows(
+            display_all,
+            card_search,
+            ["Patient Name", "Procedure", "DR.", "FIRST", "SECOND", "Third", "STATUS"],
+            cache_name="full_schedule_search_index",
+        )]
+
+    show_case = "CASE PAPER" in df_cards.columns
+    if df_cards.empty:
+        st.info("No patients found.")
+    else:
+        cards: list[dict[str, Any]] = []
+        for row_index, row in df_cards.iterrows():
+            patient = _clean_text(row.get("Patient Name"))
+            doctor = _clean_text(row.get("DR."))
+            procedure = _clean_text(row.get("Procedure"))
+            in_time = row.get("In Time")
+            out_time = row.get("Out Time")
+            status = _clean_text(row.get("STATUS") or row.get("Status") or "WAITING")
+            row_id = _clean_text(row.get("REMINDER_ROW_ID"))
+            staff = [
+                _clean_text(row.get("FIRST")),
+                _clean_text(row.get("SECOND")),
+                _clean_text(row.get("Third")),
+            ]
+            staff = [name for name in staff if name]
+            time_parts = [t for t in [_fmt_time(in_time), _fmt_time(out_time)] if t]
+            status_text = (status or "WAITING").strip().upper() or "WAITING"
+            row_key = row_id if row_id else f"full_{row_index}"
+            cards.append({
+                "key": row_key,
+                "row_id": row_id,
+                "patient": patient,
+                "initials": _initials(patient),
+                "in_time": in_time,
+                "in_min": (in_time.hour * 60 + in_time.minute) if isinstance(in_time, time_type) else None,
+                "time_text": " - ".join(time_parts),
+                "status": status,
+                "status_text": status_text,
+                "status_class": _status_class(status_text),
+                "doctor": doctor,
+                "procedure": procedure,
+                "staff": staff,
+                "op": _clean_text(row.get("OP")),
+                "case_paper": _truthy(row.get("CASE PAPER")),
+                "conflicts": conflict_by_index.get(row.get("_orig_idx"), ()),
+                "context": {"row_key": row_key, "row_id": row_id, "lookup_patient": patient, "lookup_in_time": _fmt_time(in_time), "patient": patient, "in_time": _fmt_time(in_time), "out_time": _fmt_time(out_time), "doctor": doctor, "procedure": procedure, "status": status, "op": _clean_text(row.get("OP")), "staff_first": _clean_text(row.get("FIRST")), "staff_second": _clean_text(row.get("SECOND")), "staff_third": _clean_text(row.get("Third")), "case_paper": _truthy(row.get("CASE PAPER")), "suction": _truthy(row.get("SUCTION")), "cleaning": _truthy(row.get("CLEANING"))},
+            })
+
+        card_action = render_schedule_card_grid(cards, key="full_cards", show_case=show_case)
+        if card_action:
+            action, card = card_action
+            if action == "done":
+                _update_row_status(df_raw, card["row_id"], card["patient"], card["in_time"], "DONE")
+            elif action == "cancel":
+                _update_row_status(df_raw, card["row_id"], card["patient"], card["in_time"], "CANCELLED")
+            elif action == "qtraq":
+                _update_row_case_paper(df_raw, card["row_id"], card["patient"], card["in_time"], not card["case_paper"])
+            elif action == "edit":
+                _open_full_edit_dialog(card["context"])
+        if st.session_state.get("full_edit_open"):
+            _render_full_edit_dialog(df_raw, options)
+
+
+def _save_full_schedule_edits(
+    df_raw: pd.DataFrame,
+    edited_all: Optional[pd.DataFrame],
+    display_all: pd.DataFrame,
+) -> None:
+    """Manual save: process edits only when the user clicks the save button."""
+    if not st.session_state.get("manual_save_triggered"):
+        return
+    # If auto-save is off and we already queued a dataframe, persist it immediately
+    pending_df = st.session_state.get("unsaved_df")
+    if pending_df is not None:
+        pending_msg = st.session_state.get("pending_changes_reason") or "Pending changes saved!"
+        if _maybe_save(pending_df, message=pending_msg, force=True):
+            st.session_state.unsaved_df = None
+            st.session_state.pending_changes = False
+            st.session_state.pending_changes_reason = ""
+        st.session_state.manual_save_triggered = False
+
+    if edited_all is not None:
+        editor_key = "full_schedule_editor"
+        changed_rows, has_additions = _get_editor_changed_rows(editor_key)
+        compare_cols = [
+            "Patient Name",
+            "In Time",
+            "Out Time",
+            "Procedure",
+            "DR.",
+            "FIRST",
+            "SECOND",
+            "Third",
+            "CASE PAPER",
+            "OP",
+            "SUCTION",
+            "CLEANING",
+            "STATUS",
+        ]
+        if has_additions:
+            changed_rows = list(edited_all.index)
+        else:
+            filtered_rows = []
+            for row_idx in changed_rows:
+                if row_idx not in edited_all.index or row_idx not in display_all.index:
+                    continue
+                if _row_has_changes(edited_all.loc[row_idx], display_all.loc[row_idx], compare_cols):
+                    filtered_rows.append(row_idx)
+            changed_rows = filtered_rows
+
+        if changed_rows:
+            try:
+                # Create a copy of the raw data to update
+                df_updated = df_raw.copy()
+
+                # Track which rows are worth attempting auto-allocation for
+                allocation_candidates: set[int] = set()
+
+                # Process edited data and convert back to original format
+                for idx in changed_rows:
+                    row = edited_all.loc[idx]
+                    # Use the preserved original index to map back to df_raw; append when new
+                    orig_idx_raw = row.get("_orig_idx", idx)
+                    if pd.isna(orig_idx_raw):
+                        orig_idx_raw = idx
+                    orig_idx = int(orig_idx_raw)
+
+                    is_new_row = orig_idx >= len(df_updated)
+                    if is_new_row:
+                        # Append a blank base row with stable reminder fields
+                        base_row: dict[str, Any] = {col: "" for col in df_updated.columns}
+                        if "REMINDER_ROW_ID" in base_row:
+                            base_row["REMINDER_ROW_ID"] = str(uuid.uuid4())
+                        if "REMINDER_SNOOZE_UNTIL" in base_row:
+                            base_row["REMINDER_SNOOZE_UNTIL"] = pd.NA
+                        if "REMINDER_DISMISSED" in base_row:
+                            base_row["REMINDER_DISMISSED"] = False
+                        if "STATUS" in base_row and not base_row.get("STATUS"):
+                            base_row["STATUS"] = "WAITING"
+                        df_updated = pd.concat([df_updated, pd.DataFrame([base_row])], ignore_index=True)
+                        orig_idx = len(df_updated) - 1
+
+                    try:
+                        old_status_norm = ""
+                        try:
+                            if (not is_new_row) and ("STATUS" in df_raw.columns) and (orig_idx < len(df_raw)):
+                                old_status_norm = str(df_raw.iloc[orig_idx, df_raw.columns.get_loc("STATUS")]).strip().upper()
+                        except Exception:
+                            old_status_norm = ""
+
+                        # Handle Patient ID (optional)
+                        if "Patient ID" in row.index and "Patient ID" in df_updated.columns:
+                            pid = str(row.get("Patient ID", "")).strip()
+                            if pid.lower() in {"nan", "none"}:
+                                pid = ""
+                            df_updated.iloc[orig_idx, df_updated.columns.get_loc("Patient ID")] = pid
+
+                        # Handle Patient Name
+                        patient_name_raw = row.get("Patient Name", "")
+                        patient_name = "" if pd.isna(patient_name_raw) else str(patient_name_raw).strip()
+                        if patient_name == "":
+                            # Clear row if patient name is empty, but preserve stable row id
+                            # so users can still delete the blank row from the dropdown.
+                            for col in df_updated.columns:
+                                if col == "REMINDER_ROW_ID":
+                                    continue
+                                if col == "REMINDER_SNOOZE_UNTIL":
+                                    df_updated.iloc[orig_idx, df_updated.columns.get_loc(col)] = pd.NA
+                                    continue
+                                if col == "REMINDER_DISMISSED":
+                                    df_updated.iloc[orig_idx, df_updated.columns.get_loc(col)] = False
+                                    continue
+                                df_updated.iloc[orig_idx, df_updated.columns.get_loc(col)] = ""
+                            continue
+                        df_updated.iloc[orig_idx, df_updated.columns.get_loc("Patient Name")] = patient_name
+
+                        # Handle In Time - properly convert time object to HH:MM string for Excel
+                        if "In Time" in row.index:
+                            in_time_val = row["In Time"]
+                            t = _coerce_to_time_obj(in_time_val)
+                            time_str = f"{t.hour:02d}:{t.minute:02d}" if t is not None else ""
+                            df_updated.iloc[orig_idx, df_updated.columns.get_loc("In Time")] = time_str
+
+                        # Handle Out Time - properly convert time object to HH:MM string for Excel
+                        if "Out Time" in row.index:
+                            out_time_val = row["Out Time"]
+                            t = _coerce_to_time_obj(out_time_val)
+                            time_str = f"{t.hour:02d}:{t.minute:02d}" if t is not None else ""
+                            df_updated.iloc[orig_idx, df_updated.columns.get_loc("Out Time")] = time_str
+
+                        # Handle other columns
+                        for col in ["Procedure", "DR.", "FIRST", "SECOND", "Third", "CASE PAPER", "OP", "STATUS"]:
+                            if col in row.index and col in df_updated.columns:
+                                val = row[col]
+                                clean_val = str(val).strip() if val and str(val) != "nan" else ""
+                                df_updated.iloc[orig_idx, df_updated.columns.get_loc(col)] = clean_val
+
+                        # Time tracking: update timestamps + log on STATUS changes
+                        try:
+                            if "STATUS" in df_updated.columns:
+                                new_status_norm = str(df_updated.iloc[orig_idx, df_updated.columns.get_loc("STATUS")]).strip().upper()
+                                if new_status_norm and new_status_norm != old_status_norm:
+                                    ts = _now_ist_str()
+                                    if "STATUS_CHANGED_AT" in df_updated.columns:
+                                        df_updated.iloc[orig_idx, df_updated.columns.get_loc("STATUS_CHANGED_AT")] = ts
+
+                                    # Actual start/end stamps (only fill first time)
+                                    if ("ON GOING" in new_status_norm or "ONGOING" in new_status_norm) and "ACTUAL_START_AT" in df_updated.columns:
+                                        cur = str(df_updated.iloc[orig_idx, df_updated.columns.get_loc("ACTUAL_START_AT")]).strip()
+                                        if not cur or cur.lower() in {"nan", "none"}:
+                                            df_updated.iloc[orig_idx, df_updated.columns.get_loc("ACTUAL_START_AT")] = ts
+                                    if ("DONE" in new_status_norm or "COMPLETED" in new_status_norm) and "ACTUAL_END_AT" in df_updated.columns:
+                                        cur = str(df_updated.iloc[orig_idx, df_updated.columns.get_loc("ACTUAL_END_AT")]).strip()
+                                        if not cur or cur.lower() in {"nan", "none"}:
+                                            df_updated.iloc[orig_idx, df_updated.columns.get_loc("ACTUAL_END_AT")] = ts
+
+                                    if "STATUS_LOG" in df_updated.columns:
+                                        existing_log = ""
+                                        try:
+                                            if (not is_new_row) and (orig_idx < len(df_raw)) and ("STATUS_LOG" in df_raw.columns):
+                                                existing_log = str(df_raw.iloc[orig_idx, df_raw.columns.get_loc("STATUS_LOG")])
+                                        except Exception:
+                                            existing_log = ""
+                                        df_updated.iloc[orig_idx, df_updated.columns.get_loc("STATUS_LOG")] = _append_status_log(
+                                            existing_log,
+                                            {
+                                                "at": ts,
+                                                "from": old_status_norm,
+                                                "to": new_status_norm,
+                                            },
+                                        )
+                        except Exception:
+                            pass
+
+                        # Candidate for allocation if doctor+times exist (helper will decide)
+                        allocation_candidates.add(orig_idx)
+
+                        # Handle checkbox columns (SUCTION, CLEANING) - convert boolean to check mark or empty
+                        for col in ["SUCTION", "CLEANING"]:
+                            if col in row.index and col in df_updated.columns:
+                                val = row[col]
+                                # Store True as "✓" checkmark, False/None as empty string
+                                if pd.isna(val) or val is None or val == False:
+                                    df_updated.iloc[orig_idx, df_updated.columns.get_loc(col)] = ""
+                                elif val == True:
+                                    df_updated.iloc[orig_idx, df_updated.columns.get_loc(col)] = "✓"
+                                else:
+                                    df_updated.iloc[orig_idx, df_updated.columns.get_loc(col)] = ""
+                    except Exception as col_error:
+                        st.warning(f"Warning updating row {orig_idx}: {str(col_error)}")
+                        continue
+
+                # Auto-allocate assistants after applying all row edits
+                if bool(st.session_state.get("auto_assign_assistants", True)):
+                    only_empty = bool(st.session_state.get("auto_assign_only_empty", True))
+                    invalidate_availability("schedule")
+                    availability = get_availability_snapshot(df_updated) if allocation_candidates else None
+                    for ix in sorted(allocation_candidates):
+                        _auto_fill_assistants_for_row(
+                            df_updated, ix, only_fill_empty=only_empty, availability=availability
+                        )
+
+                # Write back to storage (manual save always persists)
+                save_ok = _maybe_save(df_updated, message="Schedule updated!", force=True)
+                st.session_state.manual_save_triggered = False
+                if save_ok:
+                    st.session_state.unsaved_df = None
+                    st.session_state.pending_changes = False
+                    st.session_state.pending_changes_reason = ""
+            except Exception as e:
+                st.error(f"Error saving: {e}")
+                st.session_state.manual_save_triggered = False
+        else:
+            # Nothing changed; clear the trigger so it doesn't keep firing on rerun
+            st.session_state.manual_save_triggered = False
+    else:
+        st.session_state.manual_save_triggered = False
+
+
+def render_full_schedule(df_raw: pd.DataFrame, df: pd.DataFrame) -> None:
+    """Full Schedule: add/save/delete controls, the card grid or table editor, and the manual save."""
+    options = schedule_dropdown_options(df_raw)
+    all_sorted = df
+
+    # Manual save button and patient controls for schedule editor
+    st.markdown("### 📋 Full Schedule")
+    render_schedule_summary_chips(all_sorted)
+
+    if not st.session_state.get("auto_save_enabled", False):
+        st.caption("Auto-save is OFF. Use 'Save Changes' to persist updates.")
+    if st.session_state.get("pending_changes"):
+        st.warning("You have pending changes that are not saved yet.")
+
+    col_add, col_save, col_del = st.columns([0.15, 0.20, 0.45])
+
+    with col_add:
+        if st.button(
+            "➕ Add Patient",
+            key="add_patient_btn",
+            use_container_width=True,
+        ):
+            # Create a new empty row
+            new_row = _blank_schedule_row()
+            # Append to the dataframe
+            new_row_df = pd.DataFrame([new_row])
+            df_raw_with_new = pd.concat([df_raw, new_row_df], ignore_index=True)
+
+            # FORCE save the updated dataframe immediately
+            _maybe_save(df_raw_with_new, show_toast=False, message="New patient row added!", force=True)
+            st.success("New patient row added!")
+
+            # Clear cache so fresh data loads on rerun
+            if "cached_df_raw" in st.session_state:
+                del st.session_state.cached_df_raw
+            if "cached_df_timestamp" in st.session_state:
+                del st.session_state.cached_df_timestamp
+
+            st.rerun()
+
+    with col_save:
+        # Save button for the data editor
+        if st.button(
+            "?? Save Changes",
+            key="manual_save_full",
+            use_container_width=True,
+            type="primary",
+            disabled=bool(st.session_state.get("is_saving")) or bool(st.session_state.get("save_conflict")),
+        ):
+            st.session_state.manual_save_triggered = True
+
+    with col_del:
+        if st.button(
+            "🗑️ Delete rows…",
+            key="delete_rows_btn",
+            help="Pick one or more rows to delete",
+            use_container_width=True,
+        ):
+            st.session_state.delete_rows_open = True
+
+    if st.session_state.get("delete_rows_open"):
+        if _dialog_decorator:
+            # The dialog reruns on its own while open; closing it with ✕ must not reopen it.
+            st.session_state.delete_rows_open = False
+        _render_delete_rows_dialog(df_raw)
+    view_cols = st.columns([0.2, 0.8], gap="small")
+    with view_cols[0]:
+        view_mode = st.radio(
+            "View",
+            ["Cards", "Table"],
+            horizontal=True,
+            key="full_schedule_view_mode",
+            label_visibility="collapsed",
+        )
+    with view_cols[1]:
+        card_search = st.text_input(
+            "Search schedule",
+            value="",
+            key="full_schedule_card_search",
+            placeholder="Search schedule...",
+            label_visibility="collapsed",
+        )
+
+    # Editor-ready frame, cached per schedule content; only overtime is re-patched per minute
+    display_all = get_editor_frame(
+        "editor_display_all",
+        all_sorted,
+        [
+            "Patient Name",
+            "In Time Obj",
+            "Out Time Obj",
+            "Procedure",
+            "DR.",
+            "FIRST",
+            "SECOND",
+            "Third",
+            "CASE PAPER",
+            "OP",
+            "SUCTION",
+            "CLEANING",
+            "REMINDER_ROW_ID",
+            "STATUS",
+            "STATUS_CHANGED_AT",
+            "ACTUAL_START_AT",
+            "ACTUAL_END_AT",
+        ],
+        runtime.current_minute(),
+        text_cols=["Patient Name", "Procedure", "DR.", "FIRST", "SECOND", "Third", "CASE PAPER", "OP", "STATUS"],
+    )
+
+    # Double-booking flags from the sweep-line detector (cached per schedule version)
+    schedule_conflicts = find_schedule_conflicts(all_sorted)
+    conflict_by_index = schedule_conflicts["by_index"]
+    display_all["Conflict"] = display_all["_orig_idx"].map(
+        lambda i: " · ".join(conflict_by_index.get(i, ()))
+    )
+    if schedule_conflicts["count"]:
+        st.warning(f"⚠️ {schedule_conflicts['count']} appointment(s) have an assistant or OP double-booked.")
+
+    st.markdown(_FULL_SCHEDULE_CSS, unsafe_allow_html=True)
+
+    edited_all = None
+    if view_mode == "Table":
+        edited_all = st.data_editor(
+            display_all,
+            width="stretch",
+            key="full_schedule_editor",
+            hide_index=True,
+            disabled=["STATUS_CHANGED_AT", "ACTUAL_START_AT", "ACTUAL_END_AT", "Overtime (min)", "Conflict"],
+            column_config={
+                "_orig_idx": None,  # Hide the original index column
+                "Conflict": st.column_config.TextColumn(label="⚠️ Conflict"),
+                "REMINDER_ROW_ID": None,
+                "Patient Name": st.column_config.TextColumn(label="Patient Name"),
+                "In Time": st.column_config.TimeColumn(label="In Time", format="hh:mm A"),
+                "Out Time": st.column_config.TimeColumn(label="Out Time", format="hh:mm A"),
+                "Procedure": st.column_config.TextColumn(label="Procedure"),
+                "DR.": st.column_config.SelectboxColumn(
+                    label="DR.",
+                    options=options["doctors"],
+                    required=False,
+                ),
+                "OP": st.column_config.SelectboxColumn(
+                    label="OP",
+                    options=["OP 1", "OP 2", "OP 3", "OP 4"],
+                    required=False,
+                ),
+                "FIRST": st.column_config.SelectboxColumn(
+                    label="FIRST",
+                    options=options["assistants"],
+                    required=False,
+                ),
+                "SECOND": st.column_config.SelectboxColumn(
+                    label="SECOND",
+                    options=options["assistants"],
+                    required=False,
+                ),
+                "Third": st.column_config.SelectboxColumn(
+                    label="Third",
+                    options=options["assistants"],
+                    required=False,
+                ),
+                "CASE PAPER": st.column_config.SelectboxColumn(
+                    label="QTRAQ",
+                    options=options["assistants"],
+                    required=False,
+                ),
+                "SUCTION": st.column_config.CheckboxColumn(label="SUCTION"),
+                "CLEANING": st.column_config.CheckboxColumn(label="CLEANING"),
+                "STATUS_CHANGED_AT": None,
+                "ACTUAL_START_AT": None,
+                "ACTUAL_END_AT": None,
+                "Overtime (min)": None,
+                "STATUS": st.column_config.SelectboxColumn(
+                    label="STATUS",
+                    options=options["statuses"],
+                    required=False,
+                ),
+            },
+        )
+    else:
+        _render_schedule_cards(df_raw, display_all, conflict_by_index, card_search, options)
+
+    _save_full_schedule_edits(df_raw, edited_all, display_all)
+
+
+def render_schedule_by_op(df_raw: pd.DataFrame, df: pd.DataFrame) -> None:
+    """Per-chair view: occupancy Gantt plus one editor for the selected OP."""
+    options = schedule_dropdown_options(df_raw)
+    st.markdown("###  Schedule by OP")
+
+    # Whole-day chair occupancy: one HTML Gantt plus a small summary table
+    op_timeline = get_op_timeline(df, runtime.current_minute())
+    if op_timeline["ops"]:
+        with st.expander("🪑 Chair utilization", expanded=True):
+            st.markdown(op_timeline["html"], unsafe_allow_html=True)
+            st.dataframe(
+                op_timeline["summary"],
+                use_container_width=True,
+                hide_index=True,
+                column_config={
+                    "Utilization %": st.column_config.ProgressColumn(
+                        "Utilization %",
+                        help="Occupied minutes / day window",
+                        format="%.1f%%",
+                        min_value=0,
+                        max_value=100,
+                    ),
+                },
+            )
+            day_start, day_end = op_timeline["window"]
+            st.caption(
+                f"Day window {mins_to_hhmm(day_start % DAY_MINUTES)}–{mins_to_hhmm(day_end % DAY_MINUTES)} · "
+                "striped = double-booked · red = overrun past scheduled end"
+            )
+
+    op_index = get_op_row_index(df)
+    unique_ops = op_index["ops"]
+    op_conflicts = find_schedule_conflicts(df)["by_index"]
+
+    if unique_ops:
+        # Only the selected chair's editor is built and sent to the browser.
+        op = st.radio(
+            "Chair",
+            unique_ops,
+            horizontal=True,
+            key="op_view_chair",
+            format_func=lambda o: f"{o} ({len(op_index['rows'].get(o, ()))})",
+            label_visibility="collapsed",
+        )
+        op_df = df.loc[op_index["rows"].get(op, df.index[:0])]
+        display_op = get_editor_frame(
+            "editor_display_op",
+            op_df,
+            [
+                "Patient ID",
+                "Patient Name",
+                "In Time Obj",
+                "Out Time Obj",
+                "Procedure",
+                "DR.",
+                "OP",
+                "FIRST",
+                "SECOND",
+                "Third",
+                "CASE PAPER",
+                "SUCTION",
+                "CLEANING",
+                "STATUS",
+                "STATUS_CHANGED_AT",
+                "ACTUAL_START_AT",
+                "ACTUAL_END_AT",
+            ],
+            runtime.current_minute(),
+            text_cols=["Patient ID", "Patient Name", "Procedure", "DR.", "FIRST", "SECOND", "Third", "CASE PAPER", "OP", "STATUS"],
+            text_dtype="string",
+            bool_cols=["SUCTION", "CLEANING"],
+        )
+        display_op["Conflict"] = display_op["_orig_idx"].map(
+            lambda i: " · ".join(op_conflicts.get(i, ()))
+        )
+        op_conflict_count = int((display_op["Conflict"] != "").sum())
+        if op_conflict_count:
+            st.warning(f"⚠️ {op_conflict_count} appointment(s) in {op} have a double-booking conflict.")
+
+        edited_op = st.data_editor(
+            display_op, 
+            width="stretch", 
+            key=f"op_{str(op).replace(' ', '_')}_editor", 
+            hide_index=True,
+            disabled=["STATUS_CHANGED_AT", "ACTUAL_START_AT", "ACTUAL_END_AT", "Overtime (min)", "Conflict"],
+            column_config={
+                "_orig_idx": None,
+                "Conflict": st.column_config.TextColumn(label="⚠️ Conflict"),
+                "Patient ID": st.column_config.TextColumn(label="Patient ID", required=False),
+                "In Time": st.column_config.TimeColumn(label="In Time", format="hh:mm A"),
+                "Out Time": st.column_config.TimeColumn(label="Out Time", format="hh:mm A"),
+                "DR.": st.column_config.SelectboxColumn(
+                    label="DR.",
+                    options=options["doctors"],
+                    required=False
+                ),
+                "OP": st.column_config.SelectboxColumn(
+                    label="OP",
+                    options=["OP 1", "OP 2", "OP 3", "OP 4"],
+                    required=False
+                ),
+                "FIRST": st.column_config.SelectboxColumn(
+                    label="FIRST",
+                    options=options["assistants"],
+                    required=False
+                ),
+                "SECOND": st.column_config.SelectboxColumn(
+                    label="SECOND",
+                    options=options["assistants"],
+                    required=False
+                ),
+                "Third": st.column_config.SelectboxColumn(
+                    label="Third",
+                    options=options["assistants"],
+                    required=False
+                ),
+                "CASE PAPER": st.column_config.SelectboxColumn(
+                    label="QTRAQ",
+                    options=options["assistants"],
+                    required=False
+                ),
+                "STATUS_CHANGED_AT": st.column_config.TextColumn(label="Status Changed At"),
+                "ACTUAL_START_AT": st.column_config.TextColumn(label="Actual Start"),
+                "ACTUAL_END_AT": st.column_config.TextColumn(label="Actual End"),
+                "Overtime (min)": st.column_config.NumberColumn(label="Overtime (min)"),
+                "STATUS": st.column_config.SelectboxColumn(
+                    label="STATUS",
+                    options=options["statuses"],
+                    required=False
+                )
+            }
+        )
+
+        # Persist edits from OP tabs
+        if edited_op is not None:
+            editor_key = f"op_{str(op).replace(' ', '_')}_editor"
+            changed_rows, has_additions = _get_editor_changed_rows(editor_key)
+            compare_cols = [
+                "Patient ID",
+                "Patient Name",
+                "In Time",
+                "Out Time",
+                "Procedure",
+                "DR.",
+                "OP",
+                "FIRST",
+                "SECOND",
+                "Third",
+                "CASE PAPER",
+                "SUCTION",
+                "CLEANING",
+                "STATUS",
+            ]
+            if has_additions:
+                changed_rows = list(edited_op.index)
+            else:
+                filtered_rows = []
+                for row_idx in changed_rows:
+                    if row_idx not in edited_op.index or row_idx not in display_op.index:
+                        continue
+                    if _row_has_changes(edited_op.loc[row_idx], display_op.loc[row_idx], compare_cols):
+                        filtered_rows.append(row_idx)
+                changed_rows = filtered_rows
+
+            if changed_rows:
+                try:
+                    df_updated = df_raw.copy()
+                    allocation_candidates: set[int] = set()
+                    for idx in changed_rows:
+                        row = edited_op.loc[idx]
+                        orig_idx_raw = row.get("_orig_idx")
+                        if pd.isna(orig_idx_raw):
+                            orig_idx_raw = len(df_updated)
+                        orig_idx = int(orig_idx_raw)
+
+                        is_new_row = (orig_idx < 0) or (orig_idx >= len(df_updated))
+                        if is_new_row:
+                            base_row: dict[str, Any] = {col: "" for col in df_updated.columns}
+                            if "REMINDER_ROW_ID" in base_row:
+                                base_row["REMINDER_ROW_ID"] = str(uuid.uuid4())
+                            if "REMINDER_SNOOZE_UNTIL" in base_row:
+                                base_row["REMINDER_SNOOZE_UNTIL"] = pd.NA
+                            if "REMINDER_DISMISSED" in base_row:
+                                base_row["REMINDER_DISMISSED"] = False
+                            if "STATUS" in base_row and not base_row.get("STATUS"):
+                                base_row["STATUS"] = "WAITING"
+                            df_updated = pd.concat([df_updated, pd.DataFrame([base_row])], ignore_index=True)
+                            orig_idx = len(df_updated) - 1
+
+                        old_status_norm = ""
+                        try:
+                            if (not is_new_row) and ("STATUS" in df_raw.columns) and (orig_idx < len(df_raw)):
+                                old_status_norm = str(df_raw.iloc[orig_idx, df_raw.columns.get_loc("STATUS")]).strip().upper()
+                        except Exception:
+                            old_status_norm = ""
+
+                        # Patient ID
+                        patient_id = str(row.get("Patient ID", "")).strip()
+                        if "Patient ID" in df_updated.columns:
+                            df_updated.iloc[orig_idx, df_updated.columns.get_loc("Patient ID")] = patient_id
+
+                        # Patient Name
+                        patient_name_raw = row.get("Patient Name", "")
+                        patient_name = "" if pd.isna(patient_name_raw) else str(patient_name_raw).strip()
+                        if patient_name == "":
+                            for c in df_updated.columns:
+                                if c == "REMINDER_ROW_ID":
+                                    continue
+                                if c == "REMINDER_SNOOZE_UNTIL":
+                                    df_updated.iloc[orig_idx, df_updated.columns.get_loc(c)] = pd.NA
+                                    continue
+                                if c == "REMINDER_DISMISSED":
+                                    df_updated.iloc[orig_idx, df_updated.columns.get_loc(c)] = False
+                                    continue
+                                df_updated.iloc[orig_idx, df_updated.columns.get_loc(c)] = ""
+                            continue
+                        if "Patient Name" in df_updated.columns:
+                            df_updated.iloc[orig_idx, df_updated.columns.get_loc("Patient Name")] = patient_name
+
+                        # Times -> canonical HH:MM strings
+                        if "In Time" in df_updated.columns:
+                            t = _coerce_to_time_obj(row.get("In Time"))
+                            df_updated.iloc[orig_idx, df_updated.columns.get_loc("In Time")] = (
+                                f"{t.hour:02d}:{t.minute:02d}" if t is not None else ""
+                            )
+                        if "Out Time" in df_updated.columns:
+                            t = _coerce_to_time_obj(row.get("Out Time"))
+                            df_updated.iloc[orig_idx, df_updated.columns.get_loc("Out Time")] = (
+                                f"{t.hour:02d}:{t.minute:02d}" if t is not None else ""
+                            )
+
+                        for c in ["Procedure", "DR.", "OP", "FIRST", "SECOND", "Third", "CASE PAPER", "STATUS"]:
+                            if c in row.index and c in df_updated.columns:
+                                val = row.get(c)
+                                clean_val = str(val).strip() if val and str(val) != "nan" else ""
+                                df_updated.iloc[orig_idx, df_updated.columns.get_loc(c)] = clean_val
+
+                        # Time tracking: update timestamps + log on STATUS changes
+                        try:
+                            if "STATUS" in df_updated.columns:
+                                new_status_norm = str(df_updated.iloc[orig_idx, df_updated.columns.get_loc("STATUS")]).strip().upper()
+                                if new_status_norm and new_status_norm != old_status_norm:
+                                    ts = _now_ist_str()
+                                    if "STATUS_CHANGED_AT" in df_updated.columns:
+                                        df_updated.iloc[orig_idx, df_updated.columns.get_loc("STATUS_CHANGED_AT")] = ts
+
+                                    if ("ON GOING" in new_status_norm or "ONGOING" in new_status_norm) and "ACTUAL_START_AT" in df_updated.columns:
+                                        cur = str(df_updated.iloc[orig_idx, df_updated.columns.get_loc("ACTUAL_START_AT")]).strip()
+                                        if not cur or cur.lower() in {"nan", "none"}:
+                                            df_updated.iloc[orig_idx, df_updated.columns.get_loc("ACTUAL_START_AT")] = ts
+                                    if ("DONE" in new_status_norm or "COMPLETED" in new_status_norm) and "ACTUAL_END_AT" in df_updated.columns:
+                                        cur = str(df_updated.iloc[orig_idx, df_updated.columns.get_loc("ACTUAL_END_AT")]).strip()
+                                        if not cur or cur.lower() in {"nan", "none"}:
+                                            df_updated.iloc[orig_idx, df_updated.columns.get_loc("ACTUAL_END_AT")] = ts
+
+                                    if "STATUS_LOG" in df_updated.columns:
+                                        existing_log = ""
+                                        try:
+                                            if (not is_new_row) and (orig_idx < len(df_raw)) and ("STATUS_LOG" in df_raw.columns):
+                                                existing_log = str(df_raw.iloc[orig_idx, df_raw.columns.get_loc("STATUS_LOG")])
+                                        except Exception:
+                                            existing_log = ""
+                                        df_updated.iloc[orig_idx, df_updated.columns.get_loc("STATUS_LOG")] = _append_status_log(
+                                            existing_log,
+                                            {"at": ts, "from": old_status_norm, "to": new_status_norm},
+                                        )
+                        except Exception:
+                            pass
+
+                        allocation_candidates.add(orig_idx)
+
+                        for c in ["SUCTION", "CLEANING"]:
+                            if c in row.index and c in df_updated.columns:
+                                val = row.get(c)
+                                if pd.isna(val) or val is None or val is False:
+                                    df_updated.iloc[orig_idx, df_updated.columns.get_loc(c)] = ""
+                                elif val is True:
+                                    df_updated.iloc[orig_idx, df_updated.columns.get_loc(c)] = "✓"
+                                else:
+                                    df_updated.iloc[orig_idx, df_updated.columns.get_loc(c)] = ""
+
+                    if bool(st.session_state.get("auto_assign_assistants", True)):
+                        only_empty = bool(st.session_state.get("auto_assign_only_empty", True))
+                        invalidate_availability("schedule")
+                        availability = get_availability_snapshot(df_updated) if allocation_candidates else None
+                        for ix in sorted(allocation_candidates):
+                            _auto_fill_assistants_for_row(
+                                df_updated, ix, only_fill_empty=only_empty, availability=availability
+                            )
+
+                    _maybe_save(df_updated, message=f"Schedule updated for {op}!")
+                    st.rerun()
+                except Exception as e:
+                    st.error(f"Error saving {op} edits: {e}")
+    else:
+        st.info("No chair data available.")
@@ -0,0 +1,686 @@
+# pyright: reportMissingImports=false, reportMissingModuleSource=false, reportUnknownVariableType=false, reportUnknownArgumentType=false, reportUnknownParameterType=false, reportUnknownMemberType=false, reportGeneralTypeIssues=false
+"""Sidebar panels: settings and weekly offs (every page), save mode, time blocking and
+reset (schedule pages), and the punch / duty widgets.
+"""
+
+from datetime import datetime, timedelta
+from typing import Any, Optional
+
+import pandas as pd
+import streamlit as st
+
+import runtime
+import storage
+from allocation import _remove_assistant_assignments, get_next_busy_minute, stage_rebalance
+from staff import WEEKLY_OFF, _get_all_assistants, _get_profiles_cache_snapshot
+from status import add_time_block, remove_time_block
+from storage import (
+    _get_cached_schedule_backups,
+    _make_cleared_schedule,
+    _maybe_save,
+    db_get_one_attendance,
+    db_punch_in,
+    db_punch_out,
+    fetch_active_duty_assignments,
+    fetch_active_duty_run,
+    fetch_duty_runs_since,
+    file_path,
+    load_attendance_sheet,
+    load_data_from_supabase,
+    load_profiles,
+    mark_duty_done_supabase,
+    save_attendance_sheet,
+    start_duty_run_supabase,
+)
+from ui import LIVE_DUTY_REFRESH, live_fragment, render_countdown
+from utils import IST, _date_from_any, _parse_iso_ts, ist_today_and_time, now_ist
+
+
+# ================ ATTENDANCE PUNCH ================
+@live_fragment()
+def sidebar_punch_widget(schedule_df: pd.DataFrame, excel_path: Optional[str] = None):
+    today = datetime.now(IST).date().isoformat()
+    now_hhmm = datetime.now(IST).strftime("%H:%M")
+
+    att = load_attendance_sheet(excel_path)
+
+    # Load assistants from Assistants sheet (not from schedule)
+    try:
+        assistants_df = load_profiles("Assistants")
+        assistants = sorted(assistants_df["name"].dropna().astype(str).str.strip().unique().tolist()) if not assistants_df.empty else []
+    except Exception:
+        assistants = []
+
+    st.markdown("### 👇 Punch System")
+    if not assistants:
+        st.caption("No assistants found in Assistants sheet. Add assistants first.")
+        return
+
+    assistant = st.selectbox("Select Assistant", assistants, key="sb_assistant")
+    if assistant is None:
+        return
+
+    mask = (att["DATE"] == today) & (att["ASSISTANT"] == assistant)
+    row = att.loc[mask].head(1)
+
+    punch_in = row["PUNCH IN"].iloc[0] if not row.empty else ""
+    punch_out = row["PUNCH OUT"].iloc[0] if not row.empty else ""
+
+    if punch_in and not punch_out:
+        st.success(f"Status: PUNCHED IN at {punch_in}")
+    elif punch_in and punch_out:
+        st.info(f"Status: COMPLETED • In {punch_in} • Out {punch_out}")
+    else:
+        st.warning("Status: Not punched in")
+
+    c1, c2 = st.columns(2)
+
+    with c1:
+        disabled_in = bool(punch_in)
+        if st.button("✅ Punch In", use_container_width=True, disabled=disabled_in):
+            if row.empty:
+                new_row = pd.DataFrame([{
+                    "DATE": today,
+                    "ASSISTANT": assistant,
+                    "PUNCH IN": now_hhmm,
+                    "PUNCH OUT": "",
+                }])
+                att = pd.concat([att, new_row], ignore_index=True)
+            else:
+                att.loc[mask, "PUNCH IN"] = now_hhmm
+            save_attendance_sheet(excel_path, att)
+            st.toast(f"{assistant} punched in at {now_hhmm}", icon="✅")
+            st.rerun()
+
+    with c2:
+        disabled_out = (not punch_in) or bool(punch_out)
+        if st.button("⏹ Punch Out", use_container_width=True, disabled=disabled_out):
+            att.loc[mask, "PUNCH OUT"] = now_hhmm
+            save_attendance_sheet(excel_path, att)
+            st.toast(f"{assistant} punched out at {now_hhmm}", icon="⏹")
+            updated_df = _remove_assistant_assignments(schedule_df, assistant)
+            if updated_df is not None:
+                _maybe_save(updated_df, message=f"{assistant} removed from allotment after punch out")
+            now_dt = now_ist()
+            stage_rebalance(schedule_df, assistant, now_dt.hour * 60 + now_dt.minute, reason=f"{assistant} punched out")
+            st.rerun()
+
+    with st.expander("Admin actions"):
+        if st.button("♻️ Reset today for this assistant", use_container_width=True):
+            att = att.loc[~mask].copy()
+            save_attendance_sheet(excel_path, att)
+            st.toast("Reset done", icon="♻️")
+            st.rerun()
+
+
+@live_fragment()
+def sidebar_punch_widget_supabase(schedule_df: pd.DataFrame, supabase):
+    date_str, now_time = ist_today_and_time()
+    now_hhmm = now_time[:5]
+
+    st.markdown("### 👇 Punch System")
+
+    # Load assistants from Assistants sheet (not from schedule)
+    try:
+        assistants_df = load_profiles("Assistants")
+        assistants = sorted(assistants_df["name"].dropna().astype(str).str.strip().unique().tolist()) if not assistants_df.empty else []
+    except Exception:
+        assistants = []
+
+    if not assistants:
+        st.caption("No assistants found in Assistants sheet. Add assistants first.")
+        return
+
+    assistant = st.selectbox("Select Assistant", assistants, key="sb_assistant")
+    if assistant is None:
+        return
+
+    rec = db_get_one_attendance(supabase, date_str, assistant)
+    punch_in = (rec.get("punch_in") if rec else None) or ""
+    punch_out = (rec.get("punch_out") if rec else None) or ""
+
+    if punch_in and not punch_out:
+        st.success(f"Status: PUNCHED IN at {str(punch_in)[:5]}")
+    elif punch_in and punch_out:
+        st.info(f"Status: COMPLETED • In {str(punch_in)[:5]} • Out {str(punch_out)[:5]}")
+    else:
+        st.warning("Status: Not punched in")
+
+    c1, c2 = st.columns(2)
+
+    with c1:
+        if st.button("✅ Punch In", use_container_width=True, disabled=bool(punch_in)):
+            db_punch_in(supabase, date_str, assistant, now_time)
+            st.toast(f"{assistant} punched in at {now_hhmm}", icon="✅")
+            st.rerun()
+
+    with c2:
+        if st.button("⏹ Punch Out", use_container_width=True, disabled=(not punch_in) or bool(punch_out)):
+            db_punch_out(supabase, date_str, assistant, now_time)
+            st.toast(f"{assistant} punched out at {now_hhmm}", icon="⏹")
+            updated_df = _remove_assistant_assignments(schedule_df, assistant)
+            if updated_df is not None:
+                _maybe_save(updated_df, message=f"{assistant} removed from allotment after punch out")
+            now_dt = now_ist()
+            stage_rebalance(schedule_df, assistant, now_dt.hour * 60 + now_dt.minute, reason=f"{assistant} punched out")
+            st.rerun()
+
+
+# ================ DUTY REMINDER ================
+def compute_pending_duties(assignments: list[dict[str, Any]], runs: list[dict[str, Any]], today_date) -> dict[str, list[dict[str, Any]]]:
+    week_start = today_date - timedelta(days=today_date.weekday())
+    month_start = today_date.replace(day=1)
+    done_week: set = set()
+    done_month: set = set()
+    for r in runs:
+        if str(r.get("status", "")).upper() != "DONE":
+            continue
+        r_date = _date_from_any(r.get("date"))
+        if r_date is None:
+            continue
+        if r_date >= week_start:
+            done_week.add(r.get("duty_id"))
+        if r_date >= month_start:
+            done_month.add(r.get("duty_id"))
+    pending = {"WEEKLY": [], "MONTHLY": []}
+    for a in assignments:
+        freq = str(a.get("frequency", "")).upper()
+        if freq == "WEEKLY" and a.get("duty_id") not in done_week:
+            pending["WEEKLY"].append(a)
+        elif freq == "MONTHLY" and a.get("duty_id") not in done_month:
+            pending["MONTHLY"].append(a)
+    return pending
+
+
+def compute_free_minutes_for_assistant(schedule_df: pd.DataFrame, assistant: str) -> Optional[int]:
+    if schedule_df is None or schedule_df.empty or not assistant:
+        return None
+    now_dt = now_ist()
+    now_min = now_dt.hour * 60 + now_dt.minute
+    # Appointment layer only: time blocks do not count against duty slack.
+    next_busy = get_next_busy_minute(assistant, schedule_df, from_min=now_min, layer="appt")
+    if next_busy is None:
+        return 999
+    return max(0, next_busy - now_min)
+
+
+@live_fragment(run_every=LIVE_DUTY_REFRESH)
+def render_duty_reminder_widget(schedule_df: pd.DataFrame, supabase):
+    st.markdown("### 🧭 Duties")
+    # Duties are now stored in Excel (supabase parameter kept for compatibility but not used)
+
+    # Load assistants from Assistants sheet (not from schedule)
+    try:
+        assistants_df = load_profiles("Assistants")
+        assistants = sorted(assistants_df["name"].dropna().astype(str).str.strip().unique().tolist()) if not assistants_df.empty else []
+    except Exception:
+        assistants = []
+
+    if not assistants:
+        st.caption("No assistants found in Assistants sheet. Add assistants first.")
+        return
+
+    default_idx = 0
+    try:
+        if st.session_state.get("duty_current_assistant") in assistants:
+            default_idx = assistants.index(st.session_state.get("duty_current_assistant"))
+    except Exception:
+        default_idx = 0
+
+    selected_assistant = st.selectbox(
+        "Assistant (for this device)",
+        options=assistants,
+        index=default_idx if default_idx < len(assistants) else 0,
+        key="duty_assistant_select",
+    )
+    st.session_state.duty_current_assistant = selected_assistant
+
+    if not selected_assistant:
+        st.caption("Select an assistant to view duties.")
+        return
+
+    # Sync active run from Supabase (server truth)
+    active_run = fetch_active_duty_run(supabase, selected_assistant)
+    if active_run and st.session_state.get("active_duty_run_id") != active_run.get("id"):
+        st.session_state.active_duty_run_id = active_run.get("id")
+        st.session_state.active_duty_due_at = active_run.get("due_at")
+        st.session_state.active_duty_started_at = active_run.get("started_at")
+        st.session_state.active_duty_est_minutes = active_run.get("est_minutes")
+    if not active_run and st.session_state.get("duty_current_assistant") == selected_assistant and st.session_state.get("active_duty_run_id"):
+        # Clear stale local state if server shows none
+        for k in ["active_duty_run_id", "active_duty_due_at", "active_duty_started_at", "active_duty_est_minutes"]:
+            st.session_state[k] = None
+
+    active_run_id = st.session_state.get("active_duty_run_id")
+    if active_run_id:
+        due_dt = _parse_iso_ts(st.session_state.get("active_duty_due_at"))
+        started_dt = _parse_iso_ts(st.session_state.get("active_duty_started_at"))
+        if due_dt and render_countdown(
+            due_dt,
+            "⏱ Duty timer running •",
+            key=f"duty_countdown_{active_run_id}",
+            expired_label="⚠️ Time over!",
+        ):
+            st.error("⚠️ Time over! Please finish and mark Done.")
+        if started_dt:
+            st.caption(f"Started at {started_dt.strftime('%H:%M')} IST")
+
+        if st.button("✅ Mark Done", use_container_width=True, key="duty_mark_done_btn"):
+            ok = mark_duty_done_supabase(supabase, active_run_id)
+            if ok:
+                for k in ["active_duty_run_id", "active_duty_due_at", "active_duty_started_at", "active_duty_est_minutes"]:
+                    st.session_state[k] = None
+                st.toast("Duty marked DONE ✅", icon="✅")
+                st.rerun()
+        return
+
+    today = now_ist().date()
+    assignments = fetch_active_duty_assignments(supabase, selected_assistant)
+    week_start = today - timedelta(days=today.weekday())
+    month_start = today.replace(day=1)
+    runs = fetch_duty_runs_since(
+        supabase,
+        selected_assistant,
+        (week_start if week_start < month_start else month_start).isoformat(),
+    )
+    pending = compute_pending_duties(assignments, runs, today)
+    total_pending = len(pending["WEEKLY"]) + len(pending["MONTHLY"])
+
+    free_minutes = compute_free_minutes_for_assistant(schedule_df, selected_assistant)
+    if free_minutes is None:
+        st.caption("Free window unknown from schedule; showing pending duties.")
+    elif free_minutes <= 0:
+        if total_pending > 0:
+            st.warning("Currently busy with a case. Duties will appear when free.")
+        else:
+            st.caption("No pending duties right now.")
+        return
+
+    if total_pending == 0:
+        st.success("No pending duties 🎉")
+        return
+
+    st.warning(f"✅ You are free for ~{free_minutes} min. Pending duties: {total_pending}")
+
+    def _fits(duty):
+        if free_minutes is None:
+            return True
+        try:
+            return int(duty.get("est_minutes", 0)) <= int(free_minutes or 0)
+        except Exception:
+            return False
+
+    weekly_fit = [d for d in pending["WEEKLY"] if _fits(d)]
+    monthly_fit = [d for d in pending["MONTHLY"] if _fits(d)]
+
+    with st.expander("Pick a duty"):
+        tab1, tab2 = st.tabs([f"Weekly ({len(weekly_fit)})", f"Monthly ({len(monthly_fit)})"])
+
+        def _pick_ui(duties: list[dict[str, Any]], tab_key: str):
+            if not duties:
+                st.info("No duties fit in the current free window.")
+                return
+            labels = [f"{d['title']} • {d['est_minutes']} min" for d in duties]
+            idx = st.selectbox(
+                "Select duty",
+                options=list(range(len(labels))),
+                format_func=lambda i: labels[i],
+                key=f"duty_select_{tab_key}",
+            )
+            if st.button("▶ Start", use_container_width=True, key=f"duty_start_{tab_key}"):
+                run_id, payload = start_duty_run_supabase(supabase, selected_assistant, duties[idx])
+                if run_id:
+                    st.session_state.active_duty_run_id = run_id
+                    st.session_state.active_duty_due_at = payload.get("due_at")
+                    st.session_state.active_duty_started_at = payload.get("started_at")
+                    st.session_state.active_duty_est_minutes = payload.get("est_minutes")
+                    st.toast("Duty timer started ✅", icon="✅")
+                    st.rerun()
+                else:
+                    st.error("Failed to start duty. Please try again.")
+
+        with tab1:
+            _pick_ui(weekly_fit, "weekly")
+        with tab2:
+            _pick_ui(monthly_fit, "monthly")
+
+
+# ================ SIDEBAR SETTINGS ================
+def render_notification_settings() -> None:
+    """Reminder and auto-allotment toggles (every page)."""
+    with st.sidebar:
+        st.markdown("## 🔔 Notifications")
+        st.checkbox("Enable 15-minute reminders", value=True, key="enable_reminders")
+        st.checkbox(
+            "Run alerts on all pages",
+            value=False,
+            key="alerts_background",
+            help="When off, reminders and status alerts run only on the Scheduling page for smoother UX.",
+        )
+        st.selectbox(
+            "Default snooze (seconds)",
+            options=[30, 60, 90, 120, 150, 180, 300],
+            index=0,
+            key="default_snooze_seconds",
+        )
+        st.write("💡 Reminders alert 15 minutes before a patient's In Time.")
+
+        st.markdown("---")
+        st.markdown("## 🤖 Auto-Allotment")
+        st.session_state.auto_assign_assistants = st.checkbox(
+            "Auto-assign assistants",
+            value=st.session_state.get("auto_assign_assistants", True),
+            help="Automatically fill FIRST/SECOND/Third based on rules and availability."
+        )
+        st.session_state.auto_assign_only_empty = st.checkbox(
+            "Only fill empty slots",
+            value=st.session_state.get("auto_assign_only_empty", True),
+            help="If enabled, only empty assistant slots will be auto-filled."
+        )
+
+
+def render_weekly_off_panel() -> None:
+    with st.sidebar:
+        st.markdown("---")
+        st.markdown("## 📋 Assistant Weekly Off Schedule")
+
+        today_weekday = runtime.now().weekday()  # 0=Monday, 6=Sunday
+        weekday_names = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"]
+        today_name = weekday_names[today_weekday]
+        weekly_off_map = _get_profiles_cache_snapshot().get("weekly_off_map", WEEKLY_OFF)
+
+        # TODAY'S OFF
+        today_off = weekly_off_map.get(today_weekday, [])
+        st.markdown("**Today:**")
+        if today_off:
+            off_text = ", ".join(today_off)
+            st.warning(f"🔴 {off_text}")
+            st.caption("Cannot be allocated today.")
+        else:
+            st.success(f"✅ All assistants available")
+
+        # TOMORROW'S OFF
+        tomorrow_weekday = (today_weekday + 1) % 7  # Next day, wrap around if Sunday
+        tomorrow_name = weekday_names[tomorrow_weekday]
+        tomorrow_off = weekly_off_map.get(tomorrow_weekday, [])
+
+        st.markdown("**Tomorrow:**")
+        if tomorrow_off:
+            off_text = ", ".join(tomorrow_off)
+            st.info(f"ℹ️ {tomorrow_name}: {off_text}")
+            st.caption("Will be off tomorrow - plan accordingly.")
+        else:
+            st.success(f"✅ {tomorrow_name}: All assistants available")
+
+    with st.sidebar:
+        st.markdown("---")
+
+
+# ================ SCHEDULE TOOLS (schedule pages) ================
+def render_save_mode(df_raw: pd.DataFrame) -> None:
+    with st.sidebar:
+        st.markdown("## 💾 Save Mode")
+        st.session_state.auto_save_enabled = st.checkbox(
+            "Enable auto-save",
+            value=st.session_state.get("auto_save_enabled", False),
+            help="When off, changes stay in session until you click 'Save Changes'."
+        )
+        save_now_disabled = bool(st.session_state.get("is_saving")) or bool(st.session_state.get("save_conflict"))
+        if st.button("Save Now", key="save_now_btn", use_container_width=True, disabled=save_now_disabled):
+            df_to_save = st.session_state.get("unsaved_df")
+            if df_to_save is None:
+                df_to_save = df_raw
+            if df_to_save is not None:
+                _maybe_save(df_to_save, message="Saved", force=True)
+            else:
+                st.warning("Nothing to save yet.")
+
+        debounce_options = [0, 1, 2, 3, 5, 10]
+        try:
+            debounce_index = debounce_options.index(int(st.session_state.get("save_debounce_seconds", 2)))
+        except Exception:
+            debounce_index = 2
+        st.session_state.save_debounce_seconds = st.selectbox(
+            "Auto-save debounce (seconds)",
+            options=debounce_options,
+            index=debounce_index,
+            help="Delay auto-save slightly to merge quick edits.",
+        )
+        st.session_state.enable_conflict_checks = st.checkbox(
+            "Block saves on external changes",
+            value=st.session_state.get("enable_conflict_checks", True),
+            help="Prevents overwriting if storage changed since you loaded.",
+        )
+        if st.session_state.get("loaded_save_at"):
+            st.caption(f"Last saved: {st.session_state.loaded_save_at}")
+        if st.session_state.get("is_saving"):
+            st.caption("Saving...")
+
+        if st.session_state.get("save_conflict"):
+            st.error("Save conflict: storage changed since you loaded.")
+            col_conflict_a, col_conflict_b = st.columns(2)
+            with col_conflict_a:
+                if st.button("Reload from storage", key="reload_storage_btn"):
+                    st.session_state.unsaved_df = None
+                    st.session_state.pending_changes = False
+                    st.session_state.pending_changes_reason = ""
+                    st.session_state.save_conflict = None
+                    try:
+                        load_data_from_supabase.clear()
+                    except Exception:
+                        pass
+                    st.rerun()
+            with col_conflict_b:
+                if st.button("Force Save", key="force_save_btn"):
+                    df_to_save = st.session_state.get("unsaved_df")
+                    if df_to_save is None:
+                        df_to_save = df_raw
+                    _maybe_save(
+                        df_to_save,
+                        message="Force saved (conflict override)",
+                        force=True,
+                        ignore_conflict=True,
+                    )
+                    st.session_state.save_conflict = None
+                    st.rerun()
+
+        if st.session_state.get("pending_changes"):
+            st.caption("Pending changes not yet saved. Click 'Save Changes'.")
+            if (
+                st.session_state.auto_save_enabled
+                and st.session_state.get("unsaved_df") is not None
+                and not st.session_state.get("save_conflict")
+            ):
+                _maybe_save(
+                    st.session_state.unsaved_df,
+                    show_toast=False,
+                    message=st.session_state.get("pending_changes_reason") or "Auto-saved pending changes",
+                )
+
+
+def render_time_blocking(df_raw: pd.DataFrame) -> None:
+    with st.sidebar:
+        st.markdown("---")
+        st.markdown("## ⏰ Time Blocking")
+        st.caption("Block assistants for backend work")
+
+        with st.expander("➕ Add Time Block", expanded=False):
+            block_assistant = st.selectbox(
+                "Assistant",
+                options=[""] + _get_all_assistants(),
+                key="block_assistant_select",
+            )
+
+
+            # For debug/demo: auto-fill start and end time to cover current time
+            now_dt = now_ist()
+            block_start_default = (now_dt - timedelta(minutes=2)).time().replace(second=0, microsecond=0)
+            block_end_default = (now_dt + timedelta(minutes=2)).time().replace(second=0, microsecond=0)
+            col_start, col_end = st.columns(2)
+            with col_start:
+                block_start = st.time_input("Start Time", value=block_start_default, key="block_start_time")
+            with col_end:
+                block_end = st.time_input("End Time", value=block_end_default, key="block_end_time")
+
+            block_reason = st.text_input(
+                "Reason",
+                value="Backend Work",
+                key="block_reason_input",
+                placeholder="e.g., Lunch, Training, Backend Work",
+            )
+
+            if st.button("🔒 Add Block", key="add_block_btn", use_container_width=True):
+                if not block_assistant:
+                    st.warning("Please select an assistant")
+                else:
+                    add_time_block(block_assistant, block_start, block_end, block_reason)
+                    _maybe_save(df_raw, show_toast=False, message="Time block saved")
+                    stage_rebalance(
+                        df_raw,
+                        block_assistant,
+                        max(block_start.hour * 60 + block_start.minute, now_dt.hour * 60 + now_dt.minute),
+                        block_end.hour * 60 + block_end.minute,
+                        reason=f"{block_assistant} blocked {block_start.strftime('%H:%M')}-{block_end.strftime('%H:%M')}",
+                    )
+                    st.success(
+                        f"✅ Blocked {block_assistant} from {block_start.strftime('%H:%M')} to {block_end.strftime('%H:%M')}"
+                    )
+                    st.rerun()
+
+        # Show current time blocks
+        if st.session_state.get("time_blocks"):
+            st.markdown("**Current Blocks:**")
+            today_str = runtime.now().strftime("%Y-%m-%d")
+            today_blocks = [b for b in st.session_state.time_blocks if b.get("date") == today_str]
+
+            for i, block in enumerate(today_blocks):
+                col_info, col_del = st.columns([4, 1])
+                with col_info:
+                    st.caption(
+                        f"🚫 {block['assistant']}: {block['start_time'].strftime('%H:%M')}-{block['end_time'].strftime('%H:%M')} ({block.get('reason','')})"
+                    )
+                with col_del:
+                    if st.button("❌", key=f"del_block_{i}", help="Remove this block"):
+                        try:
+                            actual_idx = st.session_state.time_blocks.index(block)
+                            remove_time_block(actual_idx)
+                            _maybe_save(df_raw, show_toast=False, message="Time block removed")
+                            st.success("Time block removed.")
+                            st.rerun()
+                        except Exception:
+                            pass
+            # Debug: Show raw time_blocks and meta
+            st.markdown("---")
+            st.markdown("**[DEBUG] Time Blocks (formatted):**")
+            def _format_block(block):
+                return {
+                    'Assistant': block.get('assistant', ''),
+                    'Start': block.get('start_time').strftime('%H:%M') if block.get('start_time') else '',
+                    'End': block.get('end_time').strftime('%H:%M') if block.get('end_time') else '',
+                    'Date': block.get('date', ''),
+                    'Reason': block.get('reason', '')
+                }
+            # Developer debug removed from sidebar per request
+        else:
+            st.caption("No time blocks set for today")
+
+
+def render_reset_schedule(df_raw: pd.DataFrame) -> None:
+    """Backup downloads and the guarded "clear all allotments" action."""
+    with st.sidebar:
+        st.markdown("---")
+        st.markdown("## 🧹 Reset Schedule")
+        st.caption("Clear all current patient appointments/allotments (keeps time blocks).")
+
+        backup_name_base = f"tdb_allotment_backup_{runtime.now().strftime('%Y%m%d_%H%M')}"
+        try:
+            csv_bytes, xlsx_bytes = _get_cached_schedule_backups(df_raw)
+            st.download_button(
+                "⬇️ Download backup (CSV)",
+                data=csv_bytes,
+                file_name=f"{backup_name_base}.csv",
+                mime="text/csv",
+                use_container_width=True,
+            )
+            st.download_button(
+                "⬇️ Download backup (Excel)",
+                data=xlsx_bytes,
+                file_name=f"{backup_name_base}.xlsx",
+                mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+                use_container_width=True,
+            )
+        except Exception:
+            st.caption("Backup download unavailable.")
+
+        if "confirm_clear_all_check" not in st.session_state:
+            st.session_state.confirm_clear_all_check = False
+        if "confirm_clear_all_text" not in st.session_state:
+            st.session_state.confirm_clear_all_text = ""
+
+        st.checkbox(
+            "I understand this will delete ALL rows",
+            key="confirm_clear_all_check",
+        )
+        st.text_input(
+            "Type CLEAR to confirm",
+            key="confirm_clear_all_text",
+            placeholder="CLEAR",
+        )
+
+        if st.button(
+            "🧹 Clear All Allotments",
+            key="clear_all_allotments_btn",
+            use_container_width=True,
+            help="Permanently clears all current schedule rows",
+        ):
+            ok_check = bool(st.session_state.get("confirm_clear_all_check"))
+            ok_text = str(st.session_state.get("confirm_clear_all_text", "") or "").strip().upper() == "CLEAR"
+            if not (ok_check and ok_text):
+                st.warning("Please check the box and type CLEAR to confirm.")
+            else:
+                try:
+                    df_cleared = _make_cleared_schedule(df_raw)
+                    success = _maybe_save(df_cleared, message="Schedule cleared")
+                    if success:
+                        # Clear local notification/reminder state so we don't toast old rows.
+                        st.session_state.prev_hash = None
+                        st.session_state.prev_ongoing = set()
+                        st.session_state.prev_upcoming = set()
+                        st.session_state.prev_raw = pd.DataFrame()
+                        st.session_state.reminder_sent = set()
+                        st.session_state.snoozed = {}
+                        st.session_state.reminder_state_key = None
+                        st.session_state.notification_tick_key = None
+                        st.session_state.delete_rows_open = False
+                        st.toast("🧹 Schedule cleared", icon="✅")
+                        st.rerun()
+                except Exception as e:
+                    st.error(f"Error clearing schedule: {e}")
+
+
+# ================ SIDEBAR HEADER ================
+def render_sidebar_header(schedule_df: Optional[pd.DataFrame] = None) -> None:
+    """Title and live pill; attendance punch and duty timer when the page loaded the schedule."""
+    with st.sidebar:
+        st.markdown('<div class="sidebar-title">🦷 TDB Dashboard</div>', unsafe_allow_html=True)
+        st.markdown('<div class="live-pill"><span class="live-dot"></span> Live • Auto refresh</div>', unsafe_allow_html=True)
+        st.divider()
+        if schedule_df is None:
+            # Punch-out reassigns the leaver's rows, so both widgets need the schedule.
+            st.caption("Punch in/out and duties are on the Scheduling and Assistants pages.")
+            st.divider()
+            return
+        try:
+            if storage.supabase_enabled() and storage.supabase_client is not None:
+                sidebar_punch_widget_supabase(schedule_df, storage.supabase_client)
+            else:
+                sidebar_punch_widget(schedule_df, file_path)
+        except Exception as e:
+            st.caption(f"Punch widget unavailable: {e}")
+        st.divider()
+        try:
+            # Duties now use Excel backend - supabase parameter kept for backward compatibility
+            render_duty_reminder_widget(schedule_df, None)
+        except Exception as e:
+            st.caption(f"Duty reminder unavailable: {e}")
+        st.divider()
@@ -0,0 +1,575 @@
+# pyright: reportMissingImports=false, reportMissingModuleSource=false, reportUnknownVariableType=false, reportUnknownArgumentType=false, reportUnknownParameterType=false, reportUnknownMemberType=false, reportGeneralTypeIssues=false
+"""Staff roster: departments, doctors/assistants, weekly offs and allocation rules config.
+
+Profiles come through runtime.load_profiles() (storage.py in the app, the
+simulator's roster otherwise) and are cached per session under
+"profiles_cache"; the rules file is re-read when its mtime changes.
+"""
+
+import copy
+import functools
+import json
+from pathlib import Path
+from typing import Any, Optional
+
+import pandas as pd
+
+import runtime
+from utils import _norm_staff_key, _parse_weekly_off_days, _to_float, _unique_preserve_order
+
+
+# ================ GLOBAL CONSTANTS ================
+# Weekly off configuration
+WEEKLY_OFF: dict[int, list[str]] = {
+    0: ["RAJA"],                          # Monday
+    1: ["PRAMOTH", "ANYA"],              # Tuesday
+    2: ["ANSHIKA", "MUKHILA"],           # Wednesday
+    3: ["RESHMA", "LAVANYA"],            # Thursday
+    4: ["ROHINI"],                        # Friday
+    5: [],                                 # Saturday (no offs)
+    6: ["NITIN", "BABU"],                # Sunday
+}
+
+# Profile and storage configuration
+PROFILE_SUPABASE_TABLE = "profiles"
+PROFILE_ASSISTANT_SHEET = "Assistants"
+PROFILE_DOCTOR_SHEET = "Doctors"
+PROFILE_COLUMNS = [
+    "id",
+    "name",
+    "kind",
+    "department",
+    "contact_email",
+    "contact_phone",
+    "status",
+    "weekly_off",
+    "pref_first",
+    "pref_second",
+    "pref_third",
+    "created_at",
+    "updated_at",
+    "created_by",
+    "updated_by",
+]
+
+
+# ================ UTILITY FUNCTIONS ================
+def _get_profiles_cache_snapshot() -> dict[str, Any]:
+    cached = runtime.session_state().get("profiles_cache")
+    return cached if isinstance(cached, dict) else {}
+
+
+# ================ DEPARTMENT & STAFF CONFIGURATION ================
+ALLOCATION_RULES_PATH = Path(__file__).with_name("allocation_rules.json")
+
+
+def _config_bool(val: Any, default: bool = False) -> bool:
+    if isinstance(val, bool):
+        return val
+    if val is None:
+        return default
+    s = str(val).strip().lower()
+    if s in {"1", "true", "yes", "on"}:
+        return True
+    if s in {"0", "false", "no", "off"}:
+        return False
+    return default
+
+
+@functools.lru_cache(maxsize=4)
+def _load_allocation_config_cached(path_str: str, mtime: float) -> dict[str, Any]:
+    # Keyed on mtime, so an edited rules file is re-read on the next call.
+    try:
+        with open(path_str, "r", encoding="utf-8") as handle:
+            payload = json.load(handle)
+        return payload if isinstance(payload, dict) else {}
+    except Exception:
+        return {}
+
+
+def _get_allocation_config() -> dict[str, Any]:
+    try:
+        rules_path = runtime.rules_path(ALLOCATION_RULES_PATH)
+        if rules_path.exists():
+            mtime = rules_path.stat().st_mtime
+            payload = _load_allocation_config_cached(str(rules_path), mtime)
+            return copy.deepcopy(payload) if isinstance(payload, dict) else {}
+    except Exception:
+        pass
+    return {}
+
+
+def _get_allocation_department_config(department: str, config: Optional[dict[str, Any]] = None) -> dict[str, Any]:
+    dept_upper = str(department).strip().upper()
+    if not dept_upper:
+        return {}
+    cfg = config or _get_allocation_config()
+    if not isinstance(cfg, dict):
+        return {}
+    depts = cfg.get("departments", {})
+    if isinstance(depts, dict):
+        for key, val in depts.items():
+            if str(key).strip().upper() == dept_upper:
+                return val if isinstance(val, dict) else {}
+    return {}
+
+
+def _get_global_allocation_config(config: Optional[dict[str, Any]] = None) -> dict[str, Any]:
+    cfg = config or _get_allocation_config()
+    if not isinstance(cfg, dict):
+        return {
+            "cross_department_fallback": False,
+            "use_profile_role_flags": False,
+            "load_balance": False,
+            "load_balance_weight": "count",
+            "allocation_mode": "greedy",
+            "solver_time_budget_ms": 750.0,
+            "lookahead_minutes": 0,
+        }
+    global_cfg = cfg.get("global", {}) if isinstance(cfg.get("global", {}), dict) else {}
+    mode = str(global_cfg.get("allocation_mode", "greedy") or "greedy").strip().lower()
+    load_weight = str(global_cfg.get("load_balance_weight", "count") or "count").strip().lower()
+    return {
+        "cross_department_fallback": _config_bool(global_cfg.get("cross_department_fallback", False)),
+        "use_profile_role_flags": _config_bool(global_cfg.get("use_profile_role_flags", False)),
+        "load_balance": _config_bool(global_cfg.get("load_balance", False)),
+        "load_balance_weight": load_weight if load_weight in {"count", "minutes"} else "count",
+        "allocation_mode": mode if mode in {"greedy", "solver"} else "greedy",
+        "solver_time_budget_ms": _to_float(global_cfg.get("solver_time_budget_ms")) or 750.0,
+        "lookahead_minutes": max(0, int(_to_float(global_cfg.get("lookahead_minutes")) or 0)),
+    }
+
+
+def _get_config_department_maps(config: Optional[dict[str, Any]] = None) -> dict[str, Any]:
+    cfg = config or _get_allocation_config()
+    doctor_map: dict[str, str] = {}
+    assistant_map: dict[str, str] = {}
+    dept_list: list[str] = []
+    depts = cfg.get("departments") if isinstance(cfg, dict) else None
+    if isinstance(depts, dict) and depts:
+        for dept, data in depts.items():
+            dept_upper = str(dept).strip().upper()
+            if dept_upper and dept_upper not in dept_list:
+                dept_list.append(dept_upper)
+            if not isinstance(data, dict):
+                continue
+            for name in data.get("doctors", []) or []:
+                key = _norm_staff_key(name)
+                if key and key not in doctor_map:
+                    doctor_map[key] = dept_upper
+            for name in data.get("assistants", []) or []:
+                key = _norm_staff_key(name)
+                if key and key not in assistant_map:
+                    assistant_map[key] = dept_upper
+    if not dept_list:
+        for dept, data in DEPARTMENTS.items():
+            dept_upper = str(dept).strip().upper()
+            if dept_upper and dept_upper not in dept_list:
+                dept_list.append(dept_upper)
+            if not isinstance(data, dict):
+                continue
+            for name in data.get("doctors", []) or []:
+                key = _norm_staff_key(name)
+                if key and key not in doctor_map:
+                    doctor_map[key] = dept_upper
+            for name in data.get("assistants", []) or []:
+                key = _norm_staff_key(name)
+                if key and key not in assistant_map:
+                    assistant_map[key] = dept_upper
+    return {
+        "departments": dept_list,
+        "doctors": doctor_map,
+        "assistants": assistant_map,
+    }
+
+
+def _refresh_staff_options_from_supabase(client):
+    """Override ALL_ASSISTANTS/ALL_DOCTORS and WEEKLY_OFF from Supabase profiles."""
+    global ALL_ASSISTANTS, ALL_DOCTORS
+    try:
+        resp = client.table(PROFILE_SUPABASE_TABLE).select("*").execute()
+        data = resp.data or []
+        df = pd.DataFrame(data)
+        if df.empty:
+            return
+        df["name"] = df["name"].astype(str).str.upper()
+        df["department"] = df["department"].astype(str).str.upper() if "department" in df.columns else ""
+        assistants = df.loc[df["kind"] == PROFILE_ASSISTANT_SHEET, "name"].dropna().tolist()
+        doctors = df.loc[df["kind"] == PROFILE_DOCTOR_SHEET, "name"].dropna().tolist()
+        if assistants:
+            ALL_ASSISTANTS = _unique_preserve_order(assistants)
+        if doctors:
+            ALL_DOCTORS = _unique_preserve_order(doctors)
+        # Weekly off mapping
+        week_map: dict[int, list[str]] = {i: [] for i in range(7)}
+        if "weekly_off" in df.columns:
+            for _, row in df.iterrows():
+                kind = str(row.get("kind", "")).strip()
+                if kind != PROFILE_ASSISTANT_SHEET:
+                    continue
+                wo_days = _parse_weekly_off_days(row.get("weekly_off", ""))
+                name = str(row.get("name", "")).strip().upper()
+                if not name:
+                    continue
+                for idx in wo_days:
+                    week_map[idx].append(name)
+        # Updated in place: other modules hold WEEKLY_OFF via "from staff import".
+        WEEKLY_OFF.clear()
+        WEEKLY_OFF.update(week_map)
+    except Exception:
+        pass
+
+
+DEPARTMENTS = {
+    "PROSTHO": {
+        "doctors": _unique_preserve_order([]),  # Empty - add manually via UI
+        "assistants": _unique_preserve_order([]),  # Empty - add manually via UI
+        "allocation_rules": {
+            "FIRST": {
+                "default": [],
+                "time_override": []
+            },
+            "SECOND": {
+                "when_first_is": {},
+                "default": []
+            },
+        }
+    },
+    "ENDO": {
+        "doctors": _unique_preserve_order([]),  # Empty - add manually via UI
+        "assistants": _unique_preserve_order([]),  # Empty - add manually via UI
+        "allocation_rules": {
+            "FIRST": {
+                "default": [],
+                "time_override": []
+            },
+            "SECOND": {
+                "default": []
+            },
+            "Third": {
+                "default": []
+            },
+        }
+    },
+}
+
+# Combined lists for dropdowns
+ALL_DOCTORS = _unique_preserve_order(DEPARTMENTS["PROSTHO"]["doctors"] + DEPARTMENTS["ENDO"]["doctors"])
+ALL_ASSISTANTS = _unique_preserve_order(DEPARTMENTS["PROSTHO"]["assistants"] + DEPARTMENTS["ENDO"]["assistants"])
+
+
+def get_department_for_doctor(doctor_name: str) -> str:
+    """Get the department a doctor belongs to"""
+    if not doctor_name:
+        return ""
+    doc_key = _norm_staff_key(doctor_name)
+    if not doc_key:
+        return ""
+    try:
+        cache = _get_profiles_cache()
+        dept = cache.get("doctor_dept_map", {}).get(doc_key, "")
+        if dept:
+            return dept
+    except Exception:
+        pass
+    try:
+        config_maps = _get_config_department_maps()
+        dept = config_maps.get("doctors", {}).get(doc_key, "")
+        if dept:
+            return dept
+    except Exception:
+        pass
+    for dept, config in DEPARTMENTS.items():
+        for d in config["doctors"]:
+            d_key = _norm_staff_key(d)
+            if not d_key:
+                continue
+            if doc_key == d_key or doc_key.endswith(d_key) or d_key.endswith(doc_key):
+                return dept
+    return ""
+
+
+def get_assistants_for_department(department: str) -> list[str]:
+    """Get list of assistants for a specific department"""
+    dept_upper = str(department).strip().upper()
+    if not dept_upper:
+        return _get_all_assistants()
+    try:
+        cache = _get_profiles_cache()
+        dept_list = cache.get("assistants_by_dept", {}).get(dept_upper, [])
+        if dept_list:
+            return dept_list
+    except Exception:
+        pass
+    try:
+        cfg = _get_allocation_config()
+        dept_cfg = _get_allocation_department_config(dept_upper, cfg)
+        assistants = dept_cfg.get("assistants", []) if isinstance(dept_cfg, dict) else []
+        if assistants:
+            return _unique_preserve_order(assistants)
+    except Exception:
+        pass
+    if dept_upper in DEPARTMENTS:
+        return DEPARTMENTS[dept_upper]["assistants"]
+    return _get_all_assistants()
+
+
+def get_department_for_assistant(assistant_name: str) -> str:
+    """Get the department an assistant belongs to"""
+    if not assistant_name:
+        return ""
+    assist_key = _norm_staff_key(assistant_name)
+    if not assist_key:
+        return ""
+    try:
+        cache = _get_profiles_cache()
+        dept = cache.get("assistant_dept_map", {}).get(assist_key, "")
+        if dept:
+            return dept
+    except Exception:
+        pass
+    try:
+        config_maps = _get_config_department_maps()
+        dept = config_maps.get("assistants", {}).get(assist_key, "")
+        if dept:
+            return dept
+    except Exception:
+        pass
+    for dept, config in DEPARTMENTS.items():
+        for a in config["assistants"]:
+            a_key = _norm_staff_key(a)
+            if not a_key:
+                continue
+            if assist_key == a_key or assist_key.endswith(a_key) or a_key.endswith(assist_key):
+                return dept
+    return "SHARED"
+
+
+# ================ PROFILES ================
+def _ensure_profile_df(df: pd.DataFrame) -> pd.DataFrame:
+    out = df.copy()
+    for col in PROFILE_COLUMNS:
+        if col not in out.columns:
+            out[col] = ""
+    # Normalize text casing
+    out["name"] = out["name"].astype(str).str.upper()
+    out["department"] = out["department"].astype(str).str.upper()
+    return out.loc[:, PROFILE_COLUMNS]
+
+
+def _is_active_status(value: Any) -> bool:
+    try:
+        s = str(value or "").strip().upper()
+    except Exception:
+        return True
+    return (not s) or s == "ACTIVE"
+
+
+def _get_profiles_cache() -> dict[str, Any]:
+    cache_bust = int(runtime.session_state().get("profiles_cache_bust", 0))
+    cached = runtime.session_state().get("profiles_cache", {})
+    if isinstance(cached, dict) and cached.get("cache_bust") == cache_bust:
+        return cached
+
+    assistants_df = runtime.load_profiles(PROFILE_ASSISTANT_SHEET, cache_bust)
+    doctors_df = runtime.load_profiles(PROFILE_DOCTOR_SHEET, cache_bust)
+
+    if assistants_df is None:
+        assistants_df = _ensure_profile_df(pd.DataFrame())
+    if doctors_df is None:
+        doctors_df = _ensure_profile_df(pd.DataFrame())
+
+    assistants_df = _ensure_profile_df(assistants_df)
+    doctors_df = _ensure_profile_df(doctors_df)
+
+    config = _get_allocation_config()
+    config_maps = _get_config_department_maps(config)
+    config_doctor_map = config_maps.get("doctors", {})
+    config_assistant_map = config_maps.get("assistants", {})
+
+    assistants_list: list[str] = []
+    assistant_dept_map: dict[str, str] = {}
+    assistant_pref_map: dict[str, dict[str, Any]] = {}
+    weekly_off_map: dict[int, list[str]] = {i: [] for i in range(7)}
+
+    for _, row in assistants_df.iterrows():
+        name = str(row.get("name", "")).strip().upper()
+        if not name:
+            continue
+        if "status" in assistants_df.columns and not _is_active_status(row.get("status", "")):
+            continue
+        assistants_list.append(name)
+        key = _norm_staff_key(name)
+        dept = str(row.get("department", "")).strip().upper()
+        if not dept:
+            dept = config_assistant_map.get(key, "")
+        if not dept:
+            dept = "SHARED"
+        assistant_dept_map[key] = dept
+        assistant_pref_map[key] = {
+            "FIRST": row.get("pref_first", ""),
+            "SECOND": row.get("pref_second", ""),
+            "Third": row.get("pref_third", ""),
+        }
+        try:
+            for idx in _parse_weekly_off_days(row.get("weekly_off", "")):
+                weekly_off_map[idx].append(name)
+        except Exception:
+            pass
+
+    doctors_list: list[str] = []
+    doctor_dept_map: dict[str, str] = {}
+    for _, row in doctors_df.iterrows():
+        name = str(row.get("name", "")).strip().upper()
+        if not name:
+            continue
+        if "status" in doctors_df.columns and not _is_active_status(row.get("status", "")):
+            continue
+        doctors_list.append(name)
+        key = _norm_staff_key(name)
+        dept = str(row.get("department", "")).strip().upper()
+        if not dept:
+            dept = config_doctor_map.get(key, "")
+        if dept:
+            doctor_dept_map[key] = dept
+
+    assistants_list = _unique_preserve_order(assistants_list)
+    doctors_list = _unique_preserve_order(doctors_list)
+
+    dept_set = set(config_maps.get("departments", []) or [])
+    dept_set.update([d for d in assistant_dept_map.values() if d])
+    dept_set.update([d for d in doctor_dept_map.values() if d])
+    if not dept_set:
+        dept_set.update([str(d).strip().upper() for d in DEPARTMENTS.keys()])
+
+    def _build_config_lists(key: str) -> dict[str, list[str]]:
+        out: dict[str, list[str]] = {}
+        depts = config.get("departments", {}) if isinstance(config, dict) else {}
+        if isinstance(depts, dict):
+            for dept_name, data in depts.items():
+                if not isinstance(data, dict):
+                    continue
+                dept_upper = str(dept_name).strip().upper()
+                if not dept_upper:
+                    continue
+                raw_list = data.get(key, []) or []
+                out[dept_upper] = _unique_preserve_order(raw_list)
+        return out
+
+    config_assistant_lists = _build_config_lists("assistants")
+    config_doctor_lists = _build_config_lists("doctors")
+
+    assistants_by_dept: dict[str, list[str]] = {dept: [] for dept in dept_set}
+    if config_assistant_lists:
+        for dept, ordered in config_assistant_lists.items():
+            for name in ordered:
+                if name in assistants_list and name not in assistants_by_dept.setdefault(dept, []):
+                    assistants_by_dept[dept].append(name)
+    for name in assistants_list:
+        dept = assistant_dept_map.get(_norm_staff_key(name), "")
+        if not dept:
+            continue
+        if name not in assistants_by_dept.setdefault(dept, []):
+            assistants_by_dept[dept].append(name)
+
+    doctors_by_dept: dict[str, list[str]] = {dept: [] for dept in dept_set}
+    if config_doctor_lists:
+        for dept, ordered in config_doctor_lists.items():
+            for name in ordered:
+                if name in doctors_list and name not in doctors_by_dept.setdefault(dept, []):
+                    doctors_by_dept[dept].append(name)
+    for name in doctors_list:
+        dept = doctor_dept_map.get(_norm_staff_key(name), "")
+        if not dept:
+            continue
+        if name not in doctors_by_dept.setdefault(dept, []):
+            doctors_by_dept[dept].append(name)
+
+    global ALL_ASSISTANTS, ALL_DOCTORS
+    if assistants_list:
+        ALL_ASSISTANTS = assistants_list
+    if doctors_list:
+        ALL_DOCTORS = doctors_list
+    if assistants_list:
+        WEEKLY_OFF.clear()
+        WEEKLY_OFF.update(weekly_off_map)
+
+    cache = {
+        "cache_bust": cache_bust,
+        "assistants": assistants_list,
+        "doctors": doctors_list,
+        "assistant_dept_map": assistant_dept_map,
+        "doctor_dept_map": doctor_dept_map,
+        "assistant_prefs": assistant_pref_map,
+        "weekly_off_map": weekly_off_map,
+        "departments": sorted([d for d in dept_set if d]),
+        "assistants_by_dept": assistants_by_dept,
+        "doctors_by_dept": doctors_by_dept,
+    }
+    runtime.session_state().profiles_cache = cache
+    return cache
+
+
+def _get_known_departments() -> list[str]:
+    try:
+        cache = _get_profiles_cache()
+        depts = cache.get("departments", [])
+        if depts:
+            return depts
+    except Exception:
+        pass
+    config = _get_allocation_config()
+    dept_list = []
+    depts = config.get("departments", {}) if isinstance(config, dict) else {}
+    if isinstance(depts, dict):
+        for dept in depts.keys():
+            dept_upper = str(dept).strip().upper()
+            if dept_upper and dept_upper not in dept_list:
+                dept_list.append(dept_upper)
+    if dept_list:
+        return sorted(dept_list)
+    return sorted([str(d).strip().upper() for d in DEPARTMENTS.keys() if str(d).strip()])
+
+
+def _get_all_doctors() -> list[str]:
+    try:
+        cache = _get_profiles_cache()
+        doctors = cache.get("doctors", [])
+        if doctors:
+            return doctors
+    except Exception:
+        pass
+    config = _get_allocation_config()
+    out: list[str] = []
+    depts = config.get("departments", {}) if isinstance(config, dict) else {}
+    if isinstance(depts, dict):
+        for data in depts.values():
+            if not isinstance(data, dict):
+                continue
+            out.extend(data.get("doctors", []) or [])
+    out = _unique_preserve_order(out)
+    if out:
+        return out
+    return ALL_DOCTORS
+
+
+def _get_all_assistants() -> list[str]:
+    try:
+        cache = _get_profiles_cache()
+        assistants = cache.get("assistants", [])
+        if assistants:
+            return assistants
+    except Exception:
+        pass
+    config = _get_allocation_config()
+    out: list[str] = []
+    depts = config.get("departments", {}) if isinstance(config, dict) else {}
+    if isinstance(depts, dict):
+        for data in depts.values():
+            if not isinstance(data, dict):
+                continue
+            out.extend(data.get("assistants", []) or [])
+    out = _unique_preserve_order(out)
+    if out:
+        return out
+    return ALL_ASSISTANTS
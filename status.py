@@ -0,0 +1,628 @@
+# pyright: reportMissingImports=false, reportMissingModuleSource=false, reportUnknownVariableType=false, reportUnknownArgumentType=false, reportUnknownParameterType=false, reportUnknownMemberType=false, reportGeneralTypeIssues=false
+"""Live assistant status: punches, time blocks, current appointments and duty runs.
+
+Everything derived from them (the availability snapshot, day bitsets, grids)
+is versioned per session; writers call invalidate_availability(kind).
+"""
+
+import json
+import uuid
+from datetime import datetime, time as time_type
+from types import MappingProxyType
+from typing import Any, Optional
+
+import pandas as pd
+from pandas import DataFrame
+
+import runtime
+from staff import (
+    WEEKLY_OFF,
+    _get_all_assistants,
+    _get_profiles_cache_snapshot,
+    get_department_for_assistant,
+)
+from utils import (
+    IST,
+    _coerce_to_time_obj,
+    _format_punch_time,
+    _frame_fingerprint,
+    _get_third_column_name,
+    _parse_iso_ts,
+    _time_to_hhmm,
+)
+
+
+# ================ ATTENDANCE STATE ================
+def _assistant_punch_state(
+    assistant_upper: str,
+    punch_map: Optional[dict[str, dict[str, str]]],
+) -> tuple[str, str, str]:
+    if not punch_map:
+        return "NONE", "", ""
+    rec = punch_map.get(assistant_upper)
+    if not rec:
+        return "NONE", "", ""
+    punch_in = str(rec.get("punch_in", "") or "").strip()
+    punch_out = str(rec.get("punch_out", "") or "").strip()
+    if punch_in and not punch_out:
+        return "IN", punch_in, ""
+    if punch_in and punch_out:
+        return "OUT", punch_in, punch_out
+    return "NONE", punch_in, punch_out
+
+
+# ================ TIME BLOCKING SYSTEM ================
+def add_time_block(assistant: str, start_time: Any, end_time: Any, reason: str = "Backend Work") -> bool:
+    """Add a time block for an assistant. Returns True when recorded."""
+    today_str = runtime.now().strftime("%Y-%m-%d")
+    block = {
+        "assistant": assistant.upper(),
+        "start_time": start_time,
+        "end_time": end_time,
+        "reason": reason,
+        "date": today_str
+    }
+    runtime.session_state().time_blocks.append(block)
+    invalidate_availability("blocks")
+    return True
+
+
+def remove_time_block(index: int):
+    """Remove a time block by index"""
+    if 0 <= index < len(runtime.session_state().time_blocks):
+        runtime.session_state().time_blocks.pop(index)
+        invalidate_availability("blocks")
+        return True
+    return False
+
+
+def is_assistant_blocked(assistant: str, check_time: Any) -> tuple[bool, str]:
+    """Check if an assistant is blocked at a specific time. Returns (is_blocked, reason)"""
+    if not assistant or not check_time:
+        return False, ""
+    
+    assist_upper = str(assistant).strip().upper()
+    today_str = runtime.now().strftime("%Y-%m-%d")
+    check_minutes = check_time.hour * 60 + check_time.minute
+    
+    for block in runtime.session_state().time_blocks:
+        if block["date"] != today_str:
+            continue
+        if block["assistant"].upper() != assist_upper:
+            continue
+        
+        start_min = block["start_time"].hour * 60 + block["start_time"].minute
+        end_min = block["end_time"].hour * 60 + block["end_time"].minute
+        
+        if start_min <= check_minutes <= end_min:
+            return True, block.get("reason", "Blocked")
+    
+    return False, ""
+
+
+def _serialize_time_blocks(blocks: list[dict]) -> list[dict]:
+    """Convert session_state time blocks into JSON-safe primitives."""
+    out: list[dict] = []
+    for b in blocks or []:
+        try:
+            assistant = str(b.get("assistant", "")).strip().upper()
+            date = str(b.get("date", "")).strip()
+            reason = str(b.get("reason", "Backend Work")).strip() or "Backend Work"
+            start_t = b.get("start_time")
+            end_t = b.get("end_time")
+            start_obj = _coerce_to_time_obj(start_t)
+            end_obj = _coerce_to_time_obj(end_t)
+            out.append(
+                {
+                    "assistant": assistant,
+                    "date": date,
+                    "reason": reason,
+                    "start_time": _time_to_hhmm(start_obj),
+                    "end_time": _time_to_hhmm(end_obj),
+                }
+            )
+        except Exception:
+            continue
+    return out
+
+
+def _deserialize_time_blocks(value) -> list[dict]:
+    """Parse stored meta value into session_state-compatible time blocks."""
+    if value is None or value == "":
+        return []
+
+    raw = value
+    if isinstance(value, str):
+        try:
+            raw = json.loads(value)
+        except Exception:
+            return []
+
+    if not isinstance(raw, list):
+        return []
+
+    out: list[dict] = []
+    for b in raw:
+        if not isinstance(b, dict):
+            continue
+        assistant = str(b.get("assistant", "")).strip().upper()
+        date = str(b.get("date", "")).strip()
+        reason = str(b.get("reason", "Backend Work")).strip() or "Backend Work"
+        start_obj = _coerce_to_time_obj(b.get("start_time"))
+        end_obj = _coerce_to_time_obj(b.get("end_time"))
+        if not assistant or not date or start_obj is None or end_obj is None:
+            continue
+        out.append(
+            {
+                "assistant": assistant,
+                "date": date,
+                "reason": reason,
+                "start_time": start_obj,
+                "end_time": end_obj,
+            }
+        )
+    return out
+
+
+def _get_meta_from_df(df_any: Optional[DataFrame]) -> dict:
+    try:
+        if df_any is not None and hasattr(df_any, "attrs"):
+            meta = df_any.attrs.get("meta")
+            if isinstance(meta, dict):
+                return dict(meta)
+    except Exception:
+        pass
+    return {}
+
+
+def _set_meta_on_df(df_any: pd.DataFrame, meta: dict) -> None:
+    try:
+        if hasattr(df_any, "attrs"):
+            df_any.attrs["meta"] = dict(meta or {})
+    except Exception:
+        pass
+
+
+def _sync_time_blocks_from_meta(df_any: Optional[DataFrame]) -> None:
+    """Load persisted time blocks into session_state (once per run)."""
+    try:
+        meta = _get_meta_from_df(df_any)
+        if "time_blocks" in meta:
+            blocks = _deserialize_time_blocks(meta.get("time_blocks"))
+            if _serialize_time_blocks(blocks) != _serialize_time_blocks(runtime.session_state().get("time_blocks", [])):
+                invalidate_availability("blocks")
+            runtime.session_state().time_blocks = blocks
+    except Exception:
+        pass
+
+
+def _apply_time_blocks_to_meta(meta: dict) -> dict:
+    out = dict(meta or {})
+    serialized = _serialize_time_blocks(runtime.session_state().get("time_blocks", []))
+    prev = out.get("time_blocks")
+    out["time_blocks"] = serialized
+    if prev != serialized or not out.get("time_blocks_updated_at"):
+        out["time_blocks_updated_at"] = datetime.now(IST).isoformat()
+    return out
+
+
+# ================ LIVE ASSISTANT STATUS ================
+def _current_appointments_by_assistant(df_schedule: pd.DataFrame, current_min: int) -> dict[str, dict[str, Any]]:
+    """First active appointment (schedule order, FIRST -> SECOND -> Third) each assistant is in at current_min.
+
+    One pass over the rows instead of get_assistant_schedule per assistant; entries
+    have the same shape as get_assistant_schedule's.
+    """
+    if df_schedule is None or df_schedule.empty:
+        return {}
+    third_col = _get_third_column_name(df_schedule.columns)
+    role_cols = [c for c in ["FIRST", "SECOND", third_col] if c in df_schedule.columns]
+    if not role_cols:
+        return {}
+    n = len(df_schedule)
+
+    def _col(name: str, default: Any) -> list[Any]:
+        return df_schedule[name].tolist() if name in df_schedule.columns else [default] * n
+
+    status_texts = [str(v).strip().upper() for v in _col("STATUS", "")]
+    in_vals, out_vals = _col("In Time", None), _col("Out Time", None)
+    role_values = {col: df_schedule[col].tolist() for col in role_cols}
+    row_ids, patients = _col("REMINDER_ROW_ID", ""), _col("Patient Name", "Unknown")
+    doctors, ops = _col("DR.", ""), _col("OP", "")
+
+    current: dict[str, dict[str, Any]] = {}
+    for pos in range(n):
+        status_text = status_texts[pos]
+        if any(s in status_text for s in ["CANCELLED", "DONE", "COMPLETED", "SHIFTED"]):
+            continue
+        if "ON GOING" in status_text or "ONGOING" in status_text:
+            is_current = True
+        else:
+            appt_in = _coerce_to_time_obj(in_vals[pos])
+            appt_out = _coerce_to_time_obj(out_vals[pos])
+            if appt_in is None or appt_out is None:
+                is_current = "ARRIVED" in status_text
+            else:
+                appt_in_min = appt_in.hour * 60 + appt_in.minute
+                appt_out_min = appt_out.hour * 60 + appt_out.minute
+                if appt_out_min < appt_in_min:
+                    appt_out_min += 1440
+                is_current = appt_in_min <= current_min <= appt_out_min
+        if not is_current:
+            continue
+        for col in role_cols:
+            name = str(role_values[col][pos]).strip().upper()
+            if not name or name in current:
+                continue
+            current[name] = {
+                "row_id": row_ids[pos],
+                "patient": patients[pos],
+                "in_time": in_vals[pos],
+                "out_time": out_vals[pos],
+                "doctor": doctors[pos],
+                "op": ops[pos],
+                "role": col,
+                "status": status_text,
+            }
+    return current
+
+
+def _active_duty_runs_by_assistant(duty_runs_df: pd.DataFrame) -> dict[str, pd.Series]:
+    """First IN_PROGRESS duty run per assistant (as stored, stripped)."""
+    if duty_runs_df is None or duty_runs_df.empty:
+        return {}
+    try:
+        in_progress = duty_runs_df.loc[duty_runs_df["status"].astype(str).str.upper() == "IN_PROGRESS"]
+        keys = in_progress["assistant"].astype(str).str.strip().tolist()
+    except Exception:
+        return {}
+    out: dict[str, pd.Series] = {}
+    for pos, key in enumerate(keys):
+        if key not in out:
+            out[key] = in_progress.iloc[pos]
+    return out
+
+
+def _current_block_reasons(current_time: time_type) -> dict[str, str]:
+    """Reason of the first of today's time blocks covering current_time, per assistant (as is_assistant_blocked)."""
+    today_str = runtime.now().strftime("%Y-%m-%d")
+    check_minutes = current_time.hour * 60 + current_time.minute
+    reasons: dict[str, str] = {}
+    for block in runtime.session_state().get("time_blocks", []):
+        if block["date"] != today_str:
+            continue
+        name = block["assistant"].upper()
+        if name in reasons:
+            continue
+        start_min = block["start_time"].hour * 60 + block["start_time"].minute
+        end_min = block["end_time"].hour * 60 + block["end_time"].minute
+        if start_min <= check_minutes <= end_min:
+            reasons[name] = block.get("reason", "Blocked")
+    return reasons
+
+
+def get_current_assistant_status(
+    df_schedule: pd.DataFrame,
+    assistants: Optional[list[str]] = None,
+    punch_map: Optional[dict[str, dict[str, str]]] = None,
+) -> dict[str, dict[str, str]]:
+    """
+    Get real-time status of all assistants.
+    Returns dict with assistant name -> status info
+
+    Appointments, duty runs and time blocks are each indexed once per call, so
+    the cost is O(rows + runs + blocks) plus a dict lookup per assistant.
+    """
+    now = runtime.now()
+    status = {}
+    if df_schedule is None:
+        df_schedule = pd.DataFrame()
+    if assistants is None:
+        assistants = _get_all_assistants()
+    if punch_map is None:
+        punch_map = _get_tick_punch_map()
+    duty_runs_df = _get_tick_duty_runs()
+    current_time = time_type(now.hour, now.minute)
+    current_min = now.hour * 60 + now.minute
+    today_weekday = now.weekday()
+    weekday_label = now.strftime("%A")
+    weekly_off_map = _get_profiles_cache_snapshot().get("weekly_off_map", WEEKLY_OFF)
+    weekly_off_set = {
+        str(name).strip().upper()
+        for name in weekly_off_map.get(today_weekday, [])
+        if str(name).strip()
+    }
+    block_reasons = _current_block_reasons(current_time)
+    current_appts = _current_appointments_by_assistant(df_schedule, current_min)
+    active_duties = _active_duty_runs_by_assistant(duty_runs_df)
+    
+    for assistant in assistants:
+        assist_upper = assistant.upper()
+        department = get_department_for_assistant(assist_upper)
+
+        punch_state, punch_in, punch_out = _assistant_punch_state(assist_upper, punch_map)
+        if punch_state != "IN":
+            if assist_upper in weekly_off_set:
+                reason = f"Weekly off ({weekday_label})"
+            elif punch_state == "OUT":
+                out_label = _format_punch_time(punch_out)
+                reason = f"Punched out at {out_label}" if out_label else "Punched out"
+            else:
+                reason = "Not punched in"
+            status[assist_upper] = {
+                "status": "BLOCKED",
+                "reason": reason,
+                "department": department,
+            }
+            continue
+        
+        # Check if blocked
+        block_key = str(assist_upper).strip().upper()
+        if assist_upper and block_key in block_reasons:
+            status[assist_upper] = {
+                "status": "BLOCKED",
+                "reason": block_reasons[block_key],
+                "department": department
+            }
+            continue
+        
+        current_appt = current_appts.get(block_key)
+        duty_run = active_duties.get(assist_upper)
+
+        if duty_run is not None:
+            # Assistant has active duty
+            due_dt = _parse_iso_ts(duty_run.get("due_at"))
+            remaining_time = ""
+            if due_dt:
+                delta = due_dt - now
+                if delta.total_seconds() > 0:
+                    mins = int(delta.total_seconds() // 60)
+                    secs = int(delta.total_seconds() % 60)
+                    remaining_time = f" • {mins:02d}:{secs:02d}"
+
+            status[assist_upper] = {
+                "status": "BUSY",
+                "reason": f"On Duty{remaining_time}",
+                "duty_run_id": duty_run.get("id"),
+                "duty_id": duty_run.get("duty_id"),
+                "due_at": duty_run.get("due_at"),
+                "department": department
+            }
+        elif current_appt:
+            out_obj = _coerce_to_time_obj(current_appt.get("out_time"))
+            status[assist_upper] = {
+                "status": "BUSY",
+                "reason": f"With {current_appt.get('patient', 'patient')}",
+                "patient": current_appt.get("patient", ""),
+                "doctor": current_appt.get("doctor", ""),
+                "op": current_appt.get("op", ""),
+                "out_at": datetime.combine(now.date(), out_obj, tzinfo=IST).isoformat() if out_obj else "",
+                "department": department
+            }
+        else:
+            status[assist_upper] = {
+                "status": "FREE",
+                "reason": "Available",
+                "department": department
+            }
+    
+    return status
+
+
+# ================ AVAILABILITY SNAPSHOT ================
+# Punch, duty, time-block and schedule writers bump a per-session version
+# (invalidate_availability); the schedule is keyed by _schedule_cache_key()
+# plus a fingerprint of the columns availability is built from, so a copy
+# or working frame that differs from the session schedule never reuses its
+# masks. The team status map is rebuilt at most once per (versions, minute)
+# and shared by every caller.
+_AVAILABILITY_DERIVED_CACHES = ("availability_snapshot", "day_availability_cache", "availability_grid", "lookahead_demand")
+_SCHEDULE_FINGERPRINT_COLUMNS = (
+    "In Time", "Out Time", "FIRST", "SECOND", "Third", "THIRD", "STATUS", "DR.", "OP", "Patient Name", "REMINDER_ROW_ID",
+)
+
+
+def _availability_version(kind: str) -> int:
+    versions = runtime.session_state().get("availability_versions", {})
+    return int(versions.get(kind, 0)) if isinstance(versions, dict) else 0
+
+
+def _bump_availability_version(kind: str) -> None:
+    try:
+        versions = dict(runtime.session_state().get("availability_versions", {}) or {})
+        versions[kind] = int(versions.get(kind, 0)) + 1
+        runtime.session_state().availability_versions = versions
+    except Exception:
+        pass
+
+
+def _schedule_fingerprint(df_schedule: Optional[DataFrame]) -> str:
+    """Fingerprint of the interval, role, STATUS and row-identity columns plus the index of df_schedule."""
+    if df_schedule is None or df_schedule.empty:
+        return ""
+    # Unhashable content never matches, so every caller rebuilds.
+    return _frame_fingerprint(df_schedule, _SCHEDULE_FINGERPRINT_COLUMNS) or uuid.uuid4().hex
+
+
+def _schedule_version_key(df_schedule: Optional[DataFrame]) -> tuple:
+    """Saved/unsaved schedule version, the in-place edit version and a content fingerprint of df_schedule."""
+    return (
+        _schedule_cache_key(),
+        _schedule_fingerprint(df_schedule),
+        _availability_version("schedule"),
+    )
+
+
+def _availability_cache_key(df_schedule: Optional[DataFrame]) -> tuple:
+    """Schedule version plus the availability versions; one hash pass over the keyed columns."""
+    return (
+        *_schedule_version_key(df_schedule),
+        _availability_version("punch"),
+        _availability_version("duty"),
+        _availability_version("blocks"),
+    )
+
+
+def invalidate_availability(kind: str) -> None:
+    """Invalidation hook for writers: kind is "punch", "duty", "blocks" or "schedule"."""
+    _bump_availability_version(kind)
+    for cache_name in _AVAILABILITY_DERIVED_CACHES:
+        runtime.session_state().pop(cache_name, None)
+
+
+def _tick_cached(cache_name: str, key: tuple, build) -> Any:
+    cached = runtime.session_state().get(cache_name)
+    if isinstance(cached, tuple) and len(cached) == 2 and cached[0] == key:
+        return cached[1]
+    value = build()
+    runtime.session_state()[cache_name] = (key, value)
+    return value
+
+
+def _get_tick_punch_map() -> dict[str, dict[str, str]]:
+    def _build() -> dict[str, dict[str, str]]:
+        try:
+            return runtime.punch_map()
+        except runtime.MissingSourceError:
+            raise
+        except Exception:
+            return {}
+
+    return _tick_cached(
+        "tick_punch_map",
+        (_availability_version("punch"), runtime.now_epoch() // 60),
+        _build,
+    )
+
+
+def _get_tick_duty_runs() -> pd.DataFrame:
+    def _build() -> pd.DataFrame:
+        try:
+            return runtime.load_duty_runs()
+        except runtime.MissingSourceError:
+            raise
+        except Exception:
+            return pd.DataFrame()
+
+    return _tick_cached(
+        "tick_duty_runs",
+        (_availability_version("duty"), runtime.now_epoch() // 60),
+        _build,
+    )
+
+
+def _build_availability_snapshot(df_schedule: pd.DataFrame, assistants: list[str]) -> MappingProxyType:
+    try:
+        status_map = get_current_assistant_status(df_schedule, assistants=assistants)
+    except Exception:
+        status_map = {}
+    return MappingProxyType({
+        "status_map": MappingProxyType({
+            name: MappingProxyType(dict(info)) for name, info in status_map.items()
+        }),
+        "free_set": frozenset(
+            name
+            for name, info in status_map.items()
+            if str(info.get("status", "")).strip().upper() == "FREE"
+        ),
+    })
+
+
+def get_availability_snapshot(
+    df_schedule: pd.DataFrame,
+    assistants: Optional[list[str]] = None,
+    use_cache: bool = True,
+) -> MappingProxyType:
+    """Read-only {status_map, free_set}, keyed by schedule/punch/duty/blocks versions and the current minute.
+
+    use_cache=False builds it for a scratch frame without reading or storing the session copy.
+    """
+    if assistants is None:
+        assistants = _get_all_assistants()
+    if not use_cache:
+        return _build_availability_snapshot(df_schedule, assistants)
+    key = (
+        *_availability_cache_key(df_schedule),
+        tuple(str(a).strip().upper() for a in assistants),
+        runtime.now().strftime("%Y-%m-%d %H:%M"),
+    )
+    return _tick_cached("availability_snapshot", key, lambda: _build_availability_snapshot(df_schedule, assistants))
+
+
+def _get_dashboard_free_set(
+    df_schedule: pd.DataFrame,
+    assistants: list[str],
+    use_cache: bool = True,
+) -> tuple[frozenset[str], MappingProxyType]:
+    snapshot = get_availability_snapshot(df_schedule, assistants, use_cache=use_cache)
+    return snapshot["free_set"], snapshot["status_map"]
+
+
+# ================ PATIENT STATUS OPTIONS ================
+# Keep legacy values for compatibility with existing data.
+STATUS_BASE_OPTIONS = [
+    "PENDING",
+    "WAITING",
+    "ARRIVING",
+    "ARRIVED",
+    "ON GOING",
+    "DONE",
+    "COMPLETED",
+    "CANCELLED",
+    "SHIFTED",
+    "LATE",  # patient running late
+]
+
+
+def _append_status_log(existing_value, event: dict) -> str:
+    """Append a status change event to a JSON list stored in a cell."""
+    items: list[dict] = []
+    try:
+        if isinstance(existing_value, list):
+            items = [x for x in existing_value if isinstance(x, dict)]
+        elif isinstance(existing_value, str) and existing_value.strip():
+            parsed = json.loads(existing_value)
+            if isinstance(parsed, list):
+                items = [x for x in parsed if isinstance(x, dict)]
+    except Exception:
+        items = []
+
+    items.append(dict(event))
+    try:
+        return json.dumps(items, ensure_ascii=False)
+    except Exception:
+        return ""
+
+
+# ================ SCHEDULE KEYS ================
+# --- AUTO-REPAIR TIME BLOCKS FORMAT ---
+def _is_time_block_valid(block):
+    # Check for required keys and correct types
+    try:
+        if not isinstance(block, dict):
+            return False
+        if not all(k in block for k in ("assistant", "date", "reason", "start_time", "end_time")):
+            return False
+        # start_time/end_time should be time or string 'HH:MM'
+        st_val = block["start_time"]
+        et_val = block["end_time"]
+        def _is_time(val):
+            from datetime import time
+            return isinstance(val, time) or (isinstance(val, str) and len(val) == 5 and val[2] == ":")
+        return _is_time(st_val) and _is_time(et_val)
+    except Exception:
+        return False
+
+
+def _schedule_cache_key() -> tuple:
+    if runtime.session_state().get("unsaved_df") is not None:
+        return ("unsaved", runtime.session_state().get("unsaved_df_version", 0))
+    return (
+        "saved",
+        runtime.session_state().get("loaded_save_version"),
+        runtime.session_state().get("last_saved_hash"),
+    )
+
+
+def _schedule_change_key() -> tuple:
+    return _schedule_cache_key()
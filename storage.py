@@ -0,0 +1,1860 @@
+# pyright: reportMissingImports=false, reportMissingModuleSource=false, reportUnknownVariableType=false, reportUnknownArgumentType=false, reportUnknownParameterType=false, reportUnknownMemberType=false, reportGeneralTypeIssues=false
+"""Schedule, attendance, duty and profile storage: Supabase when configured, else the Excel workbook.
+
+load_schedule() is the per-run load pipeline used by every schedule page.
+On import the module registers its punch/profile/duty readers with runtime,
+which is how the allocation engine reaches storage.
+"""
+
+import hashlib
+import io
+import json
+import os
+import re
+import time as time_module
+import uuid
+import zipfile
+from datetime import timedelta
+from pathlib import Path
+from typing import Any, Optional
+
+import openpyxl
+import pandas as pd
+import streamlit as st
+
+import runtime
+import workbook_store
+from staff import (
+    DEPARTMENTS,
+    PROFILE_ASSISTANT_SHEET,
+    PROFILE_COLUMNS,
+    PROFILE_DOCTOR_SHEET,
+    PROFILE_SUPABASE_TABLE,
+    _ensure_profile_df,
+    _get_allocation_config,
+)
+from status import (
+    _apply_time_blocks_to_meta,
+    _get_meta_from_df,
+    _is_time_block_valid,
+    _schedule_cache_key,
+    _schedule_change_key,
+    _set_meta_on_df,
+    _sync_time_blocks_from_meta,
+    invalidate_availability,
+)
+from utils import (
+    _norm_staff_key,
+    _safe_int,
+    dec_to_time,
+    ist_today_and_time,
+    now_ist,
+    safe_str_to_time_obj,
+    str_to_checkbox,
+    time_to_minutes,
+)
+
+
+# Supabase integration (Postgres) for persistent cloud storage (no Google).
+# Only probed here; the client library is imported when a client is first
+# created, so Excel-only deployments never pay for it at cold start.
+_supabase_available = False
+try:
+    import importlib.util
+    _supabase_available = importlib.util.find_spec("supabase") is not None
+except Exception:
+    pass
+
+SUPABASE_AVAILABLE = _supabase_available
+
+
+def create_client(url: str, key: str):
+    from supabase import create_client as _create_client  # type: ignore
+    return _create_client(url, key)
+
+
+# ================ GLOBAL CONSTANTS ================
+# File paths
+file_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "Putt Allotment.xlsx")
+
+# Storage configuration
+# USE_SUPABASE: If True and credentials are available, uses Supabase Postgres for cloud sync
+# Otherwise falls back to local Excel file (Putt Allotment.xlsx)
+USE_SUPABASE = True
+
+
+def supabase_enabled() -> bool:
+    """USE_SUPABASE unless this session fell back to Excel (see _get_cached_data)."""
+    return USE_SUPABASE and not st.session_state.get("supabase_fallback", False)
+
+# Attendance configuration
+ATTENDANCE_SHEET = "Assistants_Attendance"
+ATTENDANCE_COLUMNS = ["DATE", "ASSISTANT", "PUNCH IN", "PUNCH OUT"]
+
+# Duties and Patients configuration (Excel sheets)
+DUTIES_MASTER_SHEET = "Duties_Master"
+DUTY_ASSIGNMENTS_SHEET = "Duty_Assignments"
+DUTY_RUNS_SHEET = "Duty_Runs"
+PATIENTS_SHEET = "Patients"
+
+# Supabase configuration
+supabase_client: Any = None
+supabase_table_name = "tdb_allotment_state"
+supabase_row_id = "main"
+SUPABASE_CHECK_TTL_SECONDS = 60
+
+
+# ================= ATTENDANCE =================
+def _attendance_excel_path(path_override: Optional[str] = None) -> str:
+    """Return a safe attendance Excel path (defaults to local workbook)."""
+    if path_override:
+        return path_override
+    try:
+        return file_path
+    except NameError:
+        return os.path.join(os.path.dirname(os.path.abspath(__file__)), "Putt Allotment.xlsx")
+
+
+@st.cache_data(ttl=30)
+def _get_active_assistant_profile_names() -> list[str]:
+    try:
+        df = load_profiles(PROFILE_ASSISTANT_SHEET)
+    except Exception:
+        return []
+    if df is None or df.empty or "name" not in df.columns:
+        return []
+    names = df["name"].astype(str).str.strip().str.upper()
+    if "status" in df.columns:
+        status = df["status"].astype(str).str.upper()
+        names = names[status == "ACTIVE"]
+    out = [n for n in names.tolist() if n]
+    seen = set()
+    deduped: list[str] = []
+    for name in out:
+        if name in seen:
+            continue
+        seen.add(name)
+        deduped.append(name)
+    return deduped
+
+
+def get_assistants_list(schedule_df):
+    try:
+        profiles = _get_active_assistant_profile_names()
+        if profiles:
+            return profiles
+    except Exception:
+        pass
+    if schedule_df is None or schedule_df.empty:
+        return []
+    cols = [c for c in ["FIRST", "SECOND", "Third"] if c in schedule_df.columns]
+    names = set()
+    for c in cols:
+        names.update([x.strip() for x in schedule_df[c].dropna().astype(str).tolist() if x.strip()])
+    return sorted(names)
+
+
+def extract_assistants(schedule_df):
+    return get_assistants_list(schedule_df)
+
+
+def ensure_attendance_sheet_exists(excel_path: Optional[str] = None):
+    """Create/align the attendance sheet with expected columns."""
+    path = Path(_attendance_excel_path(excel_path))
+    try:
+        if not path.exists():
+            with pd.ExcelWriter(path, engine="openpyxl") as writer:
+                pd.DataFrame(columns=ATTENDANCE_COLUMNS).to_excel(writer, sheet_name=ATTENDANCE_SHEET, index=False)
+            return
+
+        if ATTENDANCE_SHEET not in workbook_store.sheet_names(str(path)):
+            with pd.ExcelWriter(path, engine="openpyxl", mode="a", if_sheet_exists="overlay") as writer:
+                pd.DataFrame(columns=ATTENDANCE_COLUMNS).to_excel(writer, sheet_name=ATTENDANCE_SHEET, index=False)
+            return
+
+        current = workbook_store.read_sheet(str(path), ATTENDANCE_SHEET)
+        if current is not None and list(current.columns) != ATTENDANCE_COLUMNS:
+            aligned = pd.DataFrame(columns=ATTENDANCE_COLUMNS)
+            if not current.empty:
+                for col in ATTENDANCE_COLUMNS:
+                    if col in current.columns:
+                        aligned[col] = current[col]
+            # Use safe sheet saving to preserve all other sheets
+            save_excel_sheet(aligned, ATTENDANCE_SHEET, str(path))
+    except Exception:
+        # Non-fatal alignment failure; callers will handle empty frame
+        pass
+
+
+def load_attendance_sheet(excel_path: Optional[str] = None) -> pd.DataFrame:
+    """Load attendance from Supabase or Excel sheet."""
+    if supabase_enabled() and supabase_client:
+        df = _sb_load("assistant_attendance")
+        if df.empty:
+            df = pd.DataFrame(columns=ATTENDANCE_COLUMNS)
+        return df if not df.empty else pd.DataFrame(columns=ATTENDANCE_COLUMNS)
+
+    ensure_attendance_sheet_exists(excel_path)
+    path = _attendance_excel_path(excel_path)
+    df = workbook_store.read_sheet(path, ATTENDANCE_SHEET)
+    if df is None:
+        return pd.DataFrame(columns=ATTENDANCE_COLUMNS)
+    if df.empty:
+        df = pd.DataFrame(columns=ATTENDANCE_COLUMNS)
+
+    for col in ATTENDANCE_COLUMNS:
+        if col not in df.columns:
+            df[col] = ""
+        df[col] = df[col].astype(str).replace("nan", "").fillna("")
+    return df.loc[:, ATTENDANCE_COLUMNS]
+
+
+def save_attendance_sheet(excel_path: Optional[str], att_df: pd.DataFrame):
+    """Save attendance to Supabase or Excel sheet."""
+    invalidate_availability("punch")
+    if supabase_enabled() and supabase_client:
+        _sb_upsert(att_df, "assistant_attendance")
+        return
+
+    ensure_attendance_sheet_exists(excel_path)
+    path = _attendance_excel_path(excel_path)
+    try:
+        clean_df = att_df.copy()
+        for col in ATTENDANCE_COLUMNS:
+            if col not in clean_df.columns:
+                clean_df[col] = ""
+        clean_df = clean_df.loc[:, ATTENDANCE_COLUMNS]
+        # Use safe sheet saving to preserve all other sheets
+        save_excel_sheet(clean_df, ATTENDANCE_SHEET, path)
+        try:
+            _load_attendance_today_excel.clear()
+        except Exception:
+            pass
+    except Exception as e:
+        st.error(f"Attendance save failed: {e}")
+
+
+# ==================== GENERIC EXCEL SHEET HELPERS ====================
+def load_excel_sheet(sheet_name: str, expected_columns: Optional[list] = None, excel_path: Optional[str] = None) -> pd.DataFrame:
+    """Load any Excel sheet, return empty DataFrame with expected columns if sheet missing."""
+    path = excel_path or file_path
+    df = workbook_store.read_sheet(path, sheet_name)
+    if df is None:
+        return pd.DataFrame(columns=expected_columns) if expected_columns else pd.DataFrame()
+    if df.empty and expected_columns:
+        return pd.DataFrame(columns=expected_columns)
+    if expected_columns:
+        for col in expected_columns:
+            if col not in df.columns:
+                df[col] = ""
+    return df
+
+
+def save_excel_sheet(df: pd.DataFrame, sheet_name: str, excel_path: Optional[str] = None):
+    """Save DataFrame to any Excel sheet (preserves all other sheets)."""
+    import os
+    path = excel_path or file_path
+
+    try:
+        # CRITICAL: Only create new workbook if file doesn't exist
+        # If file exists but can't be loaded, this is a serious error
+        if not os.path.exists(path):
+            # File doesn't exist, create new workbook
+            wb = openpyxl.Workbook()
+            if wb.active:
+                wb.remove(wb.active)
+        else:
+            # File exists, MUST load it successfully
+            try:
+                wb = openpyxl.load_workbook(path)
+            except Exception as e:
+                # File exists but can't be loaded - DON'T create new one!
+                # This protects against data loss
+                print(f"CRITICAL: Cannot load existing Excel file {path}: {e}")
+                print(f"Skipping save to prevent data loss of sheet: {sheet_name}")
+                return
+
+        # Remove sheet if it exists (to avoid duplicates)
+        if sheet_name in wb.sheetnames:
+            del wb[sheet_name]
+
+        # Create new sheet and write data using openpyxl directly
+        ws = wb.create_sheet(sheet_name)
+
+        # Write headers
+        for col_idx, col_name in enumerate(df.columns, 1):
+            ws.cell(row=1, column=col_idx, value=col_name)
+
+        # Write data rows
+        for row_idx, (_, row_data) in enumerate(df.iterrows(), 2):
+            for col_idx, value in enumerate(row_data, 1):
+                ws.cell(row=row_idx, column=col_idx, value=value)
+
+        # Ensure at least one sheet is visible
+        if not any(ws_check.sheet_state == 'visible' for ws_check in wb.worksheets):
+            if wb.sheetnames:
+                wb[wb.sheetnames[0]].sheet_state = 'visible'
+
+        wb.save(path)
+        wb.close()
+        workbook_store.invalidate(path)
+    except Exception as e:
+        print(f"Error saving {sheet_name}: {e}")
+
+
+# ==================== SUPABASE HELPERS ====================
+def _sb_load(table: str, columns: str = "*") -> pd.DataFrame:
+    """Load all rows from a Supabase table into a DataFrame."""
+    try:
+        resp = supabase_client.table(table).select(columns).execute()
+        return pd.DataFrame(resp.data or [])
+    except Exception as e:
+        print(f"Supabase load error [{table}]: {e}")
+        return pd.DataFrame()
+
+
+def _sb_upsert(df: pd.DataFrame, table: str):
+    """Upsert a DataFrame to a Supabase table."""
+    try:
+        records = df.where(pd.notna(df), None).to_dict("records")
+        if records:
+            supabase_client.table(table).upsert(records).execute()
+    except Exception as e:
+        print(f"Supabase upsert error [{table}]: {e}")
+
+
+# ==================== DUTIES MASTER SHEET FUNCTIONS ====================
+def load_duties_master_sheet(excel_path: Optional[str] = None) -> pd.DataFrame:
+    """Load duties master from Supabase or Excel sheet."""
+    columns = ["id", "title", "frequency", "default_minutes", "op", "active", "created_at"]
+    if supabase_enabled() and supabase_client:
+        df = _sb_load("duties_master")
+        return df if not df.empty else pd.DataFrame(columns=columns)
+    return load_excel_sheet(DUTIES_MASTER_SHEET, columns, excel_path)
+
+
+def save_duties_master_sheet(df: pd.DataFrame, excel_path: Optional[str] = None):
+    """Save duties master to Supabase or Excel sheet."""
+    if supabase_enabled() and supabase_client:
+        _sb_upsert(df, "duties_master")
+        return
+    save_excel_sheet(df, DUTIES_MASTER_SHEET, excel_path)
+
+
+# ==================== DUTY ASSIGNMENTS SHEET FUNCTIONS ====================
+def load_duty_assignments_sheet(excel_path: Optional[str] = None) -> pd.DataFrame:
+    """Load duty assignments from Supabase or Excel sheet."""
+    columns = ["id", "duty_id", "assistant", "op", "est_minutes", "active"]
+    if supabase_enabled() and supabase_client:
+        df = _sb_load("duty_assignments")
+        return df if not df.empty else pd.DataFrame(columns=columns)
+    return load_excel_sheet(DUTY_ASSIGNMENTS_SHEET, columns, excel_path)
+
+
+def save_duty_assignments_sheet(df: pd.DataFrame, excel_path: Optional[str] = None):
+    """Save duty assignments to Supabase or Excel sheet."""
+    if supabase_enabled() and supabase_client:
+        _sb_upsert(df, "duty_assignments")
+        return
+    save_excel_sheet(df, DUTY_ASSIGNMENTS_SHEET, excel_path)
+
+
+# ==================== DUTY RUNS SHEET FUNCTIONS ====================
+def load_duty_runs_sheet(excel_path: Optional[str] = None) -> pd.DataFrame:
+    """Load duty runs from Supabase or Excel sheet."""
+    columns = ["id", "date", "assistant", "duty_id", "status", "started_at", "due_at", "ended_at", "est_minutes", "op"]
+    if supabase_enabled() and supabase_client:
+        df = _sb_load("duty_runs")
+        return df if not df.empty else pd.DataFrame(columns=columns)
+    return load_excel_sheet(DUTY_RUNS_SHEET, columns, excel_path)
+
+
+def save_duty_runs_sheet(df: pd.DataFrame, excel_path: Optional[str] = None):
+    """Save duty runs to Supabase or Excel sheet."""
+    invalidate_availability("duty")
+    if supabase_enabled() and supabase_client:
+        _sb_upsert(df, "duty_runs")
+        return
+    save_excel_sheet(df, DUTY_RUNS_SHEET, excel_path)
+
+
+# ==================== PATIENTS SHEET FUNCTIONS ====================
+def load_patients_sheet(excel_path: Optional[str] = None) -> pd.DataFrame:
+    """Load patients from Supabase or Excel sheet."""
+    columns = ["id", "name"]
+    if supabase_enabled() and supabase_client:
+        df = _sb_load("patients")
+        return df if not df.empty else pd.DataFrame(columns=columns)
+    return load_excel_sheet(PATIENTS_SHEET, columns, excel_path)
+
+
+def save_patients_sheet(df: pd.DataFrame, excel_path: Optional[str] = None):
+    """Save patients to Supabase or Excel sheet."""
+    if supabase_enabled() and supabase_client:
+        _sb_upsert(df, "patients")
+        return
+    save_excel_sheet(df, PATIENTS_SHEET, excel_path)
+
+
+# ==================== EXCEL-BASED DUTY FUNCTIONS ====================
+def fetch_active_duty_assignments_excel(assistant: str) -> list[dict[str, Any]]:
+    """Fetch active duty assignments from Excel (replaces Supabase version)."""
+    if not assistant:
+        return []
+    try:
+        assignments_df = load_duty_assignments_sheet()
+        duties_df = load_duties_master_sheet()
+
+        if assignments_df.empty or duties_df.empty:
+            return []
+
+        # Filter assignments by assistant and active=True
+        matching = assignments_df[
+            (assignments_df["assistant"].astype(str).str.strip() == assistant) &
+            (assignments_df["active"].astype(str).str.lower() == "true")
+        ]
+
+        if matching.empty:
+            return []
+
+        # Create lookup of duties
+        duty_map = {}
+        for _, duty_row in duties_df.iterrows():
+            duty_id = str(duty_row.get("id", ""))
+            if duty_row.get("active") and duty_id:
+                duty_map[duty_id] = {
+                    "id": duty_id,
+                    "title": str(duty_row.get("title", "")),
+                    "frequency": str(duty_row.get("frequency", "")).upper(),
+                    "default_minutes": _safe_int(duty_row.get("default_minutes"), 15),
+                    "op": str(duty_row.get("op", "")),
+                }
+
+        # Combine assignments with duty details
+        result = []
+        for _, assign_row in matching.iterrows():
+            duty_id = str(assign_row.get("duty_id", ""))
+            duty = duty_map.get(duty_id)
+            if not duty:
+                continue
+
+            est = assign_row.get("est_minutes")
+            if est is None or (isinstance(est, float) and pd.isna(est)):
+                est = duty.get("default_minutes", 15)
+            else:
+                est = _safe_int(est, 15)
+
+            result.append({
+                "assignment_id": str(assign_row.get("id", "")),
+                "duty_id": duty_id,
+                "title": duty["title"],
+                "frequency": duty["frequency"],
+                "est_minutes": est,
+                "op": assign_row.get("op") or duty["op"],
+            })
+
+        return result
+    except Exception as e:
+        print(f"Error fetching duty assignments: {e}")
+        return []
+
+
+def fetch_duty_runs_since_excel(assistant: str, start_date_iso: str) -> list[dict[str, Any]]:
+    """Fetch duty runs since date from Excel (replaces Supabase version)."""
+    if not assistant or not start_date_iso:
+        return []
+    try:
+        runs_df = load_duty_runs_sheet()
+        if runs_df.empty:
+            return []
+
+        # Filter by assistant and date >= start_date
+        matching = runs_df.loc[
+            (runs_df["assistant"].astype(str).str.strip() == assistant) &
+            (runs_df["date"].astype(str) >= start_date_iso)
+        ]
+
+        return matching.to_dict("records") if not matching.empty else []
+    except Exception as e:
+        print(f"Error fetching duty runs: {e}")
+        return []
+
+
+def fetch_active_duty_run_excel(assistant: str) -> Optional[dict[str, Any]]:
+    """Fetch active (IN_PROGRESS) duty run from Excel (replaces Supabase version)."""
+    if not assistant:
+        return None
+    try:
+        runs_df = load_duty_runs_sheet()
+        if runs_df.empty:
+            return None
+
+        # Filter by assistant and status=IN_PROGRESS, sorted by started_at descending
+        matching = runs_df.loc[
+            (runs_df["assistant"].astype(str).str.strip() == assistant) &
+            (runs_df["status"].astype(str).str.upper() == "IN_PROGRESS")
+        ]
+
+        if matching.empty:
+            return None
+
+        # Sort by started_at descending and get first
+        matching_sorted = matching.sort_values("started_at", ascending=False)
+        return matching_sorted.iloc[0].to_dict()
+    except Exception:
+        return None
+
+
+def start_duty_run_excel(assistant: str, duty: dict[str, Any]) -> tuple[Optional[str], dict[str, Any]]:
+    """Start a duty run in Excel (replaces Supabase version)."""
+    now_dt = now_ist()
+    est = _safe_int(duty.get("est_minutes"), 15)
+    due_dt = now_dt + timedelta(minutes=est)
+
+    payload = {
+        "id": str(uuid.uuid4()),
+        "date": now_dt.date().isoformat(),
+        "assistant": assistant,
+        "duty_id": duty.get("duty_id"),
+        "status": "IN_PROGRESS",
+        "started_at": now_dt.isoformat(),
+        "due_at": due_dt.isoformat(),
+        "op": duty.get("op"),
+        "est_minutes": est,
+    }
+
+    try:
+        runs_df = load_duty_runs_sheet()
+        new_row = pd.DataFrame([payload])
+        combined = pd.concat([runs_df, new_row], ignore_index=True)
+        save_duty_runs_sheet(combined)
+        return payload["id"], payload
+    except Exception as e:
+        print(f"Failed to start duty: {e}")
+        return None, payload
+
+
+def mark_duty_done_excel(run_id: str) -> bool:
+    """Mark duty run as DONE in Excel (replaces Supabase version)."""
+    if not run_id:
+        return False
+    try:
+        runs_df = load_duty_runs_sheet()
+        if runs_df.empty:
+            return False
+
+        # Update the row with matching id
+        runs_df.loc[runs_df["id"] == run_id, "status"] = "DONE"
+        runs_df.loc[runs_df["id"] == run_id, "ended_at"] = now_ist().isoformat()
+
+        save_duty_runs_sheet(runs_df)
+        return True
+    except Exception as e:
+        print(f"Failed to mark duty done: {e}")
+        return False
+
+
+def search_patients_excel(query: str, limit: int = 50) -> list[dict[str, str]]:
+    """Search patients from Excel sheet (replaces Supabase version)."""
+    q = (query or "").strip().lower()
+    if not q:
+        return []
+
+    try:
+        patients_df = load_patients_sheet()
+        if patients_df.empty:
+            return []
+
+        # Filter by id or name containing query
+        matching = patients_df.loc[
+            (patients_df["id"].astype(str).str.lower().str.contains(q, na=False)) |
+            (patients_df["name"].astype(str).str.lower().str.contains(q, na=False))
+        ].head(limit)
+
+        return matching.to_dict("records") if not matching.empty else []
+    except Exception as e:
+        print(f"Error searching patients: {e}")
+        return []
+
+
+@st.cache_data(ttl=5)
+def db_get_one_attendance(_supabase, date_str: str, assistant: str):
+    try:
+        res = (
+            _supabase.table("assistant_attendance")
+            .select("date,assistant,punch_in,punch_out")
+            .eq("date", date_str)
+            .eq("assistant", assistant)
+            .limit(1)
+            .execute()
+        )
+        return res.data[0] if res.data else None
+    except Exception as e:
+        st.warning(f"Attendance fetch failed: {e}")
+        return None
+
+
+@st.cache_data(ttl=5)
+def _load_attendance_today_supabase(_supabase, date_str: str) -> list[dict[str, Any]]:
+    try:
+        res = (
+            _supabase.table("assistant_attendance")
+            .select("assistant,punch_in,punch_out")
+            .eq("date", date_str)
+            .execute()
+        )
+        return res.data or []
+    except Exception:
+        return []
+
+
+@st.cache_data(ttl=30)
+def _load_attendance_range_supabase(
+    _supabase,
+    start_date: str,
+    end_date: str,
+) -> list[dict[str, Any]]:
+    if not _supabase or not start_date or not end_date:
+        return []
+    try:
+        res = (
+            _supabase.table("assistant_attendance")
+            .select("date,assistant,punch_in,punch_out")
+            .gte("date", start_date)
+            .lte("date", end_date)
+            .execute()
+        )
+        return res.data or []
+    except Exception as e:
+        st.warning(f"Attendance fetch failed: {e}")
+        return []
+
+
+@st.cache_data(ttl=5)
+def _load_attendance_today_excel(_excel_path: Optional[str], date_str: str) -> list[dict[str, Any]]:
+    try:
+        att_df = load_attendance_sheet(_excel_path)
+        if att_df is None or att_df.empty:
+            return []
+        day_df = att_df.loc[att_df["DATE"] == date_str]
+        if day_df.empty:
+            return []
+        return day_df.to_dict(orient="records")
+    except Exception:
+        return []
+
+
+def _build_punch_map_from_records(records: list[dict[str, Any]]) -> dict[str, dict[str, str]]:
+    out: dict[str, dict[str, str]] = {}
+    for rec in records or []:
+        if not isinstance(rec, dict):
+            continue
+        name = str(rec.get("assistant") or rec.get("ASSISTANT") or "").strip().upper()
+        if not name:
+            continue
+        punch_in = str(rec.get("punch_in") or rec.get("PUNCH IN") or "").strip()
+        punch_out = str(rec.get("punch_out") or rec.get("PUNCH OUT") or "").strip()
+        out[name] = {"punch_in": punch_in, "punch_out": punch_out}
+    return out
+
+
+def _get_today_punch_map() -> dict[str, dict[str, str]]:
+    date_str, _ = ist_today_and_time()
+    if supabase_enabled() and supabase_client is not None:
+        records = _load_attendance_today_supabase(supabase_client, date_str)
+        return _build_punch_map_from_records(records)
+    records = _load_attendance_today_excel(None, date_str)
+    return _build_punch_map_from_records(records)
+
+
+def db_punch_in(supabase, date_str: str, assistant: str, now_time: str):
+    try:
+        payload = {"date": date_str, "assistant": assistant, "punch_in": now_time}
+        supabase.table("assistant_attendance").upsert(payload, on_conflict="date,assistant").execute()
+        invalidate_availability("punch")
+        try:
+            db_get_one_attendance.clear()
+        except Exception:
+            pass
+        try:
+            _load_attendance_today_supabase.clear()
+        except Exception:
+            pass
+    except Exception as e:
+        st.error(f"Punch in failed: {e}")
+
+
+def db_punch_out(supabase, date_str: str, assistant: str, now_time: str):
+    try:
+        supabase.table("assistant_attendance").update({"punch_out": now_time}).eq("date", date_str).eq("assistant", assistant).execute()
+        invalidate_availability("punch")
+        try:
+            db_get_one_attendance.clear()
+        except Exception:
+            pass
+        try:
+            _load_attendance_today_supabase.clear()
+        except Exception:
+            pass
+    except Exception as e:
+        st.error(f"Punch out failed: {e}")
+
+
+# ================= DUTY REMINDER (SUPABASE) =================
+@st.cache_data(ttl=5)
+def fetch_active_duty_assignments(_supabase, assistant: str) -> list[dict[str, Any]]:
+    # Using Excel backend (Supabase disabled)
+    return fetch_active_duty_assignments_excel(assistant)
+
+
+@st.cache_data(ttl=5)
+def fetch_duty_runs_since(_supabase, assistant: str, start_date_iso: str):
+    # Using Excel backend (Supabase disabled)
+    return fetch_duty_runs_since_excel(assistant, start_date_iso)
+
+
+@st.cache_data(ttl=5)
+def fetch_active_duty_run(_supabase, assistant: str):
+    # Using Excel backend (Supabase disabled)
+    return fetch_active_duty_run_excel(assistant)
+
+
+def start_duty_run_supabase(supabase, assistant: str, duty: dict[str, Any]):
+    # Using Excel backend (Supabase disabled)
+    return start_duty_run_excel(assistant, duty)
+
+
+def mark_duty_done_supabase(supabase, run_id: str):
+    # Using Excel backend (Supabase disabled)
+    return mark_duty_done_excel(run_id)
+
+
+# ================ PROFILES (SUPABASE) ================
+def _seed_supabase_profiles_if_needed(client) -> None:
+    """Ensure all configured assistants/doctors exist in Supabase profiles table."""
+    if client is None:
+        return
+    try:
+        resp = client.table(PROFILE_SUPABASE_TABLE).select("id,name,kind").execute()
+        existing = resp.data or []
+        seen = {_norm_staff_key(r.get("name", "")) + "|" + str(r.get("kind", "")).upper() for r in existing}
+    except Exception:
+        seen = set()
+
+    now_iso = now_ist().isoformat(timespec="seconds")
+    to_insert: list[dict[str, Any]] = []
+
+    def _add(name: str, dept: str, kind: str):
+        key = _norm_staff_key(name) + "|" + kind.upper()
+        if key in seen:
+            return
+        to_insert.append({
+            "id": str(uuid.uuid4()),
+            "name": name.upper(),
+            "department": dept,
+            "contact_email": "",
+            "contact_phone": "",
+            "status": "ACTIVE",
+            "created_at": now_iso,
+            "updated_at": now_iso,
+            "created_by": "system_seed",
+            "updated_by": "system_seed",
+            "kind": kind,
+        })
+
+    config = _get_allocation_config()
+    dept_source = config.get("departments", {}) if isinstance(config, dict) else {}
+    if not isinstance(dept_source, dict) or not dept_source:
+        dept_source = DEPARTMENTS
+
+    for dept, data in dept_source.items():
+        if not isinstance(data, dict):
+            continue
+        for a in data.get("assistants", []) or []:
+            _add(a, dept, PROFILE_ASSISTANT_SHEET)
+        for d in data.get("doctors", []) or []:
+            _add(d, dept, PROFILE_DOCTOR_SHEET)
+
+    if to_insert:
+        try:
+            client.table(PROFILE_SUPABASE_TABLE).insert(to_insert).execute()
+            st.sidebar.info(f"Seeded {len(to_insert)} profiles to Supabase.")
+        except Exception:
+            pass
+
+
+# ================ Data Storage Configuration ================
+# SECURITY FIX: Removed hardcoded Supabase credentials
+def _safe_secret_get(key: str, default=None):
+    """Safely read st.secrets in all environments."""
+    try:
+        return st.secrets.get(key, default)
+    except Exception:
+        return default
+
+
+def _profiles_table_setup_sql(table_name: str) -> str:
+    table = table_name or "profiles"
+    return (
+        f"create table if not exists {table} (\n"
+        "  id text primary key,\n"
+        "  kind text not null,\n"
+        "  name text not null,\n"
+        "  department text,\n"
+        "  contact_email text,\n"
+        "  contact_phone text,\n"
+        "  status text,\n"
+        "  weekly_off text,\n"
+        "  pref_first text,\n"
+        "  pref_second text,\n"
+        "  pref_third text,\n"
+        "  created_at timestamptz,\n"
+        "  updated_at timestamptz,\n"
+        "  created_by text,\n"
+        "  updated_by text\n"
+        ");\n"
+    )
+
+
+@st.cache_data(ttl=30)
+def _profiles_table_ready(_supabase, table_name: str) -> tuple[bool, str]:
+    if not _supabase or not table_name:
+        return False, "Supabase client is not available."
+    try:
+        _supabase.table(table_name).select("id,kind,name").limit(1).execute()
+        return True, ""
+    except Exception as e:
+        return False, str(e)
+
+
+def _render_profiles_setup_help(table_name: str, err: Optional[str] = None) -> None:
+    st.error("Supabase profiles table is missing or misconfigured.")
+    if err:
+        st.caption(f"Details: {err}")
+    st.markdown("Create the table in Supabase SQL Editor:")
+    st.code(_profiles_table_setup_sql(table_name), language="sql")
+    st.markdown(
+        "If you use an anon key, add RLS policies that allow read and write, "
+        "or use a service role key."
+    )
+
+
+def load_profiles(sheet_name: str) -> pd.DataFrame:
+    """Load assistant/doctor profiles (Supabase-first).
+
+    Performance: Results are cached by _load_profiles_cached wrapper
+    """
+    if supabase_enabled() and supabase_client is not None:
+        try:
+            # Optimized: Only fetch needed columns for faster query
+            resp = (
+                supabase_client.table(PROFILE_SUPABASE_TABLE)
+                .select("id,name,kind,department,status,weekly_off,pref_first,pref_second,pref_third")
+                .eq("kind", sheet_name)
+                .execute()
+            )
+            data = resp.data or []
+            df = pd.DataFrame(data)
+            if df.empty:
+                return _ensure_profile_df(pd.DataFrame())
+            # Coerce helper columns
+            df["name"] = df["name"].astype(str).str.upper()
+            df["department"] = df["department"].astype(str).str.upper() if "department" in df.columns else ""
+            # Ensure preference/weekly_off columns exist
+            if "weekly_off" not in df.columns:
+                df["weekly_off"] = ""
+            if "pref_first" not in df.columns:
+                df["pref_first"] = ""
+            if "pref_second" not in df.columns:
+                df["pref_second"] = ""
+            if "pref_third" not in df.columns:
+                df["pref_third"] = ""
+            return _ensure_profile_df(df)
+        except Exception:
+            return _ensure_profile_df(pd.DataFrame())
+    try:
+        # Served from the workbook read cache until the file changes on disk.
+        data = workbook_store.read_sheet_values(file_path, sheet_name)
+        if data is None:
+            if not os.path.exists(file_path):
+                wb = openpyxl.Workbook()
+                wb.remove(wb.active)
+                wb.create_sheet(sheet_name)
+                wb.save(file_path)
+            try:
+                wb = openpyxl.load_workbook(file_path)
+            except (zipfile.BadZipFile, KeyError, Exception):
+                # Repair a corrupted workbook by recreating it
+                # (catches [Content_Types].xml missing errors and other corruption)
+                try:
+                    os.remove(file_path)
+                except Exception:
+                    pass
+                wb = openpyxl.Workbook()
+                wb.remove(wb.active)
+                wb.create_sheet(sheet_name)
+                wb.save(file_path)
+            if sheet_name not in wb.sheetnames:
+                ws = wb.create_sheet(sheet_name)
+                ws.append(PROFILE_COLUMNS)
+                wb.save(file_path)
+            ws = wb[sheet_name]
+            data = list(ws.values)
+        if len(data) > 1:
+            df = pd.DataFrame(data[1:], columns=data[0])
+        elif len(data) == 1:
+            df = pd.DataFrame(columns=data[0])
+        else:
+            # Sheet is completely empty, use PROFILE_COLUMNS as default
+            df = pd.DataFrame(columns=PROFILE_COLUMNS)
+        return _ensure_profile_df(df)
+    except Exception as e:
+        st.error(f"Error loading profiles '{sheet_name}': {e}")
+        return _ensure_profile_df(pd.DataFrame())
+
+
+def save_profiles(df: pd.DataFrame, sheet_name: str) -> bool:
+    """Persist assistant/doctor profiles (Supabase-first). Returns True on success."""
+    if supabase_enabled() and supabase_client is not None:
+        try:
+            clean_df = _ensure_profile_df(df)
+            clean_df = clean_df.where(pd.notna(clean_df), None)
+            if "id" in clean_df.columns:
+                ids = clean_df["id"].astype(str)
+                missing = clean_df["id"].isna() | ids.str.strip().isin(["", "nan", "none"])
+                if missing.any():
+                    clean_df.loc[missing, "id"] = [str(uuid.uuid4()) for _ in range(int(missing.sum()))]
+            clean_df["kind"] = sheet_name
+            # Flatten weekly_off lists if present
+            def _fmt_wo(val):
+                if isinstance(val, list):
+                    return ",".join([str(v) for v in val if str(v).strip()])
+                return str(val or "")
+            clean_df["weekly_off"] = clean_df["weekly_off"].apply(_fmt_wo)
+            # Upsert per row
+            rows = clean_df.to_dict(orient="records")
+            for row in rows:
+                rid = row.get("id")
+                if rid:
+                    res = supabase_client.table(PROFILE_SUPABASE_TABLE).upsert(row, on_conflict="id").execute()
+                else:
+                    res = supabase_client.table(PROFILE_SUPABASE_TABLE).insert(row).execute()
+                err = getattr(res, "error", None)
+                if err:
+                    raise RuntimeError(str(err))
+            try:
+                _get_active_assistant_profile_names.clear()
+            except Exception:
+                pass
+            return True
+        except Exception as e:
+            st.error(f"Error saving profiles to Supabase '{sheet_name}': {e}")
+            st.info("Ensure the profiles table exists and has all required columns.")
+            st.code(_profiles_table_setup_sql(PROFILE_SUPABASE_TABLE), language="sql")
+            return False
+    try:
+        clean_df = _ensure_profile_df(df)
+        clean_df = clean_df.where(pd.notna(clean_df), None)
+        if "id" in clean_df.columns:
+            ids = clean_df["id"].astype(str)
+            missing = clean_df["id"].isna() | ids.str.strip().isin(["", "nan", "none"])
+            if missing.any():
+                clean_df.loc[missing, "id"] = [str(uuid.uuid4()) for _ in range(int(missing.sum()))]
+        try:
+            wb = openpyxl.load_workbook(file_path)
+        except (zipfile.BadZipFile, KeyError, Exception):
+            wb = openpyxl.Workbook()
+
+        # Use ExcelWriter to write the sheet (replaces if exists, creates if not)
+        # Use mode='a' (append) with if_sheet_exists='replace' to keep other sheets intact
+        with pd.ExcelWriter(file_path, engine="openpyxl", mode="a", if_sheet_exists="replace") as writer:
+            clean_df.to_excel(writer, sheet_name=sheet_name, index=False)
+
+        # After saving, reload and ensure at least one sheet is visible
+        try:
+            wb = openpyxl.load_workbook(file_path)
+            if not any(ws.sheet_state == 'visible' for ws in wb.worksheets):
+                # If no sheets are visible, make the first one visible
+                if wb.sheetnames:
+                    wb[wb.sheetnames[0]].sheet_state = 'visible'
+                    wb.save(file_path)
+        except Exception:
+            pass  # If we can't fix visibility, that's ok
+        workbook_store.invalidate(file_path)
+        try:
+            _get_active_assistant_profile_names.clear()
+        except Exception:
+            pass
+        return True
+    except Exception as e:
+        st.error(f"Error saving profiles '{sheet_name}': {e}")
+        return False
+
+
+@st.cache_data(ttl=600, show_spinner="Loading profiles...")
+def _load_profiles_cached(sheet_name: str, cache_bust: int) -> pd.DataFrame:
+    """Load profiles with aggressive caching (10 minutes).
+
+    Profiles don't change frequently, so we cache for longer to improve performance.
+    Use cache_bust parameter to force refresh when needed.
+    """
+    return load_profiles(sheet_name)
+
+
+def _get_supabase_config_from_secrets_or_env():
+    """Return (url, key, table, row_id, profile_table) from Streamlit secrets/env vars."""
+    url = ""
+    key = ""
+    service_key = ""
+    table = supabase_table_name
+    row_id = supabase_row_id
+    profile_table = PROFILE_SUPABASE_TABLE
+
+    try:
+        if hasattr(st, 'secrets'):
+            supabase_section = st.secrets.get("supabase", None)
+            if isinstance(supabase_section, dict):
+                # Support [supabase] table in secrets for legacy configs.
+                url = str(supabase_section.get("url", "") or "").strip() or url
+                key = str(supabase_section.get("key", "") or "").strip() or key
+                service_key = str(supabase_section.get("service_role_key", "") or "").strip() or service_key
+                table = str(supabase_section.get("table", table) or table).strip() or table
+                row_id = str(supabase_section.get("row_id", row_id) or row_id).strip() or row_id
+                profile_table = str(supabase_section.get("profile_table", profile_table) or profile_table).strip() or profile_table
+
+            url = str(st.secrets.get("supabase_url", "") or "").strip() or url
+            key = str(st.secrets.get("supabase_key", "") or "").strip() or key
+            service_key = str(st.secrets.get("supabase_service_role_key", "") or "").strip() or service_key
+            table = str(st.secrets.get("supabase_table", table) or table).strip() or table
+            row_id = str(st.secrets.get("supabase_row_id", row_id) or row_id).strip() or row_id
+            profile_table = str(st.secrets.get("supabase_profile_table", profile_table) or profile_table).strip() or profile_table
+    except Exception:
+        pass
+
+    if not url:
+        url = os.getenv("SUPABASE_URL", "").strip()
+    if not key:
+        key = os.getenv("SUPABASE_KEY", "").strip()
+    if not service_key:
+        service_key = os.getenv("SUPABASE_SERVICE_ROLE_KEY", "").strip()
+    if os.getenv("SUPABASE_TABLE"):
+        table = os.getenv("SUPABASE_TABLE", table).strip() or table
+    if os.getenv("SUPABASE_ROW_ID"):
+        row_id = os.getenv("SUPABASE_ROW_ID", row_id).strip() or row_id
+    if os.getenv("SUPABASE_PROFILE_TABLE"):
+        profile_table = os.getenv("SUPABASE_PROFILE_TABLE", profile_table).strip() or profile_table
+
+    # SECURITY FIX: No hardcoded defaults - require configuration via secrets/env
+    if not url or not key:
+        # Return None to indicate Supabase is not configured (caller should handle gracefully)
+        return None, None, table, row_id, profile_table
+
+    # Prefer service role key when present (avoids RLS setup for server-side app).
+    effective_key = service_key or key
+    return url, effective_key, table, row_id, profile_table
+
+
+@st.cache_resource
+def _get_supabase_client_cached(_url: str, _key: str):
+    return create_client(_url, _key)
+
+
+def _get_supabase_client(_url: Optional[str], _key: Optional[str]):
+    if not SUPABASE_AVAILABLE:
+        return None
+    if not _url or not _key:
+        return None
+    try:
+        return _get_supabase_client_cached(_url, _key)
+    except Exception:
+        try:
+            return create_client(_url, _key)
+        except Exception:
+            return None
+
+
+def connect_supabase() -> bool:
+    """Point supabase_client/table/row at the configured project (called once per run)."""
+    global supabase_client, supabase_table_name, supabase_row_id
+    try:
+        url, key, table, row_id, _profile_table = _get_supabase_config_from_secrets_or_env()
+        if url and key and SUPABASE_AVAILABLE:
+            client = _get_supabase_client(url, key)
+            if client is not None:
+                supabase_client = client
+                supabase_table_name = table
+                supabase_row_id = row_id
+                return True
+    except Exception:
+        pass
+    return False
+
+
+def _supabase_ready_recent() -> bool:
+    """Check if Supabase connectivity was verified recently.
+
+    Performance: Cache connectivity check for 5 minutes to avoid repeated queries
+    """
+    try:
+        if not st.session_state.get("supabase_ready"):
+            return False
+        last = float(st.session_state.get("supabase_ready_at") or 0.0)
+        # Increased from 60s to 300s (5 minutes) for better performance
+        return (time_module.time() - last) < 300
+    except Exception:
+        return False
+
+
+def _get_expected_columns():
+    return [
+        "Patient ID", "Patient Name", "In Time", "Out Time", "Procedure", "DR.",
+        "FIRST", "SECOND", "Third", "CASE PAPER", "OP",
+        "SUCTION", "CLEANING", "STATUS", "REMINDER_ROW_ID",
+        "REMINDER_SNOOZE_UNTIL", "REMINDER_DISMISSED",
+        # Time tracking / status audit (stored in the same allotment table)
+        "STATUS_CHANGED_AT", "ACTUAL_START_AT", "ACTUAL_END_AT", "STATUS_LOG",
+    ]
+
+
+# ================ PATIENT SEARCH (SUPABASE) ================
+def _get_patients_config_from_secrets_or_env():
+    """Return (patients_table, id_col, name_col)."""
+    patients_table = "patients"
+    id_col = "id"
+    name_col = "name"
+
+    try:
+        if hasattr(st, 'secrets'):
+            patients_table = str(st.secrets.get("supabase_patients_table", patients_table) or patients_table).strip() or patients_table
+            id_col = str(st.secrets.get("supabase_patients_id_col", id_col) or id_col).strip() or id_col
+            name_col = str(st.secrets.get("supabase_patients_name_col", name_col) or name_col).strip() or name_col
+    except Exception:
+        pass
+
+    patients_table = os.getenv("SUPABASE_PATIENTS_TABLE", patients_table).strip() or patients_table
+    id_col = os.getenv("SUPABASE_PATIENTS_ID_COL", id_col).strip() or id_col
+    name_col = os.getenv("SUPABASE_PATIENTS_NAME_COL", name_col).strip() or name_col
+    return patients_table, id_col, name_col
+
+
+@st.cache_data(ttl=60)
+def search_patients_from_supabase(
+    _url: str,
+    _key: str,
+    _patients_table: str,
+    _id_col: str,
+    _name_col: str,
+    _query: str,
+    _limit: int = 50,
+):
+    """Search patients (id + name) from a Supabase table."""
+    q = (_query or "").strip()
+    client = _get_supabase_client(_url, _key)
+    if client is None:
+        return []
+
+    def _is_simple_ident(name: str) -> bool:
+        return bool(re.match(r"^[A-Za-z_][A-Za-z0-9_]*$", str(name or "")))
+
+    def _quote_ident(name: str) -> str:
+        n = str(name or "")
+        # Quote if it has spaces, punctuation, or uppercase/lowercase sensitivity.
+        if _is_simple_ident(n) and n == n.lower():
+            return n
+        return '"' + n.replace('"', '""') + '"'
+
+    def _run(_id: str, _name: str, *, server_filter: bool) -> Optional[list[dict]]:
+        select_str = f"{_quote_ident(_id)},{_quote_ident(_name)}"
+        query = client.table(_patients_table).select(select_str)
+
+        # Only apply server-side ilike/order if the column name is a simple identifier.
+        if server_filter and q and _is_simple_ident(_name):
+            query = query.ilike(_name, f"%{q}%")
+        if server_filter and _is_simple_ident(_name):
+            query = query.order(_name)
+
+        resp = query.limit(_limit).execute()
+        err = getattr(resp, "error", None)
+        if err:
+            raise RuntimeError(str(err))
+        data = getattr(resp, "data", None)
+        return data
+
+    # PostgREST supports ilike and order.
+    try:
+        data = _run(_id_col, _name_col, server_filter=True)
+    except Exception as e:
+        # Common case: columns are not named exactly `id`/`name`.
+        # Postgres error code for unknown column is 42703.
+        err_text = str(e)
+        if "42703" not in err_text and "does not exist" not in err_text:
+            raise
+
+        # First try to infer actual column names by sampling 1 row.
+        inferred_id: Optional[str] = None
+        inferred_name: Optional[str] = None
+        try:
+            probe = client.table(_patients_table).select("*").limit(1).execute()
+            probe_err = getattr(probe, "error", None)
+            if probe_err:
+                raise RuntimeError(str(probe_err))
+            probe_data = getattr(probe, "data", None)
+            if isinstance(probe_data, list) and probe_data and isinstance(probe_data[0], dict):
+                keys = [str(k) for k in probe_data[0].keys()]
+                keys_l = {k.lower(): k for k in keys}
+
+                # Heuristics: prefer exact matches, else keys containing patient+id/name.
+                for cand in ["id", "patient_id", "patientid", "uhid", "pid", "patient id"]:
+                    if cand in keys_l:
+                        inferred_id = keys_l[cand]
+                        break
+                for cand in ["name", "patient_name", "patientname", "full_name", "fullname", "patient name"]:
+                    if cand in keys_l:
+                        inferred_name = keys_l[cand]
+                        break
+        except Exception:
+            inferred_id = None
+            inferred_name = None
+
+        if inferred_id and inferred_name:
+            data = _run(inferred_id, inferred_name, server_filter=_is_simple_ident(inferred_name))
+            _id_col, _name_col = inferred_id, inferred_name
+        else:
+            # Fall back to trying a broader set of common column names.
+            id_candidates = [
+                _id_col,
+                "id",
+                "ID",
+                "patient_id",
+                "patientId",
+                "patientid",
+                "uhid",
+                "UHID",
+                "pid",
+                "PID",
+                "patient id",
+                "Patient ID",
+            ]
+            name_candidates = [
+                _name_col,
+                "name",
+                "NAME",
+                "patient_name",
+                "patientName",
+                "patientname",
+                "full_name",
+                "fullName",
+                "fullname",
+                "patient name",
+                "Patient Name",
+            ]
+
+            last_err: Optional[Exception] = None
+            data = None
+            for cid in id_candidates:
+                for cname in name_candidates:
+                    if not cid or not cname:
+                        continue
+                    try:
+                        data = _run(cid, cname, server_filter=_is_simple_ident(cname))
+                        _id_col = cid
+                        _name_col = cname
+                        last_err = None
+                        break
+                    except Exception as inner:
+                        last_err = inner
+                        continue
+                if last_err is None and data is not None:
+                    break
+            if data is None:
+                raise last_err if last_err is not None else e
+
+    if not isinstance(data, list):
+        return []
+    out = []
+    for row in data:
+        pid = row.get(_id_col)
+        name = row.get(_name_col)
+        if pid is None or name is None:
+            continue
+        out.append({"id": str(pid), "name": str(name)})
+
+    # If we couldn't do server-side filtering (e.g., quoted column names), filter locally.
+    if q and out:
+        ql = q.lower()
+        out = [p for p in out if ql in str(p.get("name", "")).lower()]
+    return out
+
+
+@st.cache_data(ttl=300, show_spinner="Loading data from Supabase...")
+def load_data_from_supabase(_url: str, _key: str, _table: str, _row_id: str) -> Optional[pd.DataFrame]:
+    """Load dataframe payload from Supabase.
+
+    Storage model: a single row with `id` and `payload` (jsonb).
+    payload = {"columns": [...], "rows": [ {col: val, ...}, ... ]}
+
+    Performance: Cached for 5 minutes (300s) to minimize API calls
+    """
+    try:
+        client = _get_supabase_client(_url, _key)
+        if client is None:
+            return None
+
+        # Optimized query: only fetch payload field
+        resp = client.table(_table).select("payload").eq("id", _row_id).limit(1).execute()
+
+        data = getattr(resp, "data", None)
+        if not data:
+            return pd.DataFrame(columns=_get_expected_columns())
+        payload = data[0].get("payload") if isinstance(data, list) else None
+        if not payload:
+            return pd.DataFrame(columns=_get_expected_columns())
+
+        columns = payload.get("columns") or _get_expected_columns()
+        # Ensure new expected columns are added for older saved payloads.
+        try:
+            expected = _get_expected_columns()
+            for col in expected:
+                if col not in columns:
+                    columns.append(col)
+        except Exception:
+            pass
+        rows = payload.get("rows") or []
+        df = pd.DataFrame(rows)
+        # Ensure expected columns are present and ordered
+        for col in columns:
+            if col not in df.columns:
+                df[col] = ""
+        df = df.loc[:, columns]
+
+        # Optional metadata (e.g., assistant time blocks)
+        try:
+            meta = payload.get("meta")
+            if isinstance(meta, dict):
+                df.attrs["meta"] = dict(meta)
+        except Exception:
+            pass
+        return df
+    except Exception as e:
+        st.error(f"Error loading from Supabase: {e}")
+        return None
+
+
+def save_data_to_supabase(_url: str, _key: str, _table: str, _row_id: str, df: pd.DataFrame) -> bool:
+    """Save dataframe payload to Supabase (upsert)."""
+    try:
+        client = _get_supabase_client(_url, _key)
+        if client is None:
+            return False
+
+        df_clean = df.copy().fillna("")
+        # Convert to JSON-serializable primitives; avoid pandas NA
+        for col in df_clean.columns:
+            df_clean[col] = df_clean[col].astype(object)
+
+        payload = {
+            "columns": df_clean.columns.tolist(),
+            "rows": df_clean.to_dict(orient="records"),
+        }
+
+        # Optional metadata (stored alongside rows/columns)
+        try:
+            meta = _get_meta_from_df(df)
+            meta = _apply_time_blocks_to_meta(meta)
+            payload["meta"] = meta
+        except Exception:
+            pass
+        client.table(_table).upsert({"id": _row_id, "payload": payload}).execute()
+
+        # PERFORMANCE: Don't clear cache here - let TTL handle it
+        # Cache will auto-refresh after 5 minutes, preventing excessive API calls
+        # Only clear session cache to force reload on next access
+        if "cached_df_timestamp" in st.session_state:
+            st.session_state.cached_df_timestamp = 0  # Force reload from Streamlit cache
+
+        return True
+    except Exception as e:
+        st.error(f"Error saving to Supabase: {e}")
+        return False
+
+
+def _get_meta_save_version(meta: Optional[dict]) -> Optional[int]:
+    if not isinstance(meta, dict):
+        return None
+    try:
+        val = meta.get("save_version")
+        if val is None or str(val).strip() == "":
+            return None
+        return int(float(val))
+    except Exception:
+        return None
+
+
+def _meta_for_hash(meta: Optional[dict]) -> dict:
+    if not isinstance(meta, dict):
+        return {}
+    skip = {"time_blocks_updated_at", "saved_at", "save_version"}
+    return {k: v for k, v in meta.items() if k not in skip}
+
+
+def _compute_save_hash(df_any: pd.DataFrame, meta: Optional[dict]) -> str:
+    try:
+        data_hash = hashlib.md5(pd.util.hash_pandas_object(df_any, index=True).values.tobytes()).hexdigest()
+    except Exception:
+        data_hash = hashlib.md5(str(df_any).encode("utf-8")).hexdigest()
+    try:
+        meta_hash = hashlib.md5(
+            json.dumps(_meta_for_hash(meta), sort_keys=True, default=str).encode("utf-8")
+        ).hexdigest()
+    except Exception:
+        meta_hash = ""
+    return hashlib.md5(f"{data_hash}|{meta_hash}".encode("utf-8")).hexdigest()
+
+
+def _fetch_remote_save_version() -> Optional[int]:
+    try:
+        if supabase_enabled():
+            sup_url, sup_key, sup_table, sup_row, _ = _get_supabase_config_from_secrets_or_env()
+            client = _get_supabase_client(sup_url, sup_key)
+            if client is None:
+                return None
+            resp = client.table(sup_table).select("payload").eq("id", sup_row).limit(1).execute()
+            data = getattr(resp, "data", None)
+            if not data:
+                return None
+            payload = data[0].get("payload") if isinstance(data, list) else None
+            meta = payload.get("meta") if isinstance(payload, dict) else None
+            return _get_meta_save_version(meta)
+    except Exception:
+        return None
+    return None
+
+
+# ================ Load Data ================
+# PERFORMANCE: Use session-based caching to reduce API calls across reruns
+def _get_cached_data() -> pd.DataFrame:
+    """Get data with session-level caching for maximum performance."""
+    # Check if we have valid cached data in session
+    if "cached_df_raw" in st.session_state and "cached_df_timestamp" in st.session_state:
+        cached_time = st.session_state.get("cached_df_timestamp", 0)
+        current_time = time_module.time()
+        # Cache is valid for 2 minutes in session state (in addition to Streamlit cache)
+        if current_time - cached_time < 120:
+            return st.session_state.cached_df_raw
+
+    # Load fresh data
+    df_raw: Optional[pd.DataFrame] = None
+    st.session_state.supabase_fallback = False
+
+    if supabase_enabled():
+        sup_url, sup_key, sup_table, sup_row, _ = _get_supabase_config_from_secrets_or_env()
+        # Check if Supabase is actually configured
+        if sup_url and sup_key:
+            df_raw = load_data_from_supabase(sup_url, sup_key, sup_table, sup_row)
+            if df_raw is None:
+                st.warning("⚠️ Failed to load from Supabase. Falling back to local Excel file.")
+                st.session_state.supabase_fallback = True  # Disable for this session
+        else:
+            st.warning("⚠️ Supabase not configured. Falling back to local Excel file.")
+            st.session_state.supabase_fallback = True  # Disable for this session
+
+    # Fallback to local Excel if cloud storage failed or not configured
+    if df_raw is None:
+        st.info("📁 Using local Excel file: Putt Allotment.xlsx")
+        try:
+            if os.path.exists(file_path):
+                df_raw = pd.read_excel(file_path, engine="openpyxl")
+            else:
+                # Create new Excel file with expected columns
+                df_raw = pd.DataFrame(columns=_get_expected_columns())
+                df_raw.to_excel(file_path, index=False, engine="openpyxl")
+                st.success(f"✅ Created new Excel file: {file_path}")
+        except Exception as e:
+            st.error(f"❌ Failed to load/create Excel file: {e}")
+            # Create empty dataframe as last resort
+            df_raw = pd.DataFrame(columns=_get_expected_columns())
+
+    # Store in session cache
+    st.session_state.cached_df_raw = df_raw
+    st.session_state.cached_df_timestamp = time_module.time()
+
+    return df_raw
+
+
+def _get_cached_schedule_hash(df_any: pd.DataFrame) -> str:
+    cache_key = _schedule_change_key()
+    cached_key = st.session_state.get("schedule_hash_key")
+    cached_hash = st.session_state.get("schedule_hash")
+    if cached_hash and cached_key == cache_key:
+        return cached_hash
+    meta = None
+    try:
+        meta = df_any.attrs.get("meta")
+    except Exception:
+        meta = None
+    new_hash = _compute_save_hash(df_any, meta)
+    st.session_state.schedule_hash_key = cache_key
+    st.session_state.schedule_hash = new_hash
+    return new_hash
+
+
+def _prepare_schedule_df_static(df_any: pd.DataFrame) -> pd.DataFrame:
+    df_local = df_any.copy()
+    df_local["In Time Str"] = df_local["In Time"].apply(dec_to_time)
+    df_local["Out Time Str"] = df_local["Out Time"].apply(dec_to_time)
+    df_local["In Time Obj"] = df_local["In Time Str"].apply(safe_str_to_time_obj)
+    df_local["Out Time Obj"] = df_local["Out Time Str"].apply(safe_str_to_time_obj)
+    if "SUCTION" in df_local.columns:
+        df_local["SUCTION"] = df_local["SUCTION"].apply(str_to_checkbox)
+    if "CLEANING" in df_local.columns:
+        df_local["CLEANING"] = df_local["CLEANING"].apply(str_to_checkbox)
+    df_local["In_min"] = df_local["In Time"].apply(time_to_minutes).astype("Int64")
+    df_local["Out_min"] = df_local["Out Time"].apply(time_to_minutes).astype("Int64")
+    df_local.loc[df_local["Out_min"] < df_local["In_min"], "Out_min"] += 1440
+    return df_local
+
+
+def _get_processed_schedule_df(df_any: pd.DataFrame) -> pd.DataFrame:
+    cache_key = _schedule_cache_key()
+    cached_key = st.session_state.get("schedule_df_cache_key")
+    cached_df = st.session_state.get("schedule_df_cache")
+    if cached_df is not None and cached_key == cache_key:
+        try:
+            return cached_df.copy(deep=False)
+        except Exception:
+            return cached_df
+    df_local = _prepare_schedule_df_static(df_any)
+    st.session_state.schedule_df_cache_key = cache_key
+    st.session_state.schedule_df_cache = df_local
+    return df_local
+
+
+def load_schedule() -> tuple[pd.DataFrame, pd.DataFrame]:
+    """(df_raw, df) for this run: stored or pending schedule, repaired and processed.
+
+    df_raw is the editable frame (session-cached, unsaved edits preferred);
+    df adds the parsed time columns and Is_Ongoing for the current minute.
+    """
+    df_raw = _get_cached_data()
+
+    # Track base save version/hash from storage unless we have local pending edits.
+    loaded_meta = _get_meta_from_df(df_raw)
+    if st.session_state.get("unsaved_df") is None:
+        loaded_version = _get_meta_save_version(loaded_meta)
+        if loaded_version is not None:
+            st.session_state.loaded_save_version = loaded_version
+            st.session_state.loaded_save_at = loaded_meta.get("saved_at")
+            st.session_state.last_saved_hash = _compute_save_hash(df_raw, loaded_meta)
+        elif st.session_state.get("last_saved_hash") is None:
+            st.session_state.last_saved_hash = _compute_save_hash(df_raw, loaded_meta)
+
+    # Prefer in-session pending changes when auto-save is off
+    if st.session_state.get("unsaved_df") is not None:
+        try:
+            df_raw = st.session_state.unsaved_df.copy()
+        except Exception:
+            df_raw = st.session_state.unsaved_df
+
+    # Clean column names
+    df_raw.columns = [col.strip() for col in df_raw.columns]
+
+    # Ensure metadata attribute exists (defensive check)
+    if not hasattr(df_raw, 'attrs'):
+        df_raw.attrs = {}
+    if "meta" not in df_raw.attrs:
+        df_raw.attrs["meta"] = {}
+
+    # Load persisted time blocks (if present) from storage metadata
+    _sync_time_blocks_from_meta(df_raw)
+
+    meta = df_raw.attrs.get("meta", {})
+    blocks = meta.get("time_blocks", [])
+    if not isinstance(blocks, list) or not all(_is_time_block_valid(b) for b in blocks):
+        # Attempt to repair by re-serializing current session_state.time_blocks
+        try:
+            meta = _apply_time_blocks_to_meta(meta)
+            df_raw.attrs["meta"] = meta
+            save_data(df_raw, show_toast=False, message="Auto-repaired time_blocks format")
+            _sync_time_blocks_from_meta(df_raw)
+        except Exception as e:
+            st.warning(f"[Auto-repair] Failed to repair time_blocks format: {e}")
+
+    # Ensure expected columns exist (backfills older data/backends)
+    for col in _get_expected_columns():
+        if col in df_raw.columns:
+            continue
+        if col == "REMINDER_SNOOZE_UNTIL":
+            df_raw[col] = pd.NA
+        elif col == "REMINDER_DISMISSED":
+            df_raw[col] = False
+        else:
+            df_raw[col] = ""
+
+    # Add stable row IDs and reminder columns if they don't exist
+    if 'Patient ID' not in df_raw.columns:
+        df_raw['Patient ID'] = ""
+
+    if 'REMINDER_ROW_ID' not in df_raw.columns:
+        df_raw['REMINDER_ROW_ID'] = [str(uuid.uuid4()) for _ in range(len(df_raw))]
+        needs_id_save = True
+    else:
+        # Backfill missing/blank IDs so every row (including blank rows) can be targeted for delete/reminders.
+        needs_id_save = False
+        try:
+            rid_series = df_raw['REMINDER_ROW_ID'].astype(str)
+            missing_mask = df_raw['REMINDER_ROW_ID'].isna() | rid_series.str.strip().eq("") | rid_series.str.lower().eq("nan")
+            if bool(missing_mask.any()):
+                df_raw.loc[missing_mask, 'REMINDER_ROW_ID'] = [str(uuid.uuid4()) for _ in range(int(missing_mask.sum()))]
+                needs_id_save = True
+        except Exception:
+            # If anything goes wrong, keep dashboard usable; IDs will be handled elsewhere.
+            pass
+
+    if 'REMINDER_SNOOZE_UNTIL' not in df_raw.columns:
+        df_raw['REMINDER_SNOOZE_UNTIL'] = pd.NA
+    if 'REMINDER_DISMISSED' not in df_raw.columns:
+        df_raw['REMINDER_DISMISSED'] = False
+
+    df = _get_processed_schedule_df(df_raw)
+
+    # Mark ongoing
+    current_min = runtime.current_minute()
+    df["Is_Ongoing"] = (df["In_min"] <= current_min) & (current_min <= df["Out_min"])
+
+    # Save reminder IDs if they were just generated
+    if needs_id_save:
+        _maybe_save(df_raw, message="Generated stable row IDs for reminders")
+    return df_raw, df
+
+
+# ================ Unified Save Function ================
+def save_data(dataframe, show_toast=True, message="Data saved!", *, ignore_conflict=False):
+    """Save dataframe to Supabase or Excel based on configuration."""
+    if st.session_state.get("is_saving"):
+        return False
+    st.session_state.is_saving = True
+    try:
+        if not hasattr(dataframe, 'attrs'):
+            dataframe.attrs = {}
+        meta = _get_meta_from_df(dataframe)
+        meta = _apply_time_blocks_to_meta(meta)
+
+        loaded_version = st.session_state.get("loaded_save_version")
+        local_version = _get_meta_save_version(meta)
+        if local_version is None and loaded_version is not None:
+            local_version = _safe_int(loaded_version, 0)
+
+        remote_version = None
+        if (
+            st.session_state.get("enable_conflict_checks", True)
+            and not ignore_conflict
+            and supabase_enabled()
+        ):
+            remote_version = _fetch_remote_save_version()
+            if remote_version is not None and loaded_version is not None:
+                if _safe_int(remote_version, -1) != _safe_int(loaded_version, -1):
+                    st.session_state.save_conflict = {
+                        "local_version": loaded_version,
+                        "remote_version": remote_version,
+                        "detected_at": now_ist().isoformat(),
+                    }
+                    st.error("Save blocked: newer data detected in storage.")
+                    return False
+
+        save_hash = _compute_save_hash(dataframe, meta)
+        if save_hash == st.session_state.get("last_saved_hash"):
+            return True
+
+        base_version = max(
+            _safe_int(loaded_version, 0),
+            _safe_int(remote_version, 0),
+            _safe_int(local_version, 0),
+        )
+        meta["save_version"] = int(base_version) + 1
+        meta["saved_at"] = now_ist().isoformat()
+        dataframe.attrs["meta"] = meta
+
+        if supabase_enabled():
+            sup_url, sup_key, sup_table, sup_row, _ = _get_supabase_config_from_secrets_or_env()
+            if sup_url and sup_key:
+                success = save_data_to_supabase(sup_url, sup_key, sup_table, sup_row, dataframe)
+                if success and show_toast:
+                    st.toast(message, icon="✅")
+            else:
+                st.warning("⚠️ Supabase not configured. Saving to local Excel instead.")
+                # Use our safe sheet saving function to preserve other sheets
+                save_excel_sheet(dataframe, 'Sheet1')
+                if show_toast:
+                    st.toast(f"{message} (local)", icon="💾")
+        else:
+            # Use our safe sheet saving function to preserve other sheets
+            save_excel_sheet(dataframe, 'Sheet1')
+            try:
+                meta = _apply_time_blocks_to_meta(_get_meta_from_df(dataframe))
+                meta_rows = []
+                for k, v in meta.items():
+                    if isinstance(v, (dict, list)):
+                        meta_rows.append({"key": str(k), "value": json.dumps(v)})
+                    else:
+                        meta_rows.append({"key": str(k), "value": str(v)})
+                save_excel_sheet(pd.DataFrame(meta_rows), 'Meta')
+            except Exception:
+                pass
+            success = True
+            if show_toast:
+                st.toast(message, icon="✅")
+
+        if success:
+            st.session_state.last_saved_hash = save_hash
+            st.session_state.loaded_save_version = meta.get("save_version")
+            st.session_state.loaded_save_at = meta.get("saved_at")
+            st.session_state.save_conflict = None
+            st.session_state.last_save_at = time_module.time()
+            invalidate_availability("schedule")
+        return success
+    except Exception as e:
+        st.error(f"Error saving data: {e}")
+        return False
+    finally:
+        st.session_state.is_saving = False
+
+
+def _queue_unsaved_df(df_pending: pd.DataFrame, reason: str = "") -> None:
+    """Keep changes in memory when auto-save is disabled or delayed."""
+    try:
+        st.session_state.unsaved_df = df_pending.copy(deep=False)
+    except Exception:
+        st.session_state.unsaved_df = df_pending
+    try:
+        st.session_state.unsaved_df_version = int(st.session_state.get("unsaved_df_version", 0)) + 1
+    except Exception:
+        st.session_state.unsaved_df_version = 1
+    st.session_state.pending_changes = True
+    st.session_state.pending_changes_reason = reason
+    invalidate_availability("schedule")
+
+
+def _maybe_save(dataframe, show_toast=True, message="Data saved!", force=False, ignore_conflict=False):
+    """Respect auto-save toggle; queue changes if disabled or debounced."""
+    if st.session_state.get("is_saving"):
+        _queue_unsaved_df(dataframe, reason=message)
+        return True
+
+    if force:
+        result = save_data(dataframe, show_toast=show_toast, message=message, ignore_conflict=ignore_conflict)
+        if result:
+            st.session_state.unsaved_df = None
+            st.session_state.pending_changes = False
+            st.session_state.pending_changes_reason = ""
+        else:
+            _queue_unsaved_df(dataframe, reason=message)
+        return result
+
+    if st.session_state.get("auto_save_enabled", False):
+        debounce_s = st.session_state.get("save_debounce_seconds", 0)
+        try:
+            debounce_s = float(debounce_s or 0)
+        except Exception:
+            debounce_s = 0.0
+        if debounce_s > 0:
+            now_ts = time_module.time()
+            last_at = float(st.session_state.get("last_save_at", 0.0) or 0.0)
+            if (now_ts - last_at) < debounce_s:
+                _queue_unsaved_df(dataframe, reason=message)
+                return True
+
+        result = save_data(dataframe, show_toast=show_toast, message=message, ignore_conflict=ignore_conflict)
+        if result:
+            st.session_state.unsaved_df = None
+            st.session_state.pending_changes = False
+            st.session_state.pending_changes_reason = ""
+        else:
+            _queue_unsaved_df(dataframe, reason=message)
+        return result
+
+    _queue_unsaved_df(dataframe, reason=message)
+    if show_toast:
+        st.toast("Auto-save disabled. Click 'Save Changes' to persist.", icon="⚠")
+    return True
+
+
+def _build_schedule_backups(df_any: pd.DataFrame) -> tuple[bytes, bytes]:
+    """Return (csv_bytes, xlsx_bytes) for the current schedule."""
+    csv_bytes = df_any.to_csv(index=False).encode("utf-8")
+
+    buf = io.BytesIO()
+    with pd.ExcelWriter(buf, engine="openpyxl") as writer:
+        df_any.to_excel(writer, sheet_name="Sheet1", index=False)
+        # Include metadata (time blocks) if present
+        try:
+            meta = _apply_time_blocks_to_meta(_get_meta_from_df(df_any))
+            meta_rows = []
+            for k, v in meta.items():
+                if isinstance(v, (dict, list)):
+                    meta_rows.append({"key": str(k), "value": json.dumps(v)})
+                else:
+                    meta_rows.append({"key": str(k), "value": str(v)})
+            pd.DataFrame(meta_rows).to_excel(writer, sheet_name="Meta", index=False)
+        except Exception:
+            pass
+    xlsx_bytes = buf.getvalue()
+    return csv_bytes, xlsx_bytes
+
+
+def _get_cached_schedule_backups(df_any: pd.DataFrame) -> tuple[bytes, bytes]:
+    cache_key = _schedule_cache_key()
+    cached_key = st.session_state.get("schedule_backup_key")
+    cached_bytes = st.session_state.get("schedule_backup_cache")
+    if cached_bytes is not None and cached_key == cache_key:
+        return cached_bytes
+    csv_bytes, xlsx_bytes = _build_schedule_backups(df_any)
+    st.session_state.schedule_backup_key = cache_key
+    st.session_state.schedule_backup_cache = (csv_bytes, xlsx_bytes)
+    return csv_bytes, xlsx_bytes
+
+
+def _make_cleared_schedule(df_existing: pd.DataFrame) -> pd.DataFrame:
+    """Create an empty schedule dataframe while preserving metadata (e.g., time blocks)."""
+    cols = list(df_existing.columns)
+    df_empty = pd.DataFrame(columns=cols)
+    try:
+        meta = _apply_time_blocks_to_meta(_get_meta_from_df(df_existing))
+        _set_meta_on_df(df_empty, meta)
+    except Exception:
+        pass
+    return df_empty
+
+
+# ================ REMINDER PERSISTENCE ================
+def _persist_reminder_to_storage(df_raw, row_id, until, dismissed):
+    """Persist snooze/dismiss fields back to storage by row ID."""
+    try:
+        if df_raw is None or not isinstance(df_raw, pd.DataFrame):
+            st.error("Schedule not loaded; cannot persist reminder.")
+            return False
+
+        if 'REMINDER_ROW_ID' not in df_raw.columns:
+            st.error("Reminder column missing; cannot persist reminder.")
+            return False
+
+        match = df_raw[df_raw['REMINDER_ROW_ID'] == row_id]
+        if match.empty:
+            return False
+
+        ix = match.index[0]
+        df_raw.at[ix, 'REMINDER_SNOOZE_UNTIL'] = int(until) if until is not None else pd.NA
+        df_raw.at[ix, 'REMINDER_DISMISSED'] = bool(dismissed)
+        if st.session_state.get("auto_save_enabled", False):
+            return _maybe_save(df_raw, show_toast=False, message="Reminder updates pending")
+        _queue_unsaved_df(df_raw, reason="Reminder updates pending")
+        return True
+    except Exception as e:
+        st.error(f"Error persisting reminder: {e}")
+    return False
+
+
+runtime.register_storage(
+    punch_map=_get_today_punch_map,
+    load_profiles=_load_profiles_cached,
+    load_duty_runs=load_duty_runs_sheet,
+)
@@ -0,0 +1,61 @@
+"""Shared fixtures: a synthetic clinic day and storage-free sources for the engine modules."""
+
+import dataclasses
+import random
+import sys
+from datetime import datetime
+from pathlib import Path
+
+import pandas as pd
+import pytest
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+import runtime
+from allocation_simulator import simulation_sources
+from utils import IST
+
+# Doctors listed in allocation_rules.json, so every row resolves to a department
+DOCTORS = ["DR.SHIFA", "DR.FARHATH", "DR.NIMAI", "DR.NEHA"]
+SIM_NOW = datetime(2026, 10, 19, 8, 0, tzinfo=IST)
+
+
+def _hhmm(minutes: int) -> str:
+    minutes %= 24 * 60
+    return f"{minutes // 60:02d}:{minutes % 60:02d}"
+
+
+@pytest.fixture
+def make_day():
+    """Factory for an unallocated day of n appointments between 09:00 and 19:00."""
+    def _make(n: int = 60, seed: int = 3) -> pd.DataFrame:
+        rnd = random.Random(seed)
+        rows = []
+        for i in range(n):
+            start = rnd.randrange(9 * 60, 19 * 60, 10)
+            rows.append({
+                "Patient Name": f"P{i}",
+                "In Time": _hhmm(start),
+                "Out Time": _hhmm(start + rnd.choice([30, 45, 60])),
+                "DR.": DOCTORS[i % len(DOCTORS)],
+                "OP": f"OP {i % 5}",
+                "FIRST": "",
+                "SECOND": "",
+                "Third": "",
+                "STATUS": "WAITING",
+                "REMINDER_ROW_ID": f"r{i}",
+            })
+        return pd.DataFrame(rows)
+
+    return _make
+
+
+@pytest.fixture
+def headless():
+    """Factory for a fresh storage-free session at 08:00 with every rostered assistant punched in."""
+    def _use():
+        return runtime.use_sources(dataclasses.replace(simulation_sources(), now=SIM_NOW))
+
+    return _use
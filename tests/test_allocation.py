@@ -0,0 +1,118 @@
+import random
+
+import pandas as pd
+
+from allocation import (
+    DAY_MINUTES,
+    _auto_fill_assistants_for_row,
+    allocate_whole_day,
+    find_schedule_conflicts,
+    get_free_assistants_between,
+    plan_rebalance,
+)
+from utils import mins_to_hhmm
+
+ROLE_COLS = ["FIRST", "SECOND", "Third"]
+
+
+def _window(row) -> tuple[int, int]:
+    start = int(row["In Time"][:2]) * 60 + int(row["In Time"][3:])
+    end = int(row["Out Time"][:2]) * 60 + int(row["Out Time"][3:])
+    return start, end + DAY_MINUTES if end < start else end
+
+
+def _overlaps(a: tuple[int, int], b: tuple[int, int]) -> bool:
+    return a[0] < b[1] and b[0] < a[1]
+
+
+def _first_assigned(df: pd.DataFrame) -> tuple[str, pd.Series]:
+    for _, row in df.iterrows():
+        for col in ROLE_COLS:
+            if row[col]:
+                return str(row[col]), row
+    raise AssertionError("nothing was allocated")
+
+
+def test_whole_day_greedy_matches_sequential_row_fill(headless, make_day):
+    for seed in range(3):
+        df = make_day(seed=seed)
+        with headless():
+            filled, changes = allocate_whole_day(df, mode="greedy")
+        with headless():
+            sequential = df.copy()
+            for pos in sorted(range(len(df)), key=lambda p: (_window(df.iloc[p])[0], p)):
+                _auto_fill_assistants_for_row(sequential, pos)
+        assert changes
+        pd.testing.assert_frame_equal(filled[ROLE_COLS], sequential[ROLE_COLS])
+
+
+def test_solver_never_double_books_an_assistant(headless, make_day):
+    for seed in range(4):
+        with headless():
+            solved, changes = allocate_whole_day(make_day(seed=seed), mode="solver")
+        assert changes
+        rows = [(_window(row), [row[col] for col in ROLE_COLS if row[col]]) for _, row in solved.iterrows()]
+        for i, (window, names) in enumerate(rows):
+            assert len(names) == len(set(names))
+            for other_window, other_names in rows[i + 1:]:
+                if _overlaps(window, other_window):
+                    assert not set(names) & set(other_names)
+
+
+def test_find_schedule_conflicts_matches_brute_force(headless):
+    rnd = random.Random(7)
+    pool = ["ANYA", "RAJA", "BABU", "NITIN", ""]
+    rows = []
+    for i in range(80):
+        start = rnd.randrange(9 * 60, 24 * 60, 15)
+        rows.append({
+            "Patient Name": f"P{i}",
+            "In Time": mins_to_hhmm(start % DAY_MINUTES),
+            "Out Time": mins_to_hhmm((start + rnd.choice([15, 30, 60, 90])) % DAY_MINUTES),
+            "FIRST": rnd.choice(pool),
+            "SECOND": rnd.choice(pool),
+            "Third": rnd.choice(pool[-2:]),
+            "OP": rnd.choice(["OP 1", "OP 2", "OP 3", ""]),
+            "STATUS": rnd.choice(["WAITING", "ONGOING", "CANCELLED", "DONE"]),
+            "REMINDER_ROW_ID": f"r{i}",
+        })
+    df = pd.DataFrame(rows, index=[f"row{i}" for i in range(len(rows))])
+
+    active = [(label, row) for label, row in df.iterrows() if row["STATUS"] not in ("CANCELLED", "DONE")]
+    expected = set()
+    for label, row in active:
+        names = [row[col] for col in ROLE_COLS if row[col]]
+        if len(names) != len(set(names)):
+            expected.add(label)
+        for other_label, other in active:
+            if other_label == label or not _overlaps(_window(row), _window(other)):
+                continue
+            if set(names) & {str(other[col]) for col in ROLE_COLS if other[col]}:
+                expected.add(label)
+            if row["OP"] and row["OP"] == other["OP"]:
+                expected.add(label)
+
+    with headless():
+        result = find_schedule_conflicts(df)
+    assert expected
+    assert set(result["by_index"]) == expected
+    assert result["row_ids"] == frozenset(df.loc[sorted(expected), "REMINDER_ROW_ID"])
+
+
+def test_availability_follows_a_refilled_frame_of_the_same_length(headless, make_day):
+    with headless():
+        df = make_day()
+        get_free_assistants_between(df, "10:00", "11:00")
+        filled, _ = allocate_whole_day(df, mode="greedy")
+        name, row = _first_assigned(filled)
+        assert name not in get_free_assistants_between(filled, row["In Time"], row["Out Time"])
+
+
+def test_plan_rebalance_leaves_session_availability_alone(headless, make_day):
+    with headless():
+        filled, _ = allocate_whole_day(make_day(), mode="greedy")
+        name, row = _first_assigned(filled)
+        before = get_free_assistants_between(filled, row["In Time"], row["Out Time"])
+        plan_rebalance(filled, name, 0)
+        assert get_free_assistants_between(filled, row["In Time"], row["Out Time"]) == before
+        assert name not in before
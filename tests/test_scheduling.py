@@ -0,0 +1,49 @@
+import pandas as pd
+
+from scheduling import _build_op_timeline, _sweep_occupancy, search_schedule_rows
+
+
+def test_search_ranks_prefix_then_word_prefix_then_substring(headless):
+    df = pd.DataFrame(
+        {
+            "Patient Name": ["Banana Rao", "Ravi Anand", "Bob", "Anand Kumar", "Shanthi", "Ana"],
+            "DR.": ["DR.NEHA"] * 6,
+        },
+        index=[10, 11, 12, 13, 14, 15],
+    )
+    with headless():
+        assert search_schedule_rows(df, "ana", ["Patient Name", "DR."]) == [13, 15, 11, 10]
+        assert search_schedule_rows(df, "AN", ["Patient Name", "DR."]) == [13, 15, 11, 10, 14]
+        assert search_schedule_rows(df, "", ["Patient Name"]) == list(df.index)
+        assert search_schedule_rows(df, "zzz", ["Patient Name"]) == []
+
+
+def test_sweep_occupancy_back_to_back_and_overlap():
+    assert _sweep_occupancy([(540, 600), (600, 660)]) == ([(540, 600), (600, 660)], [])
+    assert _sweep_occupancy([(540, 600), (570, 630), (580, 590)]) == ([(540, 630)], [(570, 600)])
+    assert _sweep_occupancy([(600, 600), (1410, 1470)]) == ([(1410, 1470)], [])
+
+
+def test_op_timeline_gaps_overlap_and_overrun():
+    df = pd.DataFrame([
+        # Ran 20 minutes over, into the next back-to-back visit
+        {"OP": "OP 1", "In Time": "10:00", "Out Time": "11:00", "STATUS": "DONE",
+         "ACTUAL_END_AT": "2026-10-19T11:20:00+05:30", "Patient Name": "A"},
+        {"OP": "OP 1", "In Time": "11:00", "Out Time": "11:30", "STATUS": "WAITING",
+         "ACTUAL_END_AT": "", "Patient Name": "B"},
+        # Overnight visit still going at 00:50
+        {"OP": "OP 1", "In Time": "23:30", "Out Time": "00:30", "STATUS": "ON GOING",
+         "ACTUAL_END_AT": "", "Patient Name": "C"},
+        {"OP": "OP 2", "In Time": "09:00", "Out Time": "09:30", "STATUS": "CANCELLED",
+         "ACTUAL_END_AT": "", "Patient Name": "D"},
+    ])
+    timeline = _build_op_timeline(df, now_min=50)
+    assert timeline["window"] == (8 * 60, 25 * 60)
+    assert [item["op"] for item in timeline["ops"]] == ["OP 1"]
+    op = timeline["ops"][0]
+    assert op["intervals"] == [(600, 660), (660, 690), (1410, 1470)]
+    assert op["overruns"] == [(660, 680), (1470, 1490)]
+    assert op["occupied"] == [(600, 660), (660, 690), (1410, 1470), (1470, 1490)]
+    assert op["overlap"] == [(660, 680)]
+    assert op["gaps"] == [(480, 600), (690, 1410), (1490, 1500)]
+    assert (op["busy"], op["overrun"], op["double_booked"]) == (170, 40, 20)
@@ -0,0 +1,1248 @@
+# pyright: reportMissingImports=false, reportMissingModuleSource=false, reportUnknownVariableType=false, reportUnknownArgumentType=false, reportUnknownParameterType=false, reportUnknownMemberType=false, reportGeneralTypeIssues=false
+"""Colours, stylesheets and fonts; apply_theme() is called once per run from app.py."""
+
+import hashlib
+import os
+import re
+import tempfile
+import time as time_module
+from typing import Optional
+
+import streamlit as st
+
+
+# ================ GLOBAL CONSTANTS ================
+# Color schemes
+# Medical Blue & White Theme with Glassmorphism
+LIGHT_COLORS = {
+    "bg_primary": "#f8fafc",        # Soft blue-tinted white
+    "bg_secondary": "#f1f5f9",      # Light blue-gray
+    "bg_card": "rgba(255, 255, 255, 0.7)",  # Translucent white for glass effect
+    "text_primary": "#1e293b",      # Dark slate for text
+    "text_secondary": "#64748b",    # Medium slate gray
+    "button_bg": "#2563eb",         # Medical blue (primary actions)
+    "button_text": "#ffffff",       # White text on buttons
+    "accent": "#3b82f6",            # Lighter blue
+    "accent_primary": "#2563eb",    # Medical blue (primary actions)
+    "accent_secondary": "#3b82f6",  # Lighter blue
+    "accent_gradient_start": "#3b82f6",
+    "accent_gradient_end": "#2563eb",
+    "success": "#10b981",           # Green
+    "warning": "#f59e0b",           # Amber
+    "danger": "#ef4444",            # Red
+    "info": "#0ea5e9",              # Sky blue
+    "glass_bg": "rgba(255, 255, 255, 0.25)",  # Glass background
+    "glass_border": "rgba(255, 255, 255, 0.18)", # Glass border
+    "glass_shadow": "0 8px 32px 0 rgba(37, 99, 235, 0.15)", # Blue-tinted shadow
+    "backdrop_blur": "blur(16px)",  # Blur strength
+}
+
+DARK_COLORS = {
+    "bg_primary": "#0f172a",        # Dark slate
+    "bg_secondary": "#1e293b",      # Lighter dark slate
+    "bg_card": "rgba(30, 41, 59, 0.7)",
+    "text_primary": "#f1f5f9",
+    "text_secondary": "#94a3b8",
+    "button_bg": "#3b82f6",
+    "button_text": "#ffffff",
+    "accent": "#60a5fa",
+    "accent_primary": "#3b82f6",
+    "accent_secondary": "#60a5fa",
+    "accent_gradient_start": "#60a5fa",
+    "accent_gradient_end": "#3b82f6",
+    "success": "#34d399",
+    "warning": "#fbbf24",
+    "danger": "#f87171",
+    "info": "#38bdf8",
+    "glass_bg": "rgba(30, 41, 59, 0.4)",
+    "glass_border": "rgba(148, 163, 184, 0.18)",
+    "glass_shadow": "0 8px 32px 0 rgba(59, 130, 246, 0.2)",
+    "backdrop_blur": "blur(16px)",
+}
+
+COLORS = LIGHT_COLORS
+
+# ================ THEME ASSETS ================
+# Stylesheets are published once as content-hashed files under ./static/theme
+# and served by Streamlit's static file serving (.streamlit/config.toml), so a
+# rerun only sends a one-line @import the browser already has cached.  When
+# static serving is off or the folder is read-only, the CSS is inlined as
+# before.  Bytes actually sent per run are kept in rerun_costs["theme_css_kb"].
+# Superseded versions stay on disk for open sessions that still @import them
+# and are pruned once they are a week old.
+_APP_DIR = os.path.dirname(os.path.abspath(__file__))
+_APP_STATIC_DIR = os.path.join(_APP_DIR, "static")
+_THEME_STATIC_SUBDIR = "theme"
+_STYLESHEET_MAX_AGE_S = 7 * 24 * 3600
+_INJECTED_CSS_BYTES: dict[str, int] = {}
+
+
+def _static_serving_enabled() -> bool:
+    try:
+        return bool(st.get_option("server.enableStaticServing"))
+    except Exception:
+        return False
+
+
+def _static_asset_url(relative_path: str) -> Optional[str]:
+    """URL of a file under ./static, versioned by its mtime; None when not served."""
+    if not _static_serving_enabled():
+        return None
+    try:
+        stamp = int(os.path.getmtime(os.path.join(_APP_STATIC_DIR, relative_path)))
+    except OSError:
+        return None
+    return f"app/static/{relative_path}?v={stamp}"
+
+
+@st.cache_resource(show_spinner=False)
+def _publish_stylesheet(name: str, css: str) -> Optional[str]:
+    """Write css to static/theme/<name>.<hash>.css once per process and return its URL."""
+    if not _static_serving_enabled():
+        return None
+    # Asset URLs are page-relative; inside static/theme they resolve one level up.
+    css = re.sub(r"""url\((['"]?)app/static/""", r"url(\1../", css)
+    digest = hashlib.sha1(css.encode("utf-8")).hexdigest()[:12]
+    filename = f"{name}.{digest}.css"
+    target_dir = os.path.join(_APP_STATIC_DIR, _THEME_STATIC_SUBDIR)
+    target = os.path.join(target_dir, filename)
+    try:
+        if not os.path.exists(target):
+            os.makedirs(target_dir, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=target_dir, suffix=".tmp")
+            with os.fdopen(fd, "w", encoding="utf-8") as fh:
+                fh.write(css)
+            os.replace(tmp_path, target)
+            cutoff = time_module.time() - _STYLESHEET_MAX_AGE_S
+            for old in os.listdir(target_dir):
+                if old.startswith(f"{name}.") and old.endswith(".css") and old != filename:
+                    old_path = os.path.join(target_dir, old)
+                    try:
+                        if os.path.getmtime(old_path) < cutoff:
+                            os.remove(old_path)
+                    except OSError:
+                        pass
+    except OSError:
+        return None
+    return f"app/static/{_THEME_STATIC_SUBDIR}/{filename}"
+
+
+def inject_stylesheet(name: str, style_html: str) -> None:
+    """Emit a <style> block as a cached static stylesheet, inlining it as a fallback."""
+    css = re.sub(r"</?style[^>]*>", "", style_html).strip()
+    url = _publish_stylesheet(name, css)
+    payload = f'<style>@import url("{url}");</style>' if url else f"<style>\n{css}\n</style>"
+    st.markdown(payload, unsafe_allow_html=True)
+    _INJECTED_CSS_BYTES[name] = len(payload.encode("utf-8"))
+    try:
+        costs = dict(st.session_state.get("rerun_costs", {}))
+        costs["theme_css_kb"] = round(sum(_INJECTED_CSS_BYTES.values()) / 1024.0, 1)
+        st.session_state.rerun_costs = costs
+    except Exception:
+        pass
+
+
+_FONT_FACES = (
+    ("normal", ("local('Inter')", "local('Inter Variable')"), ("fonts/Inter.woff2", "fonts/SourceSans3-Upright.woff2")),
+    ("italic", ("local('Inter Italic')",), ("fonts/SourceSans3-Italic.woff2",)),
+)
+
+
+def _font_face_css() -> str:
+    """@font-face for Inter from the machine or ./static/fonts, never the network.
+
+    Where Inter is neither installed nor vendored, the face resolves to the
+    Source Sans 3 files in ./static/fonts (SIL OFL, see OFL.txt).
+    """
+    css = []
+    for style, local_sources, vendored_paths in _FONT_FACES:
+        sources = list(local_sources)
+        for relative_path in vendored_paths:
+            vendored = _static_asset_url(relative_path)
+            if vendored:
+                sources.append(f"url('{vendored}') format('woff2')")
+        css.append(
+            "@font-face {\n"
+            "    font-family: 'Inter';\n"
+            f"    font-style: {style};\n"
+            "    font-weight: 200 900;\n"
+            "    font-display: swap;\n"
+            f"    src: {', '.join(sources)};\n"
+            "}\n"
+        )
+    return "".join(css)
+
+
+# -----------------------------
+# Premium sidebar CSS (white pastel)
+# -----------------------------
+def inject_white_pastel_sidebar():
+    inject_stylesheet("sidebar", _font_face_css() + """
+    /* Glassmorphism Sidebar */
+    [data-testid="stSidebar"] {
+        background: linear-gradient(180deg, rgba(248, 250, 252, 0.95) 0%, rgba(241, 245, 249, 0.95) 100%);
+        backdrop-filter: blur(20px);
+        -webkit-backdrop-filter: blur(20px);
+        border-right: 1px solid rgba(37, 99, 235, 0.1);
+        box-shadow: 4px 0 24px rgba(37, 99, 235, 0.08);
+    }
+    [data-testid="stSidebarContent"] { padding: 20px 16px; }
+
+    [data-testid="stSidebar"] .stSelectbox, [data-testid="stSidebar"] .stRadio {
+        background: rgba(255, 255, 255, 0.6);
+        backdrop-filter: blur(10px);
+        border: 1px solid rgba(37, 99, 235, 0.2);
+        border-radius: 12px;
+        padding: 10px 12px 8px 12px;
+        box-shadow: 0 4px 16px rgba(37, 99, 235, 0.1);
+        transition: all 0.3s ease;
+    }
+
+    [data-testid="stSidebar"] button {
+        border-radius: 12px !important;
+        padding: 0.7rem 1rem !important;
+        border: 1px solid rgba(255, 255, 255, 0.3) !important;
+        background: linear-gradient(135deg, #3b82f6 0%, #2563eb 100%) !important;
+        box-shadow: 0 4px 20px rgba(37, 99, 235, 0.3) !important;
+        backdrop-filter: blur(10px) !important;
+        font-weight: 600;
+        color: white !important;
+        transition: all 0.3s cubic-bezier(0.4, 0, 0.2, 1);
+    }
+
+    [data-testid="stSidebar"] button:hover {
+        transform: translateY(-2px);
+        box-shadow: 0 8px 30px rgba(37, 99, 235, 0.4) !important;
+        background: linear-gradient(135deg, #60a5fa 0%, #3b82f6 100%) !important;
+    }
+
+    .sidebar-title {
+        font-size: 24px;
+        font-weight: 800;
+        background: linear-gradient(135deg, #3b82f6 0%, #2563eb 100%);
+        -webkit-background-clip: text;
+        -webkit-text-fill-color: transparent;
+        background-clip: text;
+        margin-bottom: 20px;
+        font-family: 'Inter', 'Source Sans', 'Source Sans Pro', sans-serif;
+    }
+
+    .live-pill {
+        display: inline-flex;
+        align-items: center;
+        gap: 8px;
+        padding: 8px 16px;
+        border-radius: 20px;
+        font-size: 13px;
+        font-weight: 600;
+        background: linear-gradient(135deg, rgba(16, 185, 129, 0.2), rgba(5, 150, 105, 0.2));
+        border: 1px solid rgba(16, 185, 129, 0.3);
+        backdrop-filter: blur(10px);
+        color: #059669;
+        margin-bottom: 12px;
+    }
+
+    .live-dot {
+        width: 10px;
+        height: 10px;
+        border-radius: 50%;
+        background: linear-gradient(135deg, #10b981, #059669);
+        box-shadow: 0 0 10px rgba(16, 185, 129, 0.6);
+        animation: pulse 2s ease-in-out infinite;
+    }
+
+    @keyframes pulse {
+        0%, 100% { opacity: 1; }
+        50% { opacity: 0.6; }
+    }
+    """)
+
+# ================ PAGE THEME ================
+_THEME_CSS = f"""
+    <style>
+    :root {{
+        --bg-primary: {COLORS['bg_primary']};
+        --bg-secondary: {COLORS['bg_secondary']};
+        --text-primary: {COLORS['text_primary']};
+        --text-secondary: {COLORS['text_secondary']};
+        --accent: {COLORS['accent']};
+        --success: {COLORS['success']};
+        --warning: {COLORS['warning']};
+        --danger: {COLORS['danger']};
+        --info: {COLORS['info']};
+        --glass-bg: {COLORS['glass_bg']};
+        --glass-border: {COLORS['glass_border']};
+    }}
+    
+    * {{
+        margin: 0;
+        padding: 0;
+    }}
+    
+    body, .stApp {{
+        background: linear-gradient(135deg, #f8fafc 0%, #e0f2fe 100%) !important;
+        color: var(--text-primary) !important;
+        font-family: 'Inter', 'Source Sans', 'Source Sans Pro', sans-serif;
+    }}
+
+    /* Tighten gap below sticky header */
+    .block-container {{
+        padding-top: 0.25rem !important;
+        padding-bottom: 0.5rem !important;
+    }}
+
+    /* Compact headings & metrics */
+    h1, h2, h3 {{
+        margin: 0.15rem 0 0.35rem 0 !important;
+    }}
+    div[data-testid="stMetric"] {{
+        padding: 0.6rem 0.8rem !important;
+        border-radius: 14px;
+    }}
+
+    /* Glass Cards & Tables */
+    .stDataFrame, .stTable, [data-testid="stDataFrameResizable"], [data-testid="stTable"] {{
+        background: linear-gradient(135deg, rgba(255, 255, 255, 0.7), rgba(255, 255, 255, 0.3)) !important;
+        border: 1px solid rgba(255, 255, 255, 0.18) !important;
+        box-shadow: 0 8px 32px 0 rgba(37, 99, 235, 0.12);
+        border-radius: 20px;
+        backdrop-filter: blur(20px) !important;
+        -webkit-backdrop-filter: blur(20px) !important;
+    }}
+    .stDataFrame table, .stTable table {{
+        background: var(--glass-bg) !important;
+    }}
+    
+    header {{
+        background-color: {COLORS['bg_primary']} !important;
+        border-bottom: none !important;
+        padding: 1rem 0 !important;
+    }}
+    
+    [data-testid="stHeader"] {{
+        background-color: {COLORS['bg_primary']} !important;
+    }}
+
+    /* Hide GitHub/logo link in Streamlit header (Streamlit Cloud toolbar) */
+    [data-testid="stToolbar"] a[href*="github.com"],
+    [data-testid="stToolbar"] a[aria-label*="View source"],
+    [data-testid="stToolbar"] a[title*="View source"],
+    [data-testid="stToolbar"] a[aria-label*="GitHub"],
+    [data-testid="stToolbar"] a[title*="GitHub"],
+    [data-testid="stToolbar"] button[aria-label*="View source"],
+    [data-testid="stToolbar"] button[title*="View source"] {{
+        display: none !important;
+    }}
+    [data-testid="stToolbarActions"],
+    [data-testid="stMainMenu"] {{
+        display: none !important;
+        visibility: hidden !important;
+    }}
+    
+    /* Professional main container */
+    .main {{
+        padding: 2rem 3rem !important;
+        max-width: 2200px !important;
+        margin: 0 auto !important;
+    }}
+
+    html, body, [data-testid="stAppViewContainer"] {{
+        overflow-y: auto !important;
+        height: auto !important;
+    }}
+    [data-testid="stAppViewContainer"] > .main {{
+        overflow: visible !important;
+    }}
+    
+    /* Professional header styling */
+    .header-container {{
+        display: flex;
+        align-items: center;
+        justify-content: center;
+        gap: 1.5rem;
+        padding: 2rem 0;
+        border-bottom: none;
+    }}
+    
+    .header-logo {{
+        width: 80px;
+        height: auto;
+    }}
+    
+    .header-title {{
+        font-size: 2rem;
+        font-weight: 700;
+        color: {COLORS['text_primary']};
+        letter-spacing: 0.5px;
+    }}
+    
+    .st-bw, .st-cq, .st-dx, .stDataFrame, .stDataFrame th, .stDataFrame td {{
+        background-color: {COLORS['bg_secondary']} !important;
+        color: {COLORS['text_primary']} !important;
+    }}
+    
+    /* Premium Status-based row background colors with dynamic effects */
+    /* Upcoming rows - Light blue */
+    [data-testid="stDataFrameContainer"] tbody tr:has(td:contains("WAITING")) {{
+        background: rgba(217, 197, 178, 0.35) !important;
+        border-left: 5px solid {COLORS['info']} !important;
+    }}
+    
+    /* Ongoing rows - Light green */
+    [data-testid="stDataFrameContainer"] tbody tr:has(td:contains("ON GOING")) {{
+        background: rgba(52, 49, 45, 0.12) !important;
+        border-left: 5px solid {COLORS['success']} !important;
+    }}
+    
+    /* Arrived rows - Light yellow */
+    [data-testid="stDataFrameContainer"] tbody tr:has(td:contains("ARRIVED")) {{
+        background: rgba(217, 197, 178, 0.45) !important;
+        border-left: 5px solid {COLORS['warning']} !important;
+    }}
+
+    /* Shifted rows - Yellow */
+    [data-testid="stDataFrameContainer"] tbody tr:has(td:contains("SHIFTED")) {{
+        background: rgba(217, 197, 178, 0.45) !important;
+        border-left: 5px solid {COLORS['warning']} !important;
+    }}
+    
+    /* Cancelled rows - Light red */
+    [data-testid="stDataFrameContainer"] tbody tr:has(td:contains("CANCELLED")) {{
+        background: rgba(126, 127, 131, 0.25) !important;
+        border-left: 5px solid {COLORS['danger']} !important;
+    }}
+    
+    /* Enhanced Hover effect with shadow lift */
+    [data-testid="stDataFrameContainer"] tbody tr:has(td:contains("WAITING")):hover {{
+        background: rgba(217, 197, 178, 0.45) !important;
+        box-shadow: 0 4px 12px rgba(52, 49, 45, 0.18) inset !important;
+    }}
+    
+    [data-testid="stDataFrameContainer"] tbody tr:has(td:contains("ON GOING")):hover {{
+        background: rgba(52, 49, 45, 0.18) !important;
+        box-shadow: 0 4px 12px rgba(20, 17, 15, 0.18) inset !important;
+    }}
+    
+    [data-testid="stDataFrameContainer"] tbody tr:has(td:contains("ARRIVED")):hover {{
+        background: rgba(217, 197, 178, 0.55) !important;
+        box-shadow: 0 4px 12px rgba(52, 49, 45, 0.18) inset !important;
+    }}
+
+    [data-testid="stDataFrameContainer"] tbody tr:has(td:contains("SHIFTED")):hover {{
+        background: rgba(217, 197, 178, 0.55) !important;
+        box-shadow: 0 4px 12px rgba(52, 49, 45, 0.18) inset !important;
+    }}
+    
+    [data-testid="stDataFrameContainer"] tbody tr:has(td:contains("CANCELLED")):hover {{
+        background: rgba(126, 127, 131, 0.35) !important;
+        box-shadow: 0 4px 12px rgba(126, 127, 131, 0.25) inset !important;
+    }}
+    
+    /* Table Header Styling - Premium & Elegant */
+    [data-testid="stDataFrameContainer"] thead {{
+        background: {COLORS['button_bg']} !important;
+        border-bottom: 1px solid var(--glass-border) !important;
+        box-shadow: 0 6px 18px rgba(20, 17, 15, 0.28) !important;
+    }}
+    
+    [data-testid="stDataFrameContainer"] thead th {{
+        color: {COLORS['button_text']} !important;
+        font-weight: 800 !important;
+        padding: 18px 16px !important;
+        text-align: center !important;
+        font-size: 0.99rem !important;
+        letter-spacing: 1px !important;
+        text-transform: uppercase !important;
+        background: {COLORS['button_bg']} !important;
+        position: relative !important;
+        text-shadow: 0 2px 4px rgba(20, 17, 15, 0.3) !important;
+        box-shadow: inset 0 1px 0 rgba(243, 243, 244, 0.18) !important;
+        transition: all 0.4s cubic-bezier(0.4, 0, 0.2, 1) !important;
+        border-right: 1px solid rgba(243, 243, 244, 0.22) !important;
+    }}
+    
+    [data-testid="stDataFrameContainer"] thead th:last-child {{
+        border-right: none !important;
+    }}
+    
+    [data-testid="stDataFrameContainer"] thead th:hover {{
+        filter: brightness(1.08) !important;
+        transform: translateY(-2px) !important;
+        box-shadow: inset 0 1px 0 rgba(243, 243, 244, 0.10), 0 10px 22px rgba(20, 17, 15, 0.22) !important;
+    }}
+    
+    /* Premium Table Rows */
+    [data-testid="stDataFrameContainer"] tbody tr {{
+        transition: all 0.3s cubic-bezier(0.4, 0, 0.2, 1) !important;
+        border-radius: 0 !important;
+        position: relative !important;
+    }}
+    
+    /* Alternating row background for better readability */
+    [data-testid="stDataFrameContainer"] tbody tr:nth-child(even) {{
+        background-color: rgba(243, 243, 244, 0.04) !important;
+    }}
+    
+    [data-testid="stDataFrameContainer"] tbody tr:hover {{
+        background-color: rgba(243, 243, 244, 0.06) !important;
+        box-shadow: 0 2px 14px rgba(20, 17, 15, 0.22) inset !important;
+    }}
+    
+    /* Premium Table Cells */
+    [data-testid="stDataFrameContainer"] tbody td {{
+        padding: 12px 14px !important;
+        border-bottom: 1px solid rgba(217, 197, 178, 0.55) !important;
+        border-right: 1px solid rgba(217, 197, 178, 0.35) !important;
+        font-size: 0.93rem !important;
+        line-height: 1.25 !important;
+        vertical-align: middle !important;
+        transition: all 0.2s ease !important;
+        position: relative !important;
+    }}
+
+    [data-testid="stDataFrameContainer"] tbody td:last-child {{
+        border-right: none !important;
+    }}
+    
+    /* Dropdown and Select Styling (scoped to main content, avoid sidebar) */
+    .main [data-baseweb="select"] {{
+        background-color: {COLORS['bg_secondary']} !important;
+        border-radius: 6px !important;
+    }}
+
+    /* Premium dialog styling */
+    div[role="dialog"] > div,
+    div[data-testid="stDialog"] {{
+        background: linear-gradient(180deg, #ffffff 0%, #f3f6fb 100%);
+        border: 1px solid #d7dce5;
+        border-radius: 18px;
+        box-shadow: 0 24px 48px rgba(20, 17, 15, 0.25);
+    }}
+    div[role="dialog"] h2,
+    div[data-testid="stDialog"] h2 {{
+        font-size: 20px;
+        font-weight: 800;
+        letter-spacing: 0.6px;
+        color: #2a2d33;
+        margin-bottom: 12px;
+    }}
+    div[role="dialog"] form,
+    div[data-testid="stDialog"] form {{
+        background: #ffffff;
+        border: 1px solid #e0e4eb;
+        border-radius: 16px;
+        padding: 14px 16px 12px;
+        box-shadow: inset 0 1px 0 rgba(255, 255, 255, 0.6), 0 12px 26px rgba(20, 17, 15, 0.08);
+    }}
+    div[role="dialog"] label,
+    div[data-testid="stDialog"] label {{
+        font-size: 12px;
+        font-weight: 700;
+        letter-spacing: 0.5px;
+        text-transform: uppercase;
+        color: #5b6470;
+    }}
+    div[role="dialog"] [data-testid="stHorizontalBlock"],
+    div[data-testid="stDialog"] [data-testid="stHorizontalBlock"] {{
+        gap: 0.75rem;
+    }}
+    div[role="dialog"] [data-baseweb="input"] > div,
+    div[data-testid="stDialog"] [data-baseweb="input"] > div,
+    div[role="dialog"] [data-baseweb="select"] > div,
+    div[data-testid="stDialog"] [data-baseweb="select"] > div {{
+        background: #f8fafc;
+        border: 1px solid #d7dce5;
+        border-radius: 10px;
+        box-shadow: inset 0 1px 2px rgba(20, 17, 15, 0.06);
+    }}
+    div[role="dialog"] [data-baseweb="input"] > div:hover,
+    div[data-testid="stDialog"] [data-baseweb="input"] > div:hover,
+    div[role="dialog"] [data-baseweb="select"] > div:hover,
+    div[data-testid="stDialog"] [data-baseweb="select"] > div:hover {{
+        border-color: #c0c8d4;
+    }}
+    div[role="dialog"] [data-baseweb="input"] > div:focus-within,
+    div[data-testid="stDialog"] [data-baseweb="input"] > div:focus-within,
+    div[role="dialog"] [data-baseweb="select"] > div:focus-within,
+    div[data-testid="stDialog"] [data-baseweb="select"] > div:focus-within {{
+        border-color: #2f63e8;
+        box-shadow: 0 0 0 3px rgba(47, 99, 232, 0.16);
+    }}
+    .time-select-marker {{display:none;}}
+    div[role="dialog"] div[data-testid="stVerticalBlock"]:has(.time-select-marker) [data-baseweb="select"] svg,
+    div[role="dialog"] div[data-testid="stVerticalBlock"]:has(.time-select-marker) [data-baseweb="select"] span[role="img"],
+    div[data-testid="stDialog"] div[data-testid="stVerticalBlock"]:has(.time-select-marker) [data-baseweb="select"] svg,
+    div[data-testid="stDialog"] div[data-testid="stVerticalBlock"]:has(.time-select-marker) [data-baseweb="select"] span[role="img"] {{
+        display: none;
+    }}
+    div[role="dialog"] button[kind],
+    div[data-testid="stDialog"] button[kind] {{
+        height: 38px !important;
+        border-radius: 12px !important;
+        font-weight: 700;
+        letter-spacing: 0.4px;
+        box-shadow: 0 10px 20px rgba(20, 17, 15, 0.12) !important;
+    }}
+    div[role="dialog"] button[kind="primary"],
+    div[data-testid="stDialog"] button[kind="primary"] {{
+        background: #2f63e8 !important;
+        border: 1px solid #2f63e8 !important;
+        color: #ffffff !important;
+    }}
+    div[role="dialog"] button[kind="secondary"],
+    div[data-testid="stDialog"] button[kind="secondary"] {{
+        background: #ffffff !important;
+        border: 1px solid #d7dce5 !important;
+        color: #3d424a !important;
+    }}
+
+    /* Summary chips */
+    .summary-row {{
+        display: grid;
+        grid-template-columns: repeat(auto-fit, minmax(140px, 1fr));
+        gap: 12px;
+        margin: 8px 0 18px 0;
+    }}
+    .summary-chip {{
+        padding: 12px 14px;
+        border-radius: 14px;
+        background: var(--glass-bg);
+        border: 1px solid var(--glass-border);
+        box-shadow: 0 10px 26px rgba(20,17,15,0.12);
+        backdrop-filter: none !important;
+        display: flex;
+        flex-direction: column;
+        gap: 6px;
+    }}
+    .summary-chip .label {{
+        font-size: 12px;
+        letter-spacing: 0.4px;
+        text-transform: uppercase;
+        color: var(--text-secondary);
+        opacity: 0.8;
+    }}
+    .summary-chip .value {{
+        font-size: 22px;
+        font-weight: 800;
+        color: var(--text-primary);
+        line-height: 1.1;
+    }}
+    .summary-chip.success {{ border-color: {COLORS['success']}; }}
+    .summary-chip.warning {{ border-color: {COLORS['warning']}; }}
+    .summary-chip.danger {{ border-color: {COLORS['danger']}; }}
+    .summary-chip.info {{ border-color: {COLORS['info']}; }}
+    .summary-chip.secondary {{ border-color: {COLORS['accent']}; }}
+    
+    .main [data-baseweb="select"] button {{
+        color: {COLORS['text_primary']} !important;
+        background-color: {COLORS['bg_secondary']} !important;
+        border: 1px solid #3b82f6 !important;
+        border-radius: 6px !important;
+        transition: all 0.2s ease !important;
+    }}
+    
+    .main [data-baseweb="select"] button:hover {{
+        border-color: {COLORS['button_bg']} !important;
+        box-shadow: 0 2px 8px rgba(20, 17, 15, 0.22) !important;
+    }}
+    
+    .main [data-baseweb="select"] button span {{
+        color: {COLORS['text_primary']} !important;
+    }}
+    
+    [data-baseweb="popover"] {{
+        background-color: {COLORS['bg_secondary']} !important;
+        border-radius: 8px !important;
+        box-shadow: 0 4px 12px rgba(20, 17, 15, 0.15) !important;
+    }}
+    
+    [data-baseweb="menu"] {{
+        background-color: {COLORS['bg_secondary']} !important;
+        border-radius: 8px !important;
+    }}
+    
+    [data-baseweb="menu"] li {{
+        color: {COLORS['text_primary']} !important;
+        background-color: {COLORS['bg_secondary']} !important;
+        padding: 8px 12px !important;
+    }}
+    
+    [data-baseweb="menu"] li:hover {{
+        background-color: {COLORS['button_bg']} !important;
+        color: {COLORS['button_text']} !important;
+    }}
+    
+    [role="option"] {{
+        color: {COLORS['text_primary']} !important;
+        background-color: {COLORS['bg_secondary']} !important;
+        padding: 8px 12px !important;
+    }}
+    
+    [role="option"]:hover {{
+        background-color: {COLORS['button_bg']} !important;
+        color: {COLORS['button_text']} !important;
+    }}
+    
+    [role="listbox"] {{
+        background: var(--glass-bg) !important;
+        border-radius: 10px !important;
+        border: 1px solid var(--glass-border) !important;
+        backdrop-filter: none !important;
+        -webkit-backdrop-filter: none !important;
+    }}
+    
+    /* Data editor dropdown text visibility */
+    div[data-testid="stDataFrameContainer"] [role="button"] {{
+        color: {COLORS['text_primary']} !important;
+    }}
+    
+    div[data-testid="stDataFrameContainer"] [role="option"] {{
+        color: {COLORS['text_primary']} !important;
+        background-color: {COLORS['bg_secondary']} !important;
+    }}
+    
+    div[data-testid="stDataFrameContainer"] [role="option"]:hover {{
+        background-color: {COLORS['button_bg']} !important;
+        color: {COLORS['button_text']} !important;
+    }}
+    
+    /* Button Styling - Premium & Attractive */
+    .stButton>button {{
+        background: {COLORS['button_bg']} !important;
+        color: {COLORS['button_text']} !important;
+        border: none !important;
+        border-radius: 10px !important;
+        font-weight: 700 !important;
+        font-size: 0.85rem !important;
+        padding: 8px 16px !important;
+        transition: all 0.4s cubic-bezier(0.4, 0, 0.2, 1) !important;
+        box-shadow: 0 4px 18px rgba(20, 17, 15, 0.25) !important;
+        letter-spacing: 0.3px !important;
+        text-transform: uppercase !important;
+        cursor: pointer !important;
+    }}
+    
+    .stButton>button:hover {{
+        background: {COLORS['button_bg']} !important;
+        transform: translateY(-4px) !important;
+        box-shadow: 0 10px 28px rgba(20, 17, 15, 0.32) !important;
+        letter-spacing: 1px !important;
+    }}
+    
+    .stButton>button:active {{
+        transform: translateY(-1px) !important;
+        box-shadow: 0 2px 10px rgba(20, 17, 15, 0.28) !important;
+    }}
+    
+    .stButton>button:focus {{
+        outline: none !important;
+        box-shadow: 0 0 0 3px {COLORS['button_bg']} !important;
+    }}
+
+    /* Targeted hover animation: Add Patient + Save only (via unique tooltip/title) */
+    button[title="Add a new patient row (uses selected patient if chosen)"] {{
+        position: relative !important;
+        overflow: hidden !important;
+        background: {COLORS['button_bg']} !important;
+        color: {COLORS['button_text']} !important;
+    }}
+
+    button[title="Save changes to storage"] {{
+        position: relative !important;
+        overflow: hidden !important;
+        background: {COLORS['button_bg']} !important;
+        color: {COLORS['button_text']} !important;
+    }}
+
+    button[title="Add a new patient row (uses selected patient if chosen)"]:hover,
+    button[title="Save changes to storage"]:hover {{
+        background: {COLORS['text_primary']} !important;
+        color: {COLORS['button_text']} !important;
+        animation: pulse-glow 1.4s ease-out infinite !important;
+    }}
+
+    button[title="Add a new patient row (uses selected patient if chosen)"]:active,
+    button[title="Save changes to storage"]:active {{
+        background: {COLORS['text_primary']} !important;
+        color: {COLORS['button_text']} !important;
+    }}
+    
+    .st-bv, .st-cv, .st-cw {{
+        background-color: {COLORS['bg_secondary']} !important;
+    }}
+    
+    h1, h2, h3, h4, h5, h6 {{
+        color: {COLORS['text_primary']} !important;
+        font-weight: 600 !important;
+    }}
+    
+    h1 {{
+        font-size: 2rem !important;
+        margin-bottom: 1.5rem !important;
+    }}
+    
+    h2 {{
+        font-size: 1.5rem !important;
+        margin-bottom: 1rem !important;
+        margin-top: 1.5rem !important;
+    }}
+    
+    .stMarkdown {{
+        color: {COLORS['text_primary']} !important;
+    }}
+    
+    /* Data Frame Container - Premium & Beautiful */
+    [data-testid="stDataFrameContainer"] {{
+        background: var(--glass-bg) !important;
+        border-radius: 14px !important;
+        border: 1px solid var(--glass-border) !important;
+        box-shadow: 0 14px 40px rgba(20, 17, 15, 0.30) !important;
+        overflow: hidden !important;
+        transition: all 0.3s ease !important;
+        backdrop-filter: none !important;
+        -webkit-backdrop-filter: none !important;
+    }}
+    
+    [data-testid="stDataFrameContainer"]:hover {{
+        box-shadow: 0 18px 52px rgba(20, 17, 15, 0.36) !important;
+    }}
+    
+    /* Tabs Styling */
+    .stTabs [data-baseweb="tab-list"] {{
+        background-color: transparent !important;
+        border-bottom: 1px solid var(--glass-border) !important;
+    }}
+    
+    .stTabs [data-baseweb="tab"] {{
+        color: {COLORS['text_secondary']} !important;
+        padding: 12px 20px !important;
+        border-bottom: 3px solid transparent !important;
+        transition: all 0.3s ease !important;
+    }}
+    
+    .stTabs [data-baseweb="tab"]:hover {{
+        color: {COLORS['button_bg']} !important;
+    }}
+    
+    .stTabs [aria-selected="true"] {{
+        color: {COLORS['button_bg']} !important;
+        border-bottom: 3px solid {COLORS['button_bg']} !important;
+    }}
+    
+    /* Alert/Message Styling */
+    .st-info {{
+        background-color: rgba(217, 197, 178, 0.18) !important;
+        border-left: 4px solid {COLORS['info']} !important;
+        border-radius: 6px !important;
+        padding: 12px 16px !important;
+    }}
+    
+    .st-success {{
+        background-color: rgba(52, 49, 45, 0.12) !important;
+        border-left: 4px solid {COLORS['success']} !important;
+        border-radius: 6px !important;
+        padding: 12px 16px !important;
+    }}
+    
+    .st-warning {{
+        background-color: rgba(217, 197, 178, 0.22) !important;
+        border-left: 4px solid {COLORS['warning']} !important;
+        border-radius: 6px !important;
+        padding: 12px 16px !important;
+    }}
+    
+    .st-error {{
+        background-color: rgba(126, 127, 131, 0.18) !important;
+        border-left: 4px solid {COLORS['danger']} !important;
+        border-radius: 6px !important;
+        padding: 12px 16px !important;
+    }}
+    
+    /* Animations */
+    @keyframes bounce-click {{
+        0% {{ transform: scale(1); }}
+        50% {{ transform: scale(1.2); }}
+        100% {{ transform: scale(1); }}
+    }}
+    
+    @keyframes pulse-glow {{
+        0% {{ box-shadow: 0 0 0 0 rgba(52, 49, 45, 0.7); }}
+        70% {{ box-shadow: 0 0 0 10px rgba(52, 49, 45, 0); }}
+        100% {{ box-shadow: 0 0 0 0 rgba(52, 49, 45, 0); }}
+    }}
+    
+    @keyframes spin-check {{
+        0% {{ transform: rotate(-10deg) scale(0.8); }}
+        50% {{ transform: rotate(5deg) scale(1.1); }}
+        100% {{ transform: rotate(0deg) scale(1); }}
+    }}
+    
+    /* Checkbox Styling */
+    /* IMPORTANT: Scope checkbox styling to the data editor only.
+       Streamlit sidebar widgets use BaseWeb components that also rely on
+       checkbox inputs; global overrides can make them appear "frozen".
+    */
+    [data-testid="stDataFrameContainer"] input[type="checkbox"] {{
+        width: 20px !important;
+        height: 20px !important;
+        cursor: pointer !important;
+        transition: transform 140ms ease, filter 0.3s ease !important;
+        accent-color: #2563eb !important;
+    }}
+
+    /* Keyboard focus for table checkboxes */
+    [data-testid="stDataFrameContainer"] input[type="checkbox"]:focus-visible {{
+        outline: 2px solid var(--text-secondary) !important;
+        outline-offset: 3px !important;
+        border-radius: 4px !important;
+    }}
+
+    [data-testid="stDataFrameContainer"] input[type="checkbox"]:active {{
+        animation: bounce-click 0.4s ease !important;
+    }}
+
+    [data-testid="stDataFrameContainer"] input[type="checkbox"]:checked {{
+        animation: tdb-native-checkbox-pop 160ms ease-out, spin-check 0.5s ease !important;
+    }}
+
+    @keyframes tdb-native-checkbox-pop {{
+        0% {{ transform: scale(1); }}
+        60% {{ transform: scale(1.12); }}
+        100% {{ transform: scale(1.06); }}
+    }}
+
+    /* Streamlit (BaseWeb) checkbox animation (for st.checkbox, sidebar toggles, etc.)
+       - Adds a slight "pop" on check
+       - Animates the SVG checkmark stroke so it draws left-to-right
+       - Keeps keyboard accessibility via :focus-visible
+       NOTE: This targets BaseWeb checkbox markup and does NOT touch the data editor's native inputs.
+    */
+    /* BaseWeb checkbox SVG typically contains multiple paths (box + tick).
+       Target the tick specifically (usually the 2nd path) + any polyline tick.
+    */
+    div[data-baseweb="checkbox"] svg path:nth-of-type(2),
+    div[data-baseweb="checkbox"] svg polyline {{
+        fill: none !important;
+        stroke: var(--text-secondary) !important;
+        /* Large dash length so the tick fully hides/shows regardless of path length */
+        stroke-dasharray: 1000;
+        stroke-dashoffset: 1000;
+        transition: stroke-dashoffset 220ms ease;
+    }}
+
+    /* Draw the tick when checked */
+    div[data-baseweb="checkbox"]:has(input[type="checkbox"]:checked) svg path:nth-of-type(2),
+    div[data-baseweb="checkbox"]:has(input[type="checkbox"]:checked) svg polyline {{
+        stroke-dashoffset: 0;
+    }}
+
+    /* Pop the checkbox icon slightly on check (keeps text stable) */
+    div[data-baseweb="checkbox"]:has(input[type="checkbox"]:checked) svg {{
+        transform-origin: center;
+        animation: tdb-checkbox-pop 160ms ease-out;
+    }}
+
+    @keyframes tdb-checkbox-pop {{
+        0% {{ transform: scale(1); }}
+        60% {{ transform: scale(1.12); }}
+        100% {{ transform: scale(1.06); }}
+    }}
+
+    /* Keyboard focus ring for accessibility */
+    div[data-baseweb="checkbox"]:has(input[type="checkbox"]:focus-visible) svg {{
+        outline: 2px solid var(--text-secondary);
+        outline-offset: 3px;
+        border-radius: 4px;
+    }}
+
+    /* Reduced motion support */
+    @media (prefers-reduced-motion: reduce) {{
+        [data-testid="stDataFrameContainer"] input[type="checkbox"] {{
+            transition: none !important;
+        }}
+        [data-testid="stDataFrameContainer"] input[type="checkbox"]:checked {{
+            animation: none !important;
+        }}
+        div[data-baseweb="checkbox"] svg path:nth-of-type(2),
+        div[data-baseweb="checkbox"] svg polyline {{
+            transition: none;
+        }}
+        div[data-baseweb="checkbox"]:has(input[type="checkbox"]:checked) svg {{
+            animation: none;
+        }}
+    }}
+    
+    /* Divider styling */
+    hr {{
+        border: none !important;
+        border-top: 2px solid #3b82f6 !important;
+        margin: 2rem 0 !important;
+    }}
+    
+    /* Section cards */
+    .section-card {{
+        background-color: {COLORS['bg_secondary']} !important;
+        border-radius: 8px !important;
+        padding: 1.5rem !important;
+        border: 1px solid #3b82f6 !important;
+        margin-bottom: 1.5rem !important;
+        box-shadow: 0 2px 8px rgba(20, 17, 15, 0.08) !important;
+    }}
+    
+    /* Save button styling - aesthetic and smooth */
+    button[key="manual_save_btn"] {{
+        background: {COLORS['button_bg']} !important;
+        color: {COLORS['button_text']} !important;
+        border: none !important;
+        border-radius: 6px !important;
+        font-weight: 600 !important;
+        transition: all 0.3s ease !important;
+        box-shadow: 0 2px 8px rgba(52, 49, 45, 0.3) !important;
+        padding: 10px 20px !important;
+    }}
+    
+    button[key="manual_save_btn"]:hover {{
+        background: {COLORS['button_bg']} !important;
+        box-shadow: 0 4px 14px rgba(52, 49, 45, 0.4) !important;
+        transform: translateY(-2px) !important;
+    }}
+    
+    button[key="manual_save_btn"]:active {{
+        transform: translateY(0) !important;
+        box-shadow: 0 2px 6px rgba(52, 49, 45, 0.3) !important;
+    }}
+
+    /* Availability dashboard styling */
+    .availability-summary {{
+        display: grid;
+        grid-template-columns: repeat(auto-fit, minmax(220px, 1fr));
+        gap: 1.2rem;
+        margin: 1.25rem 0 1.75rem 0;
+    }}
+
+    .availability-card {{
+        background: var(--bg-secondary);
+        border: 1px solid var(--glass-border);
+        border-radius: 18px;
+        padding: 1.25rem 1.35rem;
+        box-shadow: 0 12px 32px rgba(20, 17, 15, 0.22);
+        backdrop-filter: none !important;
+        display: flex;
+        flex-direction: column;
+        gap: 0.55rem;
+        position: relative;
+        overflow: hidden;
+    }}
+
+    .availability-card::after {{
+        content: "";
+        position: absolute;
+        inset: 1px;
+        border-radius: 16px;
+        border-top: 4px solid var(--accent);
+        opacity: 0.9;
+        pointer-events: none;
+    }}
+
+    .availability-card.success::after {{ border-top-color: var(--success); }}
+    .availability-card.warning::after {{ border-top-color: var(--warning); }}
+    .availability-card.danger::after {{ border-top-color: var(--danger); }}
+
+    .availability-card__icon {{
+        font-size: 1.8rem;
+        line-height: 1;
+    }}
+
+    .availability-card h4 {{
+        margin: 0;
+        font-size: 0.9rem;
+        letter-spacing: 0.08em;
+        text-transform: uppercase;
+        color: var(--text-secondary);
+    }}
+
+    .availability-card strong {{
+        display: block;
+        font-size: 2.4rem;
+        margin: 0.1rem 0 0;
+        color: var(--text-primary);
+        letter-spacing: -0.02em;
+    }}
+
+    .availability-card p {{
+        margin: 0;
+        color: var(--text-primary);
+        opacity: 0.7;
+        font-size: 0.95rem;
+    }}
+
+    .assistant-grid {{
+        display: grid;
+        grid-template-columns: repeat(auto-fit, minmax(240px, 1fr));
+        gap: 16px;
+        margin-top: 1rem;
+    }}
+
+    .assistant-card {{
+        background: var(--glass-bg);
+        border: 1px solid var(--glass-border);
+        border-top: 4px solid var(--accent);
+        border-radius: 14px;
+        padding: 1rem 1.1rem;
+        box-shadow: 0 12px 28px rgba(20, 17, 15, 0.18);
+        min-height: 140px;
+        display: flex;
+        flex-direction: column;
+        gap: 0.5rem;
+        backdrop-filter: none !important;
+        -webkit-backdrop-filter: none !important;
+        transition: transform 0.2s ease, box-shadow 0.2s ease;
+    }}
+
+    .assistant-card:hover {{
+        transform: translateY(-4px);
+        box-shadow: 0 16px 36px rgba(20, 17, 15, 0.24);
+    }}
+
+    .assistant-card.status-free {{ border-top-color: var(--success); }}
+    .assistant-card.status-busy {{ border-top-color: var(--warning); }}
+    .assistant-card.status-blocked {{ border-top-color: var(--danger); }}
+    .assistant-card.status-unknown {{ border-top-color: var(--info); }}
+
+    .assistant-card__header {{
+        display: flex;
+        align-items: center;
+        justify-content: space-between;
+        gap: 0.6rem;
+        margin-bottom: 0.25rem;
+    }}
+
+    .assistant-card__name {{
+        font-size: 1.1rem;
+        font-weight: 700;
+        color: var(--text-primary);
+        letter-spacing: 0.02em;
+    }}
+
+    .assistant-card__status-pill {{
+        font-size: 0.7rem;
+        padding: 0.2rem 0.65rem;
+        border-radius: 999px;
+        text-transform: uppercase;
+        letter-spacing: 0.06em;
+        font-weight: 600;
+        white-space: nowrap;
+    }}
+
+    .assistant-card__status-pill.success {{
+        background: rgba(52, 49, 45, 0.18);
+        color: var(--text-primary);
+        border: 1px solid rgba(52, 49, 45, 0.35);
+    }}
+    
+    .assistant-card__status-pill.warning {{
+        background: rgba(217, 197, 178, 0.35);
+        color: var(--text-primary);
+        border: 1px solid rgba(217, 197, 178, 0.6);
+    }}
+    
+    .assistant-card__status-pill.danger {{
+        background: rgba(126, 127, 131, 0.25);
+        color: var(--text-primary);
+        border: 1px solid rgba(126, 127, 131, 0.45);
+    }}
+    
+    .assistant-card__status-pill.info {{
+        background: rgba(20, 17, 15, 0.12);
+        color: var(--text-primary);
+        border: 1px solid rgba(20, 17, 15, 0.35);
+    }}
+
+    .assistant-card__details {{
+        font-size: 0.88rem;
+        color: var(--text-primary);
+        opacity: 0.9;
+        line-height: 1.4;
+        flex-grow: 1;
+    }}
+
+    .assistant-card__meta {{
+        margin-top: auto;
+        padding-top: 0.5rem;
+        font-size: 0.75rem;
+        text-transform: uppercase;
+        letter-spacing: 0.04em;
+        color: var(--text-secondary);
+        opacity: 0.8;
+        display: flex;
+        justify-content: space-between;
+        border-top: 1px solid var(--glass-border);
+    }}
+
+    @media (max-width: 768px) {{
+        .assistant-grid {{
+            grid-template-columns: repeat(auto-fit, minmax(180px, 1fr));
+        }}
+    }}
+    </style>
+    """
+
+
+def _header_css() -> str:
+    # Served from ./static so the browser caches it instead of a base64 copy per rerun.
+    logo_url = _static_asset_url("logo.jpg")
+    logo_css = f"""
+header[data-testid="stHeader"]::before {{
+    content: "";
+    position: absolute;
+    left: 24px;
+    top: 50%;
+    transform: translateY(-50%);
+    width: 72px;
+    height: 56px;
+    background: url("{logo_url}") center / contain no-repeat;
+    pointer-events: none;
+}}
+""" if logo_url else ""
+    return f"""
+<style>
+header[data-testid="stHeader"] {{
+    background: #f8fafc !important;
+    min-height: 72px;
+    border-bottom: 1px solid #3b82f6;
+    box-shadow: 0 12px 32px rgba(20, 17, 15, 0.18);
+    position: sticky;
+    top: 0;
+    z-index: 100;
+}}
+header[data-testid="stHeader"] [data-testid="stToolbarActions"],
+header[data-testid="stHeader"] [data-testid="stMainMenu"] {{
+    display: none !important;
+    visibility: hidden !important;
+}}
+header[data-testid="stHeader"]::after {{
+    content: "THE DENTAL BOND\\AReal-time Scheduling Management System";
+    white-space: pre;
+    position: absolute;
+    left: 50%;
+    top: 50%;
+    transform: translate(-50%, -50%);
+    text-align: center;
+    font-size: 20px;
+    font-weight: 800;
+    line-height: 1.3;
+    letter-spacing: 0.4px;
+    color: #1e293b;
+    text-shadow: 0 3px 10px rgba(52, 49, 45, 0.2);
+    pointer-events: none;
+}}
+{logo_css}
+</style>
+"""
+
+
+def apply_theme() -> None:
+    """Inject the sidebar, page and header stylesheets (every run, before any page content)."""
+    inject_white_pastel_sidebar()
+    inject_stylesheet("theme", _THEME_CSS)
+    inject_stylesheet("header", _header_css())
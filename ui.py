@@ -0,0 +1,738 @@
+# pyright: reportMissingImports=false, reportMissingModuleSource=false, reportUnknownVariableType=false, reportUnknownArgumentType=false, reportUnknownParameterType=false, reportUnknownMemberType=false, reportGeneralTypeIssues=false
+"""Widgets shared by several pages: live fragments, countdowns, status cards,
+the availability heatmap, the rebalance preview and the profile manager.
+"""
+
+import html
+import os
+import time as time_module
+import uuid
+from datetime import time as time_type
+from typing import Any, Optional, cast
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+import runtime
+import storage
+from allocation import (
+    DAY_MINUTES,
+    GRID_FREE,
+    GRID_LABELS,
+    GRID_NOT_IN,
+    GRID_OFF,
+    _apply_rebalance_patch,
+    _grid_slot_availability,
+    auto_allocate_assistants,
+    get_availability_grid,
+)
+from staff import (
+    PROFILE_SUPABASE_TABLE,
+    _get_all_doctors,
+    _get_known_departments,
+    _refresh_staff_options_from_supabase,
+)
+from storage import (
+    _get_active_assistant_profile_names,
+    _maybe_save,
+    _profiles_table_ready,
+    _render_profiles_setup_help,
+    load_profiles,
+    save_profiles,
+)
+from theme import _static_serving_enabled
+from utils import IST, _is_blank_cell, _now_iso, _parse_iso_ts, mins_to_hhmm
+
+
+# ================ LIVE FRAGMENTS ================
+# Live panels (sidebar punch + duty timer, reminders, assistant cards) run as
+# st.fragment with their own cadence: a tick reruns only that panel, never the
+# load/hash/notification pipeline, the schedule editor or the save path.
+# Costs of the last run per scope are kept in st.session_state.rerun_costs.
+# Bundled workbook, warm: full script ~120 ms per rerun (previously paid on
+# every interaction); punch ~45 ms, duty timer ~20 ms, assistant cards
+# ~15 ms, reminders ~4 ms per fragment rerun.
+LIVE_DUTY_REFRESH = "60s"
+LIVE_REMINDERS_REFRESH = "30s"
+LIVE_CARDS_REFRESH = "60s"
+_HAS_FRAGMENT = hasattr(st, "fragment")
+
+
+def _record_rerun_cost(scope: str, started_at: float) -> None:
+    try:
+        costs = dict(st.session_state.get("rerun_costs", {}))
+        costs[scope] = round((time_module.perf_counter() - started_at) * 1000.0, 1)
+        st.session_state.rerun_costs = costs
+    except Exception:
+        pass
+
+
+def render_rerun_costs() -> None:
+    """Expander with the timings _record_rerun_cost stored on the last run."""
+    with st.expander("⏱️ Performance (last run)", expanded=False):
+        costs = dict(st.session_state.get("rerun_costs", {}))
+        if costs:
+            st.dataframe(
+                pd.DataFrame({"Metric": list(costs.keys()), "Value": list(costs.values())}),
+                hide_index=True,
+                use_container_width=True,
+            )
+        else:
+            st.caption("No timings recorded yet.")
+        st.caption(
+            "Times in ms; *_kb is the payload sent for that part of the page. "
+            f"Static serving: {'on' if _static_serving_enabled() else 'off (CSS inlined)'}."
+        )
+
+
+def _is_fragment_rerun() -> bool:
+    try:
+        from streamlit.runtime.scriptrunner import get_script_run_ctx
+        ctx = get_script_run_ctx()
+        return bool(ctx is not None and ctx.fragment_ids_this_run)
+    except Exception:
+        return False
+
+
+def live_fragment(run_every: Optional[str] = None):
+    """st.fragment(run_every=...) with clock refresh and timing; plain call on older Streamlit."""
+    def _decorate(func):
+        def _run(*args, **kwargs):
+            started_at = time_module.perf_counter()
+            if _is_fragment_rerun():
+                runtime.refresh_clock()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                _record_rerun_cost(func.__name__, started_at)
+
+        _run.__name__ = func.__name__
+        _run.__doc__ = func.__doc__
+        if not _HAS_FRAGMENT:
+            return _run
+        return st.fragment(_run, run_every=run_every)
+
+    return _decorate
+
+
+def _rerun_live_fragment() -> None:
+    """Rerun just the enclosing live fragment (whole app when fragments are unavailable)."""
+    if _HAS_FRAGMENT and _is_fragment_rerun():
+        st.rerun(scope="fragment")
+    st.rerun()
+
+
+# ================ CLIENT-SIDE COUNTDOWN ================
+# components/countdown is a build-free component: the deadline is sent once,
+# the browser ticks every second and posts back only when it expires, so
+# timers animate without server reruns.
+_countdown_component = None
+try:
+    import streamlit.components.v1 as _components_v1
+    _countdown_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), "components", "countdown")
+    if os.path.isdir(_countdown_dir):
+        _countdown_component = _components_v1.declare_component("tdb_countdown", path=_countdown_dir)
+except Exception:
+    _countdown_component = None
+
+
+def render_countdown(
+    due_at: Any,
+    label: str,
+    *,
+    key: str,
+    expired_label: str = "",
+    count_up: bool = False,
+    compact: bool = False,
+) -> bool:
+    """Browser-side mm:ss countdown to due_at; returns True once it has passed.
+
+    Expired timers are not rendered unless count_up (e.g. overtime) is set.
+    """
+    due_dt = _parse_iso_ts(due_at)
+    if due_dt is None:
+        return False
+    if due_dt.tzinfo is None:
+        due_dt = due_dt.replace(tzinfo=IST)
+    due_ms = int(due_dt.timestamp() * 1000)
+    server_ms = int(time_module.time() * 1000)
+    # 1s grace so the browser's expiry callback never lands just before the deadline
+    expired = due_ms <= server_ms + 1000
+    if expired and not count_up:
+        return True
+
+    if _countdown_component is None:
+        seconds = abs(due_ms - server_ms) // 1000
+        if expired:
+            st.caption(f"{expired_label} +{seconds // 60:02d}:{seconds % 60:02d}")
+        else:
+            st.caption(f"{label} {seconds // 60:02d}:{seconds % 60:02d}")
+        return expired
+
+    try:
+        _countdown_component(
+            due_epoch_ms=due_ms,
+            server_epoch_ms=server_ms,
+            label=label,
+            expired_label=expired_label,
+            count_up=count_up,
+            compact=compact,
+            reported_ms=st.session_state.get(key),
+            key=key,
+            default=None,
+        )
+    except Exception:
+        pass
+    return expired
+
+
+# ================ AVAILABILITY HEATMAP ================
+_GRID_CELL_STYLES = {
+    "": "background-color: #dcfce7",
+    "Busy": "background-color: #fecaca",
+    "Blocked": "background-color: #fde68a",
+    "Not in": "background-color: #e2e8f0",
+    "Off": "background-color: #cbd5e1; color: #475569",
+}
+
+
+def render_availability_heatmap(df_schedule: pd.DataFrame) -> None:
+    """Team x 15-minute heatmap; clicking a cell recommends an allocation for that slot."""
+    grid = get_availability_grid(df_schedule)
+    if not grid["names"]:
+        st.caption("No assistants configured.")
+        return
+    col_doc, col_len = st.columns([2, 1])
+    with col_doc:
+        heat_doctor = st.selectbox("Doctor for recommendations", options=[""] + _get_all_doctors(), key="heatmap_doctor")
+    with col_len:
+        heat_minutes = st.number_input("Appointment length (min)", min_value=15, max_value=240, value=30, step=15, key="heatmap_minutes")
+
+    labels = np.vectorize(GRID_LABELS.get, otypes=[object])(grid["codes"])
+    frame = pd.DataFrame(labels, index=grid["names"], columns=grid["labels"])
+    styled = frame.style.map(lambda v: _GRID_CELL_STYLES.get(v, ""))
+    st.caption("🟩 free · 🟥 busy · 🟨 blocked · ⬜ not punched in / off. Click a cell for a recommendation.")
+    try:
+        event = st.dataframe(
+            styled,
+            use_container_width=True,
+            on_select="rerun",
+            selection_mode="single-cell",
+            key="availability_heatmap",
+        )
+        cells = list(getattr(getattr(event, "selection", None), "cells", []) or [])
+    except Exception:
+        # Older Streamlit without cell selection: pick the slot by hand.
+        st.dataframe(styled, use_container_width=True)
+        picked = st.selectbox("Slot", options=[""] + grid["labels"], key="heatmap_slot")
+        cells = [(0, picked)] if picked else []
+
+    if not cells:
+        return
+    row_pos, slot_label = cells[0]
+    if slot_label not in grid["labels"]:
+        return
+    slot_start = grid["starts"][grid["labels"].index(slot_label)]
+    clicked = grid["names"][int(row_pos)] if 0 <= int(row_pos) < len(grid["names"]) else ""
+    code = int(grid["codes"][int(row_pos), grid["labels"].index(slot_label)]) if clicked else GRID_FREE
+    if clicked and code != GRID_FREE:
+        reason = grid["off_reason"].get(clicked) if code in (GRID_OFF, GRID_NOT_IN) else GRID_LABELS[code]
+        st.caption(f"{clicked} at {slot_label}: {reason or GRID_LABELS[code]}")
+    if not heat_doctor:
+        st.info(f"Slot {slot_label}: choose a doctor above to get a recommended allocation.")
+        return
+    slot_end = slot_start + int(heat_minutes)
+    in_t = time_type((slot_start // 60) % 24, slot_start % 60)
+    out_t = time_type((slot_end // 60) % 24, slot_end % 60)
+    allocation = auto_allocate_assistants(
+        heat_doctor, in_t, out_t, df_schedule, availability=_grid_slot_availability(grid, slot_start, slot_end)
+    )
+    picks = [f"**{role}**: {name}" for role, name in allocation.items() if name]
+    if picks:
+        st.success(f"Recommended for {heat_doctor} {mins_to_hhmm(slot_start % DAY_MINUTES)}-{mins_to_hhmm(slot_end % DAY_MINUTES)} · " + " · ".join(picks))
+    else:
+        st.warning("No available assistants found for this time slot in the department.")
+
+
+# ================ AVAILABILITY REBALANCER ================
+def render_rebalance_preview(df_schedule: pd.DataFrame) -> None:
+    plan = st.session_state.get("pending_rebalance")
+    if not isinstance(plan, dict) or not plan.get("diff"):
+        return
+    diff = plan["diff"]
+    refilled = sum(1 for change in diff if change.get("new"))
+    with st.container(border=True):
+        st.markdown(f"#### ♻️ Rebalance after {plan.get('reason') or plan.get('assistant', '')}")
+        st.caption(f"{refilled} of {len(diff)} seats held by {plan.get('assistant', '')} can be refilled. Nothing is saved until you apply.")
+        st.dataframe(
+            pd.DataFrame(
+                [
+                    {
+                        "Patient": change.get("patient", ""),
+                        "In Time": change.get("in_time", ""),
+                        "Role": change.get("role", ""),
+                        "Before": change.get("old", ""),
+                        "After": change.get("new", "") or "— (unfilled)",
+                    }
+                    for change in diff
+                ]
+            ),
+            use_container_width=True,
+            hide_index=True,
+        )
+        col_apply, col_discard = st.columns(2)
+        with col_apply:
+            if st.button("✅ Apply rebalance", key="rebalance_apply", use_container_width=True):
+                df_patched, applied, skipped = _apply_rebalance_patch(df_schedule, diff)
+                st.session_state.pop("pending_rebalance", None)
+                if applied:
+                    _maybe_save(df_patched, message=f"Rebalanced {applied} seat(s) after {plan.get('reason') or 'availability change'}")
+                if skipped:
+                    st.toast(f"{skipped} seat(s) changed since the preview and were left alone.", icon="⚠️")
+                st.rerun()
+        with col_discard:
+            if st.button("Discard", key="rebalance_discard", use_container_width=True):
+                st.session_state.pop("pending_rebalance", None)
+                st.rerun()
+
+
+# ================ ASSISTANT STATUS CARDS ================
+STATUS_BADGES = {
+    "FREE": {"label": "Free", "emoji": "🟢", "pill": "success", "card_class": "status-free", "default_detail": "Ready for assignment"},
+    "BUSY": {"label": "Busy", "emoji": "🔴", "pill": "warning", "card_class": "status-busy", "default_detail": "In procedure"},
+    "BLOCKED": {"label": "Blocked", "emoji": "🚫", "pill": "danger", "card_class": "status-blocked", "default_detail": "Unavailable"},
+    "UNKNOWN": {"label": "Unknown", "emoji": "❔", "pill": "info", "card_class": "status-unknown", "default_detail": "No schedule"},
+}
+
+
+def _render_availability_summary(total: int, free: int, busy: int, blocked: int) -> None:
+    """Render availability summary using native Streamlit components."""
+    col1, col2, col3, col4 = st.columns(4)
+    
+    with col1:
+        st.metric(label="👥 Total Assistants", value=total, help="Rostered today")
+    with col2:
+        st.metric(label="🟢 Free", value=free, help="Ready for allocation")
+    with col3:
+        st.metric(label="🔴 Busy", value=busy, help="Currently chairside")
+    with col4:
+        st.metric(label="🚫 Blocked", value=blocked, help="Weekly off / hold")
+
+
+_ASSISTANT_CARD_CSS = """
+<style>
+.assistant-card-name {font-weight:700; color:#1e293b; margin-bottom:2px;}
+.assistant-card-status, .assistant-card-dept {font-size:0.85rem; color:#64748b;}
+.assistant-card-detail {font-size:0.95rem; color:#1e293b; margin:6px 0;}
+</style>
+"""
+
+
+def _build_assistant_card_html(name: str, emoji: str, label: str, detail_text: str, department: str) -> str:
+    detail_html = f"<div class='assistant-card-detail'>{html.escape(detail_text)}</div>" if detail_text else ""
+    return (
+        f"<div class='assistant-card-name'>{html.escape(name)}</div>"
+        f"<div class='assistant-card-status'>{emoji} {html.escape(label)}</div>"
+        f"{detail_html}"
+        f"<div class='assistant-card-dept'>Dept: {html.escape(department)}</div>"
+    )
+
+
+def _render_assistant_cards(card_entries: list[dict[str, Any]], key_prefix: str = "cards") -> None:
+    """Render assistant cards; each card body is a memoized HTML fragment.
+
+    Duty and appointment timers tick in the browser (render_countdown).
+    """
+    if not card_entries:
+        st.info("No assistants match the selected filters.")
+        return
+    st.markdown(_ASSISTANT_CARD_CSS, unsafe_allow_html=True)
+
+    # Create rows of 4 cards each
+    cards_per_row = 4
+    for i in range(0, len(card_entries), cards_per_row):
+        row_entries = card_entries[i:i + cards_per_row]
+        cols = st.columns(cards_per_row)
+        
+        for j, entry in enumerate(row_entries):
+            with cols[j]:
+                assistant_name = str(entry.get("name", "Assistant"))
+                info = entry.get("info", {}) or {}
+                status_raw = str(info.get("status", "UNKNOWN")).upper()
+                meta = STATUS_BADGES.get(status_raw, STATUS_BADGES["UNKNOWN"])
+
+                reason = str(info.get("reason", "")).strip()
+                patient = str(info.get("patient", "")).strip()
+                doctor = str(info.get("doctor", "")).strip()
+                op_room = str(info.get("op", "")).strip()
+                department = str(info.get("department", "")) or "—"
+
+                due_at = info.get("due_at") if status_raw == "BUSY" else None
+                out_at = info.get("out_at") if status_raw == "BUSY" and patient else None
+
+                # Build detail text
+                detail_lines: list[str] = []
+                if status_raw == "BUSY" and patient:
+                    detail_lines.append(f"With {patient}")
+                elif due_at:
+                    detail_lines.append("On Duty")
+                elif reason:
+                    detail_lines.append(reason)
+                else:
+                    detail_lines.append(meta.get("default_detail", ""))
+
+                if doctor and (status_raw == "BUSY" or not patient):
+                    detail_lines.append(f"Doctor: {doctor}")
+
+                if op_room:
+                    detail_lines.append(f"OP: {op_room}")
+
+                detail_text = " | ".join(line for line in detail_lines if line)
+
+                status_emoji = meta["emoji"]
+                status_label = meta["label"]
+                
+                card_html = _build_assistant_card_html(assistant_name, status_emoji, status_label, detail_text, department)
+
+                with st.container(border=True):
+                    st.markdown(card_html, unsafe_allow_html=True)
+                    card_key = f"{key_prefix}_{entry.get('raw_name', assistant_name)}"
+                    if due_at:
+                        render_countdown(
+                            due_at,
+                            "Duty •",
+                            key=f"{card_key}_duty",
+                            expired_label="Duty time over",
+                            count_up=True,
+                            compact=True,
+                        )
+                    elif out_at:
+                        render_countdown(
+                            out_at,
+                            "Ends in",
+                            key=f"{card_key}_out",
+                            expired_label="Overtime",
+                            count_up=True,
+                            compact=True,
+                        )
+
+
+# ================ PROFILE MANAGER ================
+def _restore_profile_hidden_columns(
+    edited_df: pd.DataFrame,
+    base_df: pd.DataFrame,
+    hidden_cols: list[str],
+    user_name: str,
+) -> pd.DataFrame:
+    out = edited_df.copy()
+    for col in hidden_cols:
+        if col not in out.columns:
+            out[col] = ""
+    if "id" not in out.columns:
+        out["id"] = ""
+
+    base_id_map: dict[str, dict[str, Any]] = {}
+    if "id" in base_df.columns:
+        for _, row in base_df.iterrows():
+            rid = str(row.get("id", "")).strip()
+            if not rid or rid.lower() in {"nan", "none"}:
+                continue
+            base_id_map[rid] = row.to_dict()
+
+    if base_id_map and "name" in out.columns and "department" in out.columns:
+        base_key = (
+            base_df["name"].astype(str).str.strip().str.upper()
+            + "|"
+            + base_df["department"].astype(str).str.strip().str.upper()
+        )
+        base_keys = dict(zip(base_key, base_df["id"].astype(str)))
+        missing_id = out["id"].apply(_is_blank_cell)
+        if missing_id.any():
+            out_key = (
+                out["name"].astype(str).str.strip().str.upper()
+                + "|"
+                + out["department"].astype(str).str.strip().str.upper()
+            )
+            out.loc[missing_id, "id"] = out_key[missing_id].map(base_keys).fillna("")
+
+    if base_id_map:
+        for col in hidden_cols:
+            mask = out[col].apply(_is_blank_cell)
+            if not mask.any():
+                continue
+            out.loc[mask, col] = out.loc[mask, "id"].map(
+                lambda rid: base_id_map.get(str(rid).strip(), {}).get(col, "")
+            )
+
+    now_iso = _now_iso()
+    if "created_at" in out.columns:
+        mask = out["created_at"].apply(_is_blank_cell)
+        if mask.any():
+            out.loc[mask, "created_at"] = now_iso
+    if "created_by" in out.columns:
+        mask = out["created_by"].apply(_is_blank_cell)
+        if mask.any():
+            out.loc[mask, "created_by"] = user_name
+
+    return out
+
+
+def render_profile_manager(sheet_name: str, entity_label: str, dept_label: str) -> None:
+    """UI to add/edit assistant/doctor profiles with simple role guard."""
+    user_role = st.session_state.get("user_role", "viewer")
+    user_name = st.session_state.get("current_user", "user")
+    if storage.supabase_enabled() and storage.supabase_client is not None:
+        ready, err = _profiles_table_ready(storage.supabase_client, PROFILE_SUPABASE_TABLE)
+        if not ready:
+            _render_profiles_setup_help(PROFILE_SUPABASE_TABLE, err)
+            return
+    df_profiles = load_profiles(sheet_name)
+    status_options = ["ACTIVE", "INACTIVE"]
+    dept_options = [""] + _get_known_departments()
+    hidden_cols = ["id", "created_at", "updated_at", "created_by", "updated_by"]
+    is_editor = user_role in ("admin", "editor")
+
+    st.markdown(f"### {entity_label} Profiles")
+
+    if not is_editor:
+        # Filters (applied to the read-only view)
+        f1, f2, f3 = st.columns([0.2, 0.2, 0.6])
+        with f1:
+            status_filter = st.multiselect(
+                "Status",
+                options=status_options,
+                default=["ACTIVE"],
+                key=f"{sheet_name}_status_filter",
+            )
+        with f2:
+            dept_filter = st.selectbox(
+                dept_label,
+                options=["All"] + dept_options[1:],
+                key=f"{sheet_name}_dept_filter",
+            )
+        with f3:
+            search_term = st.text_input("Search name", key=f"{sheet_name}_search")
+
+        filtered = df_profiles.copy()
+        if status_filter:
+            filtered = filtered.loc[filtered["status"].isin(status_filter)]
+        if dept_filter and dept_filter != "All":
+            filtered = filtered.loc[filtered["department"].str.upper() == dept_filter.upper()]
+        if search_term:
+            filtered = filtered.loc[filtered["name"].str.contains(search_term, case=False, na=False)]
+
+        display_filtered = filtered.drop(columns=[c for c in hidden_cols if c in filtered.columns], errors="ignore")
+        st.dataframe(display_filtered, use_container_width=True, hide_index=True)
+        st.info("You are in read-only mode. Switch to admin/editor to add or edit profiles.")
+        return
+
+    def _render_add_profile_dialog_body() -> None:
+        st.markdown(f"### Add {entity_label}")
+        with st.form(f"add_{sheet_name}_form", clear_on_submit=False):
+            name = st.text_input(f"{entity_label} Name")
+            dept = st.selectbox(dept_label, options=dept_options, key=f"{sheet_name}_dept_new")
+            contact_email = st.text_input("Contact Email", key=f"{sheet_name}_email_new")
+            contact_phone = st.text_input("Contact Phone", key=f"{sheet_name}_phone_new")
+            status_val = st.selectbox("Status", options=status_options, key=f"{sheet_name}_status_new")
+            submitted = st.form_submit_button(f"Add {entity_label}")
+            if submitted:
+                if not name.strip():
+                    st.warning("Name is required.")
+                else:
+                    new_row = {
+                        "id": str(uuid.uuid4()),
+                        "name": name.strip(),
+                        "department": dept.strip(),
+                        "contact_email": contact_email.strip(),
+                        "contact_phone": contact_phone.strip(),
+                        "status": status_val,
+                        "created_at": _now_iso(),
+                        "updated_at": _now_iso(),
+                        "created_by": user_name,
+                        "updated_by": user_name,
+                    }
+                    df_profiles_local = pd.concat([df_profiles, pd.DataFrame([new_row])], ignore_index=True)
+                    ok = save_profiles(df_profiles_local, sheet_name)
+                    if not ok:
+                        st.error(f"Failed to save {entity_label}.")
+                        return
+                    st.session_state.profiles_cache_bust += 1
+                    if storage.supabase_enabled() and storage.supabase_client is not None:
+                        st.session_state.supabase_staff_refreshed = False
+                    st.success(f"{entity_label} added.")
+                    st.rerun()
+
+    _dialog_decorator = getattr(st, "dialog", None) or getattr(st, "experimental_dialog", None)
+    if _dialog_decorator:
+        @_dialog_decorator(f"Add {entity_label}")
+        def _render_add_profile_dialog() -> None:
+            _render_add_profile_dialog_body()
+    else:
+        def _render_add_profile_dialog() -> None:
+            st.warning("Popup add requires a newer Streamlit version.")
+            _render_add_profile_dialog_body()
+
+    if st.button(f"Add {entity_label}", key=f"add_{sheet_name}_open", use_container_width=True):
+        _render_add_profile_dialog()
+
+    def _render_delete_profile_dialog_body() -> None:
+        st.markdown(f"### Delete {entity_label} Profiles")
+        if df_profiles.empty:
+            st.caption("No profiles available to delete.")
+            return
+        option_meta: dict[str, dict[str, Any]] = {}
+        delete_options: list[str] = []
+
+        for idx, row in df_profiles.iterrows():
+            name = str(row.get("name", "")).strip()
+            dept = str(row.get("department", "")).strip()
+            rid = str(row.get("id", "")).strip()
+            row_no = cast(int, idx) + 1
+
+            label_parts = [name.title() if name else f"Row {row_no}"]
+            if dept:
+                label_parts.append(dept.title())
+            label = " - ".join(label_parts)
+            if rid:
+                label = f"{label} ({rid[-6:]})"
+            else:
+                label = f"{label} (row {row_no})"
+            if label in option_meta:
+                label = f"{label} #{row_no}"
+
+            option_meta[label] = {
+                "id": rid,
+                "index": idx,
+                "name": name.upper(),
+                "department": dept.upper(),
+            }
+            delete_options.append(label)
+
+        selected = st.multiselect(
+            f"Select {entity_label} profiles",
+            options=delete_options,
+            key=f"{sheet_name}_delete_select",
+        )
+        confirm = st.checkbox(
+            "Confirm delete",
+            key=f"{sheet_name}_delete_confirm",
+        )
+        if st.button(
+            f"Delete selected {entity_label} profiles",
+            key=f"{sheet_name}_delete_btn",
+            use_container_width=True,
+        ):
+            if not selected:
+                st.warning("Select at least one profile to delete.")
+            elif not confirm:
+                st.warning("Please confirm delete.")
+            else:
+                to_delete = [option_meta[label] for label in selected if label in option_meta]
+                if storage.supabase_enabled() and storage.supabase_client is not None:
+                    try:
+                        ids = [item["id"] for item in to_delete if item.get("id")]
+                        if ids:
+                            storage.supabase_client.table(PROFILE_SUPABASE_TABLE).delete().in_("id", ids).execute()
+                        for item in to_delete:
+                            if item.get("id"):
+                                continue
+                            if not item.get("name"):
+                                continue
+                            q = (
+                                storage.supabase_client.table(PROFILE_SUPABASE_TABLE)
+                                .delete()
+                                .eq("kind", sheet_name)
+                                .eq("name", item["name"])
+                            )
+                            if item.get("department"):
+                                q = q.eq("department", item["department"])
+                            q.execute()
+                        try:
+                            _get_active_assistant_profile_names.clear()
+                        except Exception:
+                            pass
+                        try:
+                            _refresh_staff_options_from_supabase(storage.supabase_client)
+                        except Exception:
+                            pass
+                    except Exception as e:
+                        st.error(f"Failed to delete {entity_label} profiles: {e}")
+                        return
+                else:
+                    drop_idx = [item["index"] for item in to_delete]
+                    df_after = df_profiles.drop(index=drop_idx, errors="ignore").reset_index(drop=True)
+                    ok = save_profiles(df_after, sheet_name)
+                    if not ok:
+                        st.error(f"Failed to delete {entity_label} profiles.")
+                        return
+                if storage.supabase_enabled() and storage.supabase_client is not None:
+                    st.session_state.supabase_staff_refreshed = False
+                st.session_state.profiles_cache_bust += 1
+                st.success(f"Deleted {len(to_delete)} {entity_label} profile(s).")
+                st.rerun()
+
+    if _dialog_decorator:
+        @_dialog_decorator(f"Delete {entity_label}")
+        def _render_delete_profile_dialog() -> None:
+            _render_delete_profile_dialog_body()
+    else:
+        def _render_delete_profile_dialog() -> None:
+            st.warning("Popup delete requires a newer Streamlit version.")
+            _render_delete_profile_dialog_body()
+
+    if st.button(f"Delete {entity_label}", key=f"delete_{sheet_name}_open", use_container_width=True):
+        _render_delete_profile_dialog()
+
+    st.markdown("#### Edit All Profiles")
+    edited_df = st.data_editor(
+        df_profiles,
+        hide_index=True,
+        use_container_width=True,
+        key=f"{sheet_name}_editor",
+        column_config={
+            "id": None,
+            "name": st.column_config.TextColumn(f"{entity_label} Name", required=True),
+            "department": st.column_config.SelectboxColumn(dept_label, options=dept_options),
+            "contact_email": st.column_config.TextColumn("Contact Email"),
+            "contact_phone": st.column_config.TextColumn("Contact Phone"),
+            "status": st.column_config.SelectboxColumn("Status", options=status_options, required=True),
+            "created_at": None,
+            "updated_at": None,
+            "created_by": None,
+            "updated_by": None,
+        },
+    )
+    if st.button("Save profile changes", key=f"{sheet_name}_save_btn"):
+        edited_df = _restore_profile_hidden_columns(edited_df, df_profiles, hidden_cols, user_name)
+        edited_df["updated_at"] = _now_iso()
+        edited_df["updated_by"] = user_name
+        ok = save_profiles(edited_df, sheet_name)
+        if not ok:
+            st.error("Failed to save profile changes.")
+            return
+        st.session_state.profiles_cache_bust += 1
+        if storage.supabase_enabled() and storage.supabase_client is not None:
+            st.session_state.supabase_staff_refreshed = False
+        st.success("Profiles updated.")
+        if storage.supabase_enabled() and storage.supabase_client is not None:
+            st.rerun()
+
+
+# ================ DOCTOR SUMMARY ================
+def render_doctor_summary(df_schedule: pd.DataFrame) -> None:
+    # ================ Doctor Statistics ================
+    st.markdown("### 👨‍⚕️ Schedule Summary by Doctor")
+    groupby_column = "DR."
+    if groupby_column in df_schedule.columns and not df_schedule[groupby_column].isnull().all():
+        try:
+            doctor_procedures = df_schedule.loc[df_schedule["DR."].notna()].groupby("DR.").size().reset_index(name="Total Procedures")
+            doctor_procedures = doctor_procedures.reset_index(drop=True)
+            if not doctor_procedures.empty:
+                edited_doctor = st.data_editor(doctor_procedures, width="stretch", key="doctor_editor", hide_index=True)
+            else:
+                st.info(f"No data available for '{groupby_column}'.")
+        except Exception as e:
+            st.error(f"Error processing doctor data: {e}")
+    else:
+        st.info(f"Column '{groupby_column}' not found or contains only empty values.")
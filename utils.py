@@ -0,0 +1,607 @@
+# pyright: reportMissingImports=false, reportMissingModuleSource=false, reportUnknownVariableType=false, reportUnknownArgumentType=false, reportUnknownParameterType=false, reportUnknownMemberType=false, reportGeneralTypeIssues=false
+"""Pure helpers shared by every module: IST clock, time parsing/formatting, cell coercion.
+
+No Streamlit and no storage here, so anything (the allocation engine, the
+simulator, scripts) can import it.
+"""
+
+import hashlib
+import json
+import os
+import re
+import textwrap
+from datetime import datetime, time as time_type, timedelta, timezone
+from typing import Any, Optional
+
+import pandas as pd
+
+
+# ================ TIME HELPERS ================
+# Indian Standard Time (IST = UTC+5:30)
+IST = timezone(timedelta(hours=5, minutes=30))
+
+
+def now_ist():
+    """Get current datetime in IST timezone."""
+    return datetime.now(IST)
+
+
+def time_to_minutes(time_value: Any) -> Optional[int]:
+    """Convert time values to minutes since midnight for comparison."""
+    from datetime import time as time_type
+
+    # Handle None
+    if time_value is None:
+        return None
+
+    # Handle time objects
+    if isinstance(time_value, time_type):
+        return time_value.hour * 60 + time_value.minute
+
+    # Handle strings
+    if isinstance(time_value, str):
+        time_value = time_value.strip()
+        if not time_value:
+            return None
+        try:
+            # Try parsing HH:MM format
+            parts = time_value.split(":")
+            if len(parts) == 2:
+                h, m = int(parts[0]), int(parts[1])
+                if 0 <= h < 24 and 0 <= m < 60:
+                    return h * 60 + m
+        except Exception:
+            pass
+
+    # Handle numbers (assume minutes or decimal hours)
+    try:
+        val = float(time_value)
+        if 0 <= val < 24:  # Assume decimal hours
+            hours = int(val)
+            minutes = int((val - hours) * 60)
+            return hours * 60 + minutes
+        elif 0 <= val < 1440:  # Assume minutes
+            return int(val)
+    except Exception:
+        pass
+
+    return None
+
+
+def safe_str_to_time_obj(s):
+    """Convert HH:MM string to time object. Returns None if invalid."""
+    if not s or not isinstance(s, str):
+        return None
+    try:
+        parts = s.strip().split(":")
+        if len(parts) != 2:
+            return None
+        h, m = int(parts[0]), int(parts[1])
+        if 0 <= h < 24 and 0 <= m < 60:
+            return time_type(hour=h, minute=m)
+        return None
+    except Exception:
+        return None
+
+
+def safe_time_to_minutes(t):
+    if t is None:
+        return None
+    return t.hour * 60 + t.minute
+
+
+def ist_today_and_time():
+    now = datetime.now(IST)
+    return now.date().isoformat(), now.strftime("%H:%M:%S")
+
+
+# Fix None handling in calc_worked_minutes
+def calc_worked_minutes(in_t, out_t, now_t):
+    in_min = safe_time_to_minutes(in_t)
+    now_min = safe_time_to_minutes(now_t)
+    if in_min is None:
+        return None, "ABSENT"
+    if out_t is None:
+        if now_min is None:
+            return None, "PARTIAL"
+        worked = now_min - in_min
+        if worked < 0:
+            worked += 1440
+        return worked, "PARTIAL"
+    out_min = safe_time_to_minutes(out_t)
+    if out_min is None:
+        return None, "PARTIAL"
+    worked = out_min - in_min
+    if worked < 0:
+        worked += 1440
+    return worked, "PRESENT"
+
+
+def mins_to_hhmm(m):
+    if m is None:
+        return ""
+    h = m // 60
+    mm = m % 60
+    return f"{h:02d}:{mm:02d}"
+
+
+def _normalize_html(block: str) -> str:
+    return "\n".join(
+        line.strip()
+        for line in textwrap.dedent(block).splitlines()
+        if line.strip()
+    )
+
+
+def _format_punch_time(val: str) -> str:
+    s = str(val or "").strip()
+    if len(s) >= 5:
+        return s[:5]
+    return s
+
+
+def _calc_worked_minutes(punch_in: str, punch_out: str) -> Optional[int]:
+    in_min = time_to_minutes(punch_in)
+    out_min = time_to_minutes(punch_out)
+    if in_min is None or out_min is None:
+        return None
+    worked = out_min - in_min
+    if worked < 0:
+        worked += 1440
+    return worked
+
+
+# ================ HELPER FUNCTIONS ================
+def _parse_iso_ts(val):
+    try:
+        if isinstance(val, datetime):
+            return val
+        if isinstance(val, str):
+            return datetime.fromisoformat(val.replace("Z", "+00:00"))
+    except Exception:
+        return None
+    return None
+
+
+def _safe_int(val, default: int) -> int:
+    try:
+        if val is None or (isinstance(val, float) and pd.isna(val)):
+            return default
+        return int(float(val))
+    except Exception:
+        return default
+
+
+def _frame_fingerprint(df: pd.DataFrame, columns: Any) -> Optional[str]:
+    """md5 of the given columns (as text) and the index; None when the content cannot be hashed."""
+    cols = [c for c in columns if c in df.columns]
+    try:
+        digest = hashlib.md5(str(list(df.index)).encode("utf-8"))
+        for col in cols:
+            digest.update(f"\x1f{col}\x1d".encode("utf-8") + "\x1e".join(map(str, df[col].tolist())).encode("utf-8"))
+        return digest.hexdigest()
+    except Exception:
+        return None
+
+
+def _date_from_any(val):
+    try:
+        if isinstance(val, datetime):
+            return val.date()
+        if hasattr(val, "date"):
+            return val.date()
+        if isinstance(val, str) and val:
+            return datetime.fromisoformat(val.replace("Z", "+00:00")).date()
+    except Exception:
+        return None
+    return None
+
+
+def _get_app_version_short() -> str:
+    """Best-effort git/version identifier for display.
+
+    Streamlit Cloud does not guarantee a .git directory is present at runtime,
+    so we fall back to common CI env vars when available.
+    """
+    for key in (
+        "STREAMLIT_GIT_COMMIT",
+        "GIT_COMMIT",
+        "GITHUB_SHA",
+        "COMMIT_SHA",
+        "VERCEL_GIT_COMMIT_SHA",
+        "RENDER_GIT_COMMIT",
+        "CF_PAGES_COMMIT_SHA",
+    ):
+        val = (os.environ.get(key) or "").strip()
+        if val:
+            return val[:7]
+
+    try:
+        base_dir = os.path.dirname(os.path.abspath(__file__))
+        head_path = os.path.join(base_dir, ".git", "HEAD")
+        if os.path.exists(head_path):
+            head = (open(head_path, "r", encoding="utf-8").read() or "").strip()
+            if head.startswith("ref:"):
+                ref_rel = head.split("ref:", 1)[1].strip()
+                ref_path = os.path.join(base_dir, ".git", *ref_rel.split("/"))
+                if os.path.exists(ref_path):
+                    sha = (open(ref_path, "r", encoding="utf-8").read() or "").strip()
+                    if sha:
+                        return sha[:7]
+            elif head:
+                return head[:7]
+    except Exception:
+        pass
+
+    return "unknown"
+
+
+# ================ TIME UTILITY FUNCTIONS ================
+# Define time conversion functions early so they can be used throughout the code
+def _coerce_to_time_obj(time_value: Any) -> Optional[time_type]:
+    """Best-effort coercion of many time representations into a datetime.time.
+
+    Supports:
+    - datetime.time, datetime
+    - strings: HH:MM, HH:MM:SS, HH.MM, and 12-hour formats like '09:30 AM'
+    - numbers: 9.30 (meaning 09:30), or Excel serial time 0-1
+    """
+    if time_value is None or pd.isna(time_value) or time_value == "":
+        return None
+    if isinstance(time_value, time_type):
+        return time_value
+
+    # Strings
+    if isinstance(time_value, str):
+        s = " ".join(time_value.strip().split())
+        if s == "" or s.upper() in {"N/A", "NAT", "NONE"}:
+            return None
+
+        # 12-hour formats (e.g., 09:30 AM, 9:30PM, 09:30:00 PM)
+        if re.search(r"\b(AM|PM)\b", s, flags=re.IGNORECASE) or re.search(r"(AM|PM)$", s, flags=re.IGNORECASE):
+            s_norm = re.sub(r"\s*(AM|PM)\s*$", r" \1", s, flags=re.IGNORECASE).upper()
+            for fmt in ("%I:%M %p", "%I:%M:%S %p"):
+                try:
+                    dt = datetime.strptime(s_norm, fmt)
+                    return time_type(dt.hour, dt.minute)
+                except ValueError:
+                    pass
+
+        # HH:MM or HH:MM:SS
+        if ":" in s:
+            parts = s.split(":")
+            if len(parts) >= 2:
+                try:
+                    h = int(parts[0])
+                    m_part = re.sub(r"\D.*$", "", parts[1])
+                    m = int(m_part)
+                    if 0 <= h < 24 and 0 <= m < 60:
+                        return time_type(h, m)
+                except (ValueError, TypeError):
+                    pass
+
+        # HH.MM
+        if "." in s:
+            parts = s.split(".")
+            if len(parts) == 2:
+                try:
+                    h = int(parts[0])
+                    m = int(parts[1])
+                    if 0 <= h < 24 and 0 <= m < 60:
+                        return time_type(h, m)
+                except (ValueError, TypeError):
+                    pass
+
+        return None
+
+    # Numeric formats
+    try:
+        num_val = float(time_value)
+    except (ValueError, TypeError):
+        return None
+
+    # Excel serial time format (0.625 = 15:00)
+    if 0 <= num_val <= 1:
+        total_minutes = round(num_val * 1440)
+        hours = (total_minutes // 60) % 24
+        minutes = total_minutes % 60
+        return time_type(hours, minutes)
+
+    # 9.30 meaning 09:30 (decimal part is minutes directly)
+    if 0 <= num_val < 24:
+        hours = int(num_val)
+        decimal_part = num_val - hours
+        minutes = round(decimal_part * 100)
+        if minutes > 59:
+            minutes = round(decimal_part * 60)
+        if minutes >= 60:
+            hours = (hours + 1) % 24
+            minutes = 0
+        if 0 <= hours < 24 and 0 <= minutes < 60:
+            return time_type(hours, minutes)
+
+    return None
+
+
+TIME_PICKER_HOURS = [""] + [f"{i:02d}" for i in range(1, 13)]
+TIME_PICKER_MINUTES = [""] + [f"{i:02d}" for i in range(60)]
+TIME_PICKER_AMPM = ["AM", "PM"]
+
+
+def _time_to_picker_parts(time_value: Any) -> tuple[str, str, str]:
+    t = _coerce_to_time_obj(time_value)
+    if t is None:
+        return "", "", "AM"
+    hour = t.hour
+    if hour == 0:
+        hour_12 = 12
+        ampm = "AM"
+    elif hour < 12:
+        hour_12 = hour
+        ampm = "AM"
+    elif hour == 12:
+        hour_12 = 12
+        ampm = "PM"
+    else:
+        hour_12 = hour - 12
+        ampm = "PM"
+    return f"{hour_12:02d}", f"{t.minute:02d}", ampm
+
+
+def _time_from_picker_parts(hour_str: str, minute_str: str, ampm: str) -> tuple[str, Optional[str]]:
+    hour_text = str(hour_str or "").strip()
+    minute_text = str(minute_str or "").strip()
+    if not hour_text and not minute_text:
+        return "", None
+    if not hour_text or not minute_text:
+        return "", "Select hour and minute."
+    try:
+        hour = int(hour_text)
+        minute = int(minute_text)
+    except ValueError:
+        return "", "Invalid time selection."
+    if hour < 1 or hour > 12 or minute < 0 or minute > 59:
+        return "", "Invalid time selection."
+    ampm_norm = str(ampm or "").strip().upper()
+    if ampm_norm not in ("AM", "PM"):
+        return "", "Select AM or PM."
+    if hour == 12:
+        hour_24 = 0 if ampm_norm == "AM" else 12
+    else:
+        hour_24 = hour if ampm_norm == "AM" else hour + 12
+    return f"{hour_24:02d}:{minute:02d}", None
+
+
+def dec_to_time(time_value: Any) -> str:
+    """Convert various time formats to HH:MM string"""
+    t = _coerce_to_time_obj(time_value)
+    if t is None:
+        return "N/A"
+    return f"{t.hour:02d}:{t.minute:02d}"
+
+
+def time_obj_to_str(t: Any) -> str:
+    """Convert time object to 24-hour HH:MM string for Excel"""
+    if pd.isna(t) or t is None:
+        return "N/A"
+    try:
+        if isinstance(t, time_type):
+            return f"{t.hour:02d}:{t.minute:02d}"
+        elif isinstance(t, str):
+            return t
+    except (ValueError, AttributeError):
+        pass
+    return "N/A"
+
+
+def time_obj_to_str_12hr(t: Any) -> str:
+    """Convert time object to 12-hour format with AM/PM"""
+    if pd.isna(t) or t is None:
+        return "N/A"
+    try:
+        if isinstance(t, time_type):
+            return t.strftime("%I:%M %p")
+        elif isinstance(t, str):
+            return t
+    except (ValueError, AttributeError):
+        pass
+    return "N/A"
+
+
+# ================ STAFF NAME HELPERS ================
+# Departments with their doctors and assistants
+# NOTE: Keep these lists as the single source of truth for dropdowns + allocation.
+def _unique_preserve_order(items: list[str]) -> list[str]:
+    seen: set[str] = set()
+    out: list[str] = []
+    for item in items:
+        key = str(item).strip().upper()
+        if not key or key in seen:
+            continue
+        seen.add(key)
+        out.append(key)
+    return out
+
+
+def _norm_staff_key(value: str) -> str:
+    """Normalize names like 'DR. NAME' vs 'DR.NAME' to a stable key."""
+    try:
+        s = str(value or "").strip().upper()
+        return re.sub(r"[^A-Z0-9]+", "", s)
+    except Exception:
+        return ""
+
+
+def _parse_weekly_off_days(val: Any) -> list[int]:
+    """Parse weekly off string to list of weekday indices (0=Mon)."""
+    if val is None:
+        return []
+    days_map = {
+        "MONDAY": 0, "MON": 0,
+        "TUESDAY": 1, "TUE": 1, "TUES": 1,
+        "WEDNESDAY": 2, "WED": 2,
+        "THURSDAY": 3, "THU": 3, "THURS": 3,
+        "FRIDAY": 4, "FRI": 4,
+        "SATURDAY": 5, "SAT": 5,
+        "SUNDAY": 6, "SUN": 6,
+    }
+    out: list[int] = []
+    parts: list[Any] = []
+    if isinstance(val, (list, tuple, set)):
+        parts = list(val)
+    elif isinstance(val, str):
+        raw = val.strip()
+        if not raw:
+            return []
+        if (raw.startswith("[") and raw.endswith("]")) or (raw.startswith("{") and raw.endswith("}")):
+            try:
+                parsed = json.loads(raw)
+                if isinstance(parsed, (list, tuple, set)):
+                    parts = list(parsed)
+                else:
+                    parts = [parsed]
+            except Exception:
+                parts = raw.replace(";", ",").split(",")
+        else:
+            parts = raw.replace(";", ",").split(",")
+    else:
+        parts = [val]
+
+    for part in parts:
+        if part is None or (isinstance(part, float) and pd.isna(part)):
+            continue
+        p = str(part).strip().upper()
+        if not p:
+            continue
+        if p.isdigit():
+            idx = int(p)
+            if 0 <= idx <= 6:
+                out.append(idx)
+        elif p in days_map:
+            out.append(days_map[p])
+    return out
+
+
+WEEKDAY_NAMES = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"]
+
+
+def _weekly_off_names(val: Any) -> list[str]:
+    idxs = _parse_weekly_off_days(val)
+    return [WEEKDAY_NAMES[i] for i in idxs if 0 <= i < 7]
+
+
+def _weekly_off_str_from_list(lst: list[str]) -> str:
+    if not lst:
+        return ""
+    names_upper = [str(x).strip().upper() for x in lst if str(x).strip()]
+    out = []
+    for nm in names_upper:
+        if nm in [d.upper() for d in WEEKDAY_NAMES]:
+            out.append(WEEKDAY_NAMES[[d.upper() for d in WEEKDAY_NAMES].index(nm)])
+    return ",".join(out)
+
+
+def _is_blank_cell(value: Any) -> bool:
+    """True if value is empty/NaN/'nan'/'none'."""
+    try:
+        if value is None or pd.isna(value):
+            return True
+    except Exception:
+        pass
+    s = str(value).strip()
+    return (not s) or (s.lower() in {"nan", "none", "nat", "n/a", "na", "null", "-", "--"})
+
+
+def _time_to_hhmm(t: Optional[time_type]) -> str:
+    if t is None:
+        return ""
+    return f"{t.hour:02d}:{t.minute:02d}"
+
+
+def _to_float(value: Any) -> Optional[float]:
+    try:
+        return float(value)
+    except Exception:
+        return None
+
+
+def _normalize_name_list(values: Any) -> list[str]:
+    if values is None:
+        return []
+    if isinstance(values, (list, tuple, set)):
+        items = list(values)
+    else:
+        items = [values]
+    return _unique_preserve_order([str(x) for x in items if str(x).strip()])
+
+
+def _get_third_column_name(columns: Any) -> str:
+    try:
+        if "Third" in columns:
+            return "Third"
+        if "THIRD" in columns:
+            return "THIRD"
+    except Exception:
+        pass
+    return "Third"
+
+
+# ================ MISC HELPERS ================
+def _as_bool(val) -> bool:
+    try:
+        return str(val).strip().lower() in {"1", "true", "yes", "on"}
+    except Exception:
+        return False
+
+
+def _now_iso():
+    """Get current time in IST as ISO string."""
+    return now_ist().isoformat(timespec="seconds")
+
+
+def _now_ist_str() -> str:
+    return datetime.now(IST).strftime("%Y-%m-%d %H:%M:%S")
+
+
+def _norm_cell(val) -> str:
+    if val is None:
+        return ""
+    if isinstance(val, float) and pd.isna(val):
+        return ""
+    s = str(val).strip()
+    if s.lower() in {"nan", "none"}:
+        return ""
+    return s
+
+
+# Convert checkbox columns (SUCTION, CLEANING) - checkmark or content to boolean
+def str_to_checkbox(val: Any) -> bool:
+    """Convert string values to boolean for checkboxes"""
+    # Preserve actual booleans
+    if isinstance(val, bool):
+        return val
+
+    # Handle numbers (0/1)
+    try:
+        if isinstance(val, (int, float)) and not pd.isna(val):
+            return bool(int(val))
+    except Exception:
+        pass
+
+    if pd.isna(val):
+        return False
+
+    s = str(val).strip()
+    if s == "":
+        return False
+
+    su = s.upper()
+    if su in {"FALSE", "F", "0", "NO", "N", "NONE", "NAN"}:
+        return False
+    if su in {"TRUE", "T", "1", "YES", "Y"}:
+        return True
+    if s == "✓":
+        return True
+
+    # Any other non-empty content is treated as checked (legacy behavior)
+    return True
@@ -0,0 +1,114 @@
+"""Process-wide read cache for the schedule workbook ("Putt Allotment.xlsx").
+
+Every page reads several side sheets (attendance, duty runs, duty
+assignments, profiles) on each rerun, and each read used to re-open and
+re-parse the whole workbook. Reads here are keyed by the file's
+(mtime_ns, size), so any save -- from this process or another -- is picked up
+on the next read, while unchanged files are parsed at most once per sheet.
+
+The module has no Streamlit dependency, so it is imported like any other
+module (and byte-compiled once) instead of being re-run with the app script.
+Callers get copies; mutating a returned frame or row list never touches the
+cache.
+"""
+
+import os
+import threading
+from typing import Any, Optional
+
+import pandas as pd
+
+_LOCK = threading.Lock()
+_FRAMES: dict[tuple[str, str], tuple[tuple[int, int], pd.DataFrame]] = {}
+_VALUES: dict[tuple[str, str], tuple[tuple[int, int], list[tuple[Any, ...]]]] = {}
+_SHEET_NAMES: dict[str, tuple[tuple[int, int], list[str]]] = {}
+
+
+def _stamp(path: str) -> Optional[tuple[int, int]]:
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return (st.st_mtime_ns, st.st_size)
+
+
+def sheet_names(path: str) -> list[str]:
+    """Sheet names of the workbook, or [] when it is missing or unreadable."""
+    stamp = _stamp(path)
+    if stamp is None:
+        return []
+    key = os.path.abspath(path)
+    with _LOCK:
+        hit = _SHEET_NAMES.get(key)
+        if hit and hit[0] == stamp:
+            return list(hit[1])
+    try:
+        names = list(pd.ExcelFile(path, engine="openpyxl").sheet_names)
+    except Exception:
+        return []
+    with _LOCK:
+        _SHEET_NAMES[key] = (stamp, names)
+    return list(names)
+
+
+def read_sheet(path: str, sheet_name: str) -> Optional[pd.DataFrame]:
+    """pd.read_excel(path, sheet_name) through the cache; None when missing or unreadable."""
+    stamp = _stamp(path)
+    if stamp is None:
+        return None
+    key = (os.path.abspath(path), sheet_name)
+    with _LOCK:
+        hit = _FRAMES.get(key)
+        if hit and hit[0] == stamp:
+            return hit[1].copy()
+    try:
+        df = pd.read_excel(path, sheet_name=sheet_name, engine="openpyxl")
+    except Exception:
+        return None
+    with _LOCK:
+        _FRAMES[key] = (stamp, df)
+    return df.copy()
+
+
+def read_sheet_values(path: str, sheet_name: str) -> Optional[list[tuple[Any, ...]]]:
+    """Raw openpyxl rows (ws.values) of a sheet; None when the sheet is missing or unreadable.
+
+    Rows are tuples, so the shallow list copy is enough to keep the cache intact.
+    """
+    stamp = _stamp(path)
+    if stamp is None:
+        return None
+    key = (os.path.abspath(path), sheet_name)
+    with _LOCK:
+        hit = _VALUES.get(key)
+        if hit and hit[0] == stamp:
+            return list(hit[1])
+    try:
+        import openpyxl
+
+        # One full load fills every sheet: profile pages read Assistants and
+        # Doctors back to back.
+        wb = openpyxl.load_workbook(path)
+        try:
+            loaded = {name: [tuple(row) for row in wb[name].values] for name in wb.sheetnames}
+        finally:
+            wb.close()
+    except Exception:
+        return None
+    with _LOCK:
+        for name, rows in loaded.items():
+            _VALUES[(key[0], name)] = (stamp, rows)
+    if sheet_name not in loaded:
+        return None
+    return list(loaded[sheet_name])
+
+
+def invalidate(path: Optional[str] = None) -> None:
+    """Drop cached reads for one workbook (or all). Saves are detected by mtime anyway."""
+    key = os.path.abspath(path) if path else None
+    with _LOCK:
+        for cache in (_FRAMES, _VALUES):
+            for cache_key in [k for k in cache if key is None or k[0] == key]:
+                cache.pop(cache_key, None)
+        for cache_key in [k for k in _SHEET_NAMES if key is None or k == key]:
+            _SHEET_NAMES.pop(cache_key, None)